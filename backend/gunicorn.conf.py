@@ -6,6 +6,9 @@ Tune via env:
 - WEB_CONCURRENCY (workers)
 - GUNICORN_THREADS
 - GUNICORN_TIMEOUT
+- SIDDES_SERVER=asgi: uvicorn workers serving siddes_backend.asgi:application
+  (start_prod.sh picks the app). Threads do not apply; blocking ORM/cache work
+  runs in asgiref's thread pool (size: ASGI_THREADS).
 """
 
 import os
@@ -15,6 +18,9 @@ bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
 workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
 threads = int(os.environ.get("GUNICORN_THREADS", "8"))
 
+if os.environ.get("SIDDES_SERVER", "wsgi").strip().lower() == "asgi":
+    worker_class = "uvicorn_worker.UvicornWorker"
+
 timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
 keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
 
@@ -0,0 +1,164 @@
+"""Per-request account context (profile state shared by middleware and views).
+
+AccountStateMiddleware used to resolve `user.siddes_profile` (and sometimes
+get_or_create it) on every unsafe request, and views then reloaded the same
+profile for email-verified checks. Instead, `account_context(request)` builds
+one small AccountContext per request:
+
+- request memo: stored on the underlying HttpRequest, so middleware and the
+  DRF view share it
+- shared cache: short TTL (SIDDES_ACCOUNT_CTX_TTL_SECS, default 60)
+- DB: one values() read of SiddesProfile (get_or_create only when missing)
+
+Writers call `invalidate_account_context(user_id)`: moderation state changes,
+deactivation/deletion, and email verification. Helpers never raise.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+_MEMO_ATTR = "_siddes_account_ctx"
+
+
+class AccountContext(NamedTuple):
+    user_id: int
+    state: str = "active"
+    until: Optional[datetime] = None
+    reason: Optional[str] = None
+    email_verified: bool = False
+    deactivated: bool = False
+    deleted: bool = False
+
+    def restricted_state(self, now: Optional[datetime] = None) -> Optional[str]:
+        """The restriction in force (None when active or a timebox expired)."""
+
+        st = (self.state or "active").strip().lower() or "active"
+        if st == "active":
+            return None
+        if st in ("read_only", "suspended") and self.until is not None:
+            try:
+                if (now or timezone.now()) >= self.until:
+                    return None
+            except Exception:
+                pass
+        return st
+
+
+def account_ctx_ttl() -> int:
+    raw = os.environ.get("SIDDES_ACCOUNT_CTX_TTL_SECS", "60")
+    try:
+        ttl = int(str(raw).strip())
+    except Exception:
+        ttl = 60
+    return max(0, min(ttl, 600))
+
+
+def _key(user_id: int) -> str:
+    return f"acct:v1:ctx:{int(user_id)}"
+
+
+def _to_cache(ctx: AccountContext) -> Dict[str, Any]:
+    d = ctx._asdict()
+    d["until"] = ctx.until.isoformat() if ctx.until is not None else None
+    return d
+
+
+def _from_cache(v: Any) -> Optional[AccountContext]:
+    if not isinstance(v, dict) or "user_id" not in v:
+        return None
+    try:
+        d = dict(v)
+        d["until"] = datetime.fromisoformat(d["until"]) if d.get("until") else None
+        return AccountContext(**d)
+    except Exception:
+        return None
+
+
+_FIELDS = ("account_state", "account_state_until", "account_state_reason", "email_verified", "deactivated_at", "deleted_at")
+
+
+def load_account_context(user_id: int) -> AccountContext:
+    """Context for a user id (shared cache, then one profile read)."""
+
+    uid = int(user_id)
+    ttl = account_ctx_ttl()
+    if ttl > 0:
+        try:
+            hit = _from_cache(cache.get(_key(uid)))
+            if hit is not None:
+                return hit
+        except Exception:
+            pass
+
+    from .models import SiddesProfile
+
+    row = SiddesProfile.objects.filter(user_id=uid).values(*_FIELDS).first()
+    if row is None:
+        prof, _ = SiddesProfile.objects.get_or_create(user_id=uid)
+        row = {f: getattr(prof, f, None) for f in _FIELDS}
+
+    ctx = AccountContext(
+        user_id=uid,
+        state=str(row.get("account_state") or "active").strip().lower() or "active",
+        until=row.get("account_state_until"),
+        reason=str(row.get("account_state_reason") or "").strip()[:200] or None,
+        email_verified=bool(row.get("email_verified")),
+        deactivated=row.get("deactivated_at") is not None,
+        deleted=row.get("deleted_at") is not None,
+    )
+    if ttl > 0:
+        try:
+            cache.set(_key(uid), _to_cache(ctx), timeout=ttl)
+        except Exception:
+            pass
+    return ctx
+
+
+def account_context(request: Any) -> Optional[AccountContext]:
+    """The authenticated user's AccountContext, built once per request (None if anonymous)."""
+
+    try:
+        user = getattr(request, "user", None)
+        uid = getattr(user, "pk", None) if user is not None and getattr(user, "is_authenticated", False) else None
+    except Exception:
+        uid = None
+    if not isinstance(uid, int):
+        return None
+
+    # Memoized per user id: DRF may authenticate a different user than the session.
+    req = getattr(request, "_request", request)  # DRF Request -> HttpRequest
+    memo = getattr(req, _MEMO_ATTR, None)
+    if isinstance(memo, AccountContext) and memo.user_id == uid:
+        return memo
+
+    try:
+        ctx = load_account_context(uid)
+    except Exception:
+        return None
+    try:
+        setattr(req, _MEMO_ATTR, ctx)
+    except Exception:
+        pass
+    return ctx
+
+
+def invalidate_account_context(user_id: object, request: Any = None) -> None:
+    """Drop the cached context (and this request's memo, when given)."""
+
+    try:
+        cache.delete(_key(int(user_id)))  # type: ignore[arg-type]
+    except Exception:
+        pass
+    if request is not None:
+        try:
+            req = getattr(request, "_request", request)
+            if hasattr(req, _MEMO_ATTR):
+                delattr(req, _MEMO_ATTR)
+        except Exception:
+            pass
@@ -18,12 +18,14 @@ from rest_framework.views import APIView
 
 from siddes_backend.csrf import dev_csrf_exempt
 from siddes_backend.emailing import send_email
-from siddes_backend.identity import viewer_aliases
+from siddes_backend.identity import invalidate_identity, viewer_aliases
 from siddes_contacts.normalize import normalize_email
 from siddes_contacts.tokens import hmac_token
 from siddes_contacts.models import ContactIdentityToken, ContactMatchEdge
 
+from .account_context import account_context, invalidate_account_context
 from .models import SiddesProfile, EmailChangeToken, AccountDeleteToken, UserSession
+from .session_cache import mark_revoked
 
 
 def _truthy(v: str | None) -> bool:
@@ -146,21 +148,26 @@ def _revoke_all_sessions_for_user(user) -> None:
     now = timezone.now()
 
     try:
-        # Mark our tracked sessions revoked
-        UserSession.objects.filter(user=user, revoked_at__isnull=True).update(revoked_at=now)
+        # Mark our tracked sessions revoked (and refuse them via the revocation cache)
+        qs = UserSession.objects.filter(user=user, revoked_at__isnull=True)
+        recs = list(qs.values_list("session_key", "id"))
+        qs.update(revoked_at=now)
+        mark_revoked(recs)
     except Exception:
         pass
 
-    # Delete rows from django_session for this user.
+    # Delete the remaining sessions for this user (through the session engine).
     try:
         qs = Session.objects.filter(expire_date__gt=now)
+        stale = []
         for s in qs.iterator(chunk_size=200):
             try:
                 data = s.get_decoded() or {}
                 if str(data.get("_auth_user_id") or "") == str(user.id):
-                    s.delete()
+                    stale.append((s.session_key, None))
             except Exception:
                 continue
+        mark_revoked(stale)
     except Exception:
         pass
 
@@ -321,6 +328,7 @@ class EmailChangeConfirmView(APIView):
             prof.email_verified = True
             prof.email_verified_at = now
             prof.save(update_fields=["email_verified", "email_verified_at", "updated_at"])
+            invalidate_account_context(user.id, request)
 
             _ensure_email_identity_token(user, new_email)
 
@@ -371,6 +379,7 @@ class AccountDeactivateView(APIView):
             "account_state_set_at",
             "updated_at",
         ])
+        invalidate_account_context(user.id, request)
 
         # Kill sessions and deactivate login
         try:
@@ -407,8 +416,8 @@ class AccountDeleteRequestView(APIView):
         if not user or not getattr(user, "is_authenticated", False):
             return Response({"ok": False, "error": "restricted"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        prof = _ensure_profile(user)
-        if not bool(getattr(prof, "email_verified", False)):
+        ctx = account_context(request)
+        if not (ctx.email_verified if ctx is not None else bool(getattr(_ensure_profile(user), "email_verified", False))):
             return Response({"ok": False, "error": "email_not_verified"}, status=status.HTTP_400_BAD_REQUEST)
 
         cur_email = normalize_email(str(getattr(user, "email", "") or ""))
@@ -487,6 +496,7 @@ class AccountDeleteConfirmView(APIView):
 
         user = rec.user
         User = get_user_model()
+        old_username = str(getattr(user, "username", "") or "")
 
         # Generate a unique deleted username
         base = f"deleted_{user.id}"
@@ -530,10 +540,13 @@ class AccountDeleteConfirmView(APIView):
                 "account_state_set_at",
                 "updated_at",
             ])
+            invalidate_account_context(user.id, request)
 
             rec.used_at = now
             rec.save(update_fields=["used_at"])
 
+        invalidate_identity(user.id, old_username, user.username)
+
         # sd_473: purge contact discoverability tokens/edges for deleted accounts
         _purge_contact_discoverability(user)
 
@@ -7,6 +7,8 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .account_context import account_context
+
 
 def _mask_email(email: str) -> str:
     e = (email or "").strip()
@@ -70,10 +72,10 @@ class ConnectedAuthMethodsView(APIView):
         if not user or not getattr(user, "is_authenticated", False):
             return Response({"ok": False, "error": "restricted"}, status=status.HTTP_401_UNAUTHORIZED)
 
-        prof = getattr(user, "siddes_profile", None)
+        ctx = account_context(request)
 
         email = str(getattr(user, "email", "") or "").strip()
-        email_verified = bool(getattr(prof, "email_verified", False)) if prof else False
+        email_verified = bool(ctx.email_verified) if ctx is not None else False
         try:
             has_password = bool(user.has_usable_password())
         except Exception:
@@ -21,6 +21,7 @@ from siddes_contacts.normalize import normalize_email
 from siddes_contacts.tokens import hmac_token
 from siddes_contacts.models import ContactIdentityToken
 
+from .account_context import invalidate_account_context
 from .models import EmailVerificationToken, SiddesProfile
 
 def _session_payload(request):
@@ -216,6 +217,7 @@ class VerifyConfirmView(APIView):
             prof.email_verified = True
             prof.email_verified_at = now
             prof.save(update_fields=["email_verified", "email_verified_at", "updated_at"])
+            invalidate_account_context(user.id)
 
         # sd_472: create contact identity token on verify (enables contacts match discoverability)
         try:
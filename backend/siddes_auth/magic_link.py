@@ -22,6 +22,7 @@ from siddes_contacts.normalize import normalize_email
 from siddes_contacts.tokens import hmac_token
 from siddes_contacts.models import ContactIdentityToken
 
+from .account_context import invalidate_account_context
 from .models import MagicLinkToken, SiddesProfile
 
 
@@ -286,6 +287,7 @@ class MagicLinkConsumeView(APIView):
             prof.email_verified = True
             prof.email_verified_at = now
             prof.save(update_fields=["email_verified", "email_verified_at", "updated_at"])
+            invalidate_account_context(user.id)
 
         # sd_472: create contact identity token after verified (enables contacts match discoverability)
         try:
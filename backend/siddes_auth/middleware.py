@@ -1,33 +1,56 @@
 from __future__ import annotations
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import logout
 from django.db.utils import OperationalError, ProgrammingError
 from django.utils import timezone
 
+from siddes_backend.async_support import HybridMiddleware, resolved_user
+
 from .models import UserSession
+from .session_cache import flush_seen, note_seen, remember_session, session_state, start_seen_window
 
 
-class UserSessionCaptureMiddleware:
+class UserSessionCaptureMiddleware(HybridMiddleware):
     """
     Track user sessions for device/session management.
 
-    - Inserts/updates a UserSession row for authenticated requests.
+    - Inserts a UserSession row the first time an authenticated session is seen.
     - If a session is marked revoked, logs the user out (deny-by-default).
-    - Updates last_seen_at at most once per 60 seconds to reduce DB writes.
+    - Revocation state comes from the session cache (session_cache.py); the
+      DB is read only on a cache miss.
+    - last_seen_at updates at most once per 60 seconds, written in batches.
+    - Async mode: anonymous requests skip both steps without a thread hop.
     """
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-
     def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+        pre = self._pre(request)
+        response = self.get_response(request)
+        self._post(request, *pre)
+        return response
+
+    async def _acall(self, request):
+        pre = ("", None)
+        if _signed_in(resolved_user(request)):
+            pre = await sync_to_async(self._pre)(request)
+        response = await self.get_response(request)
+        if _signed_in(resolved_user(request)):
+            await sync_to_async(self._post)(request, *pre)
+        return response
+
+    def _pre(self, request):
         # Pre: if session is revoked, force logout before view executes
+        pre_key = ""
+        pre_state = None
         try:
             user = getattr(request, "user", None)
             session = getattr(request, "session", None)
             session_key = str(getattr(session, "session_key", "") or "")
             if user and getattr(user, "is_authenticated", False) and session_key:
-                rec = UserSession.objects.filter(session_key=session_key).first()
-                if rec and rec.revoked_at is not None:
+                pre_key, pre_state = session_key, session_state(session_key)
+                if pre_state and pre_state.get("revoked"):
                     try:
                         logout(request)
                         request.session.flush()
@@ -38,16 +61,16 @@ class UserSessionCaptureMiddleware:
             pass
         except Exception:
             pass
+        return pre_key, pre_state
 
-        response = self.get_response(request)
-
+    def _post(self, request, pre_key, pre_state) -> None:
         # Post: record usage (best-effort)
         try:
-            user = importing_user = getattr(request, "user", None)
+            user = getattr(request, "user", None)
             session = getattr(request, "session", None)
             session_key = str(getattr(session, "session_key", "") or "")
             if not user or not getattr(user, "is_authenticated", False) or not session_key:
-                return response
+                return
 
             now = timezone.now()
 
@@ -64,32 +87,28 @@ class UserSessionCaptureMiddleware:
             except Exception:
                 ua = ""
 
-            rec = UserSession.objects.filter(session_key=session_key).first()
-            if rec:
-                # Update at most once per 60s
-                try:
-                    age = (now - (rec.last_seen_at or now)).total_seconds()
-                except Exception:
-                    age = 61
-                if age >= 60:
-                    rec.last_seen_at = now
-                    if ip:
-                        rec.ip = ip
-                    if ua:
-                        rec.user_agent = ua
-                    rec.save(update_fields=["last_seen_at", "ip", "user_agent"])
-            else:
-                UserSession.objects.create(
+            # Login/logout inside the view rotates the key; only reuse a matching pre-check.
+            st = pre_state if session_key == pre_key else session_state(session_key)
+            if st is None:
+                rec = UserSession.objects.create(
                     user=user,
                     session_key=session_key,
                     last_seen_at=now,
                     ip=ip or "",
                     user_agent=ua or "",
                 )
+                remember_session(session_key, rec.id)
+                start_seen_window(session_key)
+            elif not st.get("revoked"):
+                note_seen(session_key, int(st.get("id") or 0), now=now, ip=ip, ua=ua)
+
+            flush_seen()
         except (OperationalError, ProgrammingError):
             # migrations not applied yet
             pass
         except Exception:
             pass
 
-        return response
+
+def _signed_in(user) -> bool:
+    return bool(user is not None and getattr(user, "is_authenticated", False))
@@ -21,6 +21,7 @@ from siddes_backend.csrf import dev_csrf_exempt
 from siddes_backend.emailing import send_email
 from siddes_contacts.normalize import normalize_email
 
+from .account_context import invalidate_account_context
 from .models import PasswordResetToken, SiddesProfile
 
 def _session_payload(request):
@@ -77,6 +78,8 @@ def _sd_revoke_other_sessions(user, keep_session_key: str = "") -> dict:
     try:
         from django.contrib.sessions.models import Session
         from django.utils import timezone
+
+        from .session_cache import mark_revoked
         now = timezone.now()
 
         # Fast path: if UserSession tracking exists, revoke those.
@@ -85,18 +88,11 @@ def _sd_revoke_other_sessions(user, keep_session_key: str = "") -> dict:
             qs = UserSession.objects.filter(user=user, revoked_at__isnull=True)
             if keep_session_key:
                 qs = qs.exclude(session_key=keep_session_key)
-            recs = list(qs.all()[:5000])
-            for r in recs:
-                try:
-                    Session.objects.filter(session_key=r.session_key).delete()
-                except Exception:
-                    pass
-                try:
-                    r.revoked_at = now
-                    r.save(update_fields=["revoked_at"])
-                except Exception:
-                    pass
-                out["revoked"] += 1
+            recs = list(qs.values_list("session_key", "id")[:5000])
+            if recs:
+                UserSession.objects.filter(id__in=[rid for _, rid in recs]).update(revoked_at=now)
+                mark_revoked(recs)
+            out["revoked"] += len(recs)
         except Exception:
             pass
 
@@ -110,7 +106,7 @@ def _sd_revoke_other_sessions(user, keep_session_key: str = "") -> dict:
                         continue
                     if keep_session_key and s.session_key == keep_session_key:
                         continue
-                    s.delete()
+                    mark_revoked([(s.session_key, None)])
                     out["scannedDeleted"] += 1
                 except Exception:
                     continue
@@ -322,6 +318,7 @@ class PasswordResetConfirmView(APIView):
             prof.email_verified = True
             prof.email_verified_at = now
             prof.save(update_fields=["email_verified", "email_verified_at", "updated_at"])
+            invalidate_account_context(user.id)
 
         login(request, user)
 
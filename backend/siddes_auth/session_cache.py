@@ -0,0 +1,198 @@
+"""Session revocation cache + coalesced last_seen_at writes.
+
+UserSessionCaptureMiddleware used to read the UserSession row twice per
+authenticated request (revocation pre-check, then last_seen_at bookkeeping).
+Instead:
+
+- state: the cache holds {"id", "revoked"} per session key. Misses fall back
+  to one DB read; revocation paths (SessionsRevokeView, SessionsLogoutAllView,
+  password reset, account deletion) write "revoked" into it directly, so a
+  revoked session is refused on its next request without touching the DB.
+- last seen: at most one note per session per interval (cache.add gate, shared
+  across workers) goes into an in-process buffer, flushed in one bulk UPDATE
+  every SIDDES_SESSION_SEEN_FLUSH_SECS. A worker that dies loses at most one
+  window of last_seen_at bumps, which is fine for a "last active" display.
+- revoked keys are deleted through the configured SESSION_ENGINE, so
+  cached_db sessions (SIDDES_SESSION_CACHED_DB=1) lose their cache entry too.
+
+All helpers are best-effort and never raise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from importlib import import_module
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+
+_REVOKED_TTL_SECS = 14 * 24 * 60 * 60  # outlives the session cookie (2 weeks)
+
+
+def _int_env(name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        n = int(str(os.environ.get(name, str(default))).strip())
+    except Exception:
+        n = default
+    return max(lo, min(n, hi))
+
+
+def session_state_ttl() -> int:
+    return _int_env("SIDDES_SESSION_STATE_TTL_SECS", 3600, 0, 86400)
+
+
+def seen_interval() -> int:
+    return _int_env("SIDDES_SESSION_SEEN_INTERVAL_SECS", 60, 1, 3600)
+
+
+def seen_flush_secs() -> int:
+    return _int_env("SIDDES_SESSION_SEEN_FLUSH_SECS", 30, 0, 3600)
+
+
+def _h(session_key: str) -> str:
+    return hashlib.sha256(str(session_key).encode("utf-8")).hexdigest()[:32]
+
+
+def _state_key(session_key: str) -> str:
+    return f"sessions:v1:state:{_h(session_key)}"
+
+
+def _seen_key(session_key: str) -> str:
+    return f"sessions:v1:seen:{_h(session_key)}"
+
+
+# ---------------------------------------------------------------------------
+# Revocation state
+# ---------------------------------------------------------------------------
+
+
+def remember_session(session_key: str, row_id: int, *, revoked: bool = False) -> Dict[str, Any]:
+    st = {"id": int(row_id), "revoked": bool(revoked)}
+    ttl = _REVOKED_TTL_SECS if revoked else session_state_ttl()
+    if session_key and ttl > 0:
+        try:
+            cache.set(_state_key(session_key), st, timeout=ttl)
+        except Exception:
+            pass
+    return st
+
+
+def session_state(session_key: str) -> Optional[Dict[str, Any]]:
+    """{"id", "revoked"} for a tracked session (cache, then one DB read); None if untracked."""
+
+    sk = str(session_key or "")
+    if not sk:
+        return None
+    try:
+        v = cache.get(_state_key(sk))
+        if isinstance(v, dict) and "revoked" in v:
+            return v
+    except Exception:
+        pass
+
+    from .models import UserSession
+
+    row = UserSession.objects.filter(session_key=sk).values_list("id", "revoked_at").first()
+    if row is None:
+        return None
+    return remember_session(sk, row[0], revoked=row[1] is not None)
+
+
+def drop_sessions(session_keys: Iterable[object]) -> None:
+    """Delete sessions through the configured engine (DB row + any cache copy)."""
+
+    keys = [str(k) for k in (session_keys or []) if str(k or "").strip()]
+    if not keys:
+        return
+    try:
+        from django.conf import settings
+
+        store_cls = import_module(settings.SESSION_ENGINE).SessionStore
+    except Exception:
+        store_cls = None
+    for k in keys:
+        try:
+            if store_cls is not None:
+                store_cls(session_key=k).delete()
+            else:
+                from django.contrib.sessions.models import Session
+
+                Session.objects.filter(session_key=k).delete()
+        except Exception:
+            pass
+
+
+def mark_revoked(sessions: Iterable[Tuple[object, Optional[int]]]) -> None:
+    """Record (session_key, UserSession id) pairs as revoked and drop their sessions."""
+
+    keys: List[str] = []
+    for sk, rid in sessions or []:
+        k = str(sk or "")
+        if not k:
+            continue
+        keys.append(k)
+        remember_session(k, int(rid or 0), revoked=True)
+    drop_sessions(keys)
+
+
+# ---------------------------------------------------------------------------
+# Coalesced last_seen_at
+# ---------------------------------------------------------------------------
+
+_SEEN_LOCK = threading.Lock()
+_SEEN: Dict[int, Tuple[Any, str, str]] = {}  # row id -> (ts, ip, ua)
+_SEEN_LAST_FLUSH = [time.monotonic()]
+
+
+def start_seen_window(session_key: str) -> None:
+    """A freshly created row already carries last_seen_at: just open the interval."""
+
+    try:
+        cache.add(_seen_key(session_key), 1, timeout=seen_interval())
+    except Exception:
+        pass
+
+
+def note_seen(session_key: str, row_id: int, *, now: Any, ip: str = "", ua: str = "") -> bool:
+    """Queue a last_seen_at update (at most once per interval per session)."""
+
+    if not row_id:
+        return False
+    try:
+        if not cache.add(_seen_key(session_key), 1, timeout=seen_interval()):
+            return False
+    except Exception:
+        pass
+    with _SEEN_LOCK:
+        _SEEN[int(row_id)] = (now, str(ip or ""), str(ua or "")[:256])
+    return True
+
+
+def flush_seen(*, force: bool = False) -> int:
+    """Write queued last_seen_at updates in bulk. Returns rows written."""
+
+    with _SEEN_LOCK:
+        due = force or (time.monotonic() - _SEEN_LAST_FLUSH[0]) >= seen_flush_secs() or len(_SEEN) >= 500
+        if not due or not _SEEN:
+            return 0
+        batch = dict(_SEEN)
+        _SEEN.clear()
+        _SEEN_LAST_FLUSH[0] = time.monotonic()
+
+    try:
+        from .models import UserSession
+
+        # Empty ip/ua keep the stored values, so group rows by the fields they set.
+        groups: Dict[Tuple[str, ...], List[Any]] = {}
+        for rid, (ts, ip, ua) in batch.items():
+            fields = ("last_seen_at",) + (("ip",) if ip else ()) + (("user_agent",) if ua else ())
+            groups.setdefault(fields, []).append(UserSession(id=rid, last_seen_at=ts, ip=ip, user_agent=ua))
+        for fields, objs in groups.items():
+            UserSession.objects.bulk_update(objs, list(fields), batch_size=500)
+    except Exception:
+        return 0
+    return len(batch)
+
@@ -13,6 +13,7 @@ from rest_framework.views import APIView
 from siddes_backend.csrf import dev_csrf_exempt
 
 from .models import UserSession
+from .session_cache import mark_revoked
 
 
 def _iso(dt) -> Optional[str]:
@@ -92,12 +93,9 @@ class SessionsRevokeView(APIView):
 
         # If revoking current session, log out and flush.
         if cur_key and rec.session_key == cur_key:
-            try:
-                Session.objects.filter(session_key=rec.session_key).delete()
-            except Exception:
-                pass
             rec.revoked_at = now
             rec.save(update_fields=["revoked_at"])
+            mark_revoked([(rec.session_key, rec.id)])
             try:
                 logout(request)
                 request.session.flush()
@@ -105,14 +103,10 @@ class SessionsRevokeView(APIView):
                 pass
             return Response({"ok": True, "revoked": True, "loggedOut": True}, status=status.HTTP_200_OK)
 
-        # Revoke other device
-        try:
-            Session.objects.filter(session_key=rec.session_key).delete()
-        except Exception:
-            pass
-
+        # Revoke other device (the revocation cache refuses it on its next request)
         rec.revoked_at = now
         rec.save(update_fields=["revoked_at"])
+        mark_revoked([(rec.session_key, rec.id)])
 
         return Response({"ok": True, "revoked": True}, status=status.HTTP_200_OK)
 
@@ -147,19 +141,14 @@ class SessionsLogoutAllView(APIView):
         if cur_key and not include_current:
             qs = qs.exclude(session_key=cur_key)
 
-        recs = list(qs.all())
-        revoked_count = 0
-        for r in recs:
-            try:
-                Session.objects.filter(session_key=r.session_key).delete()
-            except Exception:
-                pass
-            r.revoked_at = now
-            r.save(update_fields=["revoked_at"])
-            revoked_count += 1
+        recs = list(qs.values_list("session_key", "id"))
+        if recs:
+            UserSession.objects.filter(id__in=[rid for _, rid in recs]).update(revoked_at=now)
+            mark_revoked(recs)
+        revoked_count = len(recs)
 
         # Best-effort: also scan django sessions table (completeness for sessions not yet tracked)
-        scanned_deleted = 0
+        scanned: list = []
         try:
             for s in Session.objects.filter(expire_date__gt=now).iterator(chunk_size=200):
                 try:
@@ -168,12 +157,13 @@ class SessionsLogoutAllView(APIView):
                     if uid == str(user.id):
                         if cur_key and not include_current and s.session_key == cur_key:
                             continue
-                        s.delete()
-                        scanned_deleted += 1
+                        scanned.append((s.session_key, None))
                 except Exception:
                     continue
         except Exception:
             pass
+        mark_revoked(scanned)
+        scanned_deleted = len(scanned)
 
         logged_out = False
         if include_current:
@@ -120,3 +120,180 @@ class AuthEmailEngineSmokeTests(APITestCase):
 
         rec = MagicLinkToken.objects.get(token_hash=_h(raw))
         self.assertIsNotNone(rec.used_at)
+
+
+class IdentityResolutionCacheTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username="ident_a", email="ident_a@example.com", password="pw", first_name="Ida")
+        self.other = User.objects.create_user(username="ident_b", email="ident_b@example.com", password="pw")
+
+    def test_resolve_many_is_one_query_then_cached(self):
+        from siddes_backend.identity import identity_scope, resolve_many
+
+        toks = [f"me_{self.user.id}", "@ident_b", "Ident_A", "@nobody_here", "opaque:1"]
+        with self.assertNumQueries(1):
+            out = resolve_many(toks)
+        assert out[f"me_{self.user.id}"].name == "Ida"
+        assert out["@ident_b"].user_id == self.other.id
+        assert out["Ident_A"].user_id == self.user.id
+        assert out["@nobody_here"] is None and out["opaque:1"] is None
+
+        # Known users come from the shared cache; unknown handles only from the request memo.
+        with self.assertNumQueries(0):
+            resolve_many(toks[:3])
+        with identity_scope():
+            with self.assertNumQueries(1):
+                resolve_many(toks)
+                resolve_many(toks)
+
+    def test_username_change_invalidates_cached_identity(self):
+        from siddes_backend.identity import display_for_token, resolve
+
+        assert display_for_token(f"me_{self.user.id}")["handle"] == "@ident_a"
+
+        self.client.force_login(self.user)
+        r = self.client.post("/api/auth/username/set", {"username": "ident_renamed"}, format="json")
+        assert r.status_code == 200, r.content
+
+        assert display_for_token(f"me_{self.user.id}")["handle"] == "@ident_renamed"
+        assert resolve("@ident_a") is None
+        assert resolve("@ident_renamed").user_id == self.user.id
+
+
+    def test_user_row_writes_and_reused_ids_drop_the_cached_identity(self):
+        from siddes_backend.identity import resolve
+
+        uid = self.user.id
+        assert resolve(f"me_{uid}").name == "Ida"
+        self.user.first_name = "Idris"
+        self.user.save()  # outside the username endpoint
+        assert resolve(f"me_{uid}").name == "Idris"
+
+        self.user.save(update_fields=["last_login"])  # sign-in writes keep the cache
+        with self.assertNumQueries(0):
+            resolve(f"me_{uid}")
+
+        # A rolled-back insert sends no delete signal; the next row with the same id resets the cache.
+        from django.db import transaction
+
+        class _Rollback(Exception):
+            pass
+
+        try:
+            with transaction.atomic():
+                gone = get_user_model().objects.create_user(username="ident_gone", password="pw")
+                assert resolve(f"me_{gone.id}").username == "ident_gone"
+                raise _Rollback
+        except _Rollback:
+            pass
+        get_user_model().objects.create_user(id=gone.id, username="ident_c", password="pw")
+        assert resolve(f"me_{gone.id}").username == "ident_c"
+        assert resolve("@ident_gone") is None
+
+class SessionRevocationCacheTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username="sess_a", email="sess_a@example.com", password="pw")
+        SiddesProfile.objects.get_or_create(user=self.user)
+
+    def _me(self, client) -> dict:
+        r = client.get("/api/auth/me")
+        assert r.status_code == 200
+        return r.json()
+
+    def test_tracked_session_needs_no_usersession_reads(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_login(self.user)
+        assert self._me(self.client)["authenticated"] is True  # first sight: row created
+        with CaptureQueriesContext(connection) as ctx:
+            assert self._me(self.client)["authenticated"] is True
+        assert not any("siddes_auth_usersession" in q["sql"] for q in ctx.captured_queries)
+
+    def test_revoked_device_is_refused_and_last_seen_is_batched(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+
+        from .models import UserSession
+        from .session_cache import flush_seen
+
+        other = APIClient()
+        other.force_login(self.user)
+        assert self._me(other)["authenticated"] is True
+        self.client.force_login(self.user)
+        self._me(self.client)
+
+        rec = UserSession.objects.get(session_key=other.session.session_key)
+        UserSession.objects.filter(id=rec.id).update(last_seen_at=timezone.now() - timedelta(hours=1))
+        cache.clear()  # the next request re-reads state and opens a fresh last-seen window
+        self._me(other)
+        flush_seen(force=True)
+        rec.refresh_from_db()
+        assert rec.last_seen_at > timezone.now() - timedelta(minutes=5)
+
+        r = self.client.post("/api/auth/sessions/revoke", {"id": rec.id}, format="json")
+        assert r.status_code == 200 and r.json()["revoked"] is True
+        assert self._me(other)["authenticated"] is False
+
+
+class AccountContextTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username="acct_a", email="acct_a@example.com", password="pw")
+        self.staff = User.objects.create_user(username="acct_staff", email="acct_staff@example.com", password="pw", is_staff=True)
+        SiddesProfile.objects.get_or_create(user=self.user)
+
+    def _set_state(self, state: str) -> None:
+        from rest_framework.test import APIClient
+
+        staff = APIClient()
+        staff.force_login(self.staff)
+        r = staff.post("/api/moderation/users/state", {"target": f"me_{self.user.id}", "state": state}, format="json")
+        assert r.status_code == 200, r.content
+
+    def test_restriction_is_cached_and_invalidated_by_moderation(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_login(self.user)
+        self._set_state("read_only")
+
+        r = self.client.post("/api/post", {"side": "public", "text": "hi"}, format="json")
+        assert r.status_code == 403 and r.json()["error"] == "account_restricted"
+        with CaptureQueriesContext(connection) as ctx:
+            r = self.client.post("/api/post", {"side": "public", "text": "hi"}, format="json")
+        assert r.status_code == 403 and r.json()["state"] == "read_only"
+        assert not any("siddes_auth_siddesprofile" in q["sql"] for q in ctx.captured_queries)
+
+        self._set_state("active")
+        r = self.client.post("/api/post", {"side": "public", "text": "hi"}, format="json")
+        assert r.status_code != 403, r.content
+
+    def test_expired_timebox_is_active(self):
+        from .account_context import AccountContext
+
+        past = timezone.now() - timedelta(minutes=1)
+        assert AccountContext(user_id=1, state="suspended", until=past).restricted_state() is None
+        assert AccountContext(user_id=1, state="banned", until=past).restricted_state() == "banned"
+        assert AccountContext(user_id=1, state="read_only").restricted_state() == "read_only"
+
+    def test_quota_actions_are_classified_by_view(self):
+        from siddes_backend.middleware import DailyQuotaMiddleware
+        from siddes_inbox.views import InboxThreadView, InboxThreadsView
+        from siddes_post.views import PostCreateView
+
+        mw = DailyQuotaMiddleware(lambda r: None)
+        assert mw._action_for(PostCreateView.as_view()) == "post_create"
+        assert mw._action_for(InboxThreadView.as_view()) == "inbox_send"
+        assert mw._action_for(InboxThreadsView.as_view()) is None
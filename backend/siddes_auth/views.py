@@ -12,6 +12,7 @@ from django.db import transaction
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from siddes_backend.csrf import dev_csrf_exempt
+from siddes_backend.identity import invalidate_identity
 from siddes_backend.throttles import SiddesScopedRateThrottle, SiddesLoginIdentifierThrottle
 from rest_framework import status
 from rest_framework.response import Response
@@ -21,6 +22,7 @@ from siddes_contacts.tokens import hmac_token
 from siddes_contacts.normalize import normalize_email
 from siddes_contacts.models import ContactIdentityToken
 from siddes_sets.models import SiddesSet, SiddesSetMember
+from .account_context import invalidate_account_context
 from .models import SiddesProfile
 from .email_verification import create_and_send_email_verification
 from .username_policy import validate_username_or_error
@@ -417,6 +419,7 @@ class UsernameSetView(APIView):
         # Commit
         user.username = username
         user.save(update_fields=["username"])
+        invalidate_identity(user.id, cur, username)
 
         # Best-effort: advance onboarding step if applicable
         try:
@@ -503,6 +506,7 @@ class GoogleAuthView(APIView):
                 prof.email_verified = True
                 prof.email_verified_at = timezone.now()
                 prof.save(update_fields=["email_verified", "email_verified_at", "updated_at"])
+                invalidate_account_context(user.id)
         except Exception:
             pass
 
@@ -3,16 +3,16 @@
 DRF throttles are great for per-actor budgets, but harassment and spam often need
 per-*target* limits too (e.g. "stop DMing the same person 50 times").
 
-This module is intentionally minimal and cache-backed.
+Counting goes through the shared rate-limit engine (siddes_backend/ratelimit.py):
+sliding windows, one atomic round trip per window on Redis.
 """
 
 from __future__ import annotations
 
-import time
 from dataclasses import dataclass
 from typing import Optional
 
-from django.core.cache import cache
+from .ratelimit import hit
 
 
 @dataclass
@@ -29,46 +29,18 @@ def _safe_token(s: str, *, max_len: int = 64) -> str:
     return t
 
 
-def _bucket(now_s: float, window_s: int) -> int:
-    return int(now_s // float(window_s))
-
-
-def _retry_after_ms(now_s: float, window_s: int) -> int:
-    remain_s = float(window_s) - (now_s % float(window_s))
-    return int(max(250, round(remain_s * 1000)))
-
-
-def _incr(key: str, *, ttl: int) -> int:
-    try:
-        cache.add(key, 0, timeout=ttl)
-        return int(cache.incr(key))
-    except Exception:
-        cur = int(cache.get(key) or 0)
-        nxt = cur + 1
-        try:
-            cache.set(key, nxt, timeout=ttl)
-        except Exception:
-            pass
-        return nxt
-
-
 def enforce_bucket_limit(*, scope: str, parts: list[str], limit: int, window_s: int) -> RateLimitResult:
     if limit <= 0 or window_s <= 0:
         return RateLimitResult(ok=True)
 
-    now_s = time.time()
-    b = _bucket(now_s, window_s)
-    retry_ms = _retry_after_ms(now_s, window_s)
-
     safe_parts = [_safe_token(p) for p in parts]
-    key = "sdrl:%s:%d:%s" % (_safe_token(scope, max_len=48), b, "|".join(safe_parts))
-    ttl = int(window_s + 10)
-    n = _incr(key, ttl=ttl)
+    key = "abuse:%s:%s" % (_safe_token(scope, max_len=48), "|".join(safe_parts))
+    d = hit(key, limit=int(limit), window_s=int(window_s))
 
-    if n > limit:
-        return RateLimitResult(ok=False, retry_after_ms=retry_ms, count=n)
+    if not d.ok:
+        return RateLimitResult(ok=False, retry_after_ms=int(max(250, round(d.retry_after_s * 1000))), count=d.count)
 
-    return RateLimitResult(ok=True, retry_after_ms=None, count=n)
+    return RateLimitResult(ok=True, retry_after_ms=None, count=d.count)
 
 
 def enforce_pair_limits(
@@ -6,9 +6,24 @@ from django.apps import AppConfig
 class SiddesBackendConfig(AppConfig):
     """Project-level ops app.
 
-    Purpose: expose management commands living under `siddes_backend.management.commands`.
+    Purpose: expose management commands living under `siddes_backend.management.commands`,
+    install the per-connection DB hooks (siddes_backend/async_support.py), and
+    drop cached identities when a user row changes (siddes_backend/identity.py).
     """
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "siddes_backend"
     verbose_name = "Siddes Backend"
+
+    def ready(self) -> None:
+        from django.contrib.auth import get_user_model
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+
+        from .async_support import install_db_hooks
+        from .identity import invalidate_identity_on_user_change
+
+        connection_created.connect(install_db_hooks, dispatch_uid="siddes_db_hooks")
+        User = get_user_model()
+        post_save.connect(invalidate_identity_on_user_change, sender=User, dispatch_uid="siddes_identity_saved")
+        post_delete.connect(invalidate_identity_on_user_change, sender=User, dispatch_uid="siddes_identity_deleted")
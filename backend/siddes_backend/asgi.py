@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "siddes_backend.settings")
+# Served through this module => ASGI profile (async read views; see async_support.py).
+os.environ.setdefault("SIDDES_SERVER", "asgi")
 
 application = get_asgi_application()
@@ -0,0 +1,253 @@
+"""ASGI support: async-capable middleware, DB hooks and async read views.
+
+Under WSGI (gunicorn sync workers + threads) every request holds a thread
+while it waits on the DB, the cache or an upstream. The ASGI profile
+(SIDDES_SERVER=asgi, uvicorn workers, see gunicorn.conf.py) serves requests
+on an event loop instead:
+
+- Siddes middleware is sync+async capable (HybridMiddleware), so an async
+  request never hops threads just to pass through header-only middleware.
+  Blocking steps (account state, session capture, quotas) hop once, and only
+  when they apply (authenticated writes, signed-in sessions).
+- ResolveUserMiddleware loads request.user with the async session/auth API
+  right after AuthenticationMiddleware; later middleware and views read a
+  plain user object instead of a lazy one (which would raise
+  SynchronousOnlyOperation on the loop).
+- Read-heavy endpoints (feed, inbox threads, notifications, media redirect)
+  have async views (AsyncReadView) routed when SIDDES_ASYNC_VIEWS=1; other
+  methods on the same path delegate to the DRF view. Independent queries run
+  concurrently (run_db + asyncio.gather).
+- DB instrumentation (request timings, profiler, replica write detection)
+  is installed on every connection (install_db_hooks) and gated by context
+  variables, so it also sees queries run in sync_to_async threads.
+
+Django's async ORM/cache still execute on threads; the gains are concurrency
+inside a request and not tying a worker thread to slow clients.
+
+Env:
+  SIDDES_SERVER=wsgi|asgi          deployment profile (asgi.py defaults to asgi)
+  SIDDES_ASYNC_VIEWS=1|0           route async views (default: on for asgi)
+  SIDDES_ASYNC_PARALLEL_DB=1|0     run independent queries concurrently
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+
+def _truthy(v: str | None) -> bool:
+    return str(v or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def server_profile() -> str:
+    return "asgi" if str(os.environ.get("SIDDES_SERVER", "wsgi")).strip().lower() == "asgi" else "wsgi"
+
+
+def async_views_enabled() -> bool:
+    try:
+        from django.conf import settings
+
+        return bool(getattr(settings, "SIDDES_ASYNC_VIEWS", False))
+    except Exception:
+        return False
+
+
+def parallel_db_enabled() -> bool:
+    return _truthy(os.environ.get("SIDDES_ASYNC_PARALLEL_DB", "1"))
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+
+class HybridMiddleware:
+    """Base for middleware that runs natively in both handler modes.
+
+    Subclasses check `self.is_async` in __call__ and return `self._acall(request)`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    async def _acall(self, request):
+        return await self.get_response(request)
+
+
+def resolved_user(request: Any) -> Any:
+    """request.user if it is already loaded (never triggers a session lookup)."""
+
+    user = getattr(request, "user", None)
+    wrapped = getattr(user, "_wrapped", user)
+    try:
+        from django.utils.functional import empty
+
+        if wrapped is empty:
+            cached = getattr(request, "_cached_user", None)
+            return cached if cached is not None else getattr(request, "_acached_user", None)
+    except Exception:
+        return None
+    return user
+
+
+class ResolveUserMiddleware(HybridMiddleware):
+    """Load request.user via the async auth API (async mode only; sync is a pass-through)."""
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+        return self.get_response(request)
+
+    async def _acall(self, request):
+        auser = getattr(request, "auser", None)
+        if auser is not None:
+            request.user = await auser()
+        return await self.get_response(request)
+
+
+# ---------------------------------------------------------------------------
+# DB hooks
+# ---------------------------------------------------------------------------
+
+
+def _db_hooks() -> list:
+    from siddes_backend.db_router import _note_writes
+    from siddes_backend.profiling import _db_wrapper as profile_wrapper
+    from siddes_backend.request_log import _db_wrapper as timings_wrapper
+
+    return [timings_wrapper, profile_wrapper, _note_writes]
+
+
+def install_db_hooks(sender: Any = None, connection: Any = None, **kwargs: Any) -> None:
+    """connection_created receiver: add the Siddes execute wrappers once per connection.
+
+    Each wrapper is a pass-through unless its context variable is set for the
+    current request; context variables follow sync_to_async into worker threads.
+    """
+
+    if connection is None:
+        return
+    wrappers = connection.execute_wrappers
+    for hook in _db_hooks():
+        if hook not in wrappers:
+            wrappers.append(hook)
+
+
+# ---------------------------------------------------------------------------
+# Async views
+# ---------------------------------------------------------------------------
+
+
+def instrument_thread_cache() -> None:
+    """Attach the request timing/profiler cache wrappers to this thread's cache.
+
+    Worker threads normally see the request's cache instance (the cache handler
+    is context-local), but one created first in the thread would be unwrapped.
+    Both wrappers are installed once per instance.
+    """
+
+    try:
+        from django.core.cache import caches
+
+        from siddes_backend.profiling import _instrument_cache as profile_cache
+        from siddes_backend.request_log import _instrument_cache as timings_cache
+
+        c = caches["default"]
+        timings_cache(c)
+        profile_cache(c)
+    except Exception:
+        pass
+
+
+def _call_and_release(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    try:
+        instrument_thread_cache()
+        return fn(*args, **kwargs)
+    finally:
+        # Worker threads keep their own connections; release per CONN_MAX_AGE / pool.
+        try:
+            from django.db import close_old_connections
+
+            close_old_connections()
+        except Exception:
+            pass
+
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run blocking (ORM/cache) work off the loop.
+
+    With SIDDES_ASYNC_PARALLEL_DB=1 the call gets its own worker thread (and
+    DB connection), so several run_db calls under asyncio.gather overlap.
+    Otherwise it runs on the request's thread like Django's async ORM.
+    Concurrent calls share the request's RequestTimings/Profile, whose
+    counters are lock-protected.
+    """
+
+    if parallel_db_enabled():
+        return await sync_to_async(_call_and_release, thread_sensitive=False)(fn, *args, **kwargs)
+    return await sync_to_async(fn)(*args, **kwargs)
+
+
+def throttled_response(request: Any, view: Any, scope: str) -> Optional[JsonResponse]:
+    """Apply the DRF scoped throttle for `scope` (blocking: call via run_db).
+
+    Returns None when allowed, else the 429 body/headers DRF would send.
+    """
+
+    from rest_framework.exceptions import Throttled
+
+    from siddes_backend.throttles import SiddesScopedRateThrottle
+
+    t = SiddesScopedRateThrottle()
+    t.scope = scope
+    try:
+        if t.allow_request(request, view):
+            return None
+    except Exception:
+        return None  # fail open, like the engine itself
+    exc = Throttled(wait=t.wait())
+    data: Dict[str, Any] = {"detail": str(exc.detail), "ok": False}
+    rid = str(getattr(request, "siddes_request_id", "") or "").strip()
+    if rid:
+        data["requestId"] = rid
+    resp = JsonResponse(data, status=exc.status_code)
+    if exc.wait is not None:
+        resp["Retry-After"] = "%d" % exc.wait
+    return resp
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncReadView(View):
+    """Async GET for a path served by a DRF view (`sync_view`).
+
+    Other methods are delegated to the DRF view unchanged (DRF applies its own
+    authentication, CSRF and throttling).
+    """
+
+    sync_view: Any = None
+
+    @classmethod
+    def _delegate(cls) -> Callable[..., Any]:
+        fn = cls.__dict__.get("_sync_fn")
+        if fn is None:
+            fn = cls.sync_view.as_view()
+            cls._sync_fn = fn
+        return fn
+
+    async def _fallback(self, request, *args, **kwargs):
+        return await sync_to_async(self._delegate())(request, *args, **kwargs)
+
+    post = put = patch = delete = _fallback
@@ -0,0 +1,85 @@
+"""Version tokens for event-driven cache invalidation.
+
+Cached payloads embed a version in their keys; a write bumps the version,
+orphaning every payload built under the old one at once, so payload TTLs only
+bound memory. Used by the profile, safety graph, Set/feed, inbox and ritual caches.
+
+A version is a random token (not a counter): if the version key is evicted,
+the next read starts a fresh token instead of restarting at 1, so payloads
+cached under an older version can never become visible again.
+
+Tokens also carry the time they were issued. Right after a bump, a request
+served from a lagging read replica may still see the pre-write rows, so
+payloads built in such a request are not cached (`fill_ttl`, see
+siddes_backend.db_router). All helpers are best-effort and never raise.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Iterable
+
+from django.core.cache import cache
+
+VERSION_TTL_SECS = 7 * 24 * 60 * 60  # 7 days
+
+
+def _new_token() -> str:
+    return f"{uuid.uuid4().hex[:12]}-{int(time.time())}"
+
+
+def _note_age(token: str) -> None:
+    try:
+        from .db_router import note_fresh_version, sticky_secs
+
+        issued = int(token.rsplit("-", 1)[1])
+        if time.time() - issued < sticky_secs():
+            note_fresh_version()
+    except Exception:
+        pass
+
+
+def get_version(key: str) -> str:
+    """Current version token for `key` (started on first use)."""
+
+    try:
+        v = cache.get(key)
+        if not v:
+            cache.add(key, _new_token(), timeout=VERSION_TTL_SECS)
+            v = cache.get(key)
+    except Exception:
+        return "0"
+    if not v:
+        return "0"
+    _note_age(str(v))
+    return str(v)
+
+
+def bump_versions(keys: Iterable[str]) -> None:
+    """Rotate the token of every key (one cache round trip)."""
+
+    ks = [str(k) for k in (keys or []) if k]
+    if not ks:
+        return
+    try:
+        cache.set_many({k: _new_token() for k in ks}, timeout=VERSION_TTL_SECS)
+    except Exception:
+        pass
+
+
+def fill_ttl(ttl: int) -> int:
+    """TTL for caching a versioned payload built in this request (0: don't cache).
+
+    0 when the request read from a replica and used a version bumped within
+    the replica-lag window: the rows may predate the write behind the bump.
+    """
+
+    if ttl <= 0:
+        return 0
+    try:
+        from .db_router import replica_may_be_stale
+
+        return 0 if replica_may_be_stale() else ttl
+    except Exception:
+        return ttl
@@ -0,0 +1,230 @@
+"""Read-replica routing with read-your-writes stickiness.
+
+With DATABASE_REPLICA_URLS set (settings.SIDDES_DB_REPLICAS), reads in
+read-only requests go to a replica instead of the primary:
+
+- ReplicaRoutingMiddleware marks GET/HEAD /api/ requests as replica-eligible,
+  unless the client is sticky (see below).
+- ReplicaRouter.db_for_read picks a replica for eligible requests. Everything
+  else reads from "default": unsafe requests, reads inside a transaction, and
+  any read after the request routed a write (get_or_create, save, update).
+- Stickiness: after a successful write (unsafe method, or INSERT/UPDATE/DELETE
+  SQL executed on the primary) the client gets a short-lived `sd_rw` cookie
+  and, for signed-in users, a cache flag (other devices). Sticky requests read
+  from the primary for SIDDES_DB_STICKY_SECS (default 5), covering typical
+  replication lag.
+
+Versioned caches (siddes_backend.cache_versions): a write bumps a cache
+version at once, but a lagging replica can still return the pre-write rows to
+another, non-sticky client, and caching them under the new version would serve
+them to every viewer for the full TTL. So a request that read from a replica
+does not fill a versioned cache when one of the versions it used was bumped
+less than SIDDES_DB_STICKY_SECS ago (`replica_may_be_stale`); the next
+request, past the lag window, fills it.
+
+Local testing: DATABASE_URL=sqlite:///primary.sqlite3 and
+DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3 (copy the primary file to
+simulate a caught-up replica), or two local Postgres databases.
+
+Without replicas the router returns None everywhere (Django defaults).
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, List, Optional
+
+from .async_support import HybridMiddleware
+
+STICKY_COOKIE = "sd_rw"
+
+
+class _RouteState:
+    __slots__ = ("replica", "pinned", "wrote", "replica_reads", "fresh_versions")
+
+    def __init__(self, replica: Optional[str]):
+        self.replica = replica
+        self.pinned = False  # a write was routed: later reads use the primary
+        self.wrote = False  # write SQL actually ran: make the client sticky
+        self.replica_reads = False  # at least one read was routed to the replica
+        self.fresh_versions = False  # a cache version used here was bumped within the lag window
+
+
+_STATE: ContextVar[Optional[_RouteState]] = ContextVar("siddes_db_route", default=None)
+
+
+def replica_aliases() -> List[str]:
+    try:
+        from django.conf import settings
+
+        return [a for a in (getattr(settings, "SIDDES_DB_REPLICAS", None) or []) if a in settings.DATABASES]
+    except Exception:
+        return []
+
+
+def sticky_secs() -> int:
+    try:
+        n = int(str(os.environ.get("SIDDES_DB_STICKY_SECS", "5")).strip())
+    except Exception:
+        n = 5
+    return max(0, min(n, 300))
+
+
+def note_fresh_version() -> None:
+    """Record that this request used a cache version bumped within sticky_secs()."""
+
+    st = _STATE.get()
+    if st is not None:
+        st.fresh_versions = True
+
+
+def replica_may_be_stale() -> bool:
+    """True when this request read from a replica shortly after a version bump."""
+
+    st = _STATE.get()
+    return bool(st is not None and st.replica_reads and st.fresh_versions)
+
+
+def _sticky_key(user_id: object) -> str:
+    return f"db:v1:sticky:{user_id}"
+
+
+def _is_sticky(request: Any) -> bool:
+    try:
+        raw = request.COOKIES.get(STICKY_COOKIE)
+        if raw and float(raw) > time.time():
+            return True
+    except Exception:
+        pass
+    user = getattr(request, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        try:
+            from django.core.cache import cache
+
+            return bool(cache.get(_sticky_key(user.pk)))
+        except Exception:
+            return False
+    return False
+
+
+def _mark_sticky(request: Any, response: Any) -> None:
+    secs = sticky_secs()
+    if secs <= 0:
+        return
+    try:
+        response.set_cookie(STICKY_COOKIE, f"{time.time() + secs:.3f}", max_age=secs, httponly=True, samesite="Lax")
+    except Exception:
+        pass
+    user = getattr(request, "user", None)
+    if user is not None and getattr(user, "is_authenticated", False):
+        try:
+            from django.core.cache import cache
+
+            cache.set(_sticky_key(user.pk), 1, timeout=secs)
+        except Exception:
+            pass
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        st = _STATE.get()
+        if st is None or st.replica is None or st.pinned:
+            return None
+        try:
+            from django.db import connections
+
+            if connections["default"].in_atomic_block:
+                return None
+        except Exception:
+            return None
+        st.replica_reads = True
+        return st.replica
+
+    def db_for_write(self, model, **hints):
+        st = _STATE.get()
+        if st is not None:
+            st.pinned = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are populated by replication, never migrated directly.
+        return False if db in replica_aliases() else None
+
+
+_WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLAC")
+
+
+def _note_writes(execute, sql, params, many, context):
+    st = _STATE.get()
+    if st is not None and not st.wrote and str(sql).lstrip()[:6].upper() in _WRITE_VERBS:
+        st.wrote = True
+    return execute(sql, params, many, context)
+
+
+def _eligible(request: Any) -> bool:
+    method = str(getattr(request, "method", "") or "").upper()
+    return method in ("GET", "HEAD", "OPTIONS") and str(getattr(request, "path", "") or "").startswith("/api/")
+
+
+def _should_mark(request: Any, response: Any, st: _RouteState) -> bool:
+    safe = str(getattr(request, "method", "") or "").upper() in ("GET", "HEAD", "OPTIONS")
+    return (st.wrote or not safe) and int(getattr(response, "status_code", 500) or 500) < 400
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """Scope ReplicaRouter decisions to one request (no-op without replicas).
+
+    Write detection (`_note_writes`) is installed on every connection
+    (siddes_backend.async_support.install_db_hooks).
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+        replicas = replica_aliases()
+        if not replicas:
+            return self.get_response(request)
+
+        replica = None
+        if _eligible(request) and not _is_sticky(request):
+            replica = random.choice(replicas)
+
+        st = _RouteState(replica)
+        token = _STATE.set(st)
+        try:
+            response = self.get_response(request)
+        finally:
+            _STATE.reset(token)
+
+        if _should_mark(request, response, st):
+            _mark_sticky(request, response)
+        return response
+
+    async def _acall(self, request):
+        replicas = replica_aliases()
+        if not replicas:
+            return await self.get_response(request)
+
+        from asgiref.sync import sync_to_async
+
+        replica = None
+        if _eligible(request) and not await sync_to_async(_is_sticky)(request):
+            replica = random.choice(replicas)
+
+        st = _RouteState(replica)
+        token = _STATE.set(st)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _STATE.reset(token)
+
+        if _should_mark(request, response, st):
+            await sync_to_async(_mark_sticky)(request, response)
+        return response
@@ -1,50 +1,485 @@
-"""Siddes Edge Engine v0 (Redis queue).
+"""Siddes Edge Engine queue (reliable Redis Streams queue, no Celery).
 
-Goals:
-- Provide a tiny, reliable background runner WITHOUT Celery.
-- Enqueue jobs from request paths without blocking UX.
+Request paths enqueue small JSON jobs without blocking UX; the edge_engine
+command (siddes_backend.edge_worker) runs them.
 
-Queue design:
-- Redis LIST (BRPOP)
-- JSON payload per job
+v0 was a single Redis LIST drained with BRPOP: a popped job was gone (a
+worker crash lost it), failures were dropped, and nothing could be delayed or
+prioritised. v1 keeps the same enqueue() call and adds:
+
+- Lanes: two Redis Streams read through one consumer group, `<key>:high`
+  (always served first) and `<key>:normal`.
+- Acknowledgements: a delivered job stays in the group's pending list until
+  the worker acks it (XACK + XDEL). Workers heartbeat running jobs; a job
+  idle for the visibility timeout (worker died) is re-claimed by another
+  worker and counted as a failed attempt.
+- Retries: failed attempts go back through the delayed set with exponential
+  backoff + jitter; after max attempts the job is moved to the dead-letter
+  list (`<key>:dead`) with its last error (`edge_engine --requeue-dead`).
+- Delayed jobs: `delay_s` / `run_at` park the job in a sorted set
+  (`<key>:delayed`, score = due time); workers promote due jobs atomically.
+- Metrics: per job type counters and wait/run time sums (`<key>:metrics`),
+  plus lane depth, in-flight and oldest-job age; see stats().
+
+Backends: "redis" (default) and "memory" (same semantics inside one process,
+for the test suite only: nothing drains a web process's in-memory queue, so
+SIDDES_EDGE_BACKEND=memory is ignored unless settings.SIDDES_EDGE_ALLOW_MEMORY
+is set, which tests do with override_settings).
 
 Security/Privacy:
 - Never store raw address books here.
 - Keep payloads derived + minimal.
 
 Env:
-- REDIS_URL (required to actually queue)
-- SIDDES_EDGE_QUEUE_KEY (optional override)
-- SIDDES_EDGE_ENGINE_ENABLED (optional gate; default: enabled if REDIS_URL exists)
+- REDIS_URL (required for the redis backend)
+- SIDDES_EDGE_QUEUE_KEY (key prefix; default siddes:edge:v1)
+- SIDDES_EDGE_ENGINE_ENABLED (optional gate; default: enabled if REDIS_URL exists;
+  set it to 1 where an edge_engine worker runs: see worker_declared())
+- SIDDES_EDGE_BACKEND=redis|memory (default redis; memory needs settings.SIDDES_EDGE_ALLOW_MEMORY)
+- SIDDES_EDGE_MAX_ATTEMPTS (default 5)
+- SIDDES_EDGE_VISIBILITY_SECS (default 300)
+- SIDDES_EDGE_RETRY_BASE_SECS / SIDDES_EDGE_RETRY_MAX_SECS (default 5 / 900)
+- SIDDES_EDGE_DEAD_MAX (dead-letter list cap; default 10000)
 """
 
 from __future__ import annotations
 
+import heapq
+import itertools
 import json
 import os
+import random
+import threading
 import time
 import uuid
-from typing import Any, Dict, Optional
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 
 
 def _truthy(v: str | None) -> bool:
     return str(v or "").strip().lower() in {"1", "true", "yes", "y", "on"}
 
 
-DEFAULT_QUEUE_KEY = "siddes:edge:jobs:v1"
+def _env_float(name: str, default: float, lo: float, hi: float) -> float:
+    try:
+        n = float(str(os.environ.get(name, default)).strip())
+    except Exception:
+        n = default
+    return max(lo, min(n, hi))
+
+
+DEFAULT_QUEUE_KEY = "siddes:edge:v1"
+LEGACY_LIST_KEY = "siddes:edge:jobs:v1"  # v0 BRPOP list; drained by workers on start
+GROUP = "edge"
+LANES = ("high", "normal")
 
 
 def queue_key() -> str:
     return (os.environ.get("SIDDES_EDGE_QUEUE_KEY") or "").strip() or DEFAULT_QUEUE_KEY
 
 
+def _memory_allowed() -> bool:
+    try:
+        from django.conf import settings
+
+        return bool(getattr(settings, "SIDDES_EDGE_ALLOW_MEMORY", False))
+    except Exception:
+        return False
+
+
+def backend_name() -> str:
+    if str(os.environ.get("SIDDES_EDGE_BACKEND") or "").strip().lower() == "memory" and _memory_allowed():
+        return "memory"
+    return "redis"
+
+
 def is_enabled() -> bool:
     # Enabled when explicitly enabled OR when Redis exists (dev-friendly default).
     if _truthy(os.environ.get("SIDDES_EDGE_ENGINE_ENABLED")):
         return True
+    if backend_name() == "memory":
+        return True
     return bool(str(os.environ.get("REDIS_URL") or "").strip())
 
 
+def worker_declared() -> bool:
+    """True when the deployment says an edge_engine worker runs.
+
+    is_enabled() also turns on with a bare REDIS_URL, which is fine for
+    refresh jobs that may lag. Work users wait for (mention notifications)
+    is queued only when SIDDES_EDGE_ENGINE_ENABLED is set explicitly.
+    """
+
+    return _truthy(os.environ.get("SIDDES_EDGE_ENGINE_ENABLED")) or backend_name() == "memory"
+
+
+def max_attempts() -> int:
+    return int(_env_float("SIDDES_EDGE_MAX_ATTEMPTS", 5, 1, 100))
+
+
+def visibility_secs() -> float:
+    return _env_float("SIDDES_EDGE_VISIBILITY_SECS", 300, 5, 86400)
+
+
+def retry_delay_s(attempts: int) -> float:
+    """Backoff before retry number `attempts` (1-based): exponential, capped, jittered."""
+
+    base = _env_float("SIDDES_EDGE_RETRY_BASE_SECS", 5, 0, 3600)
+    cap = _env_float("SIDDES_EDGE_RETRY_MAX_SECS", 900, 0, 86400)
+    d = min(cap, base * (2 ** max(0, int(attempts) - 1)))
+    return d / 2.0 + random.uniform(0, d / 2.0)
+
+
+def _dead_max() -> int:
+    return int(_env_float("SIDDES_EDGE_DEAD_MAX", 10000, 1, 1_000_000))
+
+
+@dataclass
+class Reservation:
+    job: Dict[str, Any]
+    receipt: Any  # backend-specific handle for ack/retry/bury/touch
+    reclaimed: bool = False  # delivered before and never acked (worker lost)
+
+
+def _dumps(job: Dict[str, Any]) -> str:
+    return json.dumps(job, separators=(",", ":"))
+
+
+def _loads(raw: Any) -> Optional[Dict[str, Any]]:
+    try:
+        job = json.loads(raw)
+    except Exception:
+        return None
+    if not isinstance(job, dict) or not str(job.get("type") or "").strip():
+        return None
+    if not isinstance(job.get("payload"), dict):
+        job["payload"] = {}
+    return job
+
+
+def _lane(job: Dict[str, Any]) -> str:
+    return "high" if job.get("priority") == "high" else "normal"
+
+
+def _empty_stats(name: str) -> Dict[str, Any]:
+    return {"backend": name, "lanes": {}, "delayed": 0, "dead": 0, "types": {}}
+
+
+def _type_stats(flat: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for k, v in flat.items():
+        jt, _, field = str(k).rpartition(":")
+        if jt:
+            out.setdefault(jt, {})[field] = float(v)
+    for row in out.values():
+        done = row.get("succeeded", 0.0) + row.get("failed", 0.0)
+        started = row.get("started", 0.0)
+        if started:
+            row["avg_wait_ms"] = round(row.get("wait_ms", 0.0) / started, 1)
+        if done:
+            row["avg_run_ms"] = round(row.get("run_ms", 0.0) / done, 1)
+        for f in ("wait_ms", "run_ms"):
+            row.pop(f, None)
+        for f in list(row):
+            if not f.startswith("avg_"):
+                row[f] = int(row[f])
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+# KEYS[1] = delayed zset, KEYS[2] = high stream, KEYS[3] = normal stream
+# ARGV[1] = now, ARGV[2] = max jobs to move. Members are "<h|n>|<job json>".
+_LUA_PROMOTE = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, m in ipairs(due) do
+  redis.call('ZREM', KEYS[1], m)
+  local lane = KEYS[3]
+  if string.sub(m, 1, 2) == 'h|' then lane = KEYS[2] end
+  redis.call('XADD', lane, '*', 'job', string.sub(m, 3))
+end
+return #due
+"""
+
+
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, client: Any, prefix: Optional[str] = None):
+        self.r = client
+        p = prefix or queue_key()
+        # Hash tag keeps every key of one queue on one Redis Cluster slot.
+        self.lanes = {lane: f"{{{p}}}:{lane}" for lane in LANES}
+        self.delayed = f"{{{p}}}:delayed"
+        self.dead = f"{{{p}}}:dead"
+        self.metrics = f"{{{p}}}:metrics"
+        self.slots = f"{{{p}}}:slot:"
+        self._promote = client.register_script(_LUA_PROMOTE)
+        self._groups_ready = False
+
+    def _ensure_groups(self) -> None:
+        if self._groups_ready:
+            return
+        for key in self.lanes.values():
+            try:
+                self.r.xgroup_create(key, GROUP, id="0", mkstream=True)
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+        self._groups_ready = True
+
+    def push(self, job: Dict[str, Any], at: Optional[float] = None) -> None:
+        if at is not None and at > time.time():
+            self.r.zadd(self.delayed, {f"{_lane(job)[0]}|{_dumps(job)}": float(at)})
+        else:
+            self.r.xadd(self.lanes[_lane(job)], {"job": _dumps(job)})
+
+    def promote_due(self, now: Optional[float] = None, limit: int = 500) -> int:
+        now = time.time() if now is None else now
+        return int(self._promote(keys=[self.delayed, self.lanes["high"], self.lanes["normal"]], args=[now, int(limit)]) or 0)
+
+    def _entries(self, lane: str, entries: Any, reclaimed: bool) -> List[Reservation]:
+        out: List[Reservation] = []
+        for entry_id, fields in entries or []:
+            job = _loads((fields or {}).get("job")) if fields else None
+            if job is None:
+                self.r.xack(self.lanes[lane], GROUP, entry_id)
+                self.r.xdel(self.lanes[lane], entry_id)
+                continue
+            out.append(Reservation(job=job, receipt=(lane, entry_id), reclaimed=reclaimed))
+        return out
+
+    def reserve(self, consumer: str, count: int, block_s: float, visibility_s: float) -> List[Reservation]:
+        self._ensure_groups()
+        out: List[Reservation] = []
+        idle_ms = int(visibility_s * 1000)
+        for lane in LANES:
+            got = self.r.xautoclaim(self.lanes[lane], GROUP, consumer, idle_ms, start_id="0-0", count=count - len(out))
+            out += self._entries(lane, got[1] if got else [], reclaimed=True)
+            if len(out) >= count:
+                return out
+        for lane in LANES:
+            got = self.r.xreadgroup(GROUP, consumer, {self.lanes[lane]: ">"}, count=count - len(out))
+            for _, entries in got or []:
+                out += self._entries(lane, entries, reclaimed=False)
+            if len(out) >= count:
+                return out
+        if out or block_s <= 0:
+            return out
+        # Nothing ready: block on both lanes (high listed first).
+        streams = {self.lanes[lane]: ">" for lane in LANES}
+        got = self.r.xreadgroup(GROUP, consumer, streams, count=count, block=max(1, int(block_s * 1000)))
+        for key, entries in got or []:
+            lane = "high" if key == self.lanes["high"] else "normal"
+            out += self._entries(lane, entries, reclaimed=False)
+        return out
+
+    def touch(self, consumer: str, receipts: List[Any], visibility_s: float) -> None:
+        by_lane: Dict[str, List[str]] = defaultdict(list)
+        for lane, entry_id in receipts:
+            by_lane[lane].append(entry_id)
+        for lane, ids in by_lane.items():
+            # XCLAIM to ourselves resets the idle clock (the visibility timer).
+            self.r.xclaim(self.lanes[lane], GROUP, consumer, 0, ids, justid=True)
+
+    def ack(self, receipt: Any) -> None:
+        lane, entry_id = receipt
+        p = self.r.pipeline(transaction=True)
+        p.xack(self.lanes[lane], GROUP, entry_id)
+        p.xdel(self.lanes[lane], entry_id)
+        p.execute()
+
+    def retry(self, receipt: Any, job: Dict[str, Any], at: float) -> None:
+        lane, entry_id = receipt
+        p = self.r.pipeline(transaction=True)
+        p.zadd(self.delayed, {f"{_lane(job)[0]}|{_dumps(job)}": float(at)})
+        p.xack(self.lanes[lane], GROUP, entry_id)
+        p.xdel(self.lanes[lane], entry_id)
+        p.execute()
+
+    def bury(self, receipt: Any, job: Dict[str, Any]) -> None:
+        p = self.r.pipeline(transaction=True)
+        p.lpush(self.dead, _dumps(job))
+        p.ltrim(self.dead, 0, _dead_max() - 1)
+        if receipt is not None:
+            lane, entry_id = receipt
+            p.xack(self.lanes[lane], GROUP, entry_id)
+            p.xdel(self.lanes[lane], entry_id)
+        p.execute()
+
+    def pop_dead(self) -> Optional[Dict[str, Any]]:
+        raw = self.r.rpop(self.dead)
+        return _loads(raw) if raw else None
+
+    def claim_slot(self, name: str, ttl_s: float) -> bool:
+        return bool(self.r.set(self.slots + name, "1", nx=True, ex=max(1, int(ttl_s))))
+
+    def incr(self, job_type: str, **fields: float) -> None:
+        p = self.r.pipeline(transaction=False)
+        for f, v in fields.items():
+            if isinstance(v, int):
+                p.hincrby(self.metrics, f"{job_type}:{f}", v)
+            else:
+                p.hincrbyfloat(self.metrics, f"{job_type}:{f}", float(v))
+        p.execute()
+
+    def drain_legacy(self, key: str = LEGACY_LIST_KEY, limit: int = 10000) -> int:
+        """Move jobs left in the v0 BRPOP list into the normal lane."""
+
+        moved = 0
+        while moved < limit:
+            raw = self.r.rpop(key)
+            if raw is None:
+                break
+            job = _loads(raw)
+            if job is not None:
+                job.setdefault("attempts", 0)
+                self.push(job)
+                moved += 1
+        return moved
+
+    def stats(self) -> Dict[str, Any]:
+        self._ensure_groups()
+        out = _empty_stats(self.name)
+        now_ms = time.time() * 1000
+        for lane, key in self.lanes.items():
+            length = int(self.r.xlen(key) or 0)
+            pending = self.r.xpending(key, GROUP) or {}
+            inflight = int(pending.get("pending") or 0)
+            first = self.r.xrange(key, count=1)
+            age = 0.0
+            if first:
+                age = max(0.0, (now_ms - int(str(first[0][0]).split("-")[0])) / 1000.0)
+            out["lanes"][lane] = {"depth": max(0, length - inflight), "inflight": inflight, "oldest_age_s": round(age, 1)}
+        out["delayed"] = int(self.r.zcard(self.delayed) or 0)
+        out["dead"] = int(self.r.llen(self.dead) or 0)
+        out["types"] = _type_stats(self.r.hgetall(self.metrics) or {})
+        return out
+
+
+class MemoryBackend:
+    """In-process backend with the Redis backend's semantics (test suite only)."""
+
+    name = "memory"
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._lanes: Dict[str, deque] = {lane: deque() for lane in LANES}
+            self._delayed: List[Any] = []  # heap of (due, seq, job)
+            self._inflight: Dict[int, List[Any]] = {}  # receipt -> [job, deadline, enqueued_at]
+            self._dead: deque = deque()
+            self._slots: Dict[str, float] = {}
+            self._metrics: Dict[str, float] = defaultdict(float)
+            self._seq = itertools.count(1)
+
+    def push(self, job: Dict[str, Any], at: Optional[float] = None) -> None:
+        job = json.loads(_dumps(job))  # same copy semantics as a real queue
+        with self._cond:
+            if at is not None and at > time.time():
+                heapq.heappush(self._delayed, (float(at), next(self._seq), job))
+            else:
+                self._lanes[_lane(job)].append((time.time(), job))
+                self._cond.notify_all()
+
+    def promote_due(self, now: Optional[float] = None, limit: int = 500) -> int:
+        now = time.time() if now is None else now
+        moved = 0
+        with self._cond:
+            while self._delayed and self._delayed[0][0] <= now and moved < limit:
+                _, _, job = heapq.heappop(self._delayed)
+                self._lanes[_lane(job)].append((now, job))
+                moved += 1
+            if moved:
+                self._cond.notify_all()
+        return moved
+
+    def reserve(self, consumer: str, count: int, block_s: float, visibility_s: float) -> List[Reservation]:
+        deadline = time.time() + max(0.0, block_s)
+        with self._cond:
+            while True:
+                now = time.time()
+                out: List[Reservation] = []
+                for receipt, row in list(self._inflight.items()):
+                    if len(out) < count and row[1] <= now:
+                        row[1] = now + visibility_s
+                        out.append(Reservation(job=row[0], receipt=receipt, reclaimed=True))
+                for lane in LANES:
+                    q = self._lanes[lane]
+                    while q and len(out) < count:
+                        enq, job = q.popleft()
+                        receipt = next(self._seq)
+                        self._inflight[receipt] = [job, now + visibility_s, enq]
+                        out.append(Reservation(job=job, receipt=receipt))
+                if out or now >= deadline:
+                    return out
+                self._cond.wait(deadline - now)
+
+    def touch(self, consumer: str, receipts: List[Any], visibility_s: float) -> None:
+        with self._cond:
+            for receipt in receipts:
+                row = self._inflight.get(receipt)
+                if row is not None:
+                    row[1] = time.time() + visibility_s
+
+    def ack(self, receipt: Any) -> None:
+        with self._cond:
+            self._inflight.pop(receipt, None)
+
+    def retry(self, receipt: Any, job: Dict[str, Any], at: float) -> None:
+        with self._cond:
+            self._inflight.pop(receipt, None)
+        self.push(job, at=at)
+
+    def bury(self, receipt: Any, job: Dict[str, Any]) -> None:
+        with self._cond:
+            self._inflight.pop(receipt, None)
+            self._dead.appendleft(json.loads(_dumps(job)))
+            while len(self._dead) > _dead_max():
+                self._dead.pop()
+
+    def pop_dead(self) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            return self._dead.pop() if self._dead else None
+
+    def claim_slot(self, name: str, ttl_s: float) -> bool:
+        now = time.time()
+        with self._cond:
+            if self._slots.get(name, 0) > now:
+                return False
+            self._slots[name] = now + max(1.0, ttl_s)
+            return True
+
+    def incr(self, job_type: str, **fields: float) -> None:
+        with self._cond:
+            for f, v in fields.items():
+                self._metrics[f"{job_type}:{f}"] += v
+
+    def drain_legacy(self, key: str = LEGACY_LIST_KEY, limit: int = 10000) -> int:
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        out = _empty_stats(self.name)
+        now = time.time()
+        with self._cond:
+            for lane in LANES:
+                q = self._lanes[lane]
+                inflight = [row for row in self._inflight.values() if _lane(row[0]) == lane]
+                seen = ([q[0][0]] if q else []) + [row[2] for row in inflight]
+                oldest = min(seen) if seen else now
+                out["lanes"][lane] = {"depth": len(q), "inflight": len(inflight), "oldest_age_s": round(now - oldest, 1)}
+            out["delayed"] = len(self._delayed)
+            out["dead"] = len(self._dead)
+            out["types"] = _type_stats(dict(self._metrics))
+        return out
+
+
 def _redis():
     import redis  # type: ignore
 
@@ -54,10 +489,62 @@ def _redis():
     return redis.from_url(url, decode_responses=True)
 
 
-def enqueue(job_type: str, payload: Optional[Dict[str, Any]] = None) -> bool:
+_MEMORY: Optional[MemoryBackend] = None
+_REDIS: Dict[str, RedisBackend] = {}
+_LOCK = threading.Lock()
+
+
+def get_backend() -> Any:
+    """The configured backend (None when the redis backend has no REDIS_URL)."""
+
+    global _MEMORY
+    if backend_name() == "memory":
+        with _LOCK:
+            if _MEMORY is None:
+                _MEMORY = MemoryBackend()
+            return _MEMORY
+    url = str(os.environ.get("REDIS_URL") or "").strip()
+    if not url:
+        return None
+    key = f"{url}|{queue_key()}"
+    with _LOCK:
+        b = _REDIS.get(key)
+        if b is None:
+            client = _redis()
+            if client is None:
+                return None
+            b = RedisBackend(client)
+            _REDIS[key] = b
+        return b
+
+
+def make_job(job_type: str, payload: Optional[Dict[str, Any]] = None, *, priority: str = "normal", attempts_max: Optional[int] = None) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "id": f"job_{int(now * 1000)}_{uuid.uuid4().hex[:8]}",
+        "type": str(job_type or "").strip(),
+        "payload": payload or {},
+        "enqueued_at": int(now),
+        "priority": "high" if priority == "high" else "normal",
+        "attempts": 0,
+        "max_attempts": int(attempts_max or max_attempts()),
+    }
+
+
+def enqueue(
+    job_type: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    priority: str = "normal",
+    delay_s: float = 0.0,
+    run_at: Optional[float] = None,
+    attempts_max: Optional[int] = None,
+) -> bool:
     """Enqueue a job. Returns True if queued, else False.
 
-    Safe to call from request paths; failures are swallowed (fail-open).
+    priority="high" jumps the normal lane; delay_s / run_at (epoch seconds)
+    schedule it for later. Safe to call from request paths; failures are
+    swallowed (fail-open).
     """
 
     if not is_enabled():
@@ -67,24 +554,33 @@ def enqueue(job_type: str, payload: Optional[Dict[str, Any]] = None) -> bool:
     if not jt:
         return False
 
-    r = None
     try:
-        r = _redis()
+        b = get_backend()
     except Exception:
-        r = None
+        b = None
 
-    if r is None:
+    if b is None:
         return False
 
-    body = {
-        "id": f"job_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}",
-        "type": jt,
-        "payload": payload or {},
-        "enqueued_at": int(time.time()),
-    }
-
+    job = make_job(jt, payload, priority=priority, attempts_max=attempts_max)
+    at = run_at if run_at is not None else (time.time() + float(delay_s) if delay_s and delay_s > 0 else None)
+    if at is not None:
+        job["available_at"] = float(at)
     try:
-        r.lpush(queue_key(), json.dumps(body, separators=(",", ":")))
-        return True
+        b.push(job, at=at)
     except Exception:
         return False
+    try:
+        b.incr(jt, enqueued=1)
+    except Exception:
+        pass
+    return True
+
+
+def stats() -> Dict[str, Any]:
+    """Queue depth/in-flight/age per lane, delayed + dead counts and per-type counters."""
+
+    b = get_backend()
+    if b is None:
+        return _empty_stats(backend_name())
+    return b.stats()
@@ -0,0 +1,370 @@
+"""Edge Engine worker: per job type thread pools over the reliable edge queue.
+
+Used by `manage.py edge_engine` (handlers live there). One process runs:
+
+- a fetch loop that reserves jobs only while the pools have free slots, so
+  no job sits reserved in memory for longer than it takes a slot to free up;
+- one thread pool per job type (SIDDES_EDGE_CONCURRENCY), so a slow type
+  (media reaping) cannot starve a latency-sensitive one (notifications);
+- batch handlers: types registered with a list handler get up to
+  SIDDES_EDGE_BATCH_SIZE ready jobs per call (one pool slot per batch);
+- heartbeats for running jobs (visibility timeout only expires when the
+  worker is gone, not when a job is slow);
+- promotion of due delayed jobs, and the interval schedule
+  (SIDDES_EDGE_SCHEDULE): each slot is claimed in the backend first, so N
+  workers enqueue a scheduled job once.
+
+Scale out by running more edge_engine processes: the consumer group spreads
+jobs across them.
+
+Env:
+  SIDDES_EDGE_CONCURRENCY="ml_refresh_suggestions=4,media_reap_orphans=1"
+  SIDDES_EDGE_CONCURRENCY_DEFAULT=2        threads for types not listed
+  SIDDES_EDGE_BATCH_SIZE=50                max jobs per batch handler call
+  SIDDES_EDGE_SCHEDULE="moderation_stats_rollup=3600,media_reap_orphans=900+60"
+      type=every_secs[+offset_secs], aligned to the epoch (86400+3600 = daily 01:00 UTC)
+  SIDDES_EDGE_STATS_EVERY_SECS=60          log a queue stats line (0 = off)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from siddes_backend import edge_queue
+from siddes_backend.edge_queue import Reservation
+
+
+def _parse_pairs(raw: str | None) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for part in str(raw or "").split(","):
+        k, sep, v = part.partition("=")
+        if sep and k.strip() and v.strip():
+            out[k.strip()] = v.strip()
+    return out
+
+
+def concurrency_from_env(raw: Optional[str] = None) -> Dict[str, int]:
+    """{job_type: threads} from SIDDES_EDGE_CONCURRENCY (or `raw`, same format)."""
+
+    out: Dict[str, int] = {}
+    src = os.environ.get("SIDDES_EDGE_CONCURRENCY") if raw is None else raw
+    for jt, v in _parse_pairs(src).items():
+        try:
+            out[jt] = max(1, min(int(v), 64))
+        except Exception:
+            continue
+    return out
+
+
+def default_concurrency() -> int:
+    try:
+        return max(1, min(int(str(os.environ.get("SIDDES_EDGE_CONCURRENCY_DEFAULT", "2")).strip()), 64))
+    except Exception:
+        return 2
+
+
+def default_batch_size() -> int:
+    try:
+        return max(1, min(int(str(os.environ.get("SIDDES_EDGE_BATCH_SIZE", "50")).strip()), 500))
+    except Exception:
+        return 50
+
+
+def schedule_from_env() -> List[Tuple[str, int, int]]:
+    """[(job_type, every_secs, offset_secs)] from SIDDES_EDGE_SCHEDULE."""
+
+    out: List[Tuple[str, int, int]] = []
+    for jt, v in _parse_pairs(os.environ.get("SIDDES_EDGE_SCHEDULE")).items():
+        every, _, offset = v.partition("+")
+        try:
+            n = int(every)
+            off = int(offset or 0)
+        except Exception:
+            continue
+        if n >= 10:
+            out.append((jt, n, off % n))
+    return out
+
+
+def _close_db() -> None:
+    try:
+        from django.db import close_old_connections
+
+        close_old_connections()
+    except Exception:
+        pass
+
+
+class EdgeWorker:
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+        *,
+        backend: Any = None,
+        concurrency: Optional[Dict[str, int]] = None,
+        default_threads: Optional[int] = None,
+        batch_handlers: Optional[Dict[str, Callable[[List[Dict[str, Any]]], Any]]] = None,
+        batch_size: Optional[int] = None,
+        schedule: Optional[List[Tuple[str, int, int]]] = None,
+        visibility_s: Optional[float] = None,
+        log: Callable[[str], None] = print,
+    ):
+        self.handlers = dict(handlers)
+        self.batch_handlers = dict(batch_handlers or {})
+        self.batch_size = int(batch_size or default_batch_size())
+        self.backend = backend if backend is not None else edge_queue.get_backend()
+        self.concurrency = dict(concurrency_from_env() if concurrency is None else concurrency)
+        self.default_threads = default_threads or default_concurrency()
+        self.schedule = schedule_from_env() if schedule is None else list(schedule)
+        self.visibility_s = float(visibility_s or edge_queue.visibility_secs())
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.log = log
+
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._running: Dict[Any, Reservation] = {}
+        self._tasks = 0  # pool slots in use (a batch takes one slot)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._last_slot: Dict[str, int] = {}
+        self._last_touch = 0.0
+        self._last_stats = 0.0
+
+    # -- capacity -----------------------------------------------------------
+
+    def _threads_for(self, job_type: str) -> int:
+        return self.concurrency.get(job_type, self.default_threads)
+
+    def capacity(self) -> int:
+        types = set(self.handlers) | set(self.batch_handlers)
+        return max(1, sum(self._threads_for(jt) for jt in types))
+
+    def _pool(self, job_type: str) -> ThreadPoolExecutor:
+        pool = self._pools.get(job_type)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=self._threads_for(job_type), thread_name_prefix=f"edge-{job_type}")
+            self._pools[job_type] = pool
+        return pool
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._running)
+
+    # -- job lifecycle --------------------------------------------------------
+
+    def _fail(self, res: Reservation, error: str) -> None:
+        job = dict(res.job)
+        jt = str(job.get("type") or "")
+        job["attempts"] = int(job.get("attempts") or 0) + 1
+        job["last_error"] = str(error)[:500]
+        limit = int(job.get("max_attempts") or edge_queue.max_attempts())
+        if job["attempts"] >= limit:
+            job["dead_at"] = int(time.time())
+            self.backend.bury(res.receipt, job)
+            self.backend.incr(jt, failed=1, dead=1)
+            self.log(f"edge_engine: dead type={jt} id={job.get('id')} attempts={job['attempts']} err={job['last_error']}")
+            return
+        delay = edge_queue.retry_delay_s(job["attempts"])
+        job["available_at"] = time.time() + delay
+        self.backend.retry(res.receipt, job, job["available_at"])
+        self.backend.incr(jt, failed=1, retried=1)
+        self.log(f"edge_engine: retry type={jt} id={job.get('id')} attempt={job['attempts']} in={delay:.1f}s err={job['last_error']}")
+
+    def _execute(self, res: Reservation) -> None:
+        job = res.job
+        jt = str(job.get("type") or "")
+        started = time.time()
+        try:
+            _close_db()
+            self.handlers[jt](job.get("payload") or {})
+        except Exception as e:
+            run_ms = (time.time() - started) * 1000.0
+            try:
+                self.backend.incr(jt, run_ms=run_ms)
+                self._fail(res, f"{type(e).__name__}: {e}")
+            except Exception as e2:
+                self.log(f"edge_engine: could not record failure type={jt} err={e2}")
+        else:
+            run_ms = (time.time() - started) * 1000.0
+            try:
+                self.backend.ack(res.receipt)
+                self.backend.incr(jt, succeeded=1, run_ms=run_ms)
+            except Exception as e2:
+                # Not acked: the job is re-claimed after the visibility timeout.
+                self.log(f"edge_engine: ack failed type={jt} err={e2}")
+        finally:
+            _close_db()
+            with self._lock:
+                self._running.pop(res.receipt, None)
+                self._tasks -= 1
+
+    def _execute_batch(self, jt: str, batch: List[Reservation]) -> None:
+        started = time.time()
+        try:
+            _close_db()
+            self.batch_handlers[jt]([r.job.get("payload") or {} for r in batch])
+        except Exception as e:
+            # All-or-nothing: every job retries on its own schedule (handlers are idempotent).
+            run_ms = (time.time() - started) * 1000.0
+            for res in batch:
+                try:
+                    self.backend.incr(jt, run_ms=run_ms / len(batch))
+                    self._fail(res, f"{type(e).__name__}: {e}")
+                except Exception as e2:
+                    self.log(f"edge_engine: could not record failure type={jt} err={e2}")
+        else:
+            run_ms = (time.time() - started) * 1000.0
+            for res in batch:
+                try:
+                    self.backend.ack(res.receipt)
+                except Exception as e2:
+                    self.log(f"edge_engine: ack failed type={jt} err={e2}")
+            try:
+                self.backend.incr(jt, succeeded=len(batch), run_ms=run_ms, batches=1)
+            except Exception:
+                pass
+        finally:
+            _close_db()
+            with self._lock:
+                for res in batch:
+                    self._running.pop(res.receipt, None)
+                self._tasks -= 1
+
+    def _admit(self, res: Reservation) -> bool:
+        """Settle reservations that must not run; record the start of the rest."""
+
+        jt = str(res.job.get("type") or "")
+        if res.reclaimed:
+            # Delivered before and never acked: its worker died (or hung) mid-job.
+            self._fail(res, "visibility timeout expired (worker lost)")
+            return False
+        if jt not in self.handlers and jt not in self.batch_handlers:
+            job = dict(res.job, last_error=f"unknown job type={jt}", dead_at=int(time.time()))
+            self.backend.bury(res.receipt, job)
+            self.backend.incr(jt or "unknown", dead=1)
+            self.log(f"edge_engine: unknown job type={jt}")
+            return False
+        enq = float(res.job.get("available_at") or res.job.get("enqueued_at") or time.time())
+        self.backend.incr(jt, started=1, wait_ms=max(0.0, time.time() - enq) * 1000.0)
+        with self._lock:
+            self._running[res.receipt] = res
+        return True
+
+    def _submit(self, jt: str, fn: Callable[..., None], *args: Any) -> None:
+        with self._lock:
+            self._tasks += 1
+        self._pool(jt).submit(fn, *args)
+
+    def _dispatch(self, reservations: List[Reservation]) -> None:
+        batches: Dict[str, List[Reservation]] = {}
+        for res in reservations:
+            if not self._admit(res):
+                continue
+            jt = str(res.job.get("type") or "")
+            if jt in self.batch_handlers:
+                batches.setdefault(jt, []).append(res)
+            else:
+                self._submit(jt, self._execute, res)
+        for jt, rows in batches.items():
+            for i in range(0, len(rows), self.batch_size):
+                self._submit(jt, self._execute_batch, jt, rows[i : i + self.batch_size])
+
+    # -- housekeeping ---------------------------------------------------------
+
+    def _heartbeat(self, now: float) -> None:
+        if now - self._last_touch < self.visibility_s / 3.0:
+            return
+        self._last_touch = now
+        with self._lock:
+            receipts = list(self._running)
+        if receipts:
+            self.backend.touch(self.consumer, receipts, self.visibility_s)
+
+    def _run_schedule(self, now: float) -> None:
+        for jt, every, offset in self.schedule:
+            slot = int((now - offset) // every)
+            if self._last_slot.get(jt) == slot:
+                continue
+            self._last_slot[jt] = slot
+            if self.backend.claim_slot(f"{jt}:{every}:{slot}", ttl_s=every * 2):
+                job = edge_queue.make_job(jt, {"scheduled_slot": slot})
+                self.backend.push(job)
+                self.backend.incr(jt, enqueued=1)
+
+    def _log_stats(self, now: float, every_s: float) -> None:
+        if every_s <= 0 or now - self._last_stats < every_s:
+            return
+        self._last_stats = now
+        try:
+            self.log(json.dumps({"event": "edge_stats", **self.backend.stats()}, separators=(",", ":")))
+        except Exception:
+            pass
+
+    # -- loop -------------------------------------------------------------------
+
+    def tick(self, block_s: float = 1.0, max_jobs: Optional[int] = None) -> int:
+        """One fetch round: housekeeping, then reserve up to the free capacity."""
+
+        now = time.time()
+        self.backend.promote_due(now)
+        self._run_schedule(now)
+        self._heartbeat(now)
+
+        with self._lock:
+            free = self.capacity() - self._tasks
+        if free <= 0:
+            time.sleep(min(0.05, block_s))
+            return 0
+        # With batch handlers one free slot can take a whole batch.
+        want = min(free * self.batch_size, 500) if self.batch_handlers else free
+        if max_jobs is not None:
+            want = min(want, max_jobs)
+        got = self.backend.reserve(self.consumer, want, block_s, self.visibility_s)
+        self._dispatch(got)
+        return len(got)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def wait_idle(self, timeout_s: float = 30.0) -> bool:
+        deadline = time.time() + timeout_s
+        while self.in_flight() and time.time() < deadline:
+            time.sleep(0.01)
+        return self.in_flight() == 0
+
+    def run(self, *, block_s: float = 5.0, max_jobs: Optional[int] = None, drain: bool = False, stats_every_s: float = 60.0) -> int:
+        """Run until stop() (or after `max_jobs` jobs / an empty queue with drain=True).
+
+        Stopping stops fetching; running jobs finish first.
+        """
+
+        moved = self.backend.drain_legacy()
+        if moved:
+            self.log(f"edge_engine: moved {moved} job(s) from the v0 list")
+
+        done = 0
+        while not self._stop.is_set():
+            try:
+                # Short blocks keep heartbeats, promotion and the schedule on time.
+                n = self.tick(block_s=min(block_s, 1.0), max_jobs=None if max_jobs is None else max_jobs - done)
+            except Exception as e:
+                self.log(f"edge_engine: queue error: {e}")
+                time.sleep(1.0)
+                continue
+            done += n
+            self._log_stats(time.time(), stats_every_s)
+            if max_jobs is not None and done >= max_jobs:
+                break
+            if drain and n == 0 and not self.in_flight():
+                break
+        self.wait_idle(timeout_s=max(self.visibility_s, 30.0))
+        for pool in self._pools.values():
+            pool.shutdown(wait=True)
+        self._pools.clear()
+        return done
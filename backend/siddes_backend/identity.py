@@ -5,14 +5,31 @@ Siddes identity has two forms in v0:
 - handle: @username              (display + UI targeting)
 
 We must treat them as ALIASES for membership checks.
+
+Resolution (token -> user id, username, display name) goes through
+`resolve_many`, which checks three layers in order:
+- a per-request memo (`identity_scope`, opened by IdentityScopeMiddleware)
+- the shared cache: one record per user id, plus handle -> id pointers
+- one bulk user query for whatever is left
+
+Handle pointers are verified against the record they point at, so a rename
+only needs the user record dropped (`invalidate_identity`, called on username
+change and account deletion, and from the user model's post_save/post_delete
+signals so any other write, or a reused user id, never serves a stale record). Unknown tokens are memoized per request only,
+never in the shared cache, so a freshly registered handle resolves at once.
 """
 
 from __future__ import annotations
 
+import contextvars
+import hashlib
+import os
 import re
-from typing import Optional, Set
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
 _VIEWER_RE = re.compile(r"^me_(\d+)$")
 
@@ -60,22 +77,252 @@ def normalize_handle(raw: str | None) -> Optional[str]:
     return "@" + uname.lower()
 
 
-def handle_for_viewer_id(viewer_id: str) -> Optional[str]:
-    """Best-effort: me_<id> -> @username."""
+# ---------------------------------------------------------------------------
+# Resolution cache
+# ---------------------------------------------------------------------------
 
-    uid = parse_viewer_user_id(viewer_id)
-    if uid is None:
-        return None
 
+class ResolvedIdentity(NamedTuple):
+    user_id: int
+    username: str
+    name: str  # full name ("" when unset)
+
+    @property
+    def handle(self) -> Optional[str]:
+        return normalize_handle("@" + self.username) if self.username else None
+
+
+_MISSING = object()  # memo marker: token resolved to no user
+_REQUEST_MEMO: contextvars.ContextVar[Optional[Dict[str, object]]] = contextvars.ContextVar("siddes_identity_memo", default=None)
+
+
+def _truthy(v: str | None) -> bool:
+    return str(v or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def identity_cache_enabled() -> bool:
+    return _truthy(os.environ.get("SIDDES_IDENTITY_CACHE_ENABLED", "1"))
+
+
+def identity_cache_ttl() -> int:
+    raw = os.environ.get("SIDDES_IDENTITY_CACHE_TTL_SECS", "600")
+    try:
+        ttl = int(str(raw).strip())
+    except Exception:
+        ttl = 600
+    return max(0, min(ttl, 86400))
+
+
+def _user_key(uid: int) -> str:
+    return f"identity:v1:u:{uid}"
+
+
+def _handle_key(uname_l: str) -> str:
+    return "identity:v1:h:" + hashlib.sha256(uname_l.encode("utf-8")).hexdigest()[:32]
+
+
+@contextmanager
+def identity_scope() -> Iterator[None]:
+    """Memoize resolutions for the duration of one request (or job)."""
+
+    tok = _REQUEST_MEMO.set({})
     try:
-        User = get_user_model()
-        u = User.objects.get(id=uid)
-        uname = _safe_str(getattr(u, "username", ""))
-        if not uname:
+        yield
+    finally:
+        _REQUEST_MEMO.reset(tok)
+
+
+def request_memo() -> Optional[Dict[str, object]]:
+    """The current request's memo dict (None outside identity_scope).
+
+    Other per-viewer lookups (e.g. the safety graph) share it under their own
+    key prefixes so they live and die with the same request.
+    """
+
+    return _REQUEST_MEMO.get()
+
+
+def _record(uid: int, username: object, first: object, last: object) -> ResolvedIdentity:
+    full = (_safe_str(first) + " " + _safe_str(last)).strip()
+    return ResolvedIdentity(int(uid), _safe_str(username), full)
+
+
+def _from_cache(v: object) -> Optional[ResolvedIdentity]:
+    if isinstance(v, (list, tuple)) and len(v) == 3:
+        try:
+            return ResolvedIdentity(int(v[0]), str(v[1]), str(v[2]))
+        except Exception:
             return None
-        return normalize_handle("@" + uname) or ("@" + uname)
+    return None
+
+
+def resolve_many(tokens: Iterable[object]) -> Dict[str, Optional[ResolvedIdentity]]:
+    """Resolve identity tokens (me_<id>, @handle, handle) to users in bulk.
+
+    Returns {token: ResolvedIdentity | None} keyed by the stripped input token;
+    opaque tokens map to None. Costs at most one cache round trip and one user
+    query per call. Never raises: on DB errors unresolved tokens map to None
+    and nothing negative is memoized.
+    """
+
+    memo = _REQUEST_MEMO.get()
+    out: Dict[str, Optional[ResolvedIdentity]] = {}
+    by_uid: Dict[int, List[str]] = {}
+    by_handle: Dict[str, List[str]] = {}
+
+    for x in tokens or []:
+        t = _safe_str(x)
+        if not t or t in out:
+            continue
+        out[t] = None
+        uid = parse_viewer_user_id(t)
+        if uid is not None:
+            mk = f"u:{uid}"
+        else:
+            h = normalize_handle(t)
+            if not h:
+                continue
+            mk = "h:" + h[1:]
+        hit = memo.get(mk) if memo is not None else None
+        if hit is not None:
+            out[t] = None if hit is _MISSING else hit  # type: ignore[assignment]
+        elif uid is not None:
+            by_uid.setdefault(uid, []).append(t)
+        else:
+            by_handle.setdefault(mk[2:], []).append(t)
+
+    if not by_uid and not by_handle:
+        return out
+
+    found: Dict[int, ResolvedIdentity] = {}
+    use_cache = identity_cache_enabled() and identity_cache_ttl() > 0
+
+    # Shared cache: handle pointers first, then every needed user record at once.
+    if use_cache:
+        try:
+            ptrs = cache.get_many([_handle_key(h) for h in by_handle]) if by_handle else {}
+            want = set(by_uid)
+            for h in by_handle:
+                p = ptrs.get(_handle_key(h))
+                if isinstance(p, int):
+                    want.add(p)
+            recs = cache.get_many([_user_key(u) for u in want]) if want else {}
+            for u in want:
+                r = _from_cache(recs.get(_user_key(u)))
+                if r is not None:
+                    found[r.user_id] = r
+        except Exception:
+            found = {}
+
+    handle_hits: Dict[str, ResolvedIdentity] = {}
+    for r in found.values():
+        if r.username.lower() in by_handle:
+            handle_hits[r.username.lower()] = r
+
+    need_uids = [u for u in by_uid if u not in found]
+    need_handles = [h for h in by_handle if h not in handle_hits]
+    db_ok = True
+    if need_uids or need_handles:
+        try:
+            from django.db.models import Q
+            from django.db.models.functions import Lower
+
+            q = Q(id__in=need_uids) | Q(uname_l__in=need_handles)
+            rows = (
+                get_user_model()
+                .objects.annotate(uname_l=Lower("username"))
+                .filter(q)
+                .values_list("id", "username", "first_name", "last_name")
+            )
+            fresh: Dict[str, object] = {}
+            for uid, uname, first, last in rows:
+                r = _record(uid, uname, first, last)
+                found[r.user_id] = r
+                if r.username.lower() in by_handle:
+                    handle_hits[r.username.lower()] = r
+                fresh[_user_key(r.user_id)] = [r.user_id, r.username, r.name]
+                if r.username:
+                    fresh[_handle_key(r.username.lower())] = r.user_id
+            if use_cache and fresh:
+                try:
+                    cache.set_many(fresh, timeout=identity_cache_ttl())
+                except Exception:
+                    pass
+        except Exception:
+            db_ok = False
+
+    for uid, toks in by_uid.items():
+        r = found.get(uid)
+        for t in toks:
+            out[t] = r
+        if memo is not None and (r is not None or db_ok):
+            memo[f"u:{uid}"] = r if r is not None else _MISSING
+    for h, toks in by_handle.items():
+        r = handle_hits.get(h)
+        for t in toks:
+            out[t] = r
+        if memo is not None and (r is not None or db_ok):
+            memo["h:" + h] = r if r is not None else _MISSING
+
+    return out
+
+
+def resolve(token: object) -> Optional[ResolvedIdentity]:
+    t = _safe_str(token)
+    return resolve_many([t]).get(t) if t else None
+
+
+def user_id_for_token(token: object) -> Optional[int]:
+    """me_<id> / @handle -> Django user id (None when unresolved)."""
+
+    r = resolve(token)
+    return r.user_id if r is not None else None
+
+
+def invalidate_identity(user_id: object, *usernames: object) -> None:
+    """Drop cached resolutions for a user (rename, account deletion).
+
+    Pass the old and new usernames so handle pointers go too; stale pointers
+    are also rejected on read, so this is belt-and-braces for them.
+    """
+
+    try:
+        uid = int(user_id)  # type: ignore[arg-type]
+    except Exception:
+        return
+    names = {_safe_str(u).lower() for u in usernames if _safe_str(u)}
+
+    memo = _REQUEST_MEMO.get()
+    if memo is not None:
+        memo.pop(f"u:{uid}", None)
+        for n in names:
+            memo.pop("h:" + n, None)
+
+    try:
+        cache.delete_many([_user_key(uid)] + [_handle_key(n) for n in names])
     except Exception:
+        pass
+
+
+_IDENTITY_FIELDS = frozenset({"username", "first_name", "last_name"})
+
+
+def invalidate_identity_on_user_change(sender, instance, **kwargs) -> None:
+    """post_save/post_delete receiver for the user model (see SiddesBackendConfig.ready)."""
+
+    fields = kwargs.get("update_fields")
+    if fields is not None and not (set(fields) & _IDENTITY_FIELDS):
+        return  # e.g. last_login on sign-in
+    invalidate_identity(getattr(instance, "pk", None), getattr(instance, "username", None))
+
+
+def handle_for_viewer_id(viewer_id: str) -> Optional[str]:
+    """Best-effort: me_<id> -> @username."""
+
+    if parse_viewer_user_id(viewer_id) is None:
         return None
+    r = resolve(viewer_id)
+    return r.handle if r is not None else None
 
 
 def viewer_aliases(viewer_id: str) -> Set[str]:
@@ -104,6 +351,7 @@ def viewer_aliases(viewer_id: str) -> Set[str]:
 
     return out
 
+
 def display_for_token(token: str) -> dict:
     """Return a best-effort display dict for an identity token.
 
@@ -118,6 +366,9 @@ def display_for_token(token: str) -> dict:
       - username
       - other opaque ids
 
+    Resolution is shared with resolve_many, so callers that prewarm a page of
+    tokens in bulk pay no per-token query here.
+
     This is best-effort and must NEVER raise.
     """
 
@@ -128,64 +379,21 @@ def display_for_token(token: str) -> dict:
     # viewer id: me_<id>
     uid = parse_viewer_user_id(t)
     if uid is not None:
-        try:
-            User = get_user_model()
-            u = User.objects.filter(id=uid).first()
-            if u is None:
-                return {"id": t, "handle": f"@user{uid}", "name": f"User {uid}"}
-
-            uname = _safe_str(getattr(u, "username", ""))
-            # Django User.get_full_name exists on AbstractUser
-            full = ""
-            try:
-                full = _safe_str(u.get_full_name())
-            except Exception:
-                full = _safe_str((getattr(u, "first_name", "") or "") + " " + (getattr(u, "last_name", "") or ""))
-
-            name = full or uname or f"User {uid}"
-            handle = normalize_handle("@" + uname) if uname else f"@user{uid}"
-            return {"id": t, "handle": handle or f"@user{uid}", "name": name}
-        except Exception:
-            # fall back to best-effort handle
-            h = handle_for_viewer_id(t) or "@unknown"
-            return {"id": t, "handle": h, "name": t}
+        r = resolve(t)
+        if r is None:
+            return {"id": t, "handle": f"@user{uid}", "name": f"User {uid}"}
+        name = r.name or r.username or f"User {uid}"
+        return {"id": t, "handle": r.handle or f"@user{uid}", "name": name}
 
-    # handle token
+    # handle token (@username or bare username)
     h = normalize_handle(t)
     if h:
         uname = h[1:]
-        try:
-            User = get_user_model()
-            u = User.objects.filter(username__iexact=uname).first()
-            if u is not None:
-                try:
-                    full = _safe_str(u.get_full_name())
-                except Exception:
-                    full = ""
-                name = full or _safe_str(getattr(u, "username", "")) or uname
-                return {"id": t, "handle": h, "name": name}
-        except Exception:
-            pass
+        r = resolve(t)
+        if r is not None:
+            return {"id": t, "handle": h, "name": r.name or r.username or uname}
         # No user found: still return normalized handle
         return {"id": t, "handle": h, "name": uname or t}
 
-    # plain username-like
-    if re.fullmatch(r"[A-Za-z0-9_.-]+", t):
-        uname = t
-        hh = "@" + uname.lower()
-        try:
-            User = get_user_model()
-            u = User.objects.filter(username__iexact=uname).first()
-            if u is not None:
-                try:
-                    full = _safe_str(u.get_full_name())
-                except Exception:
-                    full = ""
-                name = full or _safe_str(getattr(u, "username", "")) or uname
-                return {"id": t, "handle": hh, "name": name}
-        except Exception:
-            pass
-        return {"id": t, "handle": hh, "name": uname}
-
     # opaque id
     return {"id": t, "handle": "@unknown", "name": t}
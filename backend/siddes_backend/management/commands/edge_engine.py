@@ -2,25 +2,13 @@ from __future__ import annotations
 
 import json
 import os
-import time
-from typing import Any, Dict, Optional
+import signal
+from typing import Any, Dict, List, Optional
 
 from django.core.management.base import BaseCommand
 
-from siddes_backend.edge_queue import is_enabled, queue_key
-
-
-def _truthy(v: str | None) -> bool:
-    return str(v or "").strip().lower() in {"1", "true", "yes", "y", "on"}
-
-
-def _redis():
-    import redis  # type: ignore
-
-    url = str(os.environ.get("REDIS_URL") or "").strip()
-    if not url:
-        return None
-    return redis.from_url(url, decode_responses=True)
+from siddes_backend.edge_queue import get_backend, is_enabled, queue_key
+from siddes_backend.edge_worker import EdgeWorker, concurrency_from_env
 
 
 def _log(msg: str) -> None:
@@ -78,76 +66,118 @@ def handle_ml_refresh_suggestions(payload: Dict[str, Any]) -> None:
     _log(f"edge_engine: ml_refresh_suggestions viewer=me_{viewer.id} created={created}")
 
 
+def handle_media_reap_orphans(payload: Dict[str, Any]) -> None:
+    """Reap orphaned media in bounded batches; re-enqueue while work remains."""
+
+    from siddes_backend.edge_queue import enqueue
+    from siddes_media.reaper import reap_orphans
+    from siddes_media.views import _r2_cfg
+
+    ok, cfg = _r2_cfg()
+    if not ok:
+        _log("edge_engine: media_reap_orphans skipped (R2 not configured)")
+        return
+
+    batch_size = _safe_int(payload.get("batch_size")) or 500
+    max_batches = _safe_int(payload.get("max_batches")) or 4
+    report = reap_orphans(cfg, batch_size=batch_size, max_batches=max_batches)
+    _log(
+        "edge_engine: media_reap_orphans "
+        f"rows={report.get('deletedRows')} objects={report.get('deletedObjects')} "
+        f"failed={report.get('failed')} more={report.get('more')} err={report.get('error') or ''}"
+    )
+    if report.get("more") and not report.get("error"):
+        enqueue("media_reap_orphans", {"batch_size": batch_size, "max_batches": max_batches})
+
+
+def handle_moderation_stats_rollup(payload: Dict[str, Any]) -> None:
+    """Refresh the daily moderation stats snapshots (staff dashboard)."""
+
+    from siddes_safety.stats_rollup import rollup_moderation_stats
+
+    days = _safe_int(payload.get("days")) or 2
+    written = rollup_moderation_stats(days=days)
+    _log(f"edge_engine: moderation_stats_rollup days={days} rows={written}")
+
+
+def handle_post_created_batch(payloads: List[Dict[str, Any]]) -> None:
+    """Mention notifications + cache work for newly created posts (siddes_post.events)."""
+
+    from siddes_post.events import handle_post_created_batch as run_batch
+
+    run_batch(payloads)
+    _log(f"edge_engine: post_created batch={len(payloads)}")
+
+
 HANDLERS = {
     "ml_refresh_suggestions": handle_ml_refresh_suggestions,
+    "media_reap_orphans": handle_media_reap_orphans,
+    "moderation_stats_rollup": handle_moderation_stats_rollup,
+}
+
+# Types delivered in batches (one call per up to SIDDES_EDGE_BATCH_SIZE ready jobs).
+BATCH_HANDLERS = {
+    "post_created": handle_post_created_batch,
 }
 
 
 class Command(BaseCommand):
-    help = "Run Siddes Edge Engine v0 (Redis queue worker)."
+    help = "Run the Siddes Edge Engine worker (reliable Redis queue; see siddes_backend.edge_worker)."
 
     def add_arguments(self, parser):
         parser.add_argument("--once", action="store_true", help="Process at most one job and exit")
-        parser.add_argument("--idle-sleep", default="0.2", help="Sleep seconds between empty polls (default 0.2)")
-        parser.add_argument("--brpop-timeout", default="5", help="BRPOP timeout seconds (default 5)")
+        parser.add_argument("--drain", action="store_true", help="Process ready jobs until the queue is empty, then exit")
+        parser.add_argument("--idle-sleep", default="0.2", help="(unused; kept for compatibility)")
+        parser.add_argument("--brpop-timeout", default="5", help="Seconds to block waiting for jobs (default 5)")
+        parser.add_argument("--concurrency", default="", help="Per-type threads, e.g. ml_refresh_suggestions=4 (overrides env)")
+        parser.add_argument("--stats", action="store_true", help="Print queue stats as JSON and exit")
+        parser.add_argument("--requeue-dead", type=int, default=0, help="Move up to N dead-letter jobs back to the queue and exit")
 
     def handle(self, *args: Any, **opts: Any) -> None:
         if not is_enabled():
             _log("edge_engine: disabled (set SIDDES_EDGE_ENGINE_ENABLED=1 and REDIS_URL)")
             return
 
-        r = _redis()
-        if r is None:
+        backend = get_backend()
+        if backend is None:
             _log("edge_engine: REDIS_URL missing; nothing to do")
             return
 
-        once = bool(opts.get("once"))
-        idle_sleep = float(str(opts.get("idle_sleep") or "0.2").strip())
-        brpop_timeout = int(str(opts.get("brpop_timeout") or "5").strip())
-
-        qk = queue_key()
-        _log(f"edge_engine: up queue={qk}")
-
-        while True:
-            try:
-                item = r.brpop(qk, timeout=brpop_timeout)
-            except Exception as e:
-                _log(f"edge_engine: redis brpop error: {e}")
-                time.sleep(1.0)
-                continue
-
-            if not item:
-                if once:
-                    return
-                time.sleep(idle_sleep)
-                continue
-
-            # item: (key, value)
-            _, raw = item
-            try:
-                job = json.loads(raw)
-            except Exception:
-                job = None
-
-            if not isinstance(job, dict):
-                continue
+        if opts.get("stats"):
+            _log(json.dumps(backend.stats(), indent=2, sort_keys=True))
+            return
 
-            jt = str(job.get("type") or "").strip()
-            payload = job.get("payload")
-            if not isinstance(payload, dict):
-                payload = {}
+        n_dead = int(opts.get("requeue_dead") or 0)
+        if n_dead > 0:
+            moved = 0
+            while moved < n_dead:
+                job = backend.pop_dead()
+                if job is None:
+                    break
+                job["attempts"] = 0
+                for k in ("last_error", "dead_at", "available_at"):
+                    job.pop(k, None)
+                backend.push(job)
+                moved += 1
+            _log(f"edge_engine: requeued {moved} dead job(s)")
+            return
 
-            handler = HANDLERS.get(jt)
-            if handler is None:
-                _log(f"edge_engine: unknown job type={jt}")
-                if once:
-                    return
-                continue
+        concurrency = concurrency_from_env()
+        concurrency.update(concurrency_from_env(str(opts.get("concurrency") or "")))
 
+        worker = EdgeWorker(HANDLERS, batch_handlers=BATCH_HANDLERS, backend=backend, concurrency=concurrency, log=_log)
+        for sig in (signal.SIGTERM, signal.SIGINT):
             try:
-                handler(payload)
-            except Exception as e:
-                _log(f"edge_engine: job failed type={jt} err={e}")
-
-            if once:
-                return
+                signal.signal(sig, lambda *_: worker.stop())
+            except Exception:
+                pass
+
+        block_s = float(_safe_int(opts.get("brpop_timeout")) or 5)
+        stats_every = float(_safe_int(os.environ.get("SIDDES_EDGE_STATS_EVERY_SECS", "60")) or 0)
+        _log(f"edge_engine: up backend={backend.name} queue={queue_key()} consumer={worker.consumer} capacity={worker.capacity()}")
+        worker.run(
+            block_s=block_s,
+            max_jobs=1 if opts.get("once") else None,
+            drain=bool(opts.get("once") or opts.get("drain")),
+            stats_every_s=stats_every,
+        )
@@ -17,15 +17,18 @@ import logging
 import time
 import uuid
 
+from asgiref.sync import sync_to_async
 from django.http import HttpRequest, HttpResponse, JsonResponse
 
+from .async_support import HybridMiddleware, resolved_user
+
 LOG_API = logging.getLogger("siddes.api")
 
 def _truthy(v: str | None) -> bool:
     return str(v or "").strip().lower() in ("1", "true", "yes", "y", "on")
 
 
-class DevCorsMiddleware:
+class DevCorsMiddleware(HybridMiddleware):
     """Dev-only CORS middleware for local Next.js → Django.
 
     SECURITY (sd_397):
@@ -39,7 +42,7 @@ class DevCorsMiddleware:
     """
 
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         raw = os.environ.get(
             "SIDDES_DEV_CORS_ORIGINS",
             "http://localhost:3000,http://localhost:3001,http://localhost:3002,"
@@ -58,6 +61,8 @@ class DevCorsMiddleware:
             return _truthy(os.environ.get("DJANGO_DEBUG", "1"))
 
     def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self._acall(request)
         if not self._enabled(request):
             return self.get_response(request)
 
@@ -66,7 +71,18 @@ class DevCorsMiddleware:
             response = HttpResponse(status=200)
         else:
             response = self.get_response(request)
+        return self._cors(request, response)
 
+    async def _acall(self, request: HttpRequest):
+        if not self._enabled(request):
+            return await self.get_response(request)
+        if request.method == "OPTIONS":
+            response = HttpResponse(status=200)
+        else:
+            response = await self.get_response(request)
+        return self._cors(request, response)
+
+    def _cors(self, request: HttpRequest, response):
         origin = request.headers.get("Origin")
         origin_ok = bool(origin and origin in self.allow_origins)
 
@@ -84,7 +100,7 @@ class DevCorsMiddleware:
         response["Access-Control-Allow-Methods"] = "GET, POST, PATCH, PUT, DELETE, OPTIONS"
 
         # Expose request id so browser clients can read it.
-        response["Access-Control-Expose-Headers"] = "X-Request-ID"
+        response["Access-Control-Expose-Headers"] = "X-Request-ID, Server-Timing"
 
         req_headers = request.headers.get("Access-Control-Request-Headers")
         if req_headers:
@@ -97,32 +113,63 @@ class DevCorsMiddleware:
             elif not vary:
                 response["Vary"] = "Access-Control-Request-Headers"
         else:
-            response["Access-Control-Allow-Headers"] = "content-type, x-sd-viewer, x-csrftoken, x-request-id"
+            response["Access-Control-Allow-Headers"] = "content-type, x-sd-viewer, x-csrftoken, x-request-id, x-siddes-profile"
 
         response["Access-Control-Max-Age"] = "600"
         return response
 
-class RequestIdMiddleware:
+class RequestIdMiddleware(HybridMiddleware):
     """Attach a request id to each request and return it in the response header.
 
     - Accepts an incoming X-Request-ID when provided (propagates across services).
     - Otherwise generates a short id.
     """
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-
-    def __call__(self, request: HttpRequest):
+    def _assign(self, request: HttpRequest) -> str:
         rid = request.headers.get("X-Request-ID") or request.META.get("HTTP_X_REQUEST_ID")
         rid = str(rid or "").strip()
         if not rid:
             rid = uuid.uuid4().hex[:16]
         request.siddes_request_id = rid
+        return rid
 
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self._acall(request)
+        rid = self._assign(request)
         response: HttpResponse = self.get_response(request)
         response["X-Request-ID"] = rid
         return response
 
+    async def _acall(self, request: HttpRequest):
+        rid = self._assign(request)
+        response = await self.get_response(request)
+        response["X-Request-ID"] = rid
+        return response
+
+
+class IdentityScopeMiddleware(HybridMiddleware):
+    """Per-request identity memo (siddes_backend.identity.resolve_many).
+
+    A feed page resolves the same viewer and author tokens many times across
+    visibility checks and hydration; inside the scope each token costs at most
+    one lookup per request.
+    """
+
+    def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self._acall(request)
+        from siddes_backend.identity import identity_scope
+
+        with identity_scope():
+            return self.get_response(request)
+
+    async def _acall(self, request: HttpRequest):
+        from siddes_backend.identity import identity_scope
+
+        with identity_scope():
+            return await self.get_response(request)
+
 # sd_392_api_request_log_hardening_force_create
 # --- sd_395: Harden API request logging (no spoofing + redaction) -----------
 # --- sd_395: Harden API request logging (no spoofing + redaction) -----------
@@ -230,7 +277,7 @@ class ApiRequestLogMiddleware:
         return response
 # -----------------------------------------------------------------------------
 
-class ApiWriteAuthGuardMiddleware:
+class ApiWriteAuthGuardMiddleware(HybridMiddleware):
     """Safety net: require authenticated user for /api write methods in production.
 
     Why: protects against accidental missing auth checks in new endpoints.
@@ -243,25 +290,35 @@ class ApiWriteAuthGuardMiddleware:
     """
 
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         raw = os.environ.get("SIDDES_API_WRITE_ALLOWLIST", "/api/auth/")
         self.allow_prefixes = [p.strip() for p in str(raw).split(",") if p.strip()]
 
     def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self._acall(request)
+        denied = self._denied(request, lambda: getattr(request, "user", None))
+        return denied if denied is not None else self.get_response(request)
+
+    async def _acall(self, request: HttpRequest):
+        denied = self._denied(request, lambda: resolved_user(request))
+        return denied if denied is not None else await self.get_response(request)
+
+    def _denied(self, request: HttpRequest, get_user) -> JsonResponse | None:
         if not request.path.startswith("/api/"):
-            return self.get_response(request)
+            return None
 
         method = str(getattr(request, "method", "") or "").upper()
         if method in ("GET", "HEAD", "OPTIONS"):
-            return self.get_response(request)
+            return None
 
         for prefix in self.allow_prefixes:
             if request.path.startswith(prefix):
-                return self.get_response(request)
+                return None
 
-        user = getattr(request, "user", None)
+        user = get_user()
         if user is not None and getattr(user, "is_authenticated", False):
-            return self.get_response(request)
+            return None
 
         # Dev-only: allow x-sd-viewer/sd_viewer writes to keep local flows simple.
         if _truthy(os.environ.get("DJANGO_DEBUG", "1")):
@@ -270,7 +327,7 @@ class ApiWriteAuthGuardMiddleware:
             except Exception:
                 dev_viewer = None
             if str(dev_viewer or "").strip():
-                return self.get_response(request)
+                return None
 
         rid = (getattr(request, "siddes_request_id", None) or request.headers.get("X-Request-ID") or request.META.get("HTTP_X_REQUEST_ID"))
         rid = str(rid or "").strip()[:64] or None
@@ -285,7 +342,7 @@ class ApiWriteAuthGuardMiddleware:
         resp["Cache-Control"] = "no-store"
         return resp
 
-class PanicModeMiddleware:
+class PanicModeMiddleware(HybridMiddleware):
     """Emergency write-freeze for /api/*.
 
     Enable by setting:
@@ -303,7 +360,7 @@ class PanicModeMiddleware:
     """
 
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         raw = os.environ.get(
             "SIDDES_PANIC_WRITE_ALLOWLIST",
             "/api/auth/,/api/reports,/api/blocks,/api/appeals,/api/mutes,/api/hidden-posts,/api/moderation/",
@@ -311,20 +368,30 @@ class PanicModeMiddleware:
         self.allow_prefixes = [p.strip() for p in str(raw).split(",") if p.strip()]
 
     def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self._acall(request)
+        frozen = self._frozen(request)
+        return frozen if frozen is not None else self.get_response(request)
+
+    async def _acall(self, request: HttpRequest):
+        frozen = self._frozen(request)
+        return frozen if frozen is not None else await self.get_response(request)
+
+    def _frozen(self, request: HttpRequest) -> JsonResponse | None:
         if not request.path.startswith("/api/"):
-            return self.get_response(request)
+            return None
 
         enabled = _truthy(os.environ.get("SIDDES_PANIC_MODE", "0"))
         if not enabled:
-            return self.get_response(request)
+            return None
 
         method = str(getattr(request, "method", "") or "").upper()
         if method in ("GET", "HEAD", "OPTIONS"):
-            return self.get_response(request)
+            return None
 
         for prefix in self.allow_prefixes:
             if request.path.startswith(prefix):
-                return self.get_response(request)
+                return None
 
         rid = getattr(request, "siddes_request_id", None) or request.headers.get("X-Request-ID")
         payload = {
@@ -337,7 +404,7 @@ class PanicModeMiddleware:
         resp["Cache-Control"] = "no-store"
         return resp
 
-class AccountStateMiddleware:
+class AccountStateMiddleware(HybridMiddleware):
     """Block unsafe writes for accounts in restricted states.
 
     States (stored on SiddesProfile):
@@ -357,7 +424,7 @@ class AccountStateMiddleware:
     """
 
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         self.enabled = _truthy(os.environ.get('SIDDES_ACCOUNT_STATE_ENFORCE', '1'))
         raw = os.environ.get(
             'SIDDES_ACCOUNT_STATE_WRITE_ALLOWLIST',
@@ -366,50 +433,58 @@ class AccountStateMiddleware:
         self.allow_prefixes = [p.strip() for p in str(raw).split(',') if p.strip()]
 
     def __call__(self, request: HttpRequest):
+        if self.is_async:
+            return self._acall(request)
+        if self._applies(request, lambda: getattr(request, 'user', None)):
+            blocked = self._restricted_response(request)
+            if blocked is not None:
+                return blocked
+        return self.get_response(request)
+
+    async def _acall(self, request: HttpRequest):
+        if self._applies(request, lambda: resolved_user(request)):
+            blocked = await sync_to_async(self._restricted_response)(request)
+            if blocked is not None:
+                return blocked
+        return await self.get_response(request)
+
+    def _applies(self, request: HttpRequest, get_user) -> bool:
         if not self.enabled:
-            return self.get_response(request)
+            return False
 
         if not str(getattr(request, 'path', '') or '').startswith('/api/'):
-            return self.get_response(request)
+            return False
 
         method = str(getattr(request, 'method', '') or '').upper()
         if method in ('GET', 'HEAD', 'OPTIONS'):
-            return self.get_response(request)
+            return False
 
         path = str(getattr(request, 'path', '') or '')
         for pref in self.allow_prefixes:
             if path.startswith(pref):
-                return self.get_response(request)
+                return False
 
-        user = getattr(request, 'user', None)
+        user = get_user()
         if not user or not getattr(user, 'is_authenticated', False):
-            return self.get_response(request)
+            return False
 
         if bool(getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False)):
-            return self.get_response(request)
+            return False
+        return True
 
+    def _restricted_response(self, request: HttpRequest) -> JsonResponse | None:
         try:
             from django.utils import timezone
-            from siddes_auth.models import SiddesProfile  # type: ignore
+            from siddes_auth.account_context import account_context  # type: ignore
 
-            prof = getattr(user, 'siddes_profile', None)
-            if prof is None:
-                prof, _ = SiddesProfile.objects.get_or_create(user=user)
+            # Shared with views for the rest of the request (siddes_auth/account_context.py).
+            ctx = account_context(request)
+            if ctx is None or ctx.restricted_state() is None:
+                return None
 
-            state = str(getattr(prof, 'account_state', '') or 'active').strip().lower() or 'active'
-            until = getattr(prof, 'account_state_until', None)
-            reason = str(getattr(prof, 'account_state_reason', '') or '').strip()[:200] or None
-
-            # Auto-expire timeboxed restrictions without writing DB.
-            if state in ('read_only', 'suspended') and until is not None:
-                try:
-                    if timezone.now() >= until:
-                        return self.get_response(request)
-                except Exception:
-                    pass
-
-            if state in ('', 'active'):
-                return self.get_response(request)
+            state = ctx.restricted_state()
+            until = ctx.until
+            reason = ctx.reason
 
             rid = (
                 getattr(request, 'siddes_request_id', None)
@@ -441,10 +516,29 @@ class AccountStateMiddleware:
 
         except Exception:
             # Fail-open: never crash the API because of enforcement.
-            return self.get_response(request)
+            return None
 
 # --- Siddes: Daily quotas (anti-abuse, prod-only) -----------------------------
-class DailyQuotaMiddleware:
+# POST views under a daily quota, by view class. Classified in process_view from
+# the resolved route, so no per-request regex matching.
+_QUOTA_VIEWS = {
+    "siddes_post.views.PostCreateView": "post_create",
+    "siddes_post.views.PostReplyCreateView": "post_reply_create",
+    "siddes_inbox.views.InboxThreadView": "inbox_send",
+    "siddes_invites.views.InvitesView": "invites_create",
+    "siddes_safety.views.ReportsCreateView": "safety_report",
+}
+
+_QUOTA_LIMIT_ENV = {
+    "post_create": ("SIDDES_QUOTA_POST_CREATE_PER_DAY", "200"),
+    "post_reply_create": ("SIDDES_QUOTA_POST_REPLY_CREATE_PER_DAY", "500"),
+    "inbox_send": ("SIDDES_QUOTA_INBOX_SEND_PER_DAY", "300"),
+    "invites_create": ("SIDDES_QUOTA_INVITES_CREATE_PER_DAY", "50"),
+    "safety_report": ("SIDDES_QUOTA_SAFETY_REPORT_PER_DAY", "30"),
+}
+
+
+class DailyQuotaMiddleware(HybridMiddleware):
     """
     Production-only daily quotas for key write actions (anti-abuse).
     Generous defaults; override via env. Does not add UX friction for normal use.
@@ -457,58 +551,61 @@ class DailyQuotaMiddleware:
       SIDDES_QUOTA_SAFETY_REPORT_PER_DAY=30
     """
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
+        self._by_view = None  # view class -> action, built on first use
+        if self.is_async:
+            # Django hops to a thread for sync process_view; only POSTs need one.
+            self.process_view = self._aprocess_view
 
     def __call__(self, request):
+        return self.get_response(request)
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if (getattr(request, "method", "") or "").upper() != "POST":
+            return None
+        return await sync_to_async(DailyQuotaMiddleware.process_view)(self, request, view_func, view_args, view_kwargs)
+
+    def _action_for(self, view_func) -> str | None:
+        if self._by_view is None:
+            from django.utils.module_loading import import_string
+
+            by_view = {}
+            for dotted, action in _QUOTA_VIEWS.items():
+                try:
+                    by_view[import_string(dotted)] = action
+                except Exception:
+                    continue
+            self._by_view = by_view
+        cls = getattr(view_func, "view_class", None) or getattr(view_func, "cls", None)
+        return self._by_view.get(cls) if cls is not None else None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
         try:
             from django.conf import settings
             if getattr(settings, "DEBUG", False):
-                return self.get_response(request)
+                return None
 
-            import os, re
-            from django.core.cache import cache
-            from django.http import JsonResponse
-            from django.utils import timezone
+            if (getattr(request, "method", "") or "").upper() != "POST":
+                return None
 
             if os.getenv("SIDDES_DISABLE_DAILY_QUOTAS", "0").lower() in ("1", "true", "yes", "y"):
-                return self.get_response(request)
+                return None
+
+            action = self._action_for(view_func)
+            if not action:
+                return None
 
             user = getattr(request, "user", None)
             if not user or not getattr(user, "is_authenticated", False):
-                return self.get_response(request)
-
-            method = (getattr(request, "method", "") or "").upper()
-            if method != "POST":
-                return self.get_response(request)
-
-            path = (getattr(request, "path", "") or "").rstrip("/")
-            action = None
-
-            # NOTE: these are backend paths (Django)
-            if path == "/api/post":
-                action = "post_create"
-            elif re.match(r"^/api/post/[^/]+/reply$", path):
-                action = "post_reply_create"
-            elif re.match(r"^/api/inbox/[^/]+$", path):
-                action = "inbox_send"
-            elif path == "/api/invites":
-                action = "invites_create"
-            elif path == "/api/reports":
-                action = "safety_report"
+                return None
 
-            if not action:
-                return self.get_response(request)
-
-            limits = {
-                "post_create": int(os.getenv("SIDDES_QUOTA_POST_CREATE_PER_DAY", "200")),
-                "post_reply_create": int(os.getenv("SIDDES_QUOTA_POST_REPLY_CREATE_PER_DAY", "500")),
-                "inbox_send": int(os.getenv("SIDDES_QUOTA_INBOX_SEND_PER_DAY", "300")),
-                "invites_create": int(os.getenv("SIDDES_QUOTA_INVITES_CREATE_PER_DAY", "50")),
-                "safety_report": int(os.getenv("SIDDES_QUOTA_SAFETY_REPORT_PER_DAY", "30")),
-            }
-            limit = int(limits.get(action, 0) or 0)
+            env, default = _QUOTA_LIMIT_ENV[action]
+            limit = int(os.getenv(env, default) or 0)
             if limit <= 0:
-                return self.get_response(request)
+                return None
+
+            from django.core.cache import cache
+            from django.utils import timezone
 
             day = timezone.now().strftime("%Y%m%d")
             key = f"sdq:{action}:{user.id}:{day}"
@@ -540,10 +637,10 @@ class DailyQuotaMiddleware:
                     status=429,
                 )
 
-            return self.get_response(request)
+            return None
         except Exception:
             # Never break the app because of quota middleware
-            return self.get_response(request)
+            return None
 # -----------------------------------------------------------------------------
 
 
@@ -594,88 +691,133 @@ def _sd_redact_query_string(qs: str, *, max_pairs: int = 40, max_len: int = 512)
         return ''
 
 
-class ApiRequestLogMiddleware:
+class ApiRequestLogMiddleware(HybridMiddleware):
     """Structured JSON request logs for /api/*.
 
     Fields:
       request_id, method, path, status, latency_ms, viewer, (optional) dev_viewer
+      db_queries, db_ms, cache_hits, cache_misses (SIDDES_API_LOG_TIMINGS=1)
+      sample_rate (only when the request was sampled below 1.0)
+
+    Lines are handed to the `siddes.api` logger as lazy JSON; with the queue
+    handler (siddes_backend/request_log.py) serialization and the write happen
+    off the request thread. Per-path sampling always keeps 5xx and slow requests.
 
     Note: This definition is intentionally placed at the end of the module to
     override any earlier ApiRequestLogMiddleware definitions.
     """
 
-    def __init__(self, get_response):
-        self.get_response = get_response
-
     def __call__(self, request: 'HttpRequest'):
-        try:
-            if not str(getattr(request, 'path', '') or '').startswith('/api/'):
-                return self.get_response(request)
+        if self.is_async:
+            return self._acall(request)
+        if not str(getattr(request, 'path', '') or '').startswith('/api/'):
+            return self.get_response(request)
 
-            t0 = time.time()
+        timer = self._timer()
+        t0 = time.time()
+        if timer is not None:
+            with timer:
+                response = self.get_response(request)
+        else:
             response = self.get_response(request)
-            dt_ms = int((time.time() - t0) * 1000)
+        dt_ms = int((time.time() - t0) * 1000)
 
-            rid = (
-                getattr(request, 'siddes_request_id', None)
-                or request.headers.get('X-Request-ID')
-                or request.META.get('HTTP_X_REQUEST_ID')
-            )
-            rid = str(rid or '').strip()[:64] or None
+        try:
+            self._log(request, response, dt_ms, timer.timings if timer is not None else None, getattr(request, 'user', None))
+        except Exception:
+            pass
+        return response
 
-            user = getattr(request, 'user', None)
-            viewer = None
-            if user is not None and getattr(user, 'is_authenticated', False):
-                try:
-                    viewer = f"me_{int(getattr(user, 'id'))}"
-                except Exception:
-                    viewer = 'me'
+    async def _acall(self, request: 'HttpRequest'):
+        if not str(getattr(request, 'path', '') or '').startswith('/api/'):
+            return await self.get_response(request)
 
-            # Dev convenience (do not treat as truth)
-            dev_viewer = None
-            try:
-                if _truthy(os.environ.get('DJANGO_DEBUG', '1')):
-                    dv = request.headers.get('x-sd-viewer') or request.COOKIES.get('sd_viewer')
-                    dev_viewer = str(dv or '').strip()[:64] or None
-            except Exception:
-                dev_viewer = None
+        timer = self._timer()
+        t0 = time.time()
+        if timer is not None:
+            with timer:
+                response = await self.get_response(request)
+        else:
+            response = await self.get_response(request)
+        dt_ms = int((time.time() - t0) * 1000)
 
-            side = request.GET.get('side')
-            side = str(side or '').strip().lower()[:16] or None
+        try:
+            self._log(request, response, dt_ms, timer.timings if timer is not None else None, resolved_user(request))
+        except Exception:
+            pass
+        return response
 
-            # Never log query strings for auth endpoints (tokens may appear here)
-            path = str(getattr(request, 'path', '') or '')
-            qs = ''
-            if not path.startswith('/api/auth/'):
-                qs_raw = request.META.get('QUERY_STRING') or ''
-                qs = _sd_redact_query_string(str(qs_raw or ''))
+    def _timer(self):
+        try:
+            from siddes_backend.request_log import timed_request, timings_enabled
+            return timed_request() if timings_enabled() else None
+        except Exception:
+            return None
 
-            payload = {
-                'event': 'api_request',
-                'request_id': rid,
-                'viewer': viewer,
-                'method': request.method,
-                'path': path,
-                'query': qs,
-                'side': side,
-                'status': int(getattr(response, 'status_code', 0) or 0),
-                'latency_ms': dt_ms,
-            }
-            if dev_viewer and (not viewer):
-                payload['dev_viewer'] = dev_viewer
+    def _log(self, request, response, dt_ms: int, timings, user) -> None:
+        from siddes_backend.request_log import JsonLine, sample_rate_for, should_log
 
+        path = str(getattr(request, 'path', '') or '')
+        status_code = int(getattr(response, 'status_code', 0) or 0)
+        rate = sample_rate_for(path, status=status_code, latency_ms=dt_ms)
+        if not should_log(rate):
+            return
+
+        rid = (
+            getattr(request, 'siddes_request_id', None)
+            or request.headers.get('X-Request-ID')
+            or request.META.get('HTTP_X_REQUEST_ID')
+        )
+        rid = str(rid or '').strip()[:64] or None
+
+        viewer = None
+        if user is not None and getattr(user, 'is_authenticated', False):
             try:
-                LOG_API.info(json.dumps(payload, separators=(',', ':')))
+                viewer = f"me_{int(getattr(user, 'id'))}"
             except Exception:
-                pass
+                viewer = 'me'
 
-            return response
+        # Dev convenience (do not treat as truth)
+        dev_viewer = None
+        try:
+            if _truthy(os.environ.get('DJANGO_DEBUG', '1')):
+                dv = request.headers.get('x-sd-viewer') or request.COOKIES.get('sd_viewer')
+                dev_viewer = str(dv or '').strip()[:64] or None
         except Exception:
-            return self.get_response(request)
+            dev_viewer = None
+
+        side = request.GET.get('side')
+        side = str(side or '').strip().lower()[:16] or None
+
+        # Never log query strings for auth endpoints (tokens may appear here)
+        qs = ''
+        if not path.startswith('/api/auth/'):
+            qs_raw = request.META.get('QUERY_STRING') or ''
+            qs = _sd_redact_query_string(str(qs_raw or ''))
+
+        payload = {
+            'event': 'api_request',
+            'request_id': rid,
+            'viewer': viewer,
+            'method': request.method,
+            'path': path,
+            'query': qs,
+            'side': side,
+            'status': status_code,
+            'latency_ms': dt_ms,
+        }
+        if dev_viewer and (not viewer):
+            payload['dev_viewer'] = dev_viewer
+        if timings is not None:
+            payload.update(timings.fields())
+        if rate < 1.0:
+            payload['sample_rate'] = rate
+
+        LOG_API.info(JsonLine(payload))
 
 # --- end sd_391_api_request_log_hardening_force_override --------------------------
 # --- sd_584: Cache safety headers for /api/* (prevents edge/shared caching) --------
-class ApiCacheSafetyHeadersMiddleware:
+class ApiCacheSafetyHeadersMiddleware(HybridMiddleware):
     """Force safe cache headers on /api/* responses.
 
     Why:
@@ -688,13 +830,19 @@ class ApiCacheSafetyHeadersMiddleware:
     """
 
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         raw = os.environ.get("SIDDES_PUBLIC_API_PREFIXES", "/api/slate,/api/health")
         self.public_prefixes = [p.strip() for p in str(raw).split(",") if p.strip()]
 
     def __call__(self, request: HttpRequest):
-        response: HttpResponse = self.get_response(request)
+        if self.is_async:
+            return self._acall(request)
+        return self._headers(request, self.get_response(request))
+
+    async def _acall(self, request: HttpRequest):
+        return self._headers(request, await self.get_response(request))
 
+    def _headers(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
         if not str(getattr(request, "path", "") or "").startswith("/api/"):
             return response
 
@@ -0,0 +1,345 @@
+"""Opt-in per-request profiler (DB queries, cache ops, named spans).
+
+The request log only carries end-to-end latency and totals. When a request is
+profiled, ProfilerMiddleware records:
+
+- every DB query (execute wrapper on each connection): count, time, and repeated
+  statements (same SQL text, i.e. same shape with different params -> N+1)
+- cache operations on the default cache: count/time per op, get hit ratio
+- named spans: `with span("feed.fetch"): ...` around hot sections
+
+Activation (per request):
+- header `X-Siddes-Profile: 1` (or `json`) from a staff user, or in DEBUG.
+  The result is returned as a `Server-Timing` header; `json` also appends a
+  `_profile` key to JSON object responses.
+- sampling: SIDDES_PROFILE_SAMPLE=0.01 profiles that fraction of /api/
+  requests and writes an `api_profile` line to the siddes.api logger (never
+  exposed to the client).
+
+Outside a profiled request `span()` and the wrappers are pass-through.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from .async_support import HybridMiddleware
+
+LOG_API = logging.getLogger("siddes.api")
+
+_PROFILE_HEADER = "HTTP_X_SIDDES_PROFILE"
+
+
+def _rate(raw: object) -> float:
+    try:
+        r = float(str(raw).strip())
+    except Exception:
+        return 0.0
+    return max(0.0, min(r, 1.0))
+
+
+def profile_sample_rate() -> float:
+    return _rate(os.environ.get("SIDDES_PROFILE_SAMPLE", "0"))
+
+
+class Profile:
+    # note_* may run concurrently (run_db worker threads share the request's profile).
+    __slots__ = ("t0", "queries", "db_ns", "cache_ops", "cache_hits", "cache_misses", "spans", "_lock")
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter_ns()
+        self.queries: Dict[str, List[int]] = {}  # sql -> [count, ns]
+        self.db_ns = 0
+        self.cache_ops: Dict[str, List[int]] = {}  # op -> [count, ns]
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.spans: Dict[str, List[int]] = {}  # name -> [count, ns]
+        self._lock = threading.Lock()
+
+    def note_query(self, sql: str, ns: int) -> None:
+        with self._lock:
+            self.db_ns += ns
+            q = self.queries.get(sql)
+            if q is None:
+                self.queries[sql] = [1, ns]
+            else:
+                q[0] += 1
+                q[1] += ns
+
+    def note_cache(self, op: str, ns: int, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            c = self.cache_ops.setdefault(op, [0, 0])
+            c[0] += 1
+            c[1] += ns
+            self.cache_hits += hits
+            self.cache_misses += misses
+
+    def note_span(self, name: str, ns: int) -> None:
+        with self._lock:
+            s = self.spans.setdefault(name, [0, 0])
+            s[0] += 1
+            s[1] += ns
+
+    def summary(self, *, top: int = 5) -> Dict[str, Any]:
+        total_ns = time.perf_counter_ns() - self.t0
+        n_queries = sum(c for c, _ in self.queries.values())
+        dups = sorted(
+            ((sql, c, ns) for sql, (c, ns) in self.queries.items() if c > 1),
+            key=lambda x: (x[1], x[2]),
+            reverse=True,
+        )
+        looked = self.cache_hits + self.cache_misses
+        return {
+            "totalMs": _ms(total_ns),
+            "db": {
+                "queries": n_queries,
+                "ms": _ms(self.db_ns),
+                "distinct": len(self.queries),
+                "duplicates": [{"sql": sql[:300], "count": c, "ms": _ms(ns)} for sql, c, ns in dups[:top]],
+            },
+            "cache": {
+                "ops": {op: {"count": c, "ms": _ms(ns)} for op, (c, ns) in sorted(self.cache_ops.items())},
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hitRatio": round(self.cache_hits / looked, 3) if looked else None,
+            },
+            "spans": {name: {"count": c, "ms": _ms(ns)} for name, (c, ns) in self.spans.items()},
+        }
+
+    def server_timing(self) -> str:
+        s = self.summary(top=0)
+        db, ca = s["db"], s["cache"]
+        dup = sum(c - 1 for c, _ in self.queries.values() if c > 1)
+        parts = [
+            f'db;dur={db["ms"]};desc="{db["queries"]} queries, {dup} repeated"',
+            f'cache;dur={sum(v["ms"] for v in ca["ops"].values()):.2f};desc="{ca["hits"]}/{ca["hits"] + ca["misses"]} hits"',
+        ]
+        for name, v in s["spans"].items():
+            parts.append(f'{name};dur={v["ms"]}')
+        parts.append(f'app;dur={s["totalMs"]}')
+        return ", ".join(parts)
+
+
+def _ms(ns: int) -> float:
+    return round(ns / 1_000_000, 2)
+
+
+_PROFILE: ContextVar[Optional[Profile]] = ContextVar("siddes_profile", default=None)
+
+
+def current_profile() -> Optional[Profile]:
+    return _PROFILE.get()
+
+
+class span:
+    """Accumulate wall time under `name` in the active profile (no-op otherwise)."""
+
+    __slots__ = ("name", "_p", "_t0")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._p: Optional[Profile] = None
+        self._t0 = 0
+
+    def __enter__(self) -> "span":
+        self._p = _PROFILE.get()
+        if self._p is not None:
+            self._t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        p = self._p
+        if p is not None:
+            p.note_span(self.name, time.perf_counter_ns() - self._t0)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    p = _PROFILE.get()
+    if p is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        p.note_query(str(sql), time.perf_counter_ns() - t0)
+
+
+_MISS = object()
+_CACHE_OPS = ("set", "add", "delete", "set_many", "delete_many", "incr", "touch")
+
+
+def _instrument_cache(c: Any) -> None:
+    """Wrap a cache instance's ops once; pass-through when nothing is profiled."""
+
+    if getattr(c, "_siddes_profiled", False):
+        return
+    get, get_many = c.get, c.get_many
+
+    def prof_get(key, default=None, version=None):
+        p = _PROFILE.get()
+        if p is None:
+            return get(key, default, version)
+        t0 = time.perf_counter_ns()
+        tok = _PROFILE.set(None)  # backends implement ops via get/set; count only the outer call
+        try:
+            v = get(key, _MISS, version)
+        finally:
+            _PROFILE.reset(tok)
+        hit = v is not _MISS
+        p.note_cache("get", time.perf_counter_ns() - t0, hits=int(hit), misses=int(not hit))
+        return v if hit else default
+
+    def prof_get_many(keys, version=None):
+        p = _PROFILE.get()
+        if p is None:
+            return get_many(keys, version)
+        keys = list(keys)
+        t0 = time.perf_counter_ns()
+        tok = _PROFILE.set(None)
+        try:
+            out = get_many(keys, version)
+        finally:
+            _PROFILE.reset(tok)
+        p.note_cache("get_many", time.perf_counter_ns() - t0, hits=len(out), misses=max(0, len(keys) - len(out)))
+        return out
+
+    def _wrap(op: str, fn: Any) -> Any:
+        def wrapped(*args, **kwargs):
+            p = _PROFILE.get()
+            if p is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter_ns()
+            tok = _PROFILE.set(None)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _PROFILE.reset(tok)
+                p.note_cache(op, time.perf_counter_ns() - t0)
+
+        return wrapped
+
+    c.get, c.get_many = prof_get, prof_get_many
+    for op in _CACHE_OPS:
+        fn = getattr(c, op, None)
+        if fn is not None:
+            setattr(c, op, _wrap(op, fn))
+    c._siddes_profiled = True
+
+
+def _wants_profile(request: Any) -> Tuple[str, bool]:
+    """(mode, sampled): mode is "" (off), "header" or "json"."""
+
+    raw = str(request.META.get(_PROFILE_HEADER, "") or "").strip().lower()
+    if raw in ("1", "true", "yes", "json"):
+        allowed = False
+        try:
+            from django.conf import settings
+
+            user = getattr(request, "user", None)
+            allowed = bool(getattr(settings, "DEBUG", False)) or bool(
+                user is not None and getattr(user, "is_authenticated", False) and getattr(user, "is_staff", False)
+            )
+        except Exception:
+            allowed = False
+        if allowed:
+            return ("json" if raw == "json" else "header"), False
+
+    rate = profile_sample_rate()
+    if rate > 0.0 and random.random() < rate:
+        return "", True
+    return "", False
+
+
+def _append_json_trailer(response: Any, summary: Dict[str, Any]) -> None:
+    ctype = str(response.get("Content-Type", "") or "")
+    if "json" not in ctype or getattr(response, "streaming", False):
+        return
+    try:
+        body = json.loads(response.content)
+    except Exception:
+        return
+    if not isinstance(body, dict):
+        return
+    body["_profile"] = summary
+    response.content = json.dumps(body, default=str).encode("utf-8")
+    if response.has_header("Content-Length"):
+        response["Content-Length"] = str(len(response.content))
+
+
+class ProfilerMiddleware(HybridMiddleware):
+    """Profile opted-in /api/ requests (see module docstring)."""
+
+    def __call__(self, request):
+        if self.is_async:
+            return self._acall(request)
+        prof = self._start(request)
+        if prof is None:
+            return self.get_response(request)
+        token = _PROFILE.set(prof[0])
+        try:
+            response = self.get_response(request)
+        finally:
+            _PROFILE.reset(token)
+        return self._finish(request, response, *prof)
+
+    async def _acall(self, request):
+        prof = self._start(request)
+        if prof is None:
+            return await self.get_response(request)
+        token = _PROFILE.set(prof[0])
+        try:
+            response = await self.get_response(request)
+        finally:
+            _PROFILE.reset(token)
+        return self._finish(request, response, *prof)
+
+    def _start(self, request) -> Optional[Tuple[Profile, str, bool]]:
+        if not str(getattr(request, "path", "") or "").startswith("/api/"):
+            return None
+
+        try:
+            mode, sampled = _wants_profile(request)
+        except Exception:
+            mode, sampled = "", False
+        if not mode and not sampled:
+            return None
+
+        try:
+            from django.core.cache import caches
+
+            _instrument_cache(caches["default"])
+        except Exception:
+            pass
+        return Profile(), mode, sampled
+
+    def _finish(self, request, response, prof: Profile, mode: str, sampled: bool):
+        try:
+            if mode:
+                response["Server-Timing"] = prof.server_timing()
+                if mode == "json":
+                    _append_json_trailer(response, prof.summary())
+            if sampled:
+                from siddes_backend.request_log import JsonLine
+
+                LOG_API.info(
+                    JsonLine(
+                        {
+                            "event": "api_profile",
+                            "request_id": getattr(request, "siddes_request_id", None),
+                            "method": request.method,
+                            "path": str(getattr(request, "path", "") or ""),
+                            "status": int(getattr(response, "status_code", 0) or 0),
+                            **prof.summary(),
+                        }
+                    )
+                )
+        except Exception:
+            pass
+        return response
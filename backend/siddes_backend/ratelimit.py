@@ -0,0 +1,200 @@
+"""Shared-cache rate-limit engine (DRF throttles + abuse_limits).
+
+One limiter for every budget in the app: `hit(key, limit=..., window_s=...)`.
+
+Algorithm: sliding-window counter. Each key keeps two fixed-window counters
+(current and previous window); the estimate is
+
+    prev * (time left in current window / window) + curr
+
+and a hit is allowed while the estimate stays below the limit. Denied hits
+are not counted (DRF semantics), so a client that keeps retrying is released
+as soon as its older requests slide out of the window.
+
+Storage, picked from the default cache backend:
+- Redis: one EVALSHA round trip per hit (Lua reads both counters, checks and
+  INCRs atomically). Replaces DRF's per-key timestamp history lists, which
+  were read and rewritten whole on every request.
+- LocMem (dev/tests): one small tuple per key, updated under a process lock.
+  Lives in the Django cache, so cache.clear() resets budgets as before.
+- Anything else: add/incr on per-window counters (atomic increments; the
+  check itself may over-admit slightly under concurrency).
+
+All backends fail open: a cache outage never blocks requests.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Tuple
+
+_KEY_PREFIX = "sdrl:v2:"
+_LOCAL_LOCK = threading.Lock()
+
+# KEYS[1] = current window counter, KEYS[2] = previous window counter
+# ARGV[1] = limit, ARGV[2] = window_ms, ARGV[3] = elapsed_ms in current window
+_LUA_SLIDING_WINDOW = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local elapsed = tonumber(ARGV[3])
+local curr = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+if prev * (window - elapsed) / window + curr + 1 > limit then
+  return {0, prev, curr}
+end
+local n = redis.call('INCR', KEYS[1])
+if n == 1 then
+  redis.call('PEXPIRE', KEYS[1], window * 2)
+end
+return {1, prev, curr}
+"""
+
+
+@dataclass(frozen=True)
+class LimitDecision:
+    ok: bool
+    count: int  # estimated hits in the sliding window (including this one when allowed)
+    limit: int
+    retry_after_s: float = 0.0
+
+
+_ALLOW = LimitDecision(ok=True, count=0, limit=0)
+
+
+def parse_rate(rate: str | None) -> Tuple[int, int]:
+    """"10/min" -> (10, 60). Same grammar as DRF: s/sec, m/min, h/hour, d/day."""
+
+    if not rate:
+        return 0, 0
+    num, period = str(rate).split("/", 1)
+    secs = {"s": 1, "m": 60, "h": 3600, "d": 86400}[period.strip()[0]]
+    return int(num), secs
+
+
+def _estimate(prev: int, curr: int, window_ms: int, elapsed_ms: int) -> float:
+    return prev * (window_ms - elapsed_ms) / float(window_ms) + curr
+
+
+def _retry_after_s(prev: int, curr: int, limit: int, window_ms: int, elapsed_ms: int) -> float:
+    """Seconds until one more hit fits (the previous window keeps sliding out)."""
+
+    room = limit - 1 - curr
+    if room >= 0 and prev > 0:
+        # prev * (window - e) / window <= room  =>  e >= window * (1 - room / prev)
+        need = window_ms * (1.0 - room / float(prev))
+        return max(0.0, need - elapsed_ms) / 1000.0
+    # Current window alone is full: it becomes the previous window, then slides out.
+    wait = window_ms - elapsed_ms
+    if curr > 0 and limit > 1:
+        wait += window_ms * max(0.0, 1.0 - (limit - 1) / float(curr))
+    elif curr > 0:
+        wait += window_ms
+    return max(0.0, wait) / 1000.0
+
+
+def _decision(ok: bool, prev: int, curr: int, limit: int, window_ms: int, elapsed_ms: int) -> LimitDecision:
+    est = _estimate(prev, curr, window_ms, elapsed_ms)
+    if ok:
+        return LimitDecision(ok=True, count=int(est) + 1, limit=limit)
+    return LimitDecision(
+        ok=False,
+        count=int(est),
+        limit=limit,
+        retry_after_s=_retry_after_s(prev, curr, limit, window_ms, elapsed_ms),
+    )
+
+
+def _base_key(key: str) -> str:
+    k = str(key or "")
+    if len(k) > 160 or any(ord(c) < 33 or ord(c) > 126 for c in k):
+        k = "h:" + hashlib.sha256(k.encode("utf-8")).hexdigest()[:40]
+    return _KEY_PREFIX + k
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+_SCRIPT: Any = None  # redis Script (sha cached; EVALSHA with EVAL fallback)
+
+
+def _hit_redis(c: Any, base: str, limit: int, window_ms: int, now_ms: int) -> LimitDecision:
+    global _SCRIPT
+    win = now_ms // window_ms
+    elapsed = now_ms - win * window_ms
+    # Hash tag keeps both windows on one Redis Cluster slot.
+    k_curr = c.make_and_validate_key(f"{{{base}}}:{win}")
+    k_prev = c.make_and_validate_key(f"{{{base}}}:{win - 1}")
+    client = c._cache.get_client(k_curr, write=True)
+    if _SCRIPT is None:
+        _SCRIPT = client.register_script(_LUA_SLIDING_WINDOW)
+    ok, prev, curr = _SCRIPT(keys=[k_curr, k_prev], args=[limit, window_ms, elapsed], client=client)
+    return _decision(bool(int(ok)), int(prev), int(curr), limit, window_ms, elapsed)
+
+
+def _hit_local(c: Any, base: str, limit: int, window_ms: int, now_ms: int) -> LimitDecision:
+    win = now_ms // window_ms
+    elapsed = now_ms - win * window_ms
+    with _LOCAL_LOCK:
+        st = c.get(base)
+        prev = curr = 0
+        if isinstance(st, tuple) and len(st) == 3:
+            w, p, n = st
+            if w == win:
+                prev, curr = int(p), int(n)
+            elif w == win - 1:
+                prev = int(n)
+        ok = _estimate(prev, curr, window_ms, elapsed) + 1 <= limit
+        if ok:
+            c.set(base, (win, prev, curr + 1), timeout=int(2 * window_ms / 1000) + 1)
+    return _decision(ok, prev, curr, limit, window_ms, elapsed)
+
+
+def _hit_generic(c: Any, base: str, limit: int, window_ms: int, now_ms: int) -> LimitDecision:
+    win = now_ms // window_ms
+    elapsed = now_ms - win * window_ms
+    k_curr, k_prev = f"{base}:{win}", f"{base}:{win - 1}"
+    got = c.get_many([k_curr, k_prev])
+    prev, curr = int(got.get(k_prev) or 0), int(got.get(k_curr) or 0)
+    ok = _estimate(prev, curr, window_ms, elapsed) + 1 <= limit
+    if ok:
+        c.add(k_curr, 0, timeout=int(2 * window_ms / 1000) + 1)
+        c.incr(k_curr)
+    return _decision(ok, prev, curr, limit, window_ms, elapsed)
+
+
+def _backend(c: Any):
+    try:
+        from django.core.cache.backends.redis import RedisCache
+
+        if isinstance(c, RedisCache):
+            return _hit_redis
+    except Exception:
+        pass
+    try:
+        from django.core.cache.backends.locmem import LocMemCache
+
+        if isinstance(c, LocMemCache):
+            return _hit_local
+    except Exception:
+        pass
+    return _hit_generic
+
+
+def hit(key: str, *, limit: int, window_s: int, now: float | None = None) -> LimitDecision:
+    """Record one hit against `key` if it fits in `limit` per sliding `window_s`."""
+
+    limit, window_s = int(limit or 0), int(window_s or 0)
+    if limit <= 0 or window_s <= 0:
+        return _ALLOW
+    now_ms = int((time.time() if now is None else now) * 1000)
+    try:
+        from django.core.cache import caches
+
+        c = caches["default"]
+        return _backend(c)(c, _base_key(key), limit, window_s * 1000, now_ms)
+    except Exception:
+        return _ALLOW
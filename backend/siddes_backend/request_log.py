@@ -0,0 +1,365 @@
+"""Non-blocking structured request logging (behind ApiRequestLogMiddleware).
+
+The api_request line used to be serialized and written synchronously on the
+worker thread serving the request; when stdout backs up, every request waits
+on the pipe. Instead:
+
+- QueueLogHandler: the `siddes.api` logger enqueues records into a bounded
+  in-process queue; a background writer thread serializes and writes them.
+  When the queue is full, records are dropped (never blocking) and counted;
+  the writer reports drops as an `api_log_dropped` line.
+- JsonLine: payloads are logged as dicts and only turned into JSON when the
+  record is formatted (on the writer thread).
+- Sampling: per-path-prefix rates; errors and slow requests are always kept.
+- RequestTimings: per-request DB query count/time and cache hits/misses, so
+  the log stream doubles as latency instrumentation.
+
+Env:
+  SIDDES_API_LOG_ASYNC=1                 queue handler for siddes.api (settings.LOGGING)
+  SIDDES_API_LOG_QUEUE_SIZE=10000        bounded buffer (records)
+  SIDDES_API_LOG_SAMPLE=1.0              default sample rate
+  SIDDES_API_LOG_SAMPLE_PATHS=/api/feed=0.1,/api/notifications=0.05
+  SIDDES_API_LOG_SLOW_MS=1000            always log at/above this latency
+  SIDDES_API_LOG_TIMINGS=1               db/cache timing fields
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _truthy(v: str | None) -> bool:
+    return str(v or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def _int_env(name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        n = int(str(os.environ.get(name, default)).strip())
+    except Exception:
+        n = default
+    return max(lo, min(n, hi))
+
+
+def _rate(raw: object, default: float = 1.0) -> float:
+    try:
+        r = float(str(raw).strip())
+    except Exception:
+        return default
+    return max(0.0, min(r, 1.0))
+
+
+# ---------------------------------------------------------------------------
+# Queue handler
+# ---------------------------------------------------------------------------
+
+
+class JsonLine:
+    """A log message that serializes to compact JSON only when formatted."""
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        return json.dumps(self.payload, separators=(",", ":"), default=str)
+
+
+_IDLE: Any = object()
+
+
+class QueueLogHandler(logging.Handler):
+    """Bounded, drop-on-full queue in front of a stream handler.
+
+    The writer thread is started lazily and restarted after fork (gunicorn
+    workers), so a handler configured in the master keeps working in workers.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, report_secs: int = 10, stream: Any = None):
+        super().__init__()
+        cap = int(capacity) if capacity is not None else _int_env("SIDDES_API_LOG_QUEUE_SIZE", 10000, 100, 1_000_000)
+        self.capacity = max(1, cap)
+        self.report_secs = max(1, int(report_secs))
+        self.target = logging.StreamHandler(stream)
+        self.dropped = 0
+        self._reported = 0
+        self._queue: "queue.Queue[Optional[logging.LogRecord]]" = queue.Queue(self.capacity)
+        self._thread: Optional[threading.Thread] = None
+        self._pid = 0
+        self._start_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]) -> None:  # noqa: N802 (logging API)
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def _ensure_writer(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None:
+            return
+        with self._start_lock:
+            if self._pid == pid and self._thread is not None:
+                return
+            if self._pid != pid:
+                # Forked: the parent's queue may hold records the parent owns.
+                self._queue = queue.Queue(self.capacity)
+            t = threading.Thread(target=self._run, name="siddes-api-log", daemon=True)
+            self._thread = t
+            self._pid = pid
+            t.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._ensure_writer()
+            if record.exc_info:
+                # Tracebacks hold frames; render them here, not on the writer.
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # racy increments only under-count; never block
+        except Exception:
+            self.handleError(record)
+
+    def _report_drops(self) -> None:
+        n = self.dropped
+        if n == self._reported:
+            return
+        rec = logging.LogRecord(
+            "siddes.api", logging.WARNING, __file__, 0,
+            JsonLine({"event": "api_log_dropped", "dropped": n - self._reported, "dropped_total": n}), None, None,
+        )
+        self._reported = n
+        self._write(rec)
+
+    def _write(self, record: logging.LogRecord) -> None:
+        try:
+            self.target.handle(record)
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        q = self._queue
+        last_report = time.monotonic()
+        while True:
+            try:
+                rec = q.get(timeout=1.0)
+            except queue.Empty:
+                rec = _IDLE
+            if rec is None:
+                q.task_done()
+                break
+            if rec is not _IDLE:
+                self._write(rec)
+                q.task_done()
+            if time.monotonic() - last_report >= self.report_secs:
+                self._report_drops()
+                last_report = time.monotonic()
+        self._report_drops()
+
+    def flush(self, timeout: float = 2.0) -> None:
+        """Wait (bounded) until queued records are written."""
+
+        deadline = time.monotonic() + max(0.0, timeout)
+        while self._queue.unfinished_tasks and self._thread is not None and time.monotonic() < deadline:
+            time.sleep(0.005)
+        try:
+            self.target.flush()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        t = self._thread
+        if t is not None and t.is_alive() and self._pid == os.getpid():
+            try:
+                self._queue.put(None, timeout=1.0)
+                t.join(timeout=2.0)
+            except Exception:
+                pass
+        self._thread = None
+        super().close()
+
+
+# ---------------------------------------------------------------------------
+# Sampling
+# ---------------------------------------------------------------------------
+
+_SAMPLING: Optional[Tuple[str, float, Tuple[Tuple[str, float], ...], int]] = None
+
+
+def _sampling() -> Tuple[float, Tuple[Tuple[str, float], ...], int]:
+    """(default rate, longest-prefix-first rules, slow_ms); re-parsed when env changes."""
+
+    global _SAMPLING
+    raw = "|".join(
+        [
+            os.environ.get("SIDDES_API_LOG_SAMPLE", "1.0"),
+            os.environ.get("SIDDES_API_LOG_SAMPLE_PATHS", ""),
+            os.environ.get("SIDDES_API_LOG_SLOW_MS", "1000"),
+        ]
+    )
+    cur = _SAMPLING
+    if cur is not None and cur[0] == raw:
+        return cur[1], cur[2], cur[3]
+
+    default = _rate(os.environ.get("SIDDES_API_LOG_SAMPLE", "1.0"))
+    rules: List[Tuple[str, float]] = []
+    for part in str(os.environ.get("SIDDES_API_LOG_SAMPLE_PATHS", "") or "").split(","):
+        pref, sep, r = part.strip().partition("=")
+        if sep and pref.strip().startswith("/"):
+            rules.append((pref.strip(), _rate(r, default)))
+    rules.sort(key=lambda x: len(x[0]), reverse=True)
+    slow_ms = _int_env("SIDDES_API_LOG_SLOW_MS", 1000, 0, 600_000)
+    _SAMPLING = (raw, default, tuple(rules), slow_ms)
+    return default, tuple(rules), slow_ms
+
+
+def sample_rate_for(path: str, *, status: int = 200, latency_ms: int = 0) -> float:
+    """Sample rate for one request (1.0 for 5xx and slow requests)."""
+
+    default, rules, slow_ms = _sampling()
+    if status >= 500 or (slow_ms > 0 and latency_ms >= slow_ms):
+        return 1.0
+    for pref, r in rules:
+        if path.startswith(pref):
+            return r
+    return default
+
+
+def should_log(rate: float) -> bool:
+    return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+# ---------------------------------------------------------------------------
+# Per-request timings
+# ---------------------------------------------------------------------------
+
+
+class RequestTimings:
+    # Updated from every thread serving the request (run_db workers under ASGI).
+    __slots__ = ("db_queries", "db_ns", "cache_hits", "cache_misses", "_lock")
+
+    def __init__(self) -> None:
+        self.db_queries = 0
+        self.db_ns = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def add_query(self, ns: int) -> None:
+        with self._lock:
+            self.db_queries += 1
+            self.db_ns += ns
+
+    def add_cache(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+
+    def fields(self) -> Dict[str, Any]:
+        return {
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_ns / 1_000_000, 2),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+_TIMINGS: ContextVar[Optional[RequestTimings]] = ContextVar("siddes_request_timings", default=None)
+_MISS = object()
+
+
+def timings_enabled() -> bool:
+    return _truthy(os.environ.get("SIDDES_API_LOG_TIMINGS", "1"))
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _TIMINGS.get()
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    t = _TIMINGS.get()
+    if t is None:
+        return execute(sql, params, many, context)
+    t0 = time.perf_counter_ns()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        t.add_query(time.perf_counter_ns() - t0)
+
+
+def _instrument_cache(c: Any) -> None:
+    """Count hits/misses on a cache instance (once; pass-through outside a request)."""
+
+    if getattr(c, "_siddes_timed", False):
+        return
+    get, get_many = c.get, c.get_many
+
+    def timed_get(key, default=None, version=None):
+        t = _TIMINGS.get()
+        if t is None:
+            return get(key, default, version)
+        tok = _TIMINGS.set(None)  # LocMem get_many/incr call get(); count only the outer call
+        try:
+            v = get(key, _MISS, version)
+        finally:
+            _TIMINGS.reset(tok)
+        if v is _MISS:
+            t.add_cache(0, 1)
+            return default
+        t.add_cache(1, 0)
+        return v
+
+    def timed_get_many(keys, version=None):
+        t = _TIMINGS.get()
+        if t is None:
+            return get_many(keys, version)
+        tok = _TIMINGS.set(None)
+        try:
+            out = get_many(keys, version)
+        finally:
+            _TIMINGS.reset(tok)
+        n = len(keys) if hasattr(keys, "__len__") else len(out)
+        t.add_cache(len(out), max(0, n - len(out)))
+        return out
+
+    c.get, c.get_many = timed_get, timed_get_many
+    c._siddes_timed = True
+
+
+class timed_request:
+    """Context manager collecting RequestTimings for the current request.
+
+    DB queries are counted by `_db_wrapper`, installed on every connection
+    (siddes_backend.async_support.install_db_hooks), so queries run from
+    sync_to_async threads are included.
+    """
+
+    __slots__ = ("timings", "_token")
+
+    def __init__(self) -> None:
+        self.timings = RequestTimings()
+        self._token = None
+
+    def __enter__(self) -> RequestTimings:
+        self._token = _TIMINGS.set(self.timings)
+        try:
+            from django.core.cache import caches
+
+            _instrument_cache(caches["default"])
+        except Exception:
+            pass
+        return self.timings
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._token is not None:
+            _TIMINGS.reset(self._token)
@@ -144,12 +144,16 @@ MIDDLEWARE = [
     "django.contrib.sessions.middleware.SessionMiddleware",
     # Siddes middleware (order matters)
     "siddes_backend.middleware.RequestIdMiddleware",
+    "siddes_backend.middleware.IdentityScopeMiddleware",
     "siddes_backend.middleware.ApiRequestLogMiddleware",
     "siddes_backend.middleware.PanicModeMiddleware",
     "siddes_backend.middleware.DevCorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "siddes_backend.async_support.ResolveUserMiddleware",
+    "siddes_backend.profiling.ProfilerMiddleware",
+    "siddes_backend.db_router.ReplicaRoutingMiddleware",
     "siddes_auth.middleware.UserSessionCaptureMiddleware",
     'siddes_backend.middleware.DailyQuotaMiddleware',
     "siddes_backend.middleware.AccountStateMiddleware",
@@ -181,6 +185,11 @@ TEMPLATES = [
 WSGI_APPLICATION = "siddes_backend.wsgi.application"
 ASGI_APPLICATION = "siddes_backend.asgi.application"
 
+# Deployment profile: wsgi (gunicorn sync workers) or asgi (uvicorn workers).
+# Async read views are routed by default under asgi (siddes_backend/async_support.py).
+SIDDES_SERVER = "asgi" if _env("SIDDES_SERVER", "wsgi").strip().lower() == "asgi" else "wsgi"
+SIDDES_ASYNC_VIEWS = _truthy(_env("SIDDES_ASYNC_VIEWS", "1" if SIDDES_SERVER == "asgi" else "0"))
+
 # Database
 # Prefer DATABASE_URL (docker-compose), otherwise sqlite.
 try:
@@ -203,6 +212,44 @@ else:
         }
     }
 
+# Connection pooling (Postgres only): psycopg3 pool per worker process instead
+# of one persistent connection per thread. Django requires CONN_MAX_AGE=0 here.
+#   SIDDES_DB_POOL=1 SIDDES_DB_POOL_MIN_SIZE=2 SIDDES_DB_POOL_MAX_SIZE=10 SIDDES_DB_POOL_TIMEOUT=10
+SIDDES_DB_POOL = _truthy(os.environ.get("SIDDES_DB_POOL", "0"))
+
+
+def _db_pool_options() -> dict:
+    def _n(name: str, default: int) -> int:
+        try:
+            return max(0, int(os.environ.get(name, str(default)).strip()))
+        except Exception:
+            return default
+
+    return {
+        "min_size": _n("SIDDES_DB_POOL_MIN_SIZE", 2),
+        "max_size": max(1, _n("SIDDES_DB_POOL_MAX_SIZE", 10)),
+        "timeout": _n("SIDDES_DB_POOL_TIMEOUT", 10),
+    }
+
+
+# Read replicas: DATABASE_REPLICA_URLS=<url>[,<url>...] adds aliases replica1..N.
+# siddes_backend.db_router sends reads in GET/HEAD requests there (see
+# SIDDES_DB_STICKY_SECS for read-your-writes). Tests mirror replicas to default.
+SIDDES_DB_REPLICAS = []
+if dj_database_url is not None:
+    for _i, _url in enumerate([u.strip() for u in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if u.strip()], start=1):
+        _alias = f"replica{_i}"
+        DATABASES[_alias] = dj_database_url.parse(_url, conn_max_age=60)
+        DATABASES[_alias]["TEST"] = {"MIRROR": "default"}
+        SIDDES_DB_REPLICAS.append(_alias)
+
+for _alias, _db in DATABASES.items():
+    if SIDDES_DB_POOL and "postgresql" in str(_db.get("ENGINE", "")):
+        _db["CONN_MAX_AGE"] = 0
+        _db.setdefault("OPTIONS", {})["pool"] = _db_pool_options()
+
+DATABASE_ROUTERS = ["siddes_backend.db_router.ReplicaRouter"]
+
 # Cache (sd_255)
 REDIS_URL = os.environ.get("REDIS_URL", "").strip()
 if REDIS_URL:
@@ -220,6 +267,10 @@ else:
         }
     }
 
+# Edge Engine: the in-process "memory" queue backend is for tests only (nothing
+# drains it in a web process); tests enable it with override_settings.
+SIDDES_EDGE_ALLOW_MEMORY = False
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -236,6 +287,12 @@ STATIC_URL = "/static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Sessions: cached_db serves session reads from CACHES (Redis in prod) and only
+# writes through to the DB. Revocation deletes through the engine
+# (siddes_auth/session_cache.py), so cached copies go too.
+if _truthy(os.environ.get("SIDDES_SESSION_CACHED_DB", "0")):
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
 # Cookie samesite defaults (safe for local dev + prod)
 SESSION_COOKIE_SAMESITE = os.environ.get("DJANGO_SESSION_SAMESITE", "Lax")
 CSRF_COOKIE_SAMESITE = os.environ.get("DJANGO_CSRF_SAMESITE", "Lax")
@@ -302,6 +359,7 @@ REST_FRAMEWORK = {
 
         "auth_signup": _env("SIDDES_THROTTLE_AUTH_SIGNUP", "10/hour"),
         "auth_google": _env("SIDDES_THROTTLE_AUTH_GOOGLE", "30/min"),
+        "auth_username_set": _env("SIDDES_THROTTLE_AUTH_USERNAME_SET", "10/min"),
         "auth_magic_request": _env("SIDDES_THROTTLE_AUTH_MAGIC_REQUEST", "10/hour"),
         "auth_magic_ident": _env("SIDDES_THROTTLE_AUTH_MAGIC_IDENT", "10/hour"),
         "auth_magic_consume": _env("SIDDES_THROTTLE_AUTH_MAGIC_CONSUME", "30/min"),
@@ -377,13 +435,20 @@ REST_FRAMEWORK = {
 # Observability (sd_158)
 SD_LOG_LEVEL = os.environ.get("SD_LOG_LEVEL", "INFO").upper()
 
+# siddes.api request lines go through a bounded queue + writer thread so stdout
+# backpressure never blocks request threads (siddes_backend/request_log.py).
+SD_API_LOG_ASYNC = _truthy(os.environ.get("SIDDES_API_LOG_ASYNC", "1"))
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
-    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+        "api_queue": {"()": "siddes_backend.request_log.QueueLogHandler"},
+    },
     "loggers": {
         "siddes.api": {
-            "handlers": ["console"],
+            "handlers": ["api_queue" if SD_API_LOG_ASYNC else "console"],
             "level": SD_LOG_LEVEL,
             "propagate": False,
         },
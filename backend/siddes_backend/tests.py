@@ -0,0 +1,567 @@
+from __future__ import annotations
+
+import io
+import json
+import logging
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APITestCase
+
+
+class _BlockingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+    def write(self, s):
+        self.entered.set()
+        self.release.wait(5)
+        return super().write(s)
+
+
+class RequestLogQueueTests(APITestCase):
+    def test_full_queue_drops_without_blocking_and_reports(self):
+        from siddes_backend.request_log import JsonLine, QueueLogHandler
+
+        stream = _BlockingStream()
+        h = QueueLogHandler(capacity=1, stream=stream)
+        log = logging.getLogger("siddes.test.request_log")
+        log.propagate = False
+        log.addHandler(h)
+        try:
+            log.warning(JsonLine({"n": 0}))
+            assert stream.entered.wait(5)  # writer is stuck on the first line
+            for i in range(1, 5):
+                log.warning(JsonLine({"n": i}))  # one fits, the rest drop
+            assert h.dropped == 3
+            stream.release.set()
+            h.flush()
+        finally:
+            log.removeHandler(h)
+            h.close()
+
+        lines = [json.loads(x) for x in stream.getvalue().splitlines()]
+        assert [x.get("n") for x in lines[:2]] == [0, 1]
+        assert lines[-1] == {"event": "api_log_dropped", "dropped": 3, "dropped_total": 3}
+
+    def test_sampling_keeps_errors_and_slow_requests(self):
+        from siddes_backend.request_log import sample_rate_for
+
+        env = {"SIDDES_API_LOG_SAMPLE": "1", "SIDDES_API_LOG_SAMPLE_PATHS": "/api/feed=0,/api/feed/x=0.5", "SIDDES_API_LOG_SLOW_MS": "500"}
+        with mock.patch.dict("os.environ", env):
+            assert sample_rate_for("/api/feed") == 0.0
+            assert sample_rate_for("/api/feed/x/y") == 0.5
+            assert sample_rate_for("/api/inbox") == 1.0
+            assert sample_rate_for("/api/feed", status=502) == 1.0
+            assert sample_rate_for("/api/feed", latency_ms=900) == 1.0
+
+    @override_settings(DEBUG=True)
+    def test_request_line_carries_db_and_cache_timings(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        user = get_user_model().objects.create_user(username="rlog_a", email="rlog_a@example.com", password="pw")
+        self.client.force_login(user)
+        with self.assertLogs("siddes.api", level="INFO") as cm:
+            r = self.client.get("/api/auth/me")
+        assert r.status_code == 200
+        rows = [json.loads(rec.getMessage()) for rec in cm.records]
+        line = [x for x in rows if x.get("event") == "api_request" and x.get("path") == "/api/auth/me"][-1]
+        assert line["db_queries"] > 0 and line["db_ms"] >= 0
+        assert line["cache_hits"] + line["cache_misses"] > 0
+        assert "sample_rate" not in line
+
+        with mock.patch.dict("os.environ", {"SIDDES_API_LOG_SAMPLE_PATHS": "/api/auth/me=0"}):
+            with self.assertRaises(AssertionError):
+                with self.assertLogs("siddes.api", level="INFO"):
+                    self.client.get("/api/auth/me")
+
+
+class ProfilerTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    @override_settings(DEBUG=True)
+    def test_profiled_feed_returns_server_timing_and_json_trailer(self):
+        import time
+
+        from siddes_post.models import Post
+
+        Post.objects.create(id="p_prof_1", author_id="me_2", side="public", text="hello", created_at=time.time())
+        r = self.client.get("/api/feed?side=public", HTTP_X_SD_VIEWER="me_1", HTTP_X_SIDDES_PROFILE="json")
+        assert r.status_code == 200
+        st = r["Server-Timing"]
+        assert st.startswith("db;dur=") and "feed.fetch;dur=" in st and "app;dur=" in st
+        prof = r.json()["_profile"]
+        assert prof["db"]["queries"] >= 1
+        assert "feed.visibility" in prof["spans"]
+
+        r = self.client.get("/api/feed?side=public", HTTP_X_SD_VIEWER="me_1")
+        assert not r.has_header("Server-Timing") and "_profile" not in r.json()
+
+    def test_header_requires_staff_outside_debug(self):
+        User = get_user_model()
+        user = User.objects.create_user(username="prof_a", email="prof_a@example.com", password="pw")
+        self.client.force_login(user)
+        r = self.client.get("/api/auth/me", HTTP_X_SIDDES_PROFILE="1")
+        assert not r.has_header("Server-Timing")
+
+        user.is_staff = True
+        user.save(update_fields=["is_staff"])
+        r = self.client.get("/api/auth/me", HTTP_X_SIDDES_PROFILE="1")
+        assert "db;dur=" in r["Server-Timing"]
+
+    def test_repeated_statements_are_reported(self):
+        from django.core.cache import cache, caches
+        from django.db import connection
+
+        from siddes_backend.profiling import Profile, _PROFILE, _db_wrapper, _instrument_cache, span
+
+        connection.ensure_connection()
+        assert _db_wrapper in connection.execute_wrappers  # installed on every connection
+        prof = Profile()
+        token = _PROFILE.set(prof)
+        try:
+            _instrument_cache(caches["default"])
+            with span("loop"):
+                for i in range(3):
+                    get_user_model().objects.filter(id=i + 1000).first()
+            cache.set("prof:k", 1)
+            cache.get("prof:k")
+            cache.get("prof:missing")
+        finally:
+            _PROFILE.reset(token)
+
+        s = prof.summary()
+        assert s["db"]["queries"] == 3 and s["db"]["distinct"] == 1
+        assert s["db"]["duplicates"][0]["count"] == 3
+        assert s["spans"]["loop"]["count"] == 1
+        assert s["cache"]["hits"] == 1 and s["cache"]["misses"] == 1
+
+
+class ReplicaRouterTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_router_reads_replica_until_the_request_writes(self):
+        from django.db import connections
+
+        from siddes_backend.db_router import _STATE, ReplicaRouter, _RouteState
+
+        router = ReplicaRouter()
+        assert router.db_for_read(None) is None  # outside a routed request
+
+        token = _STATE.set(_RouteState("replica1"))
+        try:
+            # The test case itself runs in a transaction; toggle it explicitly.
+            with mock.patch.object(connections["default"], "in_atomic_block", False):
+                assert router.db_for_read(None) == "replica1"
+            assert router.db_for_read(None) is None  # inside a transaction
+            with mock.patch.object(connections["default"], "in_atomic_block", False):
+                assert router.db_for_write(None) is None
+                assert router.db_for_read(None) is None  # read-your-writes within the request
+        finally:
+            _STATE.reset(token)
+        assert router.allow_migrate("default", "siddes_post") is None
+
+    def test_replica_reads_right_after_a_bump_do_not_fill_versioned_caches(self):
+        import time
+
+        from django.db import connections
+
+        from siddes_backend.cache_versions import bump_versions, fill_ttl, get_version
+        from siddes_backend.db_router import _STATE, ReplicaRouter, _RouteState
+
+        bump_versions(["t:rr:ver"])
+        assert fill_ttl(60) == 60  # not a routed request
+
+        token = _STATE.set(_RouteState("replica1"))
+        try:
+            get_version("t:rr:ver")
+            assert fill_ttl(60) == 60  # no replica read yet
+            with mock.patch.object(connections["default"], "in_atomic_block", False):
+                assert ReplicaRouter().db_for_read(None) == "replica1"
+            assert fill_ttl(60) == 0
+        finally:
+            _STATE.reset(token)
+
+        token = _STATE.set(_RouteState("replica1"))
+        try:
+            with mock.patch.object(connections["default"], "in_atomic_block", False):
+                ReplicaRouter().db_for_read(None)
+            with mock.patch("siddes_backend.cache_versions.time.time", return_value=time.time() + 60):
+                get_version("t:rr:ver")  # past the lag window
+            assert fill_ttl(60) == 60
+        finally:
+            _STATE.reset(token)
+
+    def test_writes_make_the_client_sticky(self):
+        from django.test import RequestFactory
+
+        from siddes_backend.db_router import STICKY_COOKIE, _is_sticky
+
+        user = get_user_model().objects.create_user(username="rr_a", email="rr_a@example.com", password="pw")
+        self.client.force_login(user)
+        self.client.get("/api/auth/me")  # first sight records the device session
+        with mock.patch("siddes_backend.db_router.replica_aliases", return_value=["default"]):
+            r = self.client.get("/api/auth/me")
+            assert r.status_code == 200 and STICKY_COOKIE not in r.cookies
+            r = self.client.post("/api/auth/username/set", {"username": "rr_renamed"}, format="json")
+            assert r.status_code == 200 and STICKY_COOKIE in r.cookies
+
+        req = RequestFactory().get("/api/feed")
+        req.COOKIES[STICKY_COOKIE] = r.cookies[STICKY_COOKIE].value
+        assert _is_sticky(req)
+
+        other = RequestFactory().get("/api/feed")
+        other.user = user  # another device of the same user: cache flag
+        assert _is_sticky(other)
+        other.user = get_user_model().objects.create_user(username="rr_b", email="rr_b@example.com", password="pw")
+        assert not _is_sticky(other)
+
+
+class CacheVersionTests(APITestCase):
+    def test_evicting_a_version_key_never_revives_an_older_version(self):
+        from django.core.cache import cache
+
+        from siddes_backend.cache_versions import bump_versions, get_version
+
+        cache.clear()
+        seen = [get_version("t:ver")]
+        assert get_version("t:ver") == seen[0]
+        bump_versions(["t:ver"])
+        seen.append(get_version("t:ver"))
+        cache.delete("t:ver")  # evicted
+        seen.append(get_version("t:ver"))
+        assert len(set(seen)) == 3
+
+
+class RateLimitEngineTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_sliding_window_on_each_backend(self):
+        from django.core.cache import caches
+
+        from siddes_backend.ratelimit import _base_key, _hit_generic, _hit_local
+
+        c = caches["default"]
+        for fn in (_hit_local, _hit_generic):
+            base = _base_key(f"t:{fn.__name__}")
+            t0 = 1_000_000 * 60_000  # start of a window (ms)
+            assert [fn(c, base, 3, 60_000, t0 + i).ok for i in range(4)] == [True, True, True, False]
+            denied = fn(c, base, 3, 60_000, t0 + 10)
+            assert not denied.ok and denied.retry_after_s > 60  # full window must slide out first
+
+            # Half-way through the next window, half of the previous one still counts.
+            assert fn(c, base, 3, 60_000, t0 + 90_000).ok  # 3 * 0.5 + 0 + 1 <= 3
+            assert not fn(c, base, 3, 60_000, t0 + 90_001).ok
+            assert fn(c, base, 3, 60_000, t0 + 180_000).ok  # previous window fully gone
+
+    def test_scoped_throttle_honours_explicit_scope(self):
+        from rest_framework.test import APIRequestFactory
+
+        from siddes_backend.throttles import SiddesScopedRateThrottle
+
+        class _View:
+            throttle_scope = "view_scope"
+
+        req = APIRequestFactory().delete("/api/post/p1")
+        req.user = None
+        results = []
+        for _ in range(3):
+            t = SiddesScopedRateThrottle()
+            t.THROTTLE_RATES = {"post_delete": "2/min"}
+            t.scope = "post_delete"
+            results.append(t.allow_request(req, _View()))
+        assert results == [True, True, False]
+        assert t.wait() and t.wait() > 0
+
+    def test_pair_limits_deny_with_retry_hint(self):
+        from siddes_backend.abuse_limits import enforce_pair_limits
+
+        res = [enforce_pair_limits(scope="dm", actor_id="me_1", target_token="me_2", per_minute=2) for _ in range(3)]
+        assert [r.ok for r in res] == [True, True, False]
+        assert res[-1].retry_after_ms >= 250
+        assert enforce_pair_limits(scope="dm", actor_id="me_1", target_token="me_3", per_minute=2).ok
+
+
+class AsyncViewTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def _async_get(self, view_cls, path):
+        from asgiref.sync import async_to_sync
+        from django.contrib.auth.models import AnonymousUser
+        from django.test import RequestFactory
+
+        req = RequestFactory().get(path, HTTP_X_SD_VIEWER="me_1")
+        req.user = AnonymousUser()
+        return async_to_sync(view_cls.as_view())(req)
+
+    @override_settings(DEBUG=True)
+    def test_async_read_views_match_sync_views(self):
+        import time
+
+        from siddes_feed.views import FeedAsyncView
+        from siddes_notifications.models import Notification
+        from siddes_notifications.views import NotificationsListAsyncView
+        from siddes_post.models import Post
+
+        now = time.time()
+        for i in range(3):
+            Post.objects.create(id=f"p_async_{i}", author_id="me_2", side="public", text=f"hello {i}", created_at=now - i)
+        Notification.objects.create(id="n_async_1", viewer_id="me_1", side="public", type="reply", actor="@me_2", glimpse="hi", created_at=now)
+
+        # Queries stay on the test transaction's connection (no worker-thread connections).
+        with mock.patch.dict("os.environ", {"SIDDES_ASYNC_PARALLEL_DB": "0", "SIDDES_FEED_CACHE_ENABLED": "0"}):
+            for view_cls, path in ((FeedAsyncView, "/api/feed?side=public"), (NotificationsListAsyncView, "/api/notifications")):
+                r_async = self._async_get(view_cls, path)
+                r_sync = self.client.get(path, HTTP_X_SD_VIEWER="me_1")
+                assert r_async.status_code == r_sync.status_code == 200
+                a, s = json.loads(r_async.content), r_sync.json()
+                assert a["count"] == s["count"] > 0
+                assert [x["id"] for x in a["items"]] == [x["id"] for x in s["items"]]
+
+    def test_hybrid_middleware_follows_the_handler_mode(self):
+        from asgiref.sync import async_to_sync, iscoroutinefunction
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from siddes_backend.middleware import RequestIdMiddleware
+
+        async def aview(request):
+            return HttpResponse("ok")
+
+        mw = RequestIdMiddleware(aview)
+        assert mw.is_async and iscoroutinefunction(mw)
+        r = async_to_sync(mw)(RequestFactory().get("/api/feed"))
+        assert r["X-Request-ID"]
+
+        mw = RequestIdMiddleware(lambda request: HttpResponse("ok"))
+        assert not mw.is_async and not iscoroutinefunction(mw)
+        assert mw(RequestFactory().get("/api/feed"))["X-Request-ID"]
+
+
+class AsyncParallelDbTests(TransactionTestCase):
+    """run_db on worker threads (the ASGI default): rows must be committed to be visible."""
+
+    def setUp(self):
+        import time
+
+        from django.core.cache import cache
+
+        from siddes_notifications.models import Notification
+        from siddes_post.models import Post
+
+        cache.clear()
+        now = time.time()
+        for i in range(4):
+            Post.objects.create(id=f"p_par_{i}", author_id="me_2", side="public", text=f"hello {i}", created_at=now - i)
+        Notification.objects.create(id="n_par_1", viewer_id="me_1", side="public", type="reply", actor="@me_2", glimpse="hi", created_at=now)
+
+    @override_settings(DEBUG=True)
+    def test_parallel_db_views_match_sync_views(self):
+        from asgiref.sync import async_to_sync
+        from django.contrib.auth.models import AnonymousUser
+        from django.test import RequestFactory
+
+        from siddes_feed.views import FeedAsyncView
+        from siddes_notifications.views import NotificationsListAsyncView
+
+        with mock.patch.dict("os.environ", {"SIDDES_ASYNC_PARALLEL_DB": "1", "SIDDES_FEED_CACHE_ENABLED": "0"}):
+            for view_cls, path in ((FeedAsyncView, "/api/feed?side=public"), (NotificationsListAsyncView, "/api/notifications")):
+                req = RequestFactory().get(path, HTTP_X_SD_VIEWER="me_1")
+                req.user = AnonymousUser()
+                r_async = async_to_sync(view_cls.as_view())(req)
+                r_sync = self.client.get(path, HTTP_X_SD_VIEWER="me_1")
+                assert r_async.status_code == r_sync.status_code == 200
+                a, s = json.loads(r_async.content), r_sync.json()
+                assert a["count"] == s["count"] > 0
+                assert [x["id"] for x in a["items"]] == [x["id"] for x in s["items"]]
+
+    def test_worker_thread_queries_land_in_the_request_counters(self):
+        from asgiref.sync import async_to_sync
+
+        from siddes_backend.profiling import _PROFILE, Profile
+        from siddes_backend.request_log import timed_request
+        from siddes_feed.feed_stub import alist_feed
+
+        def measure(fn):
+            prof = Profile()
+            tok = _PROFILE.set(prof)
+            try:
+                with timed_request() as t:
+                    page = fn()
+            finally:
+                _PROFILE.reset(tok)
+            return page, t, prof
+
+        # Same code path with and without worker threads: every query is counted either way.
+        runs = {}
+        for flag in ("0", "1", "0"):  # first run warms per-process caches
+            with mock.patch.dict("os.environ", {"SIDDES_ASYNC_PARALLEL_DB": flag}):
+                runs[flag] = measure(lambda: async_to_sync(alist_feed)("me_1", "public", limit=10))
+        (a, ta, pa), (s, ts, _) = runs["1"], runs["0"]
+
+        assert [x["id"] for x in a["items"]] == [x["id"] for x in s["items"]]
+        assert ta.db_queries == ts.db_queries > 0, (ta.fields(), ts.fields())
+        assert sum(c for c, _ in pa.queries.values()) == ta.db_queries
+        assert (ta.cache_hits + ta.cache_misses) == (ts.cache_hits + ts.cache_misses) > 0
+
+    def test_counters_are_consistent_under_concurrent_updates(self):
+        import threading
+
+        from siddes_backend.profiling import Profile
+        from siddes_backend.request_log import RequestTimings
+
+        t, p = RequestTimings(), Profile()
+
+        def hammer():
+            for _ in range(2000):
+                t.add_query(1)
+                t.add_cache(1, 1)
+                p.note_query("select 1", 1)
+                p.note_cache("get", 1, hits=1)
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        assert (t.db_queries, t.db_ns, t.cache_hits, t.cache_misses) == (16000, 16000, 16000, 16000)
+        assert p.queries["select 1"] == [16000, 16000] and p.cache_hits == 16000
+
+
+@override_settings(SIDDES_EDGE_ALLOW_MEMORY=True)
+class EdgeEngineTests(APITestCase):
+    def _worker(self, backend, handlers, **kw):
+        from siddes_backend.edge_worker import EdgeWorker
+
+        return EdgeWorker(handlers, backend=backend, schedule=[], log=lambda m: None, **kw)
+
+    def test_memory_backend_needs_the_explicit_setting(self):
+        from siddes_backend import edge_queue
+
+        with mock.patch.dict("os.environ", {"SIDDES_EDGE_BACKEND": "memory", "REDIS_URL": "", "SIDDES_EDGE_ENGINE_ENABLED": ""}):
+            assert edge_queue.backend_name() == "memory"
+            with override_settings(SIDDES_EDGE_ALLOW_MEMORY=False):
+                # runserver/gunicorn: nothing would drain the deque, so callers run inline.
+                assert edge_queue.backend_name() == "redis"
+                assert not edge_queue.is_enabled() and not edge_queue.worker_declared()
+                assert edge_queue.enqueue("post_created", {"post_id": "p1"}) is False
+
+    def test_failed_jobs_retry_with_backoff_then_dead_letter(self):
+        from siddes_backend.edge_queue import MemoryBackend, make_job
+
+        b = MemoryBackend()
+        calls = []
+
+        def flaky(payload):
+            calls.append(payload["n"])
+            if len(calls) < 2:
+                raise RuntimeError("upstream down")
+
+        def broken(payload):
+            raise ValueError("bad payload")
+
+        w = self._worker(b, {"flaky": flaky, "broken": broken})
+        b.push(make_job("flaky", {"n": 1}))
+        b.push(make_job("broken", {}, attempts_max=2))
+        b.push(make_job("nope", {}))
+        with mock.patch.dict("os.environ", {"SIDDES_EDGE_RETRY_BASE_SECS": "0"}):
+            for _ in range(6):
+                w.tick(block_s=0.01)
+                assert w.wait_idle(5)
+
+        assert calls == [1, 1]
+        dead = [b.pop_dead(), b.pop_dead(), b.pop_dead()]  # oldest first
+        assert [d and d["type"] for d in dead] == ["nope", "broken", None]
+        assert dead[1]["attempts"] == 2 and dead[1]["last_error"] == "ValueError: bad payload"
+        s = b.stats()
+        assert s["types"]["flaky"]["retried"] == 1 and s["types"]["flaky"]["succeeded"] == 1
+        assert s["types"]["broken"]["dead"] == 1
+
+    def test_priority_delay_and_visibility_timeout(self):
+        import time
+
+        from siddes_backend.edge_queue import MemoryBackend, make_job
+
+        b = MemoryBackend()
+        b.push(make_job("a", {"n": 1}))
+        b.push(make_job("a", {"n": 2}, priority="high"))
+        b.push(make_job("a", {"n": 3}), at=time.time() + 60)
+        got = b.reserve("c1", 5, 0, visibility_s=0.05)
+        assert [r.job["payload"]["n"] for r in got] == [2, 1]  # high lane first, delayed job waits
+        assert b.stats()["delayed"] == 1 and b.promote_due(time.time() + 61) == 1
+
+        b.ack(got[0].receipt)
+        time.sleep(0.06)  # c1 "crashed" holding job 1
+        again = b.reserve("c2", 5, 0, visibility_s=30)
+        assert [(r.job["payload"]["n"], r.reclaimed) for r in again] == [(1, True), (3, False)]
+
+        # A reclaimed job counts as a failed attempt; touching keeps a running job invisible.
+        w = self._worker(b, {"a": lambda p: None})
+        with mock.patch.dict("os.environ", {"SIDDES_EDGE_RETRY_BASE_SECS": "30"}):
+            w._dispatch([again[0]])
+        assert b.stats()["delayed"] == 1
+        b.touch("c2", [again[1].receipt], 30)
+        assert b.reserve("c3", 5, 0, visibility_s=30) == []
+
+    def test_command_drains_enqueued_jobs_per_type_pool(self):
+        import threading
+
+        from django.core.management import call_command
+
+        from siddes_backend import edge_queue
+        from siddes_backend.management.commands import edge_engine
+
+        seen = []
+        lock = threading.Lock()
+
+        def handler(payload):
+            with lock:
+                seen.append((payload["n"], threading.current_thread().name))
+
+        env = {"SIDDES_EDGE_BACKEND": "memory", "SIDDES_EDGE_CONCURRENCY": "t_fast=3", "SIDDES_EDGE_STATS_EVERY_SECS": "0"}
+        with mock.patch.dict("os.environ", env), mock.patch.dict(edge_engine.HANDLERS, {"t_fast": handler}, clear=True):
+            edge_queue.get_backend().clear()
+            for n in range(5):
+                assert edge_queue.enqueue("t_fast", {"n": n})
+            out = io.StringIO()
+            with mock.patch("sys.stdout", out):
+                call_command("edge_engine", "--drain", "--brpop-timeout", "1")
+                call_command("edge_engine", "--stats")
+
+        assert sorted(n for n, _ in seen) == [0, 1, 2, 3, 4]
+        assert all(name.startswith("edge-t_fast") for _, name in seen)
+        stats = json.loads(out.getvalue()[out.getvalue().index("{"):])
+        assert stats["types"]["t_fast"]["enqueued"] == 5 and stats["types"]["t_fast"]["succeeded"] == 5
+        assert stats["lanes"]["normal"] == {"depth": 0, "inflight": 0, "oldest_age_s": 0.0}
+
+    def test_batch_handlers_receive_ready_jobs_together(self):
+        from siddes_backend.edge_queue import MemoryBackend, make_job
+
+        b = MemoryBackend()
+        calls = []
+        w = self._worker(b, {}, batch_handlers={"ev": lambda rows: calls.append([r["n"] for r in rows])}, batch_size=3, default_threads=1)
+        for n in range(5):
+            b.push(make_job("ev", {"n": n}))
+        assert w.tick(block_s=0.01) == 3  # one free slot = one batch
+        assert w.wait_idle(5)
+        assert w.tick(block_s=0.01) == 2
+        assert w.wait_idle(5)
+        assert calls == [[0, 1, 2], [3, 4]]
+        assert b.stats()["types"]["ev"]["batches"] == 2
@@ -3,6 +3,9 @@
 Why a custom throttle?
 - In DEV, we authenticate requests as a lightweight `SiddesViewer` object (not a Django model).
 - DRF's built-in throttles assume `request.user.pk` exists for authenticated users.
+- DRF stores a timestamp history list per key and rewrites it on every request;
+  these throttles count through the shared rate-limit engine instead
+  (siddes_backend/ratelimit.py: sliding window, one atomic Redis call).
 
 This custom scoped throttle supports both:
 - Real Django users (uses `user.pk`)
@@ -17,9 +20,43 @@ from __future__ import annotations
 
 from rest_framework.throttling import ScopedRateThrottle
 
+from .ratelimit import LimitDecision, hit
+
 
 class SiddesScopedRateThrottle(ScopedRateThrottle):
-    """Scoped throttle that supports SiddesViewer identities in dev."""
+    """Scoped throttle that supports SiddesViewer identities in dev.
+
+    Scope: `get_scope(view)` (an explicitly assigned instance scope, e.g.
+    method-scoped throttles, wins over `view.throttle_scope`).
+    """
+
+    decision: LimitDecision | None = None
+
+    def get_scope(self, view):
+        return self.__dict__.get("scope") or getattr(view, self.scope_attr, None)
+
+    def allow_request(self, request, view):  # type: ignore[override]
+        self.scope = self.get_scope(view)
+        if not self.scope:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.decision = hit(self.key, limit=self.num_requests, window_s=self.duration)
+        return self.decision.ok
+
+    def wait(self):  # type: ignore[override]
+        d = self.decision
+        if d is None or d.ok:
+            return None
+        return d.retry_after_s
 
     def get_cache_key(self, request, view):  # type: ignore[override]
         # For authenticated requests, prefer a stable user identifier.
@@ -37,7 +74,7 @@ class SiddesScopedRateThrottle(ScopedRateThrottle):
         return self.cache_format % {"scope": self.scope, "ident": ident}
 
 
-class SiddesLoginIdentifierThrottle(ScopedRateThrottle):
+class SiddesLoginIdentifierThrottle(SiddesScopedRateThrottle):
     """Per-identifier login throttling (credential-stuffing defense).
 
     Why:
@@ -82,7 +119,7 @@ class SiddesLoginIdentifierThrottle(ScopedRateThrottle):
 
 
 
-class _SiddesHashedFieldThrottle(ScopedRateThrottle):
+class _SiddesHashedFieldThrottle(SiddesScopedRateThrottle):
     """Generic per-field throttling keyed by a hashed identifier.
 
     Used for email-based flows (reset/magic) to defend against distributed abuse
@@ -5,12 +5,13 @@ from __future__ import annotations
 from django.contrib import admin
 from django.urls import include, path
 
-from siddes_media.views import MediaRedirectView
+from siddes_media.views import MediaRedirectAsyncView, MediaRedirectView
 
+from .async_support import async_views_enabled
 from .views import healthz, readyz
 
 urlpatterns = [
-    path("m/<path:key>", MediaRedirectView.as_view()),
+    path("m/<path:key>", (MediaRedirectAsyncView if async_views_enabled() else MediaRedirectView).as_view()),
 
     path("healthz", healthz),
     path("readyz", readyz),
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from siddes_broadcasts.models import Broadcast
+from siddes_broadcasts.store_db import STORE
+
+
+class Command(BaseCommand):
+    help = "Seed the dev starter broadcasts when the table is empty (DEBUG only unless --force)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Seed even when DEBUG is off.")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would happen without writing.")
+
+    def handle(self, *args, **opts):
+        force = bool(opts.get("force"))
+
+        if Broadcast.objects.all()[:1].exists():
+            self.stdout.write(self.style.WARNING("Broadcasts already present; nothing to seed."))
+            return
+        if opts.get("dry_run"):
+            self.stdout.write(self.style.WARNING("Would seed the starter broadcasts."))
+            return
+
+        created = STORE.ensure_seed(force=force)
+        if not created:
+            self.stdout.write(self.style.WARNING("Skipped: DEBUG is off (pass --force to seed anyway)."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Seeded {created} broadcast(s)."))
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Lower, Substr
+
+
+def backfill_name_key(apps, schema_editor):
+    Broadcast = apps.get_model("siddes_broadcasts", "Broadcast")
+    Broadcast.objects.update(name_key=Lower(Substr("name", 1, 255)))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_broadcasts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="broadcast",
+            name="name_key",
+            field=models.CharField(db_index=True, default="", max_length=255),
+        ),
+        migrations.RunPython(backfill_name_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="broadcast",
+            index=models.Index(
+                F("subscriber_count").desc(),
+                Coalesce("last_post_at", Value(0.0)).desc(),
+                F("id").asc(),
+                name="bc_discover_rank",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="broadcast",
+            name="bc_subs_last",
+        ),
+    ]
@@ -11,6 +11,14 @@ Design rules:
 from __future__ import annotations
 
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+
+def name_key(name: object) -> str:
+    """Search key for Broadcast.name (indexed prefix search)."""
+
+    return str(name or "").strip().lower()[:255]
 
 
 class BroadcastRole(models.TextChoices):
@@ -32,6 +40,8 @@ class Broadcast(models.Model):
     owner_id = models.CharField(max_length=64, db_index=True)
 
     name = models.CharField(max_length=255)
+    # Lowercased name for indexed prefix search (kept in sync by save()).
+    name_key = models.CharField(max_length=255, default="", db_index=True)
     handle = models.CharField(max_length=64, unique=True, db_index=True)
     category = models.CharField(max_length=64, default="")
     desc = models.TextField(default="")
@@ -48,10 +58,25 @@ class Broadcast(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["subscriber_count", "last_post_at"], name="bc_subs_last"),
+            # Discover ranking + keyset cursor: (-subscriber_count, -coalesce(last_post_at, 0), id)
+            models.Index(
+                F("subscriber_count").desc(),
+                Coalesce("last_post_at", Value(0.0)).desc(),
+                F("id").asc(),
+                name="bc_discover_rank",
+            ),
             models.Index(fields=["last_post_at"], name="bc_last_post"),
         ]
 
+    def save(self, *args, **kwargs):
+        # Every write path (store, admin, shell) keeps name_key in sync.
+        # QuerySet.update(name=...) bypasses this: set name_key there too.
+        self.name_key = name_key(self.name)
+        fields = kwargs.get("update_fields")
+        if fields is not None and "name" in fields and "name_key" not in fields:
+            kwargs["update_fields"] = [*fields, "name_key"]
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:  # pragma: no cover
         return f"Broadcast({self.id}, {self.handle})"
 
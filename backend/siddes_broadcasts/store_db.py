@@ -12,20 +12,32 @@ STARTER_BROADCASTS = [
 """DB-backed Broadcasts store.
 
 This store produces small JSON shapes that the Next UI can consume directly.
+
+Query shape:
+- list pages resolve the viewer's memberships for the whole page in one query
+  (`members_for`), never per item
+- listings are ranked by the counters kept on Broadcast (subscriber_count,
+  last_post_at) and paged with a keyset cursor over the bc_discover_rank index
+- search is a prefix match on indexed columns (handle, name_key)
+- the follow feed k-way merges per-broadcast timelines with a
+  "<created_at>|<id>" cursor; unread dots are one SQL comparison
+- dev seeding lives in `manage.py seed_broadcasts`, not on the request path
 """
 
 
+import heapq
 import time
 import uuid
 from typing import Any, Dict, List, Optional, Tuple
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
 
 from siddes_post.models import Post
 
-from .models import Broadcast, BroadcastMember, BroadcastRole, NotifyMode
+from .models import Broadcast, BroadcastMember, BroadcastRole, NotifyMode, name_key
 
 
 def now_s() -> float:
@@ -62,17 +74,32 @@ def rel_label(ts_s: Optional[float]) -> str:
     return f"{int(d // 86400)}d"
 
 
-def _member_for(viewer_id: str, b: Broadcast) -> Optional[BroadcastMember]:
-    if not viewer_id:
-        return None
+_LOOKUP = object()
+
+
+def members_for(viewer_id: str, broadcast_ids: List[str]) -> Dict[str, BroadcastMember]:
+    """Viewer memberships for a page of broadcasts (one query)."""
+
+    ids = [str(x) for x in broadcast_ids if x]
+    if not viewer_id or not ids:
+        return {}
     try:
-        return BroadcastMember.objects.filter(broadcast=b, viewer_id=str(viewer_id)).first()
+        rows = BroadcastMember.objects.filter(viewer_id=str(viewer_id), broadcast_id__in=ids)
+        return {str(m.broadcast_id): m for m in rows}
     except Exception:
-        return None
+        return {}
 
 
-def broadcast_to_item(b: Broadcast, *, viewer_id: str) -> Dict[str, Any]:
-    m = _member_for(viewer_id, b)
+def broadcast_to_item(b: Broadcast, *, viewer_id: str, member: Any = _LOOKUP) -> Dict[str, Any]:
+    """Serialize a broadcast for a viewer.
+
+    Pass `member` (a BroadcastMember or None) when the caller already resolved
+    it; otherwise it is looked up here (single-item paths only).
+    """
+
+    if member is _LOOKUP:
+        member = members_for(viewer_id, [b.id]).get(str(b.id))
+    m: Optional[BroadcastMember] = member
 
     last_post_at = float(b.last_post_at) if b.last_post_at else None
     last_seen = float(m.last_seen_at) if m else 0.0
@@ -96,14 +123,54 @@ def broadcast_to_item(b: Broadcast, *, viewer_id: str) -> Dict[str, Any]:
     }
 
 
-def _seed_if_empty() -> None:
-    if not getattr(settings, "DEBUG", False):
-        return
+_RANK_ORDER = (F("subscriber_count").desc(), F("rank_last").desc(), F("id").asc())
+
+
+def _ranked(qs):
+    """Annotate the bc_discover_rank expression (never-posted broadcasts rank as 0)."""
+
+    return qs.annotate(rank_last=Coalesce("last_post_at", Value(0.0)))
+
+
+def encode_rank_cursor(b: Broadcast) -> str:
+    """Opaque keyset cursor: "<subscriber_count>|<last_post_at or 0>|<id>"."""
+
+    return f"{int(b.subscriber_count or 0)}|{float(b.last_post_at or 0.0)!r}|{b.id}"
+
+
+def decode_rank_cursor(raw: Any) -> Optional[Tuple[int, float, str]]:
     try:
-        if Broadcast.objects.all()[:1].exists():
-            return
+        subs_s, last_s, bid = str(raw or "").split("|", 2)
+        subs = int(subs_s)
+        last = float(last_s)
     except Exception:
-        return
+        return None
+    if not bid:
+        return None
+    return subs, last, bid
+
+
+def _after_rank_cursor(cur: Tuple[int, float, str]) -> Q:
+    """Rows strictly after `cur` in _RANK_ORDER (needs the `rank_last` annotation)."""
+
+    subs, last, bid = cur
+    return (
+        Q(subscriber_count__lt=subs)
+        | Q(subscriber_count=subs, rank_last__lt=last)
+        | Q(subscriber_count=subs, rank_last=last, id__gt=bid)
+    )
+
+
+def _seed_if_empty(*, force: bool = False) -> int:
+    """Create the dev starter broadcasts when the table is empty. Returns rows created.
+
+    Called by `manage.py seed_broadcasts` (never from request handlers).
+    """
+
+    if not force and not getattr(settings, "DEBUG", False):
+        return 0
+    if Broadcast.objects.all()[:1].exists():
+        return 0
 
     owner = "me"
 
@@ -137,6 +204,7 @@ def _seed_if_empty() -> None:
                 id=new_id("b"),
                 owner_id=owner,
                 name=s["name"],
+                name_key=name_key(s["name"]),
                 handle=normalize_handle(s["handle"]),
                 category=s.get("category") or "",
                 desc=s.get("desc") or "",
@@ -152,7 +220,7 @@ def _seed_if_empty() -> None:
                 muted=False,
                 last_seen_at=0.0,
             )
-
+    return len(seeds)
 
 
 def _display_author(author_id: str) -> tuple[str, str]:
@@ -168,18 +236,72 @@ def _display_author(author_id: str) -> tuple[str, str]:
     except Exception:
         return (a, '@' + a.lstrip('@'))
 
-class DbBroadcastsStore:
-    def ensure_seed(self) -> None:
-        _seed_if_empty()
+_FEED_BATCH = 16
 
-    def list(self, *, viewer_id: str, tab: str, q: str | None = None, category: str | None = None, limit: int = 50) -> List[Dict[str, Any]]:
-        self.ensure_seed()
+
+def encode_post_cursor(rec: Post) -> str:
+    """Opaque feed cursor (same shape as the main feed): "<created_at>|<id>"."""
+
+    return f"{float(rec.created_at)!r}|{rec.id}"
+
+
+def decode_post_cursor(raw: Any) -> Optional[Tuple[float, str]]:
+    try:
+        ts_s, pid = str(raw or "").split("|", 1)
+        return float(ts_s), str(pid)
+    except Exception:
+        return None
+
+
+def _before_post_cursor(cur: Tuple[float, str]) -> Q:
+    ts, pid = cur
+    if not pid:
+        return Q(created_at__lt=ts)
+    return Q(created_at__lt=ts) | Q(created_at=ts, id__lt=pid)
+
+
+def _post_sort_key(rec: Post) -> Tuple[float, str]:
+    return (float(rec.created_at), str(rec.id))
+
+
+def _post_item(rec: Post, broadcast: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    author_id = str(getattr(rec, "author_id", "") or "")
+    name, handle = _display_author(author_id)
+    return {
+        "id": rec.id,
+        "author": name,
+        "handle": handle,
+        "time": "now",
+        "content": rec.text,
+        "kind": "text",
+        "setId": rec.set_id,
+        "broadcast": broadcast,
+        "createdAt": int(float(rec.created_at) * 1000),
+    }
+
+
+class DbBroadcastsStore:
+    def ensure_seed(self, *, force: bool = False) -> int:
+        return _seed_if_empty(force=force)
+
+    def list_page(
+        self,
+        *,
+        viewer_id: str,
+        tab: str,
+        q: str | None = None,
+        category: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One ranked page of broadcasts plus the next cursor (or None)."""
 
         tab = str(tab or "following").strip().lower()
         if tab not in ("following", "discover"):
             tab = "following"
+        lim = max(1, min(200, int(limit)))
 
-        qs = Broadcast.objects.all()
+        qs = _ranked(Broadcast.objects.all())
 
         if category:
             c = str(category or "").strip()
@@ -187,26 +309,36 @@ class DbBroadcastsStore:
                 qs = qs.filter(category__iexact=c)
 
         if q:
-            t = str(q or "").strip()
+            t = str(q or "").strip().lower().lstrip("@")
             if t:
-                qs = qs.filter(Q(name__icontains=t) | Q(handle__icontains=t) | Q(desc__icontains=t))
+                qs = qs.filter(Q(handle__startswith="@" + t) | Q(name_key__startswith=t))
 
+        followed = BroadcastMember.objects.filter(viewer_id=str(viewer_id)).values("broadcast_id")
         if tab == "following":
-            ids = list(BroadcastMember.objects.filter(viewer_id=str(viewer_id)).values_list("broadcast_id", flat=True))
-            if not ids:
-                return []
-            qs = qs.filter(id__in=ids)
+            qs = qs.filter(id__in=followed)
         else:
             # Discover: hide ones already followed
-            ids = list(BroadcastMember.objects.filter(viewer_id=str(viewer_id)).values_list("broadcast_id", flat=True))
-            if ids:
-                qs = qs.exclude(id__in=ids)
-
-        qs = qs.order_by("-subscriber_count", "-last_post_at", "-updated_at")
-        out: List[Dict[str, Any]] = []
-        for b in qs[: max(1, min(200, int(limit)) )]:
-            out.append(broadcast_to_item(b, viewer_id=str(viewer_id)))
-        return out
+            qs = qs.exclude(id__in=followed)
+
+        cur = decode_rank_cursor(cursor) if cursor else None
+        if cur is not None:
+            qs = qs.filter(_after_rank_cursor(cur))
+
+        rows = list(qs.order_by(*_RANK_ORDER)[: lim + 1])
+        has_more = len(rows) > lim
+        rows = rows[:lim]
+        next_cursor = encode_rank_cursor(rows[-1]) if (has_more and rows) else None
+
+        if tab == "following":
+            mems = members_for(str(viewer_id), [b.id for b in rows])
+        else:
+            mems = {}
+        out = [broadcast_to_item(b, viewer_id=str(viewer_id), member=mems.get(str(b.id))) for b in rows]
+        return out, next_cursor
+
+    def list(self, *, viewer_id: str, tab: str, q: str | None = None, category: str | None = None, limit: int = 50) -> List[Dict[str, Any]]:
+        items, _ = self.list_page(viewer_id=viewer_id, tab=tab, q=q, category=category, limit=limit)
+        return items
 
     def create(self, *, owner_id: str, name: str, handle: str, category: str = "", desc: str = "", pinned_rules: str = "") -> Dict[str, Any]:
         h = normalize_handle(handle)
@@ -218,6 +350,7 @@ class DbBroadcastsStore:
                 id=new_id("b"),
                 owner_id=str(owner_id),
                 name=str(name or "Untitled")[:255],
+                name_key=name_key(name or "Untitled"),
                 handle=h,
                 category=str(category or "")[:64],
                 desc=str(desc or ""),
@@ -225,7 +358,7 @@ class DbBroadcastsStore:
                 subscriber_count=0,
                 last_post_at=None,
             )
-            BroadcastMember.objects.create(
+            m = BroadcastMember.objects.create(
                 broadcast=b,
                 viewer_id=str(owner_id),
                 role=BroadcastRole.OWNER,
@@ -234,7 +367,7 @@ class DbBroadcastsStore:
                 last_seen_at=0.0,
             )
 
-        return broadcast_to_item(b, viewer_id=str(owner_id))
+        return broadcast_to_item(b, viewer_id=str(owner_id), member=m)
 
     def get(self, *, viewer_id: str, broadcast_id: str) -> Optional[Dict[str, Any]]:
         try:
@@ -264,9 +397,9 @@ class DbBroadcastsStore:
 
             m = BroadcastMember.objects.filter(broadcast=b, viewer_id=str(viewer_id)).first()
             if m:
-                return broadcast_to_item(b, viewer_id=str(viewer_id))
+                return broadcast_to_item(b, viewer_id=str(viewer_id), member=m)
 
-            BroadcastMember.objects.create(
+            m = BroadcastMember.objects.create(
                 broadcast=b,
                 viewer_id=str(viewer_id),
                 role=BroadcastRole.SUBSCRIBER,
@@ -278,7 +411,7 @@ class DbBroadcastsStore:
             b.subscriber_count = int(b.subscriber_count or 0) + 1
             b.save(update_fields=["subscriber_count"])
 
-        return broadcast_to_item(b, viewer_id=str(viewer_id))
+        return broadcast_to_item(b, viewer_id=str(viewer_id), member=m)
 
     def unfollow(self, *, viewer_id: str, broadcast_id: str) -> Dict[str, Any]:
         with transaction.atomic():
@@ -288,17 +421,17 @@ class DbBroadcastsStore:
 
             m = BroadcastMember.objects.filter(broadcast=b, viewer_id=str(viewer_id)).first()
             if not m:
-                return broadcast_to_item(b, viewer_id=str(viewer_id))
+                return broadcast_to_item(b, viewer_id=str(viewer_id), member=None)
 
             # Owners/Writers can't unfollow via this endpoint.
             if str(m.role) in (BroadcastRole.OWNER, BroadcastRole.WRITER):
-                return broadcast_to_item(b, viewer_id=str(viewer_id))
+                return broadcast_to_item(b, viewer_id=str(viewer_id), member=m)
 
             m.delete()
             b.subscriber_count = max(0, int(b.subscriber_count or 0) - 1)
             b.save(update_fields=["subscriber_count"])
 
-        return broadcast_to_item(b, viewer_id=str(viewer_id))
+        return broadcast_to_item(b, viewer_id=str(viewer_id), member=None)
 
     def set_notify(self, *, viewer_id: str, broadcast_id: str, mode: str, muted: bool) -> Dict[str, Any]:
         mode = str(mode or NotifyMode.OFF).strip().lower()
@@ -328,22 +461,21 @@ class DbBroadcastsStore:
             m.muted = bool(muted)
             m.save(update_fields=["notify_mode", "muted"])
 
-        return broadcast_to_item(b, viewer_id=str(viewer_id))
+        return broadcast_to_item(b, viewer_id=str(viewer_id), member=m)
 
     def touch_last_post(self, *, broadcast_id: str, created_at: float) -> None:
-        try:
-            b = Broadcast.objects.filter(id=str(broadcast_id)).first()
-            if not b:
-                return
-            cur = float(b.last_post_at or 0.0)
-            nxt = float(created_at or 0.0)
-            if nxt <= 0.0:
-                return
-            if nxt > cur:
-                b.last_post_at = nxt
-                b.save(update_fields=["last_post_at"])
-        except Exception:
+        """Raise last_post_at to `created_at` (one conditional UPDATE).
+
+        feed_page() uses last_post_at as an upper bound per broadcast, so this
+        runs inside the post insert transaction and errors propagate: a post
+        must never commit with a lower last_post_at than its own created_at.
+        """
+        nxt = float(created_at or 0.0)
+        if nxt <= 0.0:
             return
+        Broadcast.objects.filter(id=str(broadcast_id)).filter(
+            Q(last_post_at__isnull=True) | Q(last_post_at__lt=nxt)
+        ).update(last_post_at=nxt)
 
     def mark_seen(self, *, viewer_id: str, broadcast_id: str) -> None:
         try:
@@ -359,8 +491,6 @@ class DbBroadcastsStore:
             return
 
     def list_posts(self, *, viewer_id: str, broadcast_id: str, limit: int = 30, before: float | None = None) -> List[Dict[str, Any]]:
-        self.ensure_seed()
-
         b = Broadcast.objects.filter(id=str(broadcast_id)).first()
         if not b:
             raise ValueError("not_found")
@@ -369,101 +499,108 @@ class DbBroadcastsStore:
         if before is not None and float(before) > 0:
             qs = qs.filter(created_at__lt=float(before))
 
-        qs = qs.order_by("-created_at")
-
-        out: List[Dict[str, Any]] = []
-        for rec in qs[: max(1, min(200, int(limit)) )]:
-            author_id = str(getattr(rec, "author_id", "") or "")
-            name, handle = _display_author(author_id)
-            out.append(
-                {
-                    "id": rec.id,
-                    "author": name,
-                    "handle": handle,
-                    "time": "now",
-                    "content": rec.text,
-                    "kind": "text",
-                    "setId": rec.set_id,
-                    "broadcast": {"id": b.id, "name": b.name, "handle": b.handle},
-                    "createdAt": int(float(rec.created_at) * 1000),
-                }
-            )
+        qs = qs.order_by("-created_at", "-id")
+
+        meta = {"id": b.id, "name": b.name, "handle": b.handle}
+        out: List[Dict[str, Any]] = [_post_item(rec, meta) for rec in qs[: max(1, min(200, int(limit)) )]]
 
         # Mark seen when user fetches posts.
         self.mark_seen(viewer_id=str(viewer_id), broadcast_id=str(broadcast_id))
 
         return out
 
-    def feed(self, *, viewer_id: str, limit: int = 30, before: float | None = None) -> list[dict[str, Any]]:
-        """Return public posts from broadcasts the viewer follows (calm, non-algorithmic)."""
-        self.ensure_seed()
+    def feed_page(self, *, viewer_id: str, limit: int = 30, cursor: str | None = None, before: float | None = None) -> Tuple[list[dict[str, Any]], Optional[str]]:
+        """Public posts from followed broadcasts, newest first, plus the next cursor.
 
-        ids = list(BroadcastMember.objects.filter(viewer_id=str(viewer_id)).values_list("broadcast_id", flat=True))
-        if not ids:
-            return []
+        K-way merge over per-broadcast timelines: followed broadcasts are
+        visited in order of their newest possible post (last_post_at, capped
+        by the cursor) in small batches, each batch read via the
+        (set_id, -created_at, -id) index. We stop once the page is full and no
+        unvisited broadcast can still contribute a newer post, so following
+        hundreds of quiet broadcasts costs nothing extra.
 
-        qs = Post.objects.filter(side="public", set_id__in=ids)
-        if before is not None and float(before) > 0:
-            qs = qs.filter(created_at__lt=float(before))
-        qs = qs.order_by("-created_at")
+        The early exit is only sound because last_post_at is raised in the
+        same transaction as every broadcast post insert (touch_last_post).
+        """
+
+        lim = max(1, min(200, int(limit)))
+        cur = decode_post_cursor(cursor) if cursor else None
+        if cur is None and before is not None and float(before) > 0:
+            cur = (float(before), "")
+
+        streams = list(
+            Broadcast.objects.filter(id__in=BroadcastMember.objects.filter(viewer_id=str(viewer_id)).values("broadcast_id"))
+            .values_list("id", "name", "handle", "last_post_at")
+        )
+        if not streams:
+            return [], None
+
+        cap = cur[0] if cur is not None else float("inf")
 
-        bs = {b.id: b for b in Broadcast.objects.filter(id__in=ids)}
+        def bound(row: Tuple[Any, ...]) -> float:
+            # Unknown last_post_at (pre-mirror data) must be visited: treat as unbounded.
+            return min(cap, float(row[3])) if row[3] is not None else cap
+
+        streams.sort(key=lambda r: (-bound(r), str(r[0])))
+        bs = {str(r[0]): r for r in streams}
+
+        page: list[Post] = []
+        i = 0
+        while i < len(streams):
+            if len(page) > lim and float(page[lim].created_at) > bound(streams[i]):
+                break
+            batch = [str(r[0]) for r in streams[i : i + _FEED_BATCH]]
+            i += len(batch)
+
+            qs = Post.objects.filter(side="public", set_id__in=batch)
+            if cur is not None:
+                qs = qs.filter(_before_post_cursor(cur))
+            rows = list(qs.order_by("-created_at", "-id")[: lim + 1])
+            if rows:
+                page = list(heapq.merge(page, rows, key=_post_sort_key, reverse=True))[: lim + 1]
+
+        has_more = len(page) > lim
+        page = page[:lim]
+        next_cursor = encode_post_cursor(page[-1]) if (has_more and page) else None
 
         out: list[dict[str, Any]] = []
-        for rec in qs[: max(1, min(200, int(limit))) ]:
-            b = bs.get(str(rec.set_id or ""))
-            author_id = str(getattr(rec, "author_id", "") or "")
-            name, handle = _display_author(author_id)
-            out.append(
-                {
-                    "id": rec.id,
-                    "author": name,
-                    "handle": handle,
-                    "time": "now",
-                    "content": rec.text,
-                    "kind": "text",
-                    "setId": rec.set_id,
-                    "broadcast": {"id": b.id, "name": b.name, "handle": b.handle} if b else None,
-                    "createdAt": int(float(rec.created_at) * 1000),
-                }
-            )
-        return out
+        for rec in page:
+            r = bs.get(str(rec.set_id or ""))
+            out.append(_post_item(rec, {"id": r[0], "name": r[1], "handle": r[2]} if r else None))
+        return out, next_cursor
+
+    def feed(self, *, viewer_id: str, limit: int = 30, before: float | None = None) -> list[dict[str, Any]]:
+        """Return public posts from broadcasts the viewer follows (calm, non-algorithmic)."""
+        items, _ = self.feed_page(viewer_id=viewer_id, limit=limit, before=before)
+        return items
 
     def list_unread(self, *, viewer_id: str, limit: int = 50) -> list[dict[str, Any]]:
         """List broadcasts that have new posts since the viewer last saw them.
 
         We deliberately return a small list + dots (no big addictive counters).
+        The unread test (last_post_at > last_seen_at) runs in SQL.
         """
-        self.ensure_seed()
-
         ms = (
             BroadcastMember.objects
-            .filter(viewer_id=str(viewer_id), muted=False)
+            .filter(viewer_id=str(viewer_id), muted=False, broadcast__last_post_at__gt=F("last_seen_at"))
             .select_related("broadcast")
+            .order_by("-broadcast__last_post_at", "broadcast_id")[: max(1, min(200, int(limit)))]
         )
 
         items: list[dict[str, Any]] = []
         for m in ms:
-            b = getattr(m, "broadcast", None)
-            if not b:
-                continue
-            last = float(getattr(b, "last_post_at", 0.0) or 0.0)
-            seen = float(getattr(m, "last_seen_at", 0.0) or 0.0)
-            if last > 0.0 and last > seen:
-                it = broadcast_to_item(b, viewer_id=str(viewer_id))
-                it["hasUnread"] = True
-                it["lastUpdateAt"] = int(last * 1000)
-                items.append(it)
-
-        items.sort(key=lambda x: int(x.get("lastUpdateAt") or 0), reverse=True)
-        return items[: max(1, min(200, int(limit))) ]
+            b = m.broadcast
+            it = broadcast_to_item(b, viewer_id=str(viewer_id), member=m)
+            it["hasUnread"] = True
+            it["lastUpdateAt"] = int(float(b.last_post_at) * 1000)
+            items.append(it)
+        return items
 
     def list_writers(self, *, viewer_id: str, broadcast_id: str) -> list[dict[str, str]]:
         """Return the writer team for a broadcast (owner+writer roles).
 
         Privacy: follower list stays private; only team is exposed here.
         """
-        self.ensure_seed()
         rows = (
             BroadcastMember.objects
             .filter(broadcast_id=str(broadcast_id), role__in=["owner", "writer"])
@@ -476,7 +613,6 @@ class DbBroadcastsStore:
         return out
 
     def add_writer(self, *, owner_viewer_id: str, broadcast_id: str, writer_viewer_id: str) -> None:
-        self.ensure_seed()
         # Must be owner
         is_owner = BroadcastMember.objects.filter(broadcast_id=str(broadcast_id), viewer_id=str(owner_viewer_id), role="owner").exists()
         if not is_owner:
@@ -489,7 +625,6 @@ class DbBroadcastsStore:
         )
 
     def remove_writer(self, *, owner_viewer_id: str, broadcast_id: str, writer_viewer_id: str) -> None:
-        self.ensure_seed()
         is_owner = BroadcastMember.objects.filter(broadcast_id=str(broadcast_id), viewer_id=str(owner_viewer_id), role="owner").exists()
         if not is_owner:
             raise PermissionError("owner_required")
@@ -0,0 +1,199 @@
+"""Broadcast store tests.
+
+The app is only installed with SIDDES_BROADCASTS_ENABLED=1, so run these as:
+
+    SIDDES_BROADCASTS_ENABLED=1 python manage.py test siddes_broadcasts
+"""
+
+from __future__ import annotations
+
+import unittest
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+_ENABLED = bool(getattr(settings, "SIDDES_BROADCASTS_ENABLED", False))
+
+
+@unittest.skipUnless(_ENABLED, "SIDDES_BROADCASTS_ENABLED=1 installs siddes_broadcasts")
+@override_settings(DEBUG=True)
+class BroadcastFeedPageTests(APITestCase):
+    viewer = "me_feed"
+
+    def setUp(self):
+        from siddes_broadcasts.models import Broadcast, BroadcastMember
+        from siddes_post.models import Post
+
+        base = 1_700_000_000.0
+        self.followed = []
+        for i in range(20):
+            bid = f"b_feed_{i:02d}"
+            # Every 4th broadcast predates the last_post_at mirror (NULL).
+            Broadcast.objects.create(id=bid, owner_id="me_owner", name=f"Feed {i}", handle=f"@feed{i}", last_post_at=None)
+            last = None
+            for j in range(i % 5 + 1):
+                # Shared timestamps across broadcasts: ties are broken by id.
+                ts = base + float((i * 7 + j * 13) % 40)
+                Post.objects.create(id=f"p_feed_{i:02d}_{j}", author_id="me_owner", side="public", text="x", set_id=bid, created_at=ts)
+                last = ts if last is None else max(last, ts)
+            if i % 4:
+                Broadcast.objects.filter(id=bid).update(last_post_at=last)
+            if i % 3 != 2:
+                BroadcastMember.objects.create(broadcast_id=bid, viewer_id=self.viewer, role="subscriber")
+                self.followed.append(bid)
+        # Not followed and not public: never in the feed.
+        Post.objects.create(id="p_feed_private", author_id="me_owner", side="friends", text="x", set_id="b_feed_00", created_at=base + 99)
+
+    def _expected(self):
+        from siddes_post.models import Post
+
+        return list(Post.objects.filter(side="public", set_id__in=self.followed).order_by("-created_at", "-id").values_list("id", flat=True))
+
+    def _walk(self, limit):
+        from siddes_broadcasts.store_db import STORE
+
+        ids, cursor = [], None
+        for _ in range(100):
+            items, cursor = STORE.feed_page(viewer_id=self.viewer, limit=limit, cursor=cursor)
+            ids.extend(it["id"] for it in items)
+            if cursor is None:
+                return ids
+        raise AssertionError("feed_page did not terminate")
+
+    def test_cursor_pages_match_the_brute_force_order(self):
+        expected = self._expected()
+        assert len(expected) > 20
+        for limit in (1, 5, 7, 200):
+            assert self._walk(limit) == expected, limit
+
+    def test_legacy_before_returns_strictly_older_posts(self):
+        from siddes_broadcasts.store_db import STORE
+        from siddes_post.models import Post
+
+        cut = float(Post.objects.get(id=self._expected()[6]).created_at)
+        items, _ = STORE.feed_page(viewer_id=self.viewer, limit=200, before=cut)
+        want = list(
+            Post.objects.filter(side="public", set_id__in=self.followed, created_at__lt=cut)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+        assert [it["id"] for it in items] == want
+        assert all(it["broadcast"]["id"] in self.followed for it in items)
+
+    def test_unfollowed_viewer_gets_an_empty_page(self):
+        from siddes_broadcasts.store_db import STORE
+
+        assert STORE.feed_page(viewer_id="me_nobody", limit=5) == ([], None)
+
+    def test_list_unread_runs_the_last_seen_check_in_sql(self):
+        from siddes_broadcasts.models import BroadcastMember
+        from siddes_broadcasts.store_db import STORE
+
+        # Seen everything on b_feed_01, muted b_feed_03; NULL last_post_at is never unread.
+        BroadcastMember.objects.filter(viewer_id=self.viewer, broadcast_id="b_feed_01").update(last_seen_at=2e9)
+        BroadcastMember.objects.filter(viewer_id=self.viewer, broadcast_id="b_feed_03").update(muted=True)
+
+        got = [it["id"] for it in STORE.list_unread(viewer_id=self.viewer, limit=200)]
+        want = [
+            m.broadcast_id
+            for m in BroadcastMember.objects.filter(viewer_id=self.viewer).select_related("broadcast")
+            if not m.muted and m.broadcast.last_post_at is not None and m.broadcast.last_post_at > m.last_seen_at
+        ]
+        assert sorted(got) == sorted(want) and "b_feed_01" not in got and "b_feed_03" not in got
+        assert "b_feed_00" not in got  # last_post_at NULL
+
+    def test_post_create_raises_last_post_at_before_the_event_runs(self):
+        from siddes_broadcasts.models import Broadcast, BroadcastMember
+        from siddes_broadcasts.store_db import STORE
+
+        owner = get_user_model().objects.create_user(username="bcowner", password="x")
+        me = f"me_{owner.id}"
+        BroadcastMember.objects.create(broadcast_id="b_feed_05", viewer_id=me, role="owner")
+        BroadcastMember.objects.create(broadcast_id="b_feed_05", viewer_id="me_late", role="subscriber")
+        before = Broadcast.objects.get(id="b_feed_05").last_post_at
+
+        # The post_created event is never delivered here (no worker).
+        with mock.patch("siddes_post.events._publish"):
+            r = self.client.post("/api/post", {"side": "public", "setId": "b_feed_05", "text": "new"}, format="json", HTTP_X_SD_VIEWER=me)
+        assert r.status_code == 201, r.content
+        pid = r.json()["post"]["id"]
+        assert Broadcast.objects.get(id="b_feed_05").last_post_at > before
+
+        items, _ = STORE.feed_page(viewer_id="me_late", limit=1)
+        assert [it["id"] for it in items] == [pid]
+
+
+@unittest.skipUnless(_ENABLED, "SIDDES_BROADCASTS_ENABLED=1 installs siddes_broadcasts")
+class BroadcastListPageTests(APITestCase):
+    viewer = "me_list"
+
+    def setUp(self):
+        from siddes_broadcasts.models import Broadcast, BroadcastMember
+
+        for i in range(12):
+            Broadcast.objects.create(
+                id=f"b_list_{i:02d}",
+                owner_id="me_owner",
+                name=f"{'News' if i % 2 else 'Sports'} Desk {i}",
+                handle=f"@list{i}",
+                category="news" if i % 2 else "sports",
+                subscriber_count=i % 3,  # ties on subscriber_count
+                last_post_at=(None if i % 4 == 0 else 1_700_000_000.0 + (i % 2)),  # ties + NULL
+            )
+        for i in range(0, 12, 3):
+            BroadcastMember.objects.create(broadcast_id=f"b_list_{i:02d}", viewer_id=self.viewer, role="subscriber")
+
+    def _expected(self, tab):
+        from siddes_broadcasts.models import Broadcast, BroadcastMember
+
+        followed = set(BroadcastMember.objects.filter(viewer_id=self.viewer).values_list("broadcast_id", flat=True))
+        rows = [b for b in Broadcast.objects.all() if (b.id in followed) == (tab == "following")]
+        rows.sort(key=lambda b: (-b.subscriber_count, -(b.last_post_at or 0.0), b.id))
+        return [b.id for b in rows]
+
+    def _walk(self, tab, limit, **kw):
+        from siddes_broadcasts.store_db import STORE
+
+        ids, cursor = [], None
+        for _ in range(50):
+            items, cursor = STORE.list_page(viewer_id=self.viewer, tab=tab, limit=limit, cursor=cursor, **kw)
+            ids.extend(it["id"] for it in items)
+            if cursor is None:
+                return ids
+        raise AssertionError("list_page did not terminate")
+
+    def test_keyset_pages_follow_the_discover_rank(self):
+        for tab in ("discover", "following"):
+            for limit in (1, 3, 50):
+                assert self._walk(tab, limit) == self._expected(tab), (tab, limit)
+
+    def test_prefix_search_matches_handle_and_name_key(self):
+        from siddes_broadcasts.models import Broadcast
+
+        got = self._walk("discover", 50, q="news")
+        assert got and all(Broadcast.objects.get(id=b).name.startswith("News") for b in got)
+        assert self._walk("discover", 50, q="@list1") == [b for b in self._expected("discover") if Broadcast.objects.get(id=b).handle.startswith("@list1")]
+        assert self._walk("discover", 50, q="desk") == []  # prefix, not substring
+
+    def test_name_key_follows_renames_outside_the_store(self):
+        from siddes_broadcasts.models import Broadcast
+
+        b = Broadcast.objects.get(id="b_list_01")
+        b.name = "Weather Watch"
+        b.save(update_fields=["name"])
+        assert Broadcast.objects.get(id="b_list_01").name_key == "weather watch"
+        assert self._walk("discover", 50, q="weath") == ["b_list_01"]
+
+    def test_following_page_resolves_memberships_in_one_query(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from siddes_broadcasts.store_db import STORE
+
+        with CaptureQueriesContext(connection) as ctx:
+            items, _ = STORE.list_page(viewer_id=self.viewer, tab="following", limit=50)
+        assert len(items) == 4 and all(it["isFollowing"] for it in items)
+        assert len(ctx.captured_queries) == 2  # page + members_for
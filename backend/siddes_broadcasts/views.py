@@ -58,9 +58,28 @@ class BroadcastsView(APIView):
         tab = str(request.query_params.get("tab") or "following")
         q = str(request.query_params.get("q") or "").strip() or None
         category = str(request.query_params.get("category") or "").strip() or None
+        cursor = str(request.query_params.get("cursor") or "").strip() or None
 
-        items = STORE.list(viewer_id=viewer, tab=tab, q=q, category=category)
-        return Response({"ok": True, "restricted": False, "viewer": viewer, "role": role, "tab": tab, "count": len(items), "items": items}, status=status.HTTP_200_OK)
+        try:
+            limit = int(request.query_params.get("limit") or 50)
+        except Exception:
+            limit = 50
+
+        items, next_cursor = STORE.list_page(viewer_id=viewer, tab=tab, q=q, category=category, limit=limit, cursor=cursor)
+        return Response(
+            {
+                "ok": True,
+                "restricted": False,
+                "viewer": viewer,
+                "role": role,
+                "tab": tab,
+                "count": len(items),
+                "items": items,
+                "nextCursor": next_cursor,
+                "hasMore": bool(next_cursor),
+            },
+            status=status.HTTP_200_OK,
+        )
 
     def post(self, request):
         has_viewer, viewer, role = _viewer_ctx(request)
@@ -217,8 +236,22 @@ class BroadcastFeedView(APIView):
         except Exception:
             before = None
 
-        items = STORE.feed(viewer_id=viewer, limit=limit, before=before)
-        return Response({"ok": True, "restricted": False, "viewer": viewer, "role": role, "count": len(items), "items": items}, status=status.HTTP_200_OK)
+        cursor = str(request.query_params.get("cursor") or "").strip() or None
+
+        items, next_cursor = STORE.feed_page(viewer_id=viewer, limit=limit, cursor=cursor, before=before)
+        return Response(
+            {
+                "ok": True,
+                "restricted": False,
+                "viewer": viewer,
+                "role": role,
+                "count": len(items),
+                "items": items,
+                "nextCursor": next_cursor,
+                "hasMore": bool(next_cursor),
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 @method_decorator(dev_csrf_exempt, name="dispatch")
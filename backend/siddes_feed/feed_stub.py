@@ -4,6 +4,7 @@ import re
 import time
 from typing import Any, Dict, List, Optional, Set, Tuple
 
+from siddes_backend.profiling import span
 from siddes_post.runtime_store import POST_STORE, REPLY_STORE
 from siddes_visibility.policy import SideId
 
@@ -148,19 +149,11 @@ def _set_allows(viewer_id: str, set_id: Optional[str]) -> bool:
     except Exception:
         pass
 
-    # sd_366: membership table (fast) with JSON fallback
+    # sd_366: membership table is the source of truth (fail-closed)
     try:
         return SiddesSetMember.objects.filter(set_id=sid, member_id__in=list(aliases)).exists()
     except Exception:
-        try:
-            s = SiddesSet.objects.get(id=sid)
-            members = getattr(s, "members", []) or []
-            if not isinstance(members, list):
-                return False
-            mem = {str(m).strip() for m in members if isinstance(m, (str, int, float))}
-            return bool(mem.intersection(aliases))
-        except Exception:
-            return False
+        return False
 
 
 # sd_526: Side-only visibility uses SideMembership (room posts).
@@ -169,25 +162,13 @@ def _set_allows(viewer_id: str, set_id: Optional[str]) -> bool:
 # Close implies Friends (friends includes close).
 _SD_526_MEMO = {}
 
-def _user_from_token(token: str):
-    t = str(token or "").strip()
-    if not t:
-        return None
+def _user_id_from_token(token: str) -> Optional[int]:
     try:
-        from django.contrib.auth import get_user_model
-        from siddes_backend.identity import parse_viewer_user_id, normalize_handle  # type: ignore
-        User = get_user_model()
-        uid = parse_viewer_user_id(t)
-        if uid is not None:
-            return User.objects.filter(id=uid).first()
-        h = normalize_handle(t)
-        if h:
-            uname = str(h[1:] or "").strip()
-            if uname:
-                return User.objects.filter(username__iexact=uname).first()
+        from siddes_backend.identity import user_id_for_token  # type: ignore
+
+        return user_id_for_token(token)
     except Exception:
         return None
-    return None
 
 def _side_membership_allows(viewer_id: str, author_id: str, side: str) -> bool:
     s = str(side or "").strip().lower()
@@ -204,11 +185,11 @@ def _side_membership_allows(viewer_id: str, author_id: str, side: str) -> bool:
         pass
     ok = False
     try:
-        viewer_u = _user_from_token(viewer_id)
-        author_u = _user_from_token(author_id)
-        if viewer_u and author_u:
+        viewer_uid = _user_id_from_token(viewer_id)
+        author_uid = _user_id_from_token(author_id)
+        if viewer_uid and author_uid:
             from siddes_prism.models import SideMembership  # type: ignore
-            rel = SideMembership.objects.filter(owner=author_u, member=viewer_u).first()
+            rel = SideMembership.objects.filter(owner_id=author_uid, member_id=viewer_uid).first()
             if rel:
                 r = str(getattr(rel, "side", "") or "").strip().lower()
                 if s == "friends":
@@ -258,6 +239,20 @@ def _can_view_record(viewer_id: str, rec) -> bool:
     return _side_membership_allows(viewer_id, author_id, side)
 
 
+def _prewarm_identities(viewer_id: str, recs: List[Any]) -> None:
+    """Resolve the viewer and every author of a batch in one lookup.
+
+    Visibility checks and hydration then read from the request memo.
+    """
+
+    try:
+        from siddes_backend.identity import resolve_many  # type: ignore
+
+        resolve_many([viewer_id] + [str(getattr(r, "author_id", "") or "") for r in recs])
+    except Exception:
+        pass
+
+
 def _author_label(author_id: str) -> str:
     a = str(author_id or '').strip()
     if not a:
@@ -474,9 +469,9 @@ def _hydrate_from_record(
         from siddes_prism.models import PrismFacet  # type: ignore
 
         side_key = str(getattr(rec, "side", "") or "public").strip().lower() or "public"
-        u = _user_from_token(author_id)
-        if u is not None:
-            f = PrismFacet.objects.filter(user=u, side=side_key).first()
+        uid = _user_id_from_token(author_id)
+        if uid is not None:
+            f = PrismFacet.objects.filter(user_id=uid, side=side_key).first()
             if f is not None:
                 dn = str(getattr(f, "display_name", "") or "").strip()
                 if dn:
@@ -546,19 +541,64 @@ def _hydrate_from_record(
     return out
 
 
-def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: str | None = None, set_id: str | None = None, limit: int = 200, cursor: str | None = None, lite: bool = False) -> Dict[str, Any]:
-    """Cursor-paginated feed (backward compatible).
+def _parse_cursor(cur: str | None) -> Tuple[Optional[float], str]:
+    raw = str(cur or "").strip()
+    if not raw or "|" not in raw:
+        return None, ""
+    a, b = raw.split("|", 1)
+    a = a.strip()
+    b = b.strip()
+    if not a or not b:
+        return None, ""
+    try:
+        ts = float(a)
+    except Exception:
+        return None, ""
+    return ts, b
 
-    Inputs (via view query params):
-    - limit: int (1..200). Defaults to 200 when omitted (matches old behavior).
-    - cursor: opaque string returned in `nextCursor` (format: "<created_at>|<id>").
 
-    Response adds:
-    - nextCursor: str | None
-    - hasMore: bool
-    - serverTs: float
-    """
+def _encode_cursor(rec: Any) -> str:
+    ts = float(getattr(rec, "created_at", 0.0) or 0.0)
+    pid = str(getattr(rec, "id", "") or "").strip()
+    return f"{ts:.6f}|{pid}"
+
+
+def _after_pred(rec: Any, ts: float, pid: str) -> bool:
+    rts = float(getattr(rec, "created_at", 0.0) or 0.0)
+    rid = str(getattr(rec, "id", "") or "").strip()
+    if rts < ts:
+        return True
+    if rts == ts and rid < pid:
+        return True
+    return False
+
+
+class _FeedScan:
+    """Result of the fetch + visibility phase of one feed page."""
+
+    __slots__ = ("visible", "has_more", "last_scanned", "topic", "tag")
+
+    def __init__(self, visible: List[Any], has_more: bool, last_scanned: Any, topic: Optional[str], tag: Optional[str]):
+        self.visible = visible
+        self.has_more = has_more
+        self.last_scanned = last_scanned
+        self.topic = topic
+        self.tag = tag
+
+    def post_ids(self) -> List[str]:
+        return [str(getattr(r, "id", "") or "").strip() for r in self.visible if str(getattr(r, "id", "") or "").strip()]
 
+    def next_cursor(self) -> Optional[str]:
+        if not self.has_more:
+            return None
+        if self.visible:
+            return _encode_cursor(self.visible[-1])
+        if self.last_scanned is not None:
+            return _encode_cursor(self.last_scanned)
+        return None
+
+
+def _scan_feed(viewer_id: str, side: SideId, *, topic: str | None, tag: str | None, set_id: str | None, limit: int, cursor: str | None) -> _FeedScan:
     # Clamp limit (keep old behavior when omitted: defaults to 200)
     try:
         lim = int(limit)
@@ -593,35 +633,6 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
     except Exception:
         hidden_ids = set()
 
-    def parse_cursor(cur: str | None) -> Tuple[Optional[float], str]:
-        raw = str(cur or "").strip()
-        if not raw or "|" not in raw:
-            return None, ""
-        a, b = raw.split("|", 1)
-        a = a.strip()
-        b = b.strip()
-        if not a or not b:
-            return None, ""
-        try:
-            ts = float(a)
-        except Exception:
-            return None, ""
-        return ts, b
-
-    def encode_cursor(rec: Any) -> str:
-        ts = float(getattr(rec, "created_at", 0.0) or 0.0)
-        pid = str(getattr(rec, "id", "") or "").strip()
-        return f"{ts:.6f}|{pid}"
-
-    def after_pred(rec: Any, ts: float, pid: str) -> bool:
-        rts = float(getattr(rec, "created_at", 0.0) or 0.0)
-        rid = str(getattr(rec, "id", "") or "").strip()
-        if rts < ts:
-            return True
-        if rts == ts and rid < pid:
-            return True
-        return False
-
     def fetch_batch(after: str | None, n: int) -> List[Any]:
         # Fast path: ORM query in DB mode.
         try:
@@ -640,7 +651,7 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
                 else:
                     qs = qs.filter(public_channel=t)
 
-            cts, cid = parse_cursor(after)
+            cts, cid = _parse_cursor(after)
             if cts is not None and cid:
                 qs = qs.filter(Q(created_at__lt=cts) | (Q(created_at=cts) & Q(id__lt=cid)))
 
@@ -650,9 +661,9 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
             recs_all = POST_STORE.list()
             recs_side = [r for r in recs_all if str(getattr(r, "side", "") or "").strip().lower() == str(side)]
 
-            cts, cid = parse_cursor(after)
+            cts, cid = _parse_cursor(after)
             if cts is not None and cid:
-                recs_side = [r for r in recs_side if after_pred(r, cts, cid)]
+                recs_side = [r for r in recs_side if _after_pred(r, cts, cid)]
 
             if str(side) == "public" and t:
                 def _topic_of(rec: Any) -> str:
@@ -679,7 +690,8 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
     loops = 0
     while len(visible) < lim and loops < 5:
         loops += 1
-        recs = fetch_batch(after, batch_size + 1)
+        with span("feed.fetch"):
+            recs = fetch_batch(after, batch_size + 1)
         if not recs:
             has_more_underlying = False
             break
@@ -688,34 +700,37 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
         if more_underlying:
             recs = recs[:batch_size]
 
-        stopped_early = False
-        for r in recs:
-            last_scanned = r
+        with span("feed.visibility"):
+            _prewarm_identities(viewer_id, recs)
 
-            # sd_717e_topic_tags: side-bound tag filter (hashtags as folders)
-            if tag_norm:
-                try:
-                    tgs = _extract_topic_tags(str(getattr(r, "text", "") or ""))
-                    if tag_norm not in tgs:
+            stopped_early = False
+            for r in recs:
+                last_scanned = r
+
+                # sd_717e_topic_tags: side-bound tag filter (hashtags as folders)
+                if tag_norm:
+                    try:
+                        tgs = _extract_topic_tags(str(getattr(r, "text", "") or ""))
+                        if tag_norm not in tgs:
+                            continue
+                    except Exception:
                         continue
-                except Exception:
-                    continue
 
-            pid = str(getattr(r, "id", "") or "").strip()
-            if pid and pid in hidden_ids:
-                continue
+                pid = str(getattr(r, "id", "") or "").strip()
+                if pid and pid in hidden_ids:
+                    continue
 
-            if not _can_view_record(viewer_id, r):
-                continue
+                if not _can_view_record(viewer_id, r):
+                    continue
 
-            sid = str(getattr(r, "set_id", "") or "").strip() or None
-            if sid and not _set_allows(viewer_id, sid):
-                continue
+                sid = str(getattr(r, "set_id", "") or "").strip() or None
+                if sid and not _set_allows(viewer_id, sid):
+                    continue
 
-            visible.append(r)
-            if len(visible) >= lim:
-                stopped_early = True
-                break
+                visible.append(r)
+                if len(visible) >= lim:
+                    stopped_early = True
+                    break
 
         if stopped_early:
             # There are more records after the last returned item (either unprocessed in this batch or beyond).
@@ -725,73 +740,78 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
         # Not enough visible items yet; continue scanning if more underlying records exist.
         if more_underlying and last_scanned is not None:
             has_more_underlying = True
-            after = encode_cursor(last_scanned)
+            after = _encode_cursor(last_scanned)
             continue
 
         has_more_underlying = False
         break
 
+    return _FeedScan(visible, has_more_underlying, last_scanned, t, tag_norm)
 
+
+def _lite_page(side: SideId, scan: _FeedScan) -> Dict[str, Any]:
     # sd_743: lite mode for activity polling (avoid heavy hydration/engagement/media)
-    if lite:
-        items: List[dict] = []
-        for r in visible:
-            pid = str(getattr(r, 'id', '') or '').strip()
-            if not pid:
-                continue
-            text = str(getattr(r, 'text', '') or '')
-            has_link = ('http://' in text) or ('https://' in text) or ('www.' in text)
-            has_mention = ('@' in text)
-            it: Dict[str, Any] = {'id': pid}
-            if has_mention:
-                it['context'] = 'mention'
-            it['hasDoc'] = bool(has_link)
-            if has_link:
-                it['kind'] = 'link'
-            items.append(it)
+    items: List[dict] = []
+    for r in scan.visible:
+        pid = str(getattr(r, 'id', '') or '').strip()
+        if not pid:
+            continue
+        text = str(getattr(r, 'text', '') or '')
+        has_link = ('http://' in text) or ('https://' in text) or ('www.' in text)
+        has_mention = ('@' in text)
+        it: Dict[str, Any] = {'id': pid}
+        if has_mention:
+            it['context'] = 'mention'
+        it['hasDoc'] = bool(has_link)
+        if has_link:
+            it['kind'] = 'link'
+        items.append(it)
 
-        next_cursor = None
-        if has_more_underlying:
-            if visible:
-                next_cursor = encode_cursor(visible[-1])
-            elif last_scanned is not None:
-                next_cursor = encode_cursor(last_scanned)
-
-        return {
-            'side': side,
-            'count': len(items),
-            'items': items,
-            'nextCursor': next_cursor,
-            'hasMore': bool(next_cursor),
-            'serverTs': time.time(),
-        }
-    post_ids = [str(getattr(r, "id", "") or "").strip() for r in visible if str(getattr(r, "id", "") or "").strip()]
-    like_counts, reply_counts, liked_ids = _bulk_engagement(viewer_id, post_ids)
-    echo_counts, echoed_ids = _bulk_echo(viewer_id, post_ids, side, visible)
-    media_map = _bulk_media(post_ids)
+    next_cursor = scan.next_cursor()
+    return {
+        'side': side,
+        'count': len(items),
+        'items': items,
+        'nextCursor': next_cursor,
+        'hasMore': bool(next_cursor),
+        'serverTs': time.time(),
+    }
+
+
+def _render_page(
+    side: SideId,
+    viewer_id: str,
+    scan: _FeedScan,
+    engagement: Tuple[Dict[str, int], Dict[str, int], Set[str]],
+    echo: Tuple[Dict[str, int], Set[str]],
+    media_map: Dict[str, List[Dict[str, Any]]],
+) -> Dict[str, Any]:
+    like_counts, reply_counts, liked_ids = engagement
+    echo_counts, echoed_ids = echo
 
     items: List[dict] = []
-    for r in visible:
-        pid = str(getattr(r, "id", "") or "").strip()
-        it = _hydrate_from_record(
-            r,
-            viewer_id=viewer_id,
-            like_count=int(like_counts.get(pid, 0) or 0),
-            reply_count=int(reply_counts.get(pid, 0) or 0),
-            liked=(pid in liked_ids),
-            echo_count=int(echo_counts.get(pid, 0) or 0),
-            echoed=(pid in echoed_ids),
-        )
+    with span("feed.hydration"):
+        for r in scan.visible:
+            pid = str(getattr(r, "id", "") or "").strip()
+            it = _hydrate_from_record(
+                r,
+                viewer_id=viewer_id,
+                like_count=int(like_counts.get(pid, 0) or 0),
+                reply_count=int(reply_counts.get(pid, 0) or 0),
+                liked=(pid in liked_ids),
+                echo_count=int(echo_counts.get(pid, 0) or 0),
+                echoed=(pid in echoed_ids),
+            )
 
-        media = media_map.get(pid) or []
-        if media:
-            it["media"] = media
-            it["kind"] = "image"
+            media = media_map.get(pid) or []
+            if media:
+                it["media"] = media
+                it["kind"] = "image"
 
-        items.append(it)
+            items.append(it)
 
     # Final guard for Public topics (should already be filtered in fetch_batch).
-    tt = str(t or "").strip().lower()
+    tt = str(scan.topic or "").strip().lower()
     if str(side) == "public" and tt:
         def _topic_of_item(it: dict) -> str:
             ch = str(it.get("publicChannel") or "").strip().lower()
@@ -803,8 +823,8 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
             items = [it for it in items if _topic_of_item(it) == tt]
 
     # sd_717e_topic_tags: Final guard for tag filter (should already be filtered)
-    if tag_norm:
-        tn = str(tag_norm).strip().lower()
+    if scan.tag:
+        tn = str(scan.tag).strip().lower()
         def _has_tag(it: dict) -> bool:
             arr = it.get("tags")
             if not isinstance(arr, list):
@@ -815,13 +835,7 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
             return False
         items = [it for it in items if _has_tag(it)]
 
-    next_cursor = None
-    if has_more_underlying:
-        if visible:
-            next_cursor = encode_cursor(visible[-1])
-        elif last_scanned is not None:
-            next_cursor = encode_cursor(last_scanned)
-
+    next_cursor = scan.next_cursor()
     return {
         "side": side,
         "count": len(items),
@@ -832,4 +846,54 @@ def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: st
     }
 
 
+def list_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: str | None = None, set_id: str | None = None, limit: int = 200, cursor: str | None = None, lite: bool = False) -> Dict[str, Any]:
+    """Cursor-paginated feed (backward compatible).
+
+    Inputs (via view query params):
+    - limit: int (1..200). Defaults to 200 when omitted (matches old behavior).
+    - cursor: opaque string returned in `nextCursor` (format: "<created_at>|<id>").
+
+    Response adds:
+    - nextCursor: str | None
+    - hasMore: bool
+    - serverTs: float
+    """
+
+    scan = _scan_feed(viewer_id, side, topic=topic, tag=tag, set_id=set_id, limit=limit, cursor=cursor)
+    if lite:
+        return _lite_page(side, scan)
+
+    post_ids = scan.post_ids()
+    with span("feed.engagement"):
+        engagement = _bulk_engagement(viewer_id, post_ids)
+        echo = _bulk_echo(viewer_id, post_ids, side, scan.visible)
+        media_map = _bulk_media(post_ids)
+
+    return _render_page(side, viewer_id, scan, engagement, echo, media_map)
+
+
+async def alist_feed(viewer_id: str, side: SideId, *, topic: str | None = None, tag: str | None = None, set_id: str | None = None, limit: int = 200, cursor: str | None = None, lite: bool = False) -> Dict[str, Any]:
+    """list_feed for async views: engagement, echo and media queries run concurrently."""
+
+    import asyncio
+
+    from asgiref.sync import sync_to_async
+
+    from siddes_backend.async_support import run_db
+
+    scan = await sync_to_async(_scan_feed)(viewer_id, side, topic=topic, tag=tag, set_id=set_id, limit=limit, cursor=cursor)
+    if lite:
+        return _lite_page(side, scan)
+
+    post_ids = scan.post_ids()
+    with span("feed.engagement"):
+        engagement, echo, media_map = await asyncio.gather(
+            run_db(_bulk_engagement, viewer_id, post_ids),
+            run_db(_bulk_echo, viewer_id, post_ids, side, scan.visible),
+            run_db(_bulk_media, post_ids),
+        )
+
+    return await sync_to_async(_render_page)(side, viewer_id, scan, engagement, echo, media_map)
+
+
 # sd_555_media_meta: applied
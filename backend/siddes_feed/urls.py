@@ -1,9 +1,11 @@
-"""URL routing for Siddes Feed (DRF)."""
+"""URL routing for Siddes Feed (DRF; async view on the ASGI profile)."""
 
 from django.urls import path
 
-from .views import FeedView
+from siddes_backend.async_support import async_views_enabled
+
+from .views import FeedAsyncView, FeedView
 
 urlpatterns = [
-    path("feed", FeedView.as_view()),
+    path("feed", (FeedAsyncView if async_views_enabled() else FeedView).as_view()),
 ]
@@ -15,18 +15,22 @@ from __future__ import annotations
 import hashlib
 import os
 
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.cache import cache
+from django.http import JsonResponse
 
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from siddes_backend.async_support import AsyncReadView
+from siddes_backend.cache_versions import fill_ttl
 from siddes_inbox.visibility_stub import resolve_viewer_role
 from siddes_visibility.policy import SideId
-from .feed_stub import list_feed
+from .feed_stub import alist_feed, list_feed
 
 
 _ALLOWED_SIDES = {"public", "friends", "close", "work"}
@@ -103,10 +107,95 @@ def _feed_cache_ttl() -> int:
     return ttl
 
 
-def _feed_cache_key(*, viewer: str, role: str, side: str, topic: str | None, tag: str | None, set_id: str | None, limit: int, cursor: str | None, lite: bool = False) -> str:
-    raw = f"v1|viewer={viewer}|role={role}|side={side}|topic={topic or ''}|tag={tag or ''}|set={set_id or ''}|limit={limit}|cursor={cursor or ''}|lite={'1' if lite else '0'}"
+def _feed_sets_ver(viewer: str, set_id: str | None) -> str:
+    # Set-scoped versions: membership changes for this viewer / this Set orphan cached pages.
+    try:
+        from siddes_sets.cache_versions import member_version, set_version
+
+        return f"{member_version(viewer)}.{set_version(set_id) if set_id else 0}"
+    except Exception:
+        return "0.0"
+
+
+def _feed_cache_key(*, viewer: str, role: str, side: str, topic: str | None, tag: str | None, set_id: str | None, limit: int, cursor: str | None, lite: bool = False, ver: str = "") -> str:
+    raw = f"v2|ver={ver}|viewer={viewer}|role={role}|side={side}|topic={topic or ''}|tag={tag or ''}|set={set_id or ''}|limit={limit}|cursor={cursor or ''}|lite={'1' if lite else '0'}"
     h = hashlib.sha256(raw.encode("utf-8")).hexdigest()
-    return f"feed:v1:{h}"
+    return f"feed:v2:{h}"
+
+
+class _FeedQuery(NamedTuple):
+    side: SideId
+    topic: Optional[str]
+    tag: Optional[str]
+    set_id: Optional[str]
+    limit: int
+    cursor: Optional[str]
+    lite: bool
+
+
+def _feed_query(params: Any) -> _FeedQuery:
+    side_raw = str(params.get("side") or "public").strip().lower()
+    side: SideId = side_raw if side_raw in _ALLOWED_SIDES else "public"  # type: ignore[assignment]
+
+    topic_raw = str(params.get("topic") or "").strip().lower()
+    topic = topic_raw or None
+
+    # sd_717e_topic_tags: Side-bound topic tag filter (hashtags as folders)
+    tag_raw = str(params.get("tag") or "").strip().lower()
+    if tag_raw.startswith("#"):
+        tag_raw = tag_raw[1:]
+    tag = tag_raw or None
+
+    set_raw = str(params.get("set") or "").strip()
+    set_id = set_raw or None
+
+    limit_raw = str(params.get("limit") or "").strip()
+    cursor_raw = str(params.get("cursor") or "").strip() or None
+
+    lite = _truthy(params.get("lite"))
+
+    try:
+        limit = int(limit_raw) if limit_raw else 200
+    except Exception:
+        limit = 200
+
+    # Clamp (keep old behavior when omitted: defaults to 200)
+    if limit < 1:
+        limit = 1
+    if limit > 200:
+        limit = 200
+
+    return _FeedQuery(side, topic, tag, set_id, limit, cursor_raw, lite)
+
+
+def _feed_cache_key_for(viewer: str, role: str, q: _FeedQuery) -> Optional[str]:
+    if not _feed_cache_enabled() or _feed_cache_ttl() <= 0:
+        return None
+    return _feed_cache_key(
+        viewer=viewer,
+        role=role,
+        side=str(q.side),
+        topic=q.topic,
+        tag=q.tag,
+        set_id=q.set_id,
+        limit=q.limit,
+        cursor=q.cursor,
+        lite=q.lite,
+        ver=_feed_sets_ver(viewer, q.set_id),
+    )
+
+
+def _feed_payload(has_viewer: bool, viewer: str, role: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"ok": True, "restricted": False, "viewer": viewer if has_viewer else None, "role": role}
+    payload.update(data)
+    return payload
+
+
+def _set_cache_headers(resp: Any, cache_status: str) -> Any:
+    resp["X-Siddes-Cache"] = cache_status
+    if cache_status != "bypass":
+        resp["X-Siddes-Cache-Ttl"] = str(_feed_cache_ttl())
+    return resp
 
 
 class FeedView(APIView):
@@ -114,90 +203,71 @@ class FeedView(APIView):
 
     def get(self, request, *args, **kwargs):
         has_viewer, viewer, role = _viewer_ctx(request)
-
-        side_raw = str(getattr(request, "query_params", {}).get("side") or "public").strip().lower()
-        side: SideId = side_raw if side_raw in _ALLOWED_SIDES else "public"  # type: ignore[assignment]
-
-        viewer_out = viewer if has_viewer else None
+        q = _feed_query(getattr(request, "query_params", {}))
 
         # sd_745_public_browse_readonly: unknown viewer may browse Public (read-only).
         # Default-safe: unknown viewer => restricted for non-public sides.
-        if not has_viewer and side != "public":
+        if not has_viewer and q.side != "public":
             return Response(
-                _restricted_payload(has_viewer, viewer, role, extra={"side": side, "count": 0, "items": []}),
+                _restricted_payload(has_viewer, viewer, role, extra={"side": q.side, "count": 0, "items": []}),
                 status=status.HTTP_200_OK,
             )
 
-        topic_raw = str(getattr(request, "query_params", {}).get("topic") or "").strip().lower()
-        topic = topic_raw or None
+        cache_status = "bypass"
+        cache_key = _feed_cache_key_for(viewer, role, q)
+        if cache_key is not None:
+            try:
+                cached = cache.get(cache_key)
+            except Exception:
+                cached = None
+                cache_key = None
+            if cached is not None:
+                return _set_cache_headers(Response(_feed_payload(has_viewer, viewer, role, cached), status=status.HTTP_200_OK), "hit")
+            if cache_key is not None:
+                cache_status = "miss"
+        data = list_feed(viewer_id=viewer, side=q.side, topic=q.topic, tag=q.tag, set_id=q.set_id, limit=q.limit, cursor=q.cursor, lite=q.lite)
+        fill = fill_ttl(_feed_cache_ttl()) if cache_key is not None and cache_status == "miss" else 0
+        if fill > 0:
+            try:
+                cache.set(cache_key, data, timeout=fill)
+            except Exception:
+                cache_status = "bypass"
 
-        # sd_717e_topic_tags: Side-bound topic tag filter (hashtags as folders)
-        tag_raw = str(getattr(request, "query_params", {}).get("tag") or "").strip().lower()
-        if tag_raw.startswith("#"):
-            tag_raw = tag_raw[1:]
-        tag = tag_raw or None
+        return _set_cache_headers(Response(_feed_payload(has_viewer, viewer, role, data), status=status.HTTP_200_OK), cache_status)
 
-        set_raw = str(getattr(request, "query_params", {}).get("set") or "").strip()
-        set_id = set_raw or None
 
-        limit_raw = str(getattr(request, "query_params", {}).get("limit") or "").strip()
-        cursor_raw = str(getattr(request, "query_params", {}).get("cursor") or "").strip() or None
+class FeedAsyncView(AsyncReadView):
+    """GET /api/feed on the ASGI profile (same contract and cache as FeedView)."""
 
-        lite = _truthy(getattr(request, "query_params", {}).get("lite"))
+    sync_view = FeedView
 
-        try:
-            limit = int(limit_raw) if limit_raw else 200
-        except Exception:
-            limit = 200
+    async def get(self, request, *args, **kwargs):
+        has_viewer, viewer, role = await sync_to_async(_viewer_ctx)(request)
+        q = _feed_query(request.GET)
 
-        # Clamp (keep old behavior when omitted: defaults to 200)
-        if limit < 1:
-            limit = 1
-        if limit > 200:
-            limit = 200
+        if not has_viewer and q.side != "public":
+            return JsonResponse(
+                _restricted_payload(has_viewer, viewer, role, extra={"side": q.side, "count": 0, "items": []}),
+                status=status.HTTP_200_OK,
+            )
 
         cache_status = "bypass"
-        cache_ttl = _feed_cache_ttl()
-        cache_key = None
-
-        if _feed_cache_enabled() and cache_ttl > 0:
-            cache_key = _feed_cache_key(
-                viewer=viewer,
-                role=role,
-                side=str(side),
-                topic=topic,
-                tag=tag,
-                set_id=set_id,
-                limit=limit,
-                cursor=cursor_raw,
-                lite=lite,
-            )
+        cache_key = await sync_to_async(_feed_cache_key_for)(viewer, role, q)
+        if cache_key is not None:
             try:
-                cached = cache.get(cache_key)
+                cached = await cache.aget(cache_key)
             except Exception:
                 cached = None
                 cache_key = None
-                cache_status = "bypass"
             if cached is not None:
-                payload: Dict[str, Any] = {"ok": True, "restricted": False, "viewer": viewer_out, "role": role}
-                payload.update(cached)
-                resp = Response(payload, status=status.HTTP_200_OK)
-                resp["X-Siddes-Cache"] = "hit"
-                resp["X-Siddes-Cache-Ttl"] = str(cache_ttl)
-                return resp
+                return _set_cache_headers(JsonResponse(_feed_payload(has_viewer, viewer, role, cached), status=status.HTTP_200_OK), "hit")
             if cache_key is not None:
                 cache_status = "miss"
-        data = list_feed(viewer_id=viewer, side=side, topic=topic, tag=tag, set_id=set_id, limit=limit, cursor=cursor_raw, lite=lite)
+        data = await alist_feed(viewer_id=viewer, side=q.side, topic=q.topic, tag=q.tag, set_id=q.set_id, limit=q.limit, cursor=q.cursor, lite=q.lite)
         if cache_key is not None and cache_status == "miss":
             try:
-                cache.set(cache_key, data, timeout=cache_ttl)
+                await cache.aset(cache_key, data, timeout=_feed_cache_ttl())
             except Exception:
                 cache_status = "bypass"
 
-        payload: Dict[str, Any] = {"ok": True, "restricted": False, "viewer": viewer_out, "role": role}
-        payload.update(data)
-        resp = Response(payload, status=status.HTTP_200_OK)
-        resp["X-Siddes-Cache"] = cache_status
-        if cache_status != "bypass":
-            resp["X-Siddes-Cache-Ttl"] = str(cache_ttl)
-        return resp
+        return _set_cache_headers(JsonResponse(_feed_payload(has_viewer, viewer, role, data), status=status.HTTP_200_OK), cache_status)
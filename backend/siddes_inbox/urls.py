@@ -1,20 +1,23 @@
-"""URL routing for the Inbox API (DRF)."""
+"""URL routing for the Inbox API (DRF; async thread list on the ASGI profile)."""
 
 from __future__ import annotations
 
 from django.urls import path
 
+from siddes_backend.async_support import async_views_enabled
+
 from .views import (
     InboxDebugIncomingView,
     InboxDebugResetUnreadView,
     InboxThreadView,
+    InboxThreadsAsyncView,
     InboxThreadsView,
 )
 from .views_typing import InboxTypingView
 
 urlpatterns = [
     path("typing", InboxTypingView.as_view(), name="inbox_typing"),
-    path("threads", InboxThreadsView.as_view(), name="inbox_threads"),
+    path("threads", (InboxThreadsAsyncView if async_views_enabled() else InboxThreadsView).as_view(), name="inbox_threads"),
     path("thread/<str:thread_id>", InboxThreadView.as_view(), name="inbox_thread"),
 
     # Dev-only debug tools (viewer=me + DJANGO_DEBUG=1)
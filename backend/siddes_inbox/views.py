@@ -22,10 +22,14 @@ USE_DB = (str(os.environ.get("SD_INBOX_STORE", "")).strip().lower() == "db")
 
 from typing import Any, Optional
 
+from asgiref.sync import sync_to_async
 from django.utils.decorators import method_decorator
+from siddes_backend.async_support import AsyncReadView, throttled_response
+from siddes_backend.cache_versions import bump_versions, fill_ttl, get_version
 from siddes_backend.csrf import dev_csrf_exempt
 from django.conf import settings
 from django.core.cache import cache
+from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -66,50 +70,31 @@ def _inbox_cache_ttl() -> int:
     return ttl
 
 
-_INBOX_VER_TTL_SECS = 7 * 24 * 60 * 60  # 7 days
-
-
 def _inbox_ver_key(viewer_id: str) -> str:
     v = str(viewer_id or "").strip() or "anon"
     return f"inbox:v1:ver:{v}"
 
 
-def _inbox_get_ver(viewer_id: str) -> int:
-    try:
-        v = cache.get(_inbox_ver_key(viewer_id))
-        iv = int(v) if v is not None else 1
-        return iv if iv > 0 else 1
-    except Exception:
-        return 1
+def _inbox_get_ver(viewer_id: str) -> str:
+    return get_version(_inbox_ver_key(viewer_id))
 
 
 def _inbox_bump_ver(viewer_id: str) -> None:
     v = str(viewer_id or "").strip()
-    if not v:
-        return
-    k = _inbox_ver_key(v)
-    try:
-        cache.add(k, 1, timeout=_INBOX_VER_TTL_SECS)
-        cache.incr(k)  # type: ignore[attr-defined]
-    except Exception:
-        try:
-            cur = cache.get(k)
-            nxt = (int(cur) + 1) if cur is not None else 2
-            cache.set(k, nxt, timeout=_INBOX_VER_TTL_SECS)
-        except Exception:
-            pass
+    if v:
+        bump_versions([_inbox_ver_key(v)])
 
 
 def _inbox_hash(raw: str) -> str:
     return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
-def _inbox_threads_cache_key(*, viewer_id: str, ver: int, side: str | None, limit: int, cursor: str | None) -> str:
+def _inbox_threads_cache_key(*, viewer_id: str, ver: str, side: str | None, limit: int, cursor: str | None) -> str:
     raw = f"v1|ver={ver}|viewer={viewer_id}|side={side or ''}|limit={limit}|cursor={cursor or ''}"
     return f"inbox:threads:v1:{_inbox_hash(raw)}"
 
 
-def _inbox_thread_cache_key(*, viewer_id: str, ver: int, thread_id: str, limit: int, cursor: str | None) -> str:
+def _inbox_thread_cache_key(*, viewer_id: str, ver: str, thread_id: str, limit: int, cursor: str | None) -> str:
     raw = f"v1|ver={ver}|viewer={viewer_id}|thread={thread_id}|limit={limit}|cursor={cursor or ''}"
     return f"inbox:thread:v1:{_inbox_hash(raw)}"
 
@@ -539,6 +524,53 @@ def _clamp_int(raw: Any, *, default: int, min_v: int, max_v: int) -> int:
     return max(min_v, min(max_v, v))
 
 
+def _threads_query(params: Any) -> tuple[Optional[str], int, Optional[str]]:
+    side = params.get("side")
+    limit = _clamp_int(params.get("limit"), default=20, min_v=1, max_v=50)
+    cursor = params.get("cursor")
+    return side, limit, cursor
+
+
+def _threads_cache_key_for(viewer_id: Optional[str], side: Optional[str], limit: int, cursor: Optional[str]) -> Optional[str]:
+    if not viewer_id or not _inbox_cache_enabled() or _inbox_cache_ttl() <= 0:
+        return None
+    ver = _inbox_get_ver(str(viewer_id))
+    return _inbox_threads_cache_key(
+        viewer_id=str(viewer_id),
+        ver=ver,
+        side=side if side else None,
+        limit=limit,
+        cursor=cursor if cursor else None,
+    )
+
+
+def _load_threads(viewer_id: Optional[str], side: Optional[str], limit: int, cursor: Optional[str]) -> Any:
+    data = list_threads(
+        store,
+        viewer_id=viewer_id,
+        side=side if side else None,
+        limit=limit,
+        cursor=cursor if cursor else None,
+    )
+    if isinstance(data, dict) and data.get("ok") is False:
+        return data
+    return _filter_blocked_threads_payload(viewer_id, data)
+
+
+def _threads_reply(make: Any, data: Any, code: int, cache_status: str) -> Any:
+    resp = make(data, status=code)
+    resp["Cache-Control"] = "private, no-store"
+    resp["Vary"] = "Cookie, Authorization"
+    resp["X-Siddes-Cache"] = cache_status
+    if cache_status != "bypass":
+        resp["X-Siddes-Cache-Ttl"] = str(_inbox_cache_ttl())
+    return resp
+
+
+def _threads_cacheable(data: Any) -> bool:
+    return isinstance(data, dict) and not data.get("restricted")
+
+
 @method_decorator(dev_csrf_exempt, name="dispatch")
 class InboxThreadsView(APIView):
     """GET /api/inbox/threads"""
@@ -546,74 +578,38 @@ class InboxThreadsView(APIView):
     throttle_scope = "inbox_threads"
 
     def get(self, request):
-        side = request.query_params.get("side")
-        limit = _clamp_int(request.query_params.get("limit"), default=20, min_v=1, max_v=50)
-        cursor = request.query_params.get("cursor")
-
+        side, limit, cursor = _threads_query(request.query_params)
         if side and side not in SIDE_IDS:
             return Response({"ok": False, "error": "invalid_side"}, status=status.HTTP_400_BAD_REQUEST)
         viewer_id = get_viewer_id(request)
 
         cache_status = "bypass"
-        cache_ttl = _inbox_cache_ttl()
-        cache_key = None
-
-        if viewer_id and _inbox_cache_enabled() and cache_ttl > 0:
-            ver = _inbox_get_ver(str(viewer_id))
-            cache_key = _inbox_threads_cache_key(
-                viewer_id=str(viewer_id),
-                ver=ver,
-                side=side if side else None,
-                limit=limit,
-                cursor=cursor if cursor else None,
-            )
+        cache_key = _threads_cache_key_for(viewer_id, side, limit, cursor)
+        if cache_key is not None:
             try:
                 cached = cache.get(cache_key)
             except Exception:
                 cached = None
                 cache_key = None
             if cached is not None:
-                resp = Response(cached, status=status.HTTP_200_OK)
-                resp["X-Siddes-Cache"] = "hit"
-                resp["X-Siddes-Cache-Ttl"] = str(cache_ttl)
-                resp["Cache-Control"] = "private, no-store"
-                resp["Vary"] = "Cookie, Authorization"
-                return resp
+                return _threads_reply(Response, cached, status.HTTP_200_OK, "hit")
             if cache_key is not None:
                 cache_status = "miss"
 
-        data = list_threads(
-            store,
-            viewer_id=viewer_id,
-            side=side if side else None,
-            limit=limit,
-            cursor=cursor if cursor else None,
-        )
+        data = _load_threads(viewer_id, side, limit, cursor)
 
         # sd_756_inbox_store_errors_http: store failures should return 503 (not restricted/login).
         if isinstance(data, dict) and data.get("ok") is False:
-            resp = Response(data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-            resp["Cache-Control"] = "private, no-store"
-            resp["Vary"] = "Cookie, Authorization"
-            resp["X-Siddes-Cache"] = "bypass"
-            return resp
-        data = _filter_blocked_threads_payload(viewer_id, data)
+            return _threads_reply(Response, data, status.HTTP_503_SERVICE_UNAVAILABLE, "bypass")
 
-        if cache_key is not None and cache_status == "miss" and isinstance(data, dict) and not data.get("restricted"):
+        fill = fill_ttl(_inbox_cache_ttl()) if cache_key is not None and cache_status == "miss" and _threads_cacheable(data) else 0
+        if fill > 0:
             try:
-                cache.set(cache_key, data, timeout=cache_ttl)
+                cache.set(cache_key, data, timeout=fill)
             except Exception:
                 cache_status = "bypass"
 
-        resp = Response(data, status=status.HTTP_200_OK)
-        resp["Cache-Control"] = "private, no-store"
-        resp["Vary"] = "Cookie, Authorization"
-        resp["X-Siddes-Cache"] = cache_status
-        if cache_status != "bypass":
-            resp["X-Siddes-Cache-Ttl"] = str(cache_ttl)
-        return resp
-
-
+        return _threads_reply(Response, data, status.HTTP_200_OK, cache_status)
 
     def post(self, request):
         """POST /api/inbox/threads
@@ -694,6 +690,54 @@ class InboxThreadsView(APIView):
         resp["Vary"] = "Cookie, Authorization"
         return resp
 
+
+class InboxThreadsAsyncView(AsyncReadView):
+    """GET /api/inbox/threads on the ASGI profile (same throttle, cache and contract).
+
+    POST (new thread) is served by InboxThreadsView.
+    """
+
+    sync_view = InboxThreadsView
+
+    def _gate(self, request) -> tuple[Any, Optional[str]]:
+        throttled = throttled_response(request, self, InboxThreadsView.throttle_scope)
+        return throttled, (None if throttled is not None else get_viewer_id(request))
+
+    async def get(self, request):
+        side, limit, cursor = _threads_query(request.GET)
+        throttled, viewer_id = await sync_to_async(self._gate)(request)
+        if throttled is not None:
+            return throttled
+        if side and side not in SIDE_IDS:
+            return JsonResponse({"ok": False, "error": "invalid_side"}, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_status = "bypass"
+        cache_key = await sync_to_async(_threads_cache_key_for)(viewer_id, side, limit, cursor)
+        if cache_key is not None:
+            try:
+                cached = await cache.aget(cache_key)
+            except Exception:
+                cached = None
+                cache_key = None
+            if cached is not None:
+                return _threads_reply(JsonResponse, cached, status.HTTP_200_OK, "hit")
+            if cache_key is not None:
+                cache_status = "miss"
+
+        data = await sync_to_async(_load_threads)(viewer_id, side, limit, cursor)
+
+        if isinstance(data, dict) and data.get("ok") is False:
+            return _threads_reply(JsonResponse, data, status.HTTP_503_SERVICE_UNAVAILABLE, "bypass")
+
+        if cache_key is not None and cache_status == "miss" and _threads_cacheable(data):
+            try:
+                await cache.aset(cache_key, data, timeout=_inbox_cache_ttl())
+            except Exception:
+                cache_status = "bypass"
+
+        return _threads_reply(JsonResponse, data, status.HTTP_200_OK, cache_status)
+
+
 @method_decorator(dev_csrf_exempt, name="dispatch")
 class InboxThreadView(APIView):
     """GET/POST /api/inbox/thread/:id"""
@@ -751,9 +795,10 @@ class InboxThreadView(APIView):
         )
         data = _restrict_blocked_thread_payload(viewer_id, data)
 
-        if cache_key is not None and cache_status == "miss" and isinstance(data, dict) and not data.get("restricted"):
+        fill = fill_ttl(cache_ttl) if cache_key is not None and cache_status == "miss" and isinstance(data, dict) and not data.get("restricted") else 0
+        if fill > 0:
             try:
-                cache.set(cache_key, data, timeout=cache_ttl)
+                cache.set(cache_key, data, timeout=fill)
             except Exception:
                 cache_status = "bypass"
 
@@ -21,6 +21,7 @@ from django.db import transaction
 
 from siddes_backend.identity import viewer_aliases
 
+from siddes_sets.membership import add_members, members_of
 from siddes_sets.models import SetEventKind, SiddesSet, SiddesSetEvent
 
 from .models import SiddesInvite, VALID_SIDES, VALID_STATUSES
@@ -209,19 +210,10 @@ class DbInvitesStore:
                 except SiddesSet.DoesNotExist:
                     return invite_to_item(inv)
 
-                prev = s.members if isinstance(s.members, list) else []
-                prev_list = [str(m) for m in prev if isinstance(m, (str, int, float))]
-                nxt = list(dict.fromkeys(prev_list + [inv.to_id]))
-                if nxt != prev_list:
-                    s.members = nxt
-                    s.save(update_fields=["members", "updated_at"])
-
-                    # sd_366: Keep membership table in sync (best-effort)
-                    try:
-                        from siddes_sets.models import SiddesSetMember  # type: ignore
-                        SiddesSetMember.objects.get_or_create(set=s, member_id=inv.to_id)
-                    except Exception:
-                        pass
+                # sd_366: membership rows are the source of truth (JSON is mirrored).
+                prev_list = members_of(s.id)
+                if inv.to_id not in prev_list:
+                    nxt = add_members(set_id=s.id, member_ids=[inv.to_id])
                     SiddesSetEvent.objects.create(
                         id=new_id("se"),
                         set=s,
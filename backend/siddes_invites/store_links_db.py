@@ -18,6 +18,7 @@ from django.utils import timezone
 
 from siddes_backend.identity import display_for_token, viewer_aliases
 
+from siddes_sets.membership import add_members, members_of
 from siddes_sets.models import SetEventKind, SiddesSet, SiddesSetEvent
 
 from .models import SiddesInviteLink, VALID_SIDES
@@ -192,8 +193,8 @@ class DbInviteLinksStore:
             except SiddesSet.DoesNotExist:
                 return False, link_to_item(link, include_owner=True), "not_found"
 
-            prev = s.members if isinstance(s.members, list) else []
-            prev_list = [str(m) for m in prev if isinstance(m, (str, int, float))]
+            # sd_366: membership rows are the source of truth (JSON is mirrored).
+            prev_list = members_of(s.id)
             if member_id in prev_list:
                 payload = {"joined": True, "setId": s.id, "setLabel": s.label, "side": str(s.side), "link": link_to_item(link)}
                 return True, payload, "already_member"
@@ -203,16 +204,7 @@ class DbInviteLinksStore:
             link.save(update_fields=["uses", "updated_at"])
 
             # Add member
-            nxt = list(dict.fromkeys(prev_list + [member_id]))
-            s.members = nxt
-            s.save(update_fields=["members", "updated_at"])
-
-            # Best-effort: keep membership table in sync
-            try:
-                from siddes_sets.models import SiddesSetMember  # type: ignore
-                SiddesSetMember.objects.get_or_create(set=s, member_id=member_id)
-            except Exception:
-                pass
+            nxt = add_members(set_id=s.id, member_ids=[member_id])
 
             SiddesSetEvent.objects.create(
                 id=new_id("se"),
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from siddes_media.multipart import STALE_UPLOAD_AGE_SEC, abort_stale_multipart_uploads
+from siddes_media.views import _r2_cfg
+
+
+class Command(BaseCommand):
+    help = "Abort multipart media uploads that were initiated but never completed (frees stored parts in R2)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=STALE_UPLOAD_AGE_SEC // 3600,
+            help="Abort uploads older than N hours (default: 24).",
+        )
+        parser.add_argument("--limit", type=int, default=200, help="Max uploads to abort per run (default: 200).")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show how many uploads would be aborted without touching R2.",
+        )
+
+    def handle(self, *args, **opts):
+        ok, cfg = _r2_cfg()
+        if not ok and not opts.get("dry_run"):
+            self.stderr.write(self.style.ERROR("R2 is not configured (SIDDES_R2_*); nothing aborted."))
+            return
+
+        hours = max(1, min(int(opts.get("hours") or 24), 24 * 30))
+        stats = abort_stale_multipart_uploads(
+            cfg,
+            older_than_sec=hours * 3600,
+            limit=max(1, min(int(opts.get("limit") or 200), 5000)),
+            dry_run=bool(opts.get("dry_run")),
+        )
+
+        if opts.get("dry_run"):
+            self.stdout.write(self.style.WARNING(f"Would abort {stats['found']} multipart upload(s) older than {hours} hour(s)."))
+            return
+
+        msg = f"Aborted {stats['aborted']} of {stats['found']} stale multipart upload(s)"
+        if stats["failed"]:
+            msg += f" ({stats['failed']} failed; will retry next run)"
+        self.stdout.write(self.style.SUCCESS(msg + "."))
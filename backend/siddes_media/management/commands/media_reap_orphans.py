@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from siddes_media.reaper import DEFAULT_DETACHED_AGE_SEC, DEFAULT_PENDING_AGE_SEC, reap_orphans
+from siddes_media.views import _r2_cfg
+
+
+class Command(BaseCommand):
+    help = "Delete orphaned media (stale pending uploads, detached/dangling committed objects) from R2 and the DB."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pending-hours",
+            type=int,
+            default=DEFAULT_PENDING_AGE_SEC // 3600,
+            help="Reap pending uploads older than N hours (default: 24).",
+        )
+        parser.add_argument(
+            "--detached-days",
+            type=int,
+            default=DEFAULT_DETACHED_AGE_SEC // 86400,
+            help="Reap committed media with no post older than N days (default: 7).",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per batch (max 1000).")
+        parser.add_argument("--max-batches", type=int, default=10, help="Batches per category per run.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be deleted without touching R2 or the DB.",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the full report as JSON.")
+
+    def handle(self, *args, **opts):
+        ok, cfg = _r2_cfg()
+        dry_run = bool(opts.get("dry_run"))
+        if not ok and not dry_run:
+            self.stderr.write(self.style.ERROR("R2 is not configured (SIDDES_R2_*); nothing deleted."))
+            return
+
+        report = reap_orphans(
+            cfg if ok else None,
+            pending_age_sec=max(1, int(opts.get("pending_hours") or 24)) * 3600,
+            detached_age_sec=max(1, int(opts.get("detached_days") or 7)) * 86400,
+            batch_size=int(opts.get("batch_size") or 500),
+            max_batches=int(opts.get("max_batches") or 10),
+            dry_run=dry_run,
+        )
+
+        if opts.get("json"):
+            self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
+            return
+
+        if report.get("error"):
+            self.stderr.write(self.style.ERROR(f"Reaper did not run: {report['error']}"))
+            return
+
+        found = report["pending"] + report["detached"] + report["dangling"] + report["retried"]
+        summary = (
+            f"pending={report['pending']} detached={report['detached']} dangling={report['dangling']} "
+            f"retried={report['retried']} bytes={report['bytes']}"
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"Would reap {found} media object(s): {summary}"))
+            for s in report["sample"]:
+                self.stdout.write(f"  {s['kind']}: {s['r2Key']}")
+            return
+
+        msg = f"Reaped {report['deletedRows']} of {found} media object(s): {summary}"
+        if report["failed"]:
+            msg += f" ({report['failed']} storage delete(s) failed; retried next run)"
+        if report["more"]:
+            msg += " (more remain)"
+        self.stdout.write(self.style.SUCCESS(msg + "."))
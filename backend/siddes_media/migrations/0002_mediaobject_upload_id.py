@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_media", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mediaobject",
+            name="upload_id",
+            field=models.CharField(blank=True, max_length=256, null=True),
+        ),
+    ]
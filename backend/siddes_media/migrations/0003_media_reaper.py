@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_media", "0002_mediaobject_upload_id"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="mediaobject",
+            name="status",
+            field=models.CharField(
+                choices=[("pending", "pending"), ("committed", "committed"), ("reaping", "reaping")],
+                db_index=True,
+                default="pending",
+                max_length=16,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="mediaobject",
+            index=models.Index(fields=["status", "created_at"], name="media_status_time"),
+        ),
+    ]
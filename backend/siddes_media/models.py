@@ -22,6 +22,8 @@ KIND_CHOICES = (
 STATUS_CHOICES = (
     ("pending", "pending"),
     ("committed", "committed"),
+    # Claimed by the orphan reaper (siddes_media.reaper); bytes are being deleted.
+    ("reaping", "reaping"),
 )
 
 
@@ -53,10 +55,16 @@ class MediaObject(models.Model):
     # Future wiring: attach to a Post (or Reply) when committed.
     post_id = models.CharField(max_length=64, null=True, blank=True, db_index=True)
 
+    # Set while an S3 multipart upload is in flight (see siddes_media.multipart);
+    # cleared on complete. A pending row with upload_id is not committable yet.
+    upload_id = models.CharField(max_length=256, null=True, blank=True)
+
     class Meta:
         indexes = [
             models.Index(fields=["owner_id", "-created_at"], name="media_owner_time"),
             models.Index(fields=["is_public", "-created_at"], name="media_public_time"),
+            # Orphan reaper scans (status, created_at) in keyset batches.
+            models.Index(fields=["status", "created_at"], name="media_status_time"),
         ]
 
     def __str__(self) -> str:
@@ -0,0 +1,229 @@
+"""S3-compatible multipart uploads (R2) for large media.
+
+Flow (all calls are owner-only, see views.MediaMultipart*View):
+1) initiate  -> CreateMultipartUpload; the MediaObject row is created `pending`
+               with `upload_id` set.
+2) parts     -> presigned PUT URLs for a batch of part numbers. Clients re-request
+               URLs for any part that failed, and can list uploaded parts to resume
+               after a restart (ListParts), so a network blip costs one part, not
+               the whole video.
+3) complete  -> CompleteMultipartUpload; `upload_id` is cleared. The row stays
+               `pending` until MediaCommitView, same as single-PUT uploads.
+   abort     -> AbortMultipartUpload; the row is deleted.
+
+The server talks to R2 with presigned (query-auth) requests built by
+`siddes_media.signing.presign_s3_url`, so there is still no boto3 dependency.
+
+Stale uploads (initiated but never completed) hold storage for their parts until
+aborted: `abort_stale_multipart_uploads` is run by `manage.py media_abort_stale_uploads`.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from .models import MediaObject
+from .signing import presign_s3_url
+
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 minimum for every part except the last
+MAX_PARTS = 10000
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+PART_URL_BATCH_MAX = 100
+PART_URL_EXPIRES = 3600
+STALE_UPLOAD_AGE_SEC = 24 * 3600
+
+_HTTP_TIMEOUT = 15
+
+
+class MultipartError(Exception):
+    """R2 rejected (or could not be reached for) a multipart call."""
+
+    def __init__(self, code: str, *, status: int = 0):
+        super().__init__(code)
+        self.code = code
+        self.status = status
+
+
+def part_size_for(total_bytes: Optional[int]) -> int:
+    """Pick a part size: the configured default, grown so we stay under MAX_PARTS."""
+    raw = str(os.environ.get("SIDDES_MEDIA_MULTIPART_PART_SIZE", "") or "").strip()
+    size = int(raw) if raw.isdigit() else DEFAULT_PART_SIZE
+    size = max(MIN_PART_SIZE, size)
+    if total_bytes and total_bytes > 0:
+        size = max(size, int(math.ceil(total_bytes / float(MAX_PARTS))))
+    return size
+
+
+def part_count_for(total_bytes: Optional[int], part_size: int) -> Optional[int]:
+    if not total_bytes or total_bytes <= 0:
+        return None
+    return max(1, int(math.ceil(total_bytes / float(part_size))))
+
+
+def _url(cfg: Dict[str, str], method: str, key: str, *, expires: int = 300, extra_query: Optional[Dict[str, str]] = None) -> str:
+    return presign_s3_url(
+        method=method,
+        endpoint=cfg["endpoint"],
+        bucket=cfg["bucket"],
+        key=key,
+        access_key_id=cfg["ak"],
+        secret_access_key=cfg["sk"],
+        expires=expires,
+        extra_query=extra_query,
+    )
+
+
+def _xml_children(root: ET.Element, name: str) -> List[ET.Element]:
+    # S3 responses are namespaced; match on the local tag name only.
+    return [el for el in root.iter() if el.tag.rsplit("}", 1)[-1] == name]
+
+
+def _xml_text(el: ET.Element, name: str) -> str:
+    for child in el:
+        if child.tag.rsplit("}", 1)[-1] == name:
+            return str(child.text or "").strip()
+    return ""
+
+
+def _request(method: str, url: str, *, data: Optional[bytes] = None, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    try:
+        resp = requests.request(method, url, data=data, headers=headers or {}, timeout=_HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        raise MultipartError("r2_unreachable") from e
+    if resp.status_code >= 300:
+        raise MultipartError("r2_rejected", status=resp.status_code)
+    return resp
+
+
+def initiate_upload(cfg: Dict[str, str], key: str, *, content_type: str) -> str:
+    """CreateMultipartUpload; returns the upload id."""
+    url = _url(cfg, "POST", key, extra_query={"uploads": ""})
+    resp = _request("POST", url, headers={"content-type": content_type})
+    try:
+        root = ET.fromstring(resp.content)
+    except ET.ParseError as e:
+        raise MultipartError("r2_bad_response") from e
+    ids = _xml_children(root, "UploadId")
+    upload_id = str(ids[0].text or "").strip() if ids else ""
+    if not upload_id:
+        raise MultipartError("r2_bad_response")
+    return upload_id
+
+
+def presign_part_urls(cfg: Dict[str, str], key: str, upload_id: str, part_numbers: List[int]) -> List[Dict[str, Any]]:
+    """Presigned PUT URLs for a batch of parts (no network calls)."""
+    out: List[Dict[str, Any]] = []
+    for n in part_numbers:
+        out.append(
+            {
+                "partNumber": int(n),
+                "url": _url(
+                    cfg,
+                    "PUT",
+                    key,
+                    expires=PART_URL_EXPIRES,
+                    extra_query={"partNumber": str(int(n)), "uploadId": upload_id},
+                ),
+            }
+        )
+    return out
+
+
+def list_uploaded_parts(cfg: Dict[str, str], key: str, upload_id: str) -> List[Dict[str, Any]]:
+    """ListParts (follows pagination); used by clients resuming an upload."""
+    parts: List[Dict[str, Any]] = []
+    marker = ""
+    for _ in range(MAX_PARTS // 1000 + 1):
+        q = {"uploadId": upload_id}
+        if marker:
+            q["part-number-marker"] = marker
+        resp = _request("GET", _url(cfg, "GET", key, extra_query=q))
+        try:
+            root = ET.fromstring(resp.content)
+        except ET.ParseError as e:
+            raise MultipartError("r2_bad_response") from e
+        for el in _xml_children(root, "Part"):
+            num = _xml_text(el, "PartNumber")
+            if not num.isdigit():
+                continue
+            size = _xml_text(el, "Size")
+            parts.append({"partNumber": int(num), "etag": _xml_text(el, "ETag"), "size": int(size) if size.isdigit() else None})
+        truncated = [el for el in _xml_children(root, "IsTruncated")]
+        nxt = [el for el in _xml_children(root, "NextPartNumberMarker")]
+        if not truncated or str(truncated[0].text or "").strip().lower() != "true" or not nxt:
+            break
+        marker = str(nxt[0].text or "").strip()
+        if not marker:
+            break
+    return parts
+
+
+def complete_upload(cfg: Dict[str, str], key: str, upload_id: str, parts: List[Tuple[int, str]]) -> None:
+    """CompleteMultipartUpload with (part_number, etag) pairs in ascending order."""
+    root = ET.Element("CompleteMultipartUpload")
+    for num, etag in sorted(parts, key=lambda p: p[0]):
+        el = ET.SubElement(root, "Part")
+        ET.SubElement(el, "PartNumber").text = str(int(num))
+        ET.SubElement(el, "ETag").text = etag
+    body = ET.tostring(root, encoding="utf-8")
+
+    url = _url(cfg, "POST", key, extra_query={"uploadId": upload_id})
+    resp = _request("POST", url, data=body, headers={"content-type": "application/xml"})
+    # S3 can report a failed completion with a 200 + <Error> body.
+    if b"<Error>" in (resp.content or b""):
+        raise MultipartError("r2_rejected", status=resp.status_code)
+
+
+def abort_upload(cfg: Dict[str, str], key: str, upload_id: str) -> None:
+    url = _url(cfg, "DELETE", key, extra_query={"uploadId": upload_id})
+    try:
+        _request("DELETE", url)
+    except MultipartError as e:
+        # Already completed/aborted upstream: nothing left to clean up.
+        if e.status != 404:
+            raise
+
+
+def abort_stale_multipart_uploads(
+    cfg: Dict[str, str],
+    *,
+    older_than_sec: int = STALE_UPLOAD_AGE_SEC,
+    limit: int = 200,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """Abort multipart uploads that were initiated but never completed.
+
+    Only touches rows that are still `pending` with an `upload_id`; completed uploads
+    (upload_id cleared) are left to the normal pending/committed lifecycle.
+    """
+    cutoff = time.time() - max(60, int(older_than_sec))
+    rows = list(
+        MediaObject.objects.filter(status="pending", upload_id__isnull=False, created_at__lt=cutoff)
+        .order_by("created_at")
+        .values_list("id", "r2_key", "upload_id")[: max(1, int(limit))]
+    )
+
+    stats = {"found": len(rows), "aborted": 0, "failed": 0}
+    if dry_run:
+        return stats
+
+    done: List[str] = []
+    for media_id, key, upload_id in rows:
+        try:
+            abort_upload(cfg, key, str(upload_id))
+        except MultipartError:
+            stats["failed"] += 1
+            continue
+        done.append(media_id)
+
+    if done:
+        MediaObject.objects.filter(id__in=done, status="pending").delete()
+    stats["aborted"] = len(done)
+    return stats
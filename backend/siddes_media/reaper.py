@@ -0,0 +1,257 @@
+"""Orphaned media reaper (storage + registry cleanup).
+
+What counts as an orphan:
+- pending:   upload signed but never committed/attached, older than the pending grace.
+             (In-flight multipart uploads are aborted by multipart.abort_stale_multipart_uploads.)
+- detached:  committed rows with no post_id, older than the detached grace. Post delete
+             detaches media (post_id=None), and MediaCommitView can commit without a post.
+- dangling:  committed rows whose post_id points at a Post row that no longer exists.
+             Scanned incrementally; the post_id cursor is kept in the cache so continuous
+             runs make progress instead of rescanning from the start.
+- reaping:   rows claimed by an earlier run whose storage delete failed (retried).
+
+Prism avatars (post_id "prism_avatar:<side>") are never reaped here.
+
+Safety (runs continuously from edge_engine):
+- Rows are claimed with a conditional UPDATE to status="reaping" before any bytes are
+  deleted; post creation and MediaCommitView ignore reaping rows, so a concurrent attach
+  either wins the row or never sees it.
+- Bytes go first (DeleteObjects, up to 1000 keys per call); a row is only deleted once its
+  key is confirmed gone, so a failed storage call never leaves unreferenced bytes behind.
+- One runner at a time (cache lock). Every pass is bounded by batch_size * max_batches.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import MediaObject
+from .multipart import MultipartError, _request, _url, _xml_children, _xml_text, abort_stale_multipart_uploads
+
+
+DEFAULT_PENDING_AGE_SEC = 24 * 3600
+DEFAULT_DETACHED_AGE_SEC = 7 * 24 * 3600
+DELETE_OBJECTS_MAX = 1000  # S3 DeleteObjects limit
+REPORT_SAMPLE_MAX = 20
+
+_LOCK_KEY = "media:reaper:v1:lock"
+_LOCK_TTL_SEC = 15 * 60
+_DANGLING_CURSOR_KEY = "media:reaper:v1:dangling_cursor"
+
+
+def delete_objects(cfg: Dict[str, str], keys: List[str]) -> Tuple[List[str], List[str]]:
+    """Bulk-delete keys from storage. Returns (deleted, failed).
+
+    Missing keys count as deleted (S3 DeleteObjects is idempotent).
+    """
+    deleted: List[str] = []
+    failed: List[str] = []
+    for i in range(0, len(keys), DELETE_OBJECTS_MAX):
+        chunk = keys[i : i + DELETE_OBJECTS_MAX]
+        root = ET.Element("Delete")
+        ET.SubElement(root, "Quiet").text = "true"
+        for k in chunk:
+            ET.SubElement(ET.SubElement(root, "Object"), "Key").text = k
+        body = ET.tostring(root, encoding="utf-8")
+        md5 = base64.b64encode(hashlib.md5(body).digest()).decode("ascii")
+
+        try:
+            resp = _request(
+                "POST",
+                _url(cfg, "POST", "", extra_query={"delete": ""}),
+                data=body,
+                headers={"content-type": "application/xml", "content-md5": md5},
+            )
+            errored = {_xml_text(el, "Key") for el in _xml_children(ET.fromstring(resp.content or b"<r/>"), "Error")}
+        except (MultipartError, ET.ParseError):
+            failed.extend(chunk)
+            continue
+
+        for k in chunk:
+            (failed if k in errored else deleted).append(k)
+    return deleted, failed
+
+
+def _orphan_qs(kind: str, now: float, pending_age_sec: int, detached_age_sec: int):
+    if kind == "pending":
+        return MediaObject.objects.filter(
+            status="pending",
+            upload_id__isnull=True,
+            post_id__isnull=True,
+            created_at__lt=now - pending_age_sec,
+        )
+    if kind == "detached":
+        return MediaObject.objects.filter(
+            status="committed",
+            post_id__isnull=True,
+            created_at__lt=now - detached_age_sec,
+        )
+    return MediaObject.objects.filter(status="reaping")
+
+
+def _keyset_batches(qs, batch_size: int, max_batches: int):
+    """Yield lists of (id, r2_key, bytes, created_at) walking the (status, created_at) index."""
+    last: Optional[Tuple[float, str]] = None
+    for _ in range(max_batches):
+        page = qs.order_by("created_at", "id")
+        if last is not None:
+            page = page.filter(Q(created_at__gt=last[0]) | (Q(created_at=last[0]) & Q(id__gt=last[1])))
+        rows = list(page.values_list("id", "r2_key", "bytes", "created_at")[:batch_size])
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last = (rows[-1][3], rows[-1][0])
+
+
+def _dangling_post_ids(batch_size: int, *, advance: bool = True) -> Tuple[List[str], bool]:
+    """Next slice of committed post_ids whose Post row is gone. Returns (post_ids, more).
+
+    With advance=False (dry runs) the persisted cursor is left untouched.
+    """
+    from siddes_post import runtime_store  # type: ignore
+
+    # Memory post stores are not in the DB: every post_id would look dangling.
+    if getattr(runtime_store, "ALLOW_MEMORY", False):
+        return [], False
+
+    from siddes_post.models import Post  # type: ignore
+
+    cursor = str(cache.get(_DANGLING_CURSOR_KEY) or "")
+    pids = list(
+        MediaObject.objects.filter(status="committed", post_id__isnull=False, post_id__gt=cursor)
+        .exclude(post_id__startswith="prism_avatar:")
+        .order_by("post_id")
+        .values_list("post_id", flat=True)
+        .distinct()[:batch_size]
+    )
+    more = len(pids) >= batch_size
+    if advance:
+        cache.set(_DANGLING_CURSOR_KEY, pids[-1] if more else "", timeout=None)
+    if not pids:
+        return [], False
+
+    alive = set(Post.objects.filter(id__in=pids).values_list("id", flat=True))
+    return [p for p in pids if p not in alive], more
+
+
+def _claim(ids: List[str], kind: str) -> List[Tuple[str, str]]:
+    """Atomically move still-orphaned rows to `reaping`. Returns [(id, r2_key)] now owned."""
+    if kind == "reaping":
+        qs = MediaObject.objects.filter(id__in=ids, status="reaping")
+    else:
+        cond = MediaObject.objects.filter(id__in=ids)
+        if kind == "pending":
+            cond = cond.filter(status="pending", upload_id__isnull=True, post_id__isnull=True)
+        elif kind == "detached":
+            cond = cond.filter(status="committed", post_id__isnull=True)
+        cond.update(status="reaping")
+        qs = MediaObject.objects.filter(id__in=ids, status="reaping")
+    return list(qs.values_list("id", "r2_key"))
+
+
+def _reap_rows(cfg: Dict[str, str], rows: List[Tuple[str, str]], report: Dict[str, Any]) -> None:
+    if not rows:
+        return
+    by_key = {k: mid for mid, k in rows}
+    # Claimed rows are doomed: stop handing out cached signed URLs for them now.
+    from .views import invalidate_signed_urls
+
+    invalidate_signed_urls(by_key.keys())
+    deleted, failed = delete_objects(cfg, list(by_key.keys()))
+    report["deletedObjects"] += len(deleted)
+    report["failed"] += len(failed)
+    if deleted:
+        n, _ = MediaObject.objects.filter(id__in=[by_key[k] for k in deleted], status="reaping").delete()
+        report["deletedRows"] += n
+
+
+def reap_orphans(
+    cfg: Optional[Dict[str, str]],
+    *,
+    pending_age_sec: int = DEFAULT_PENDING_AGE_SEC,
+    detached_age_sec: int = DEFAULT_DETACHED_AGE_SEC,
+    batch_size: int = 500,
+    max_batches: int = 10,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """Find and delete orphaned media. With dry_run, only report what would go.
+
+    Returns a report dict (counts per category, bytes, sample keys, `more` when the pass
+    stopped at its batch budget and another run should follow).
+    """
+    batch_size = max(1, min(int(batch_size), DELETE_OBJECTS_MAX))
+    max_batches = max(1, int(max_batches))
+    now = time.time()
+
+    report: Dict[str, Any] = {
+        "dryRun": bool(dry_run),
+        "pending": 0,
+        "detached": 0,
+        "dangling": 0,
+        "retried": 0,
+        "bytes": 0,
+        "deletedObjects": 0,
+        "deletedRows": 0,
+        "failed": 0,
+        "multipart": None,
+        "more": False,
+        "sample": [],
+    }
+
+    if not dry_run:
+        if not cfg:
+            report["error"] = "r2_not_configured"
+            return report
+        if not cache.add(_LOCK_KEY, 1, timeout=_LOCK_TTL_SEC):
+            report["error"] = "locked"
+            return report
+
+    try:
+        if cfg:
+            report["multipart"] = abort_stale_multipart_uploads(
+                cfg, older_than_sec=pending_age_sec, limit=batch_size, dry_run=dry_run
+            )
+
+        for kind, label in (("reaping", "retried"), ("pending", "pending"), ("detached", "detached")):
+            qs = _orphan_qs(kind, now, pending_age_sec, detached_age_sec)
+            n_batches = 0
+            for rows in _keyset_batches(qs, batch_size, max_batches):
+                n_batches += 1
+                report[label] += len(rows)
+                report["bytes"] += sum(int(r[2] or 0) for r in rows)
+                for r in rows[: max(0, REPORT_SAMPLE_MAX - len(report["sample"]))]:
+                    report["sample"].append({"kind": label, "r2Key": r[1]})
+                if not dry_run:
+                    _reap_rows(cfg or {}, _claim([r[0] for r in rows], kind), report)
+            if n_batches >= max_batches:
+                report["more"] = True
+
+        pids, more = _dangling_post_ids(batch_size, advance=not dry_run)
+        if more:
+            report["more"] = True
+        if pids:
+            if dry_run:
+                rows = list(MediaObject.objects.filter(status="committed", post_id__in=pids).values_list("id", "r2_key", "bytes"))
+            else:
+                MediaObject.objects.filter(status="committed", post_id__in=pids).update(status="reaping")
+                rows = list(MediaObject.objects.filter(status="reaping", post_id__in=pids).values_list("id", "r2_key", "bytes"))
+            report["dangling"] += len(rows)
+            report["bytes"] += sum(int(r[2] or 0) for r in rows)
+            for r in rows[: max(0, REPORT_SAMPLE_MAX - len(report["sample"]))]:
+                report["sample"].append({"kind": "dangling", "r2Key": r[1]})
+            if not dry_run:
+                _reap_rows(cfg or {}, [(r[0], r[1]) for r in rows], report)
+    finally:
+        if not dry_run:
+            cache.delete(_LOCK_KEY)
+
+    return report
@@ -6,7 +6,9 @@ R2 S3-compatible API notes:
 - Region is typically "auto".
 - Service is "s3".
 
-This module creates presigned URLs for PUT/GET.
+This module creates presigned URLs for PUT/GET (and the multipart upload
+sub-resources used by siddes_media.multipart).
+The derived signing key is cached per date/region/service.
 """
 
 from __future__ import annotations
@@ -14,6 +16,8 @@ from __future__ import annotations
 import hashlib
 import hmac
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, Optional
 from urllib.parse import quote, urlencode, urlparse
 
 
@@ -25,7 +29,13 @@ def _sha256_hex(s: str) -> str:
     return hashlib.sha256(s.encode('utf-8')).hexdigest()
 
 
+@lru_cache(maxsize=32)
 def _signing_key(secret_key: str, date_yyyymmdd: str, region: str, service: str) -> bytes:
+    """Derive the SigV4 signing key.
+
+    The key only changes per (secret, date, region, service), so the 4-step HMAC
+    chain is memoized instead of being recomputed for every presigned URL.
+    """
     k_date = _hmac(('AWS4' + secret_key).encode('utf-8'), date_yyyymmdd)
     k_region = hmac.new(k_date, region.encode('utf-8'), hashlib.sha256).digest()
     k_service = hmac.new(k_region, service.encode('utf-8'), hashlib.sha256).digest()
@@ -44,10 +54,14 @@ def presign_s3_url(
     expires: int = 300,
     region: str = 'auto',
     service: str = 's3',
+    extra_query: Optional[Dict[str, str]] = None,
 ) -> str:
     """Return a presigned URL (query auth) for the S3-compatible API.
 
     Uses path-style: {endpoint}/{bucket}/{key}
+
+    `extra_query` adds signed sub-resource params (e.g. multipart `uploads`, `uploadId`,
+    `partNumber`); they are part of the canonical query string.
     """
 
     method_u = (method or 'GET').upper()
@@ -74,7 +88,8 @@ def presign_s3_url(
     # Canonical URI (path-style). Keep '/' safe so keys can contain folders.
     bucket_enc = quote(bucket, safe='')
     key_enc = quote(key, safe='/~')
-    canonical_uri = f'/{bucket_enc}/{key_enc}'
+    # Bucket-level sub-resources (e.g. DeleteObjects) pass an empty key.
+    canonical_uri = f'/{bucket_enc}/{key_enc}' if key_enc else f'/{bucket_enc}'
 
     credential_scope = f'{date_stamp}/{region}/{service}/aws4_request'
 
@@ -85,8 +100,11 @@ def presign_s3_url(
         'X-Amz-Expires': str(int(expires)),
         'X-Amz-SignedHeaders': 'host',
     }
+    for qk, qv in (extra_query or {}).items():
+        query[str(qk)] = str(qv if qv is not None else '')
 
-    canonical_querystring = urlencode(sorted(query.items()), quote_via=quote, safe='=')
+    # Values must be fully percent-encoded (upload ids may contain '=' / '+').
+    canonical_querystring = urlencode(sorted(query.items()), quote_via=quote, safe='')
 
     canonical_headers = f'host:{host}\n'
     signed_headers = 'host'
@@ -88,3 +88,367 @@ class MediaApiSmokeTests(APITestCase):
             d = r.json()
             assert d.get("ok") is True
             assert isinstance(d.get("url"), str) and d.get("url")
+
+    def test_batch_urls_splits_denied_and_missing(self):
+        from unittest import mock
+
+        from django.core.cache import cache
+
+        cache.clear()
+        own = self._mk(owner="me", key="t/b_own.png", public=False)
+        time.sleep(0.002)
+        other = self._mk(owner="someone_else", key="t/b_other.png", public=False)
+        url = f"/api/media/urls?keys={own.r2_key},{other.r2_key},t/b_missing.png"
+        cfg = {"endpoint": "https://r2.test", "bucket": "b", "ak": "AK", "sk": "SK"}
+        with mock.patch("siddes_media.views._r2_cfg", return_value=(True, cfg)), mock.patch(
+            "siddes_media.views.presign_s3_url", side_effect=lambda **kw: f"https://r2.test/{kw['key']}?sig=1"
+        ) as signer:
+            r = self.client.get(url, HTTP_X_SD_VIEWER="me")
+            assert r.status_code == 200, r.content
+            d = r.json()
+            assert [it["r2Key"] for it in d["items"]] == [own.r2_key]
+            assert d["items"][0]["url"] == f"https://r2.test/{own.r2_key}?sig=1"
+            assert d["denied"] == [other.r2_key]
+            assert d["missing"] == ["t/b_missing.png"]
+            assert signer.call_count == 1
+
+            # Second page load: same split, URL served from the signed-URL cache.
+            r2 = self.client.get(url, HTTP_X_SD_VIEWER="me")
+            assert r2.status_code == 200
+            d2 = r2.json()
+            assert [it["url"] for it in d2["items"]] == [it["url"] for it in d["items"]]
+            assert (d2["denied"], d2["missing"]) == (d["denied"], d["missing"])
+            assert signer.call_count == 1
+
+    def test_batch_urls_rejects_oversized_pages(self):
+        keys = ",".join(f"t/k{i}.png" for i in range(51))
+        r = self.client.get(f"/api/media/urls?keys={keys}", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 400
+        assert r.json().get("error") == "too_many_keys"
+
+    def test_signed_url_is_reused_until_commit(self):
+        from unittest import mock
+
+        obj = self._mk(owner="me", key="t/cache.png", public=True)
+        cfg = {"endpoint": "https://r2.test", "bucket": "b", "ak": "AK", "sk": "SK"}
+        with mock.patch("siddes_media.views._r2_cfg", return_value=(True, cfg)):
+            r1 = self.client.get(f"/api/media/url?key={obj.r2_key}")
+            r2 = self.client.get(f"/api/media/url?key={obj.r2_key}")
+            assert r1.status_code == 200 and r2.status_code == 200
+            assert r1.json()["url"] == r2.json()["url"]
+
+            # Commit flips the object private: the public cache entry must not leak it.
+            self.client.post("/api/media/commit", {"r2Key": obj.r2_key, "isPublic": False}, format="json", HTTP_X_SD_VIEWER="me")
+            r3 = self.client.get(f"/api/media/url?key={obj.r2_key}")
+            assert r3.json().get("restricted") is True
+
+
+    def test_post_delete_and_reaper_drop_cached_signed_urls(self):
+        from unittest import mock
+
+        from django.core.cache import cache
+
+        from siddes_post.models import Post
+
+        from .reaper import _reap_rows
+        from .views import _signed_url_cache_key
+
+        Post.objects.create(id="p_media_del", author_id="me", side="public", text="pic", created_at=time.time())
+        obj = self._mk(owner="me", key="t/del.png", public=True, post_id="p_media_del")
+        MediaObject.objects.filter(id=obj.id).update(status="committed")
+        cfg = {"endpoint": "https://r2.test", "bucket": "b", "ak": "AK", "sk": "SK"}
+        with mock.patch("siddes_media.views._r2_cfg", return_value=(True, cfg)):
+            assert self.client.get(f"/api/media/url?key={obj.r2_key}").json().get("url")
+            r = self.client.delete("/api/post/p_media_del", HTTP_X_SD_VIEWER="me")
+            assert r.status_code == 200, r.content
+            # Detached -> private: the anonymous public URL is gone at once.
+            assert self.client.get(f"/api/media/url?key={obj.r2_key}").json().get("restricted") is True
+
+            assert self.client.get(f"/api/media/url?key={obj.r2_key}", HTTP_X_SD_VIEWER="me").json().get("url")
+        assert cache.get(_signed_url_cache_key(obj.r2_key, "private"))
+        report = {"deletedObjects": 0, "deletedRows": 0, "failed": 0}
+        with mock.patch("siddes_media.reaper.delete_objects", return_value=([obj.r2_key], [])):
+            _reap_rows(cfg, [(obj.id, obj.r2_key)], report)
+        assert cache.get(_signed_url_cache_key(obj.r2_key, "private")) is None
+
+class PresignTests(APITestCase):
+    def test_signing_key_is_memoized(self):
+        from .signing import _signing_key, presign_s3_url
+
+        _signing_key.cache_clear()
+        for key in ("a.png", "b.png", "c.png"):
+            presign_s3_url(method="GET", endpoint="r2.test", bucket="b", key=key, access_key_id="AK", secret_access_key="SK")
+        info = _signing_key.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
+
+class _LocalS3(object):
+    """Tiny S3-compatible multipart server (path-style) for tests.
+
+    Set SIDDES_TEST_S3_ENDPOINT / _BUCKET / _ACCESS_KEY_ID / _SECRET_ACCESS_KEY to run the
+    same tests against a real local S3 (e.g. MinIO) instead.
+    """
+
+    def __init__(self):
+        import hashlib
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+
+        store = self
+        self.uploads: dict = {}
+        self.objects: dict = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *a):
+                pass
+
+            def _reply(self, code: int, body: bytes = b"", headers: dict | None = None):
+                self.send_response(code)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _parse(self):
+                u = urlparse(self.path)
+                q = {k: v[0] for k, v in parse_qs(u.query, keep_blank_values=True).items()}
+                if "X-Amz-Signature" not in q:
+                    self._reply(403, b"<Error><Code>AccessDenied</Code></Error>")
+                    return None, None
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                return (u.path, q), body
+
+            def do_POST(self):
+                (path, q), body = self._parse()
+                if path is None:
+                    return
+                if "delete" in q:
+                    import re
+                    for k in re.findall(rb"<Key>([^<]*)</Key>", body):
+                        store.objects.pop(path.rstrip("/") + "/" + k.decode(), None)
+                    self._reply(200, b"<DeleteResult/>")
+                    return
+                if "uploads" in q:
+                    uid = f"up-{len(store.uploads) + 1}=="
+                    store.uploads[uid] = {"key": path, "parts": {}}
+                    self._reply(200, f"<InitiateMultipartUploadResult xmlns=\"http://s3.amazonaws.com/doc/2006-03-01/\"><UploadId>{uid}</UploadId></InitiateMultipartUploadResult>".encode())
+                    return
+                up = store.uploads.pop(q.get("uploadId"), None)
+                if up is None:
+                    self._reply(404, b"<Error><Code>NoSuchUpload</Code></Error>")
+                    return
+                import re
+                nums = [int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", body)]
+                store.objects[path] = b"".join(up["parts"][n][1] for n in nums)
+                self._reply(200, b"<CompleteMultipartUploadResult/>")
+
+            def do_PUT(self):
+                (path, q), body = self._parse()
+                if path is None:
+                    return
+                if "uploadId" not in q:
+                    store.objects[path] = body
+                    self._reply(200, headers={"ETag": '"' + hashlib.md5(body).hexdigest() + '"'})
+                    return
+                up = store.uploads.get(q.get("uploadId"))
+                if up is None:
+                    self._reply(404, b"<Error><Code>NoSuchUpload</Code></Error>")
+                    return
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                up["parts"][int(q["partNumber"])] = (etag, body)
+                self._reply(200, headers={"ETag": etag})
+
+            def do_GET(self):
+                (path, q), _ = self._parse()
+                if path is None:
+                    return
+                up = store.uploads.get(q.get("uploadId"))
+                if up is None:
+                    self._reply(404, b"<Error><Code>NoSuchUpload</Code></Error>")
+                    return
+                xs = "".join(
+                    f"<Part><PartNumber>{n}</PartNumber><ETag>{e}</ETag><Size>{len(b)}</Size></Part>"
+                    for n, (e, b) in sorted(up["parts"].items())
+                )
+                self._reply(200, f"<ListPartsResult><IsTruncated>false</IsTruncated>{xs}</ListPartsResult>".encode())
+
+            def do_DELETE(self):
+                (path, q), _ = self._parse()
+                if path is None:
+                    return
+                if store.uploads.pop(q.get("uploadId"), None) is None:
+                    self._reply(404, b"<Error><Code>NoSuchUpload</Code></Error>")
+                    return
+                self._reply(204)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(DEBUG=True)
+class _LocalS3TestCase(APITestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        import os
+
+        ep = str(os.environ.get("SIDDES_TEST_S3_ENDPOINT", "") or "").strip()
+        cls.local = None if ep else _LocalS3()
+        cls.cfg = {
+            "SIDDES_R2_ENDPOINT": ep or cls.local.endpoint,
+            "SIDDES_R2_BUCKET": os.environ.get("SIDDES_TEST_S3_BUCKET", "siddes-test"),
+            "SIDDES_R2_ACCESS_KEY_ID": os.environ.get("SIDDES_TEST_S3_ACCESS_KEY_ID", "AK"),
+            "SIDDES_R2_SECRET_ACCESS_KEY": os.environ.get("SIDDES_TEST_S3_SECRET_ACCESS_KEY", "SK"),
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.local is not None:
+            cls.local.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        from unittest import mock
+
+        patcher = mock.patch.dict("os.environ", self.cfg)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class MediaMultipartTests(_LocalS3TestCase):
+    def _init(self, nbytes: int = 12 * 1024 * 1024):
+        r = self.client.post(
+            "/api/media/multipart/init",
+            {"kind": "video", "contentType": "video/mp4", "bytes": str(nbytes)},
+            format="json",
+            HTTP_X_SD_VIEWER="me",
+        )
+        assert r.status_code == 200, r.content
+        return r.json()
+
+    def test_init_parts_resume_complete_commit(self):
+        import requests
+
+        d = self._init()
+        key = d["media"]["r2Key"]
+        assert d["upload"]["partCount"] == 2
+
+        r = self.client.post("/api/media/multipart/parts", {"r2Key": key, "partNumbers": [1, 2]}, format="json", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 200, r.content
+        urls = {p["partNumber"]: p["url"] for p in r.json()["parts"]}
+
+        # Part 1 lands; the "network blip" loses part 2. Resume from ListParts.
+        assert requests.put(urls[1], data=b"a" * (5 * 1024 * 1024), timeout=10).status_code == 200
+        r = self.client.get(f"/api/media/multipart/parts?key={key}", HTTP_X_SD_VIEWER="me")
+        assert [p["partNumber"] for p in r.json()["parts"]] == [1]
+
+        # Committing before completion is refused.
+        r = self.client.post("/api/media/commit", {"r2Key": key}, format="json", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 409
+
+        assert requests.put(urls[2], data=b"b" * 10, timeout=10).status_code == 200
+        listed = self.client.get(f"/api/media/multipart/parts?key={key}", HTTP_X_SD_VIEWER="me").json()["parts"]
+        r = self.client.post(
+            "/api/media/multipart/complete",
+            {"r2Key": key, "parts": [{"partNumber": p["partNumber"], "etag": p["etag"]} for p in listed]},
+            format="json",
+            HTTP_X_SD_VIEWER="me",
+        )
+        assert r.status_code == 200, r.content
+        assert MediaObject.objects.get(r2_key=key).upload_id is None
+
+        r = self.client.post("/api/media/commit", {"r2Key": key, "postId": "p_mp"}, format="json", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 200
+        assert MediaObject.objects.get(r2_key=key).status == "committed"
+
+    def test_parts_are_owner_only(self):
+        d = self._init()
+        r = self.client.post(
+            "/api/media/multipart/parts",
+            {"r2Key": d["media"]["r2Key"], "partNumbers": [1]},
+            format="json",
+            HTTP_X_SD_VIEWER="me_999",
+        )
+        assert r.status_code == 404
+
+    def test_abort_drops_row(self):
+        d = self._init()
+        key = d["media"]["r2Key"]
+        r = self.client.post("/api/media/multipart/abort", {"r2Key": key}, format="json", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 200
+        assert not MediaObject.objects.filter(r2_key=key).exists()
+
+    def test_stale_uploads_are_aborted(self):
+        from .multipart import abort_stale_multipart_uploads
+        from .views import _r2_cfg
+
+        d = self._init()
+        key = d["media"]["r2Key"]
+        MediaObject.objects.filter(r2_key=key).update(created_at=time.time() - 3 * 86400)
+
+        _, cfg = _r2_cfg()
+        assert abort_stale_multipart_uploads(cfg, dry_run=True)["found"] == 1
+        assert MediaObject.objects.filter(r2_key=key).exists()
+
+        stats = abort_stale_multipart_uploads(cfg)
+        assert stats["aborted"] == 1
+        assert not MediaObject.objects.filter(r2_key=key).exists()
+
+
+class MediaReaperTests(_LocalS3TestCase):
+    def _row(self, key: str, *, status: str, post_id: str | None = None, age: float = 30 * 86400):
+        import requests
+        from .signing import presign_s3_url
+        from .views import _r2_cfg
+
+        _, cfg = _r2_cfg()
+        url = presign_s3_url(method="PUT", endpoint=cfg["endpoint"], bucket=cfg["bucket"], key=key, access_key_id=cfg["ak"], secret_access_key=cfg["sk"])
+        requests.put(url, data=b"x", timeout=10)
+        return MediaObject.objects.create(
+            id="mo_" + key.replace("/", "_"),
+            owner_id="me",
+            r2_key=key,
+            kind="image",
+            content_type="image/png",
+            status=status,
+            created_at=time.time() - age,
+            post_id=post_id,
+            bytes=1,
+        )
+
+    def test_reaper_dry_run_then_delete(self):
+        from .reaper import reap_orphans
+        from .views import _r2_cfg
+
+        self._row("r/pending.png", status="pending")
+        self._row("r/detached.png", status="committed")
+        self._row("r/dangling.png", status="committed", post_id="p_gone")
+        keep = [
+            self._row("r/fresh.png", status="pending", age=60),
+            self._row("r/avatar.png", status="committed", post_id="prism_avatar:public"),
+        ]
+
+        _, cfg = _r2_cfg()
+        rep = reap_orphans(cfg, dry_run=True)
+        assert (rep["pending"], rep["detached"], rep["dangling"]) == (1, 1, 1)
+        assert MediaObject.objects.count() == 5
+
+        rep = reap_orphans(cfg)
+        assert rep["deletedRows"] == 3 and rep["failed"] == 0
+        assert sorted(MediaObject.objects.values_list("id", flat=True)) == sorted(o.id for o in keep)
+        if self.local is not None:
+            assert sorted(self.local.objects) == ["/siddes-test/r/avatar.png", "/siddes-test/r/fresh.png"]
+
+    def test_reaping_rows_cannot_be_committed(self):
+        obj = self._row("r/claimed.png", status="reaping")
+        r = self.client.post("/api/media/commit", {"r2Key": obj.r2_key}, format="json", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 404
@@ -2,10 +2,24 @@
 
 from django.urls import path
 
-from .views import MediaCommitView, MediaSignUploadView, MediaSignedUrlView
+from .views import (
+    MediaCommitView,
+    MediaMultipartAbortView,
+    MediaMultipartCompleteView,
+    MediaMultipartInitView,
+    MediaMultipartPartsView,
+    MediaSignUploadView,
+    MediaSignedUrlBatchView,
+    MediaSignedUrlView,
+)
 
 urlpatterns = [
     path("media/sign-upload", MediaSignUploadView.as_view()),
     path("media/commit", MediaCommitView.as_view()),
     path("media/url", MediaSignedUrlView.as_view()),
+    path("media/urls", MediaSignedUrlBatchView.as_view()),
+    path("media/multipart/init", MediaMultipartInitView.as_view()),
+    path("media/multipart/parts", MediaMultipartPartsView.as_view()),
+    path("media/multipart/complete", MediaMultipartCompleteView.as_view()),
+    path("media/multipart/abort", MediaMultipartAbortView.as_view()),
 ]
@@ -4,6 +4,14 @@ Endpoints (via /api root):
 - POST /api/media/sign-upload
 - POST /api/media/commit
 - GET  /api/media/url?key=<r2_key>
+- GET  /api/media/urls?keys=<k1>,<k2>,...   (batch: authorize + sign a page of media)
+
+Resumable multipart uploads (large video; see siddes_media.multipart):
+- POST /api/media/multipart/init
+- POST /api/media/multipart/parts    (presign a batch of part URLs)
+- GET  /api/media/multipart/parts?key=<r2_key>   (uploaded parts, for resume)
+- POST /api/media/multipart/complete
+- POST /api/media/multipart/abort
 
 Dev convenience:
 - If DEBUG=True, dev viewer via x-sd-viewer / sd_viewer is accepted.
@@ -18,19 +26,25 @@ Same-origin serving strategy:
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
 import time
 import uuid
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 from django.conf import settings
+from django.core.cache import cache
+from asgiref.sync import sync_to_async
 from django.http import HttpResponse, HttpResponseRedirect
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from siddes_backend.async_support import AsyncReadView, run_db
 from siddes_inbox.visibility_stub import resolve_viewer_role
 
+from . import multipart
 from .models import MediaObject
 from .signing import presign_s3_url
 from .token_urls import build_media_url
@@ -60,15 +74,16 @@ def _r2_cfg() -> Tuple[bool, Dict[str, str]]:
     return True, {'endpoint': endpoint, 'bucket': bucket, 'ak': ak, 'sk': sk}
 
 
-def _raw_viewer_from_request(request) -> Optional[str]:
+def _raw_viewer_from_request(request, *, session_user: bool = True) -> Optional[str]:
     """Resolve a viewer string (safe).
 
     Nuance:
     - In dev, DRF may authenticate a SiddesViewer where user.id is already a viewer string (e.g. "me" or "me_1").
     - For real Django users, user.id is numeric; we convert to viewer id "me_<id>".
+    - session_user=False ignores request.user (views without DRF authentication).
     """
 
-    user = getattr(request, 'user', None)
+    user = getattr(request, 'user', None) if session_user else None
     if user is not None and getattr(user, 'is_authenticated', False):
         uid = str(getattr(user, 'id', '') or '').strip()
         if not uid:
@@ -86,8 +101,8 @@ def _raw_viewer_from_request(request) -> Optional[str]:
     return raw or None
 
 
-def _viewer_ctx(request) -> Tuple[bool, str, str]:
-    raw = _raw_viewer_from_request(request)
+def _viewer_ctx(request, *, session_user: bool = True) -> Tuple[bool, str, str]:
+    raw = _raw_viewer_from_request(request, session_user=session_user)
     has_viewer = bool(raw)
     viewer = (raw or 'anon').strip() or 'anon'
     role = resolve_viewer_role(viewer) or 'anon'
@@ -169,6 +184,133 @@ def _viewer_can_view_post(viewer_id: str, post_id: str) -> bool:
         return False
 
 
+def _viewer_can_view_media(viewer: str, obj: MediaObject, *, memo: Optional[Dict[str, bool]] = None) -> bool:
+    """Authorization for a private object (public objects never reach here).
+
+    `memo` lets batch callers authorize each attached post / avatar facet once,
+    no matter how many media keys point at it.
+    """
+    if obj.owner_id == viewer:
+        return True
+
+    pid = str(getattr(obj, "post_id", "") or "").strip()
+    if not pid:
+        return False
+
+    memo_key = f"{obj.owner_id}|{pid}" if pid.startswith("prism_avatar:") else pid
+    if memo is not None and memo_key in memo:
+        return memo[memo_key]
+
+    if pid.startswith("prism_avatar:"):
+        side = pid.split(":", 1)[1].strip().lower() if ":" in pid else ""
+        ok = _viewer_can_view_prism_avatar(viewer, obj.owner_id, side)
+    else:
+        ok = _viewer_can_view_post(viewer, pid)
+
+    if memo is not None:
+        memo[memo_key] = bool(ok)
+    return bool(ok)
+
+
+# --- Signed GET URL cache ---
+# A presigned GET URL does not depend on the viewer, only on the key, so it can be
+# shared across requests (authorization is still checked per viewer before handing
+# it out). Entries are keyed by (key, visibility bucket):
+# - public:  longer-lived URL; the entry also carries the media metadata so public
+#            lookups skip the DB entirely.
+# - private: short-lived URL; the DB row is still read to authorize the viewer.
+# Both buckets for a key are dropped (invalidate_signed_urls) when visibility or
+# attachment changes: MediaCommitView, upload abort, post delete (detach) and the
+# orphan reaper. Otherwise a detached or deleted object would keep a working URL
+# until the entry expired.
+
+_SIGNED_GET_EXPIRES = {"public": 600, "private": 60}
+_SIGNED_GET_MIN_REMAINING = 15  # never hand out a cached URL about to expire
+_BATCH_MAX_KEYS = 50
+
+
+def _visibility_bucket(is_public: bool) -> str:
+    return "public" if is_public else "private"
+
+
+def _signed_url_cache_key(key: str, bucket: str) -> str:
+    h = hashlib.sha256(str(key or "").encode("utf-8")).hexdigest()
+    return f"media:signed:v1:{bucket}:{h}"
+
+
+def _media_meta(obj: MediaObject) -> Dict[str, Any]:
+    return {'r2Key': obj.r2_key, 'kind': obj.kind, 'contentType': obj.content_type, 'isPublic': obj.is_public}
+
+
+def _cached_public_entry(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        hit = cache.get(_signed_url_cache_key(key, "public"))
+    except Exception:
+        return None
+    if not isinstance(hit, dict):
+        return None
+    remaining = int(float(hit.get("exp") or 0) - time.time())
+    if remaining < _SIGNED_GET_MIN_REMAINING:
+        return None
+    return {"url": hit.get("url"), "expiresIn": remaining, "media": hit.get("media") or {}}
+
+
+def _signed_get_url(cfg: Dict[str, str], obj: MediaObject) -> Tuple[str, int]:
+    """Return (url, expires_in) for obj, reusing a cached presigned URL when fresh."""
+    bucket = _visibility_bucket(bool(obj.is_public))
+    ck = _signed_url_cache_key(obj.r2_key, bucket)
+    now = time.time()
+
+    try:
+        hit = cache.get(ck)
+    except Exception:
+        hit = None
+    if isinstance(hit, dict):
+        remaining = int(float(hit.get("exp") or 0) - now)
+        if remaining >= _SIGNED_GET_MIN_REMAINING and hit.get("url"):
+            return str(hit["url"]), remaining
+
+    expires = _SIGNED_GET_EXPIRES[bucket]
+    url = presign_s3_url(
+        method='GET',
+        endpoint=cfg['endpoint'],
+        bucket=cfg['bucket'],
+        key=obj.r2_key,
+        access_key_id=cfg['ak'],
+        secret_access_key=cfg['sk'],
+        expires=expires,
+    )
+    entry: Dict[str, Any] = {"url": url, "exp": now + expires}
+    if bucket == "public":
+        entry["media"] = _media_meta(obj)
+    try:
+        cache.set(ck, entry, timeout=max(1, expires - _SIGNED_GET_MIN_REMAINING))
+    except Exception:
+        pass
+    return url, expires
+
+
+def invalidate_signed_urls(keys: Iterable[str]) -> None:
+    ks = [_signed_url_cache_key(k, b) for k in (keys or []) if k for b in _SIGNED_GET_EXPIRES]
+    if not ks:
+        return
+    try:
+        cache.delete_many(ks)
+    except Exception:
+        pass
+
+
+def _r2_not_configured_response() -> Response:
+    return Response(
+        {
+            'ok': False,
+            'error': 'r2_not_configured',
+            'hint': 'Set SIDDES_R2_ACCOUNT_ID (or SIDDES_R2_ENDPOINT), SIDDES_R2_BUCKET, SIDDES_R2_ACCESS_KEY_ID, SIDDES_R2_SECRET_ACCESS_KEY',
+        },
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
 def _restricted_payload(has_viewer: bool, viewer: str, role: str, *, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     out: Dict[str, Any] = {'ok': True, 'restricted': True, 'viewer': viewer if has_viewer else None, 'role': role}
     if extra:
@@ -295,10 +437,13 @@ class MediaCommitView(APIView):
         if not r2_key:
             return Response({'ok': False, 'error': 'missing_key'}, status=status.HTTP_400_BAD_REQUEST)
 
-        obj = MediaObject.objects.filter(r2_key=r2_key, owner_id=viewer).first()
+        obj = MediaObject.objects.filter(r2_key=r2_key, owner_id=viewer).exclude(status='reaping').first()
         if not obj:
             return Response({'ok': False, 'error': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
 
+        if str(obj.upload_id or '').strip():
+            return Response({'ok': False, 'error': 'upload_incomplete'}, status=status.HTTP_409_CONFLICT)
+
         make_public = _truthy(str(body.get('isPublic') or body.get('public') or '0'))
         post_id = str(body.get('postId') or body.get('post_id') or '').strip() or None
 
@@ -306,6 +451,7 @@ class MediaCommitView(APIView):
         obj.is_public = bool(make_public)
         obj.post_id = post_id
         obj.save(update_fields=['status', 'is_public', 'post_id'])
+        invalidate_signed_urls([obj.r2_key])
 
         return Response(
             {
@@ -326,8 +472,8 @@ class MediaCommitView(APIView):
 class MediaSignedUrlView(APIView):
     """Return a short-lived signed GET URL for a key.
 
-    Public objects: allowed for any viewer.
-    Private objects: owner-only in this phase.
+    Public objects: allowed for any viewer (served from the signed-URL cache without a DB read).
+    Private objects: owner, or viewers who can see the attached post / avatar facet.
     """
 
     def get(self, request):
@@ -337,6 +483,13 @@ class MediaSignedUrlView(APIView):
         if not key:
             return Response({'ok': False, 'error': 'missing_key'}, status=status.HTTP_400_BAD_REQUEST)
 
+        hit = _cached_public_entry(key)
+        if hit is not None:
+            return Response(
+                {'ok': True, 'restricted': False, 'url': hit['url'], 'expiresIn': hit['expiresIn'], 'media': hit['media']},
+                status=status.HTTP_200_OK,
+            )
+
         obj = MediaObject.objects.filter(r2_key=key).first()
         if not obj:
             return Response({'ok': False, 'error': 'not_found'}, status=status.HTTP_404_NOT_FOUND)
@@ -344,45 +497,97 @@ class MediaSignedUrlView(APIView):
         if not obj.is_public:
             if not has_viewer:
                 return Response(_restricted_payload(has_viewer, viewer, role), status=status.HTTP_200_OK)
-
-            if obj.owner_id != viewer:
-                pid = str(getattr(obj, "post_id", "") or "").strip()
-                if pid.startswith("prism_avatar:"):
-                    side = pid.split(":", 1)[1].strip().lower() if ":" in pid else ""
-                    if not _viewer_can_view_prism_avatar(viewer, obj.owner_id, side):
-                        return Response({'ok': False, 'error': 'forbidden'}, status=status.HTTP_403_FORBIDDEN)
-                else:
-                    if not pid or not _viewer_can_view_post(viewer, pid):
-                        return Response({'ok': False, 'error': 'forbidden'}, status=status.HTTP_403_FORBIDDEN)
+            if not _viewer_can_view_media(viewer, obj):
+                return Response({'ok': False, 'error': 'forbidden'}, status=status.HTTP_403_FORBIDDEN)
 
         ok, cfg = _r2_cfg()
         if not ok:
-            return Response(
-                {
-                    'ok': False,
-                    'error': 'r2_not_configured',
-                    'hint': 'Set SIDDES_R2_ACCOUNT_ID (or SIDDES_R2_ENDPOINT), SIDDES_R2_BUCKET, SIDDES_R2_ACCESS_KEY_ID, SIDDES_R2_SECRET_ACCESS_KEY',
-                },
-                status=status.HTTP_503_SERVICE_UNAVAILABLE,
-            )
+            return _r2_not_configured_response()
 
-        get_url = presign_s3_url(
-            method='GET',
-            endpoint=cfg['endpoint'],
-            bucket=cfg['bucket'],
-            key=obj.r2_key,
-            access_key_id=cfg['ak'],
-            secret_access_key=cfg['sk'],
-            expires=60,
-        )
+        get_url, expires_in = _signed_get_url(cfg, obj)
 
         return Response(
             {
                 'ok': True,
                 'restricted': False,
                 'url': get_url,
-                'expiresIn': 60,
-                'media': {'r2Key': obj.r2_key, 'kind': obj.kind, 'contentType': obj.content_type, 'isPublic': obj.is_public},
+                'expiresIn': expires_in,
+                'media': _media_meta(obj),
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class MediaSignedUrlBatchView(APIView):
+    """Authorize and sign a page of media keys in one call.
+
+    GET /api/media/urls?keys=<k1>,<k2>,... (max 50; repeated `keys` params also accepted)
+
+    - One DB query for all keys not already in the public signed-URL cache.
+    - Private keys are authorized once per attached post / avatar facet.
+    - Response lists signed `items`, plus `denied` and `missing` keys (never an error for a partial page).
+    """
+
+    def get(self, request):
+        has_viewer, viewer, role = _viewer_ctx(request)
+
+        qp = getattr(request, 'query_params', {})
+        raw_keys = qp.getlist('keys') if hasattr(qp, 'getlist') else [qp.get('keys')]
+        keys: list = []
+        seen: set = set()
+        for chunk in raw_keys:
+            for k in str(chunk or '').split(','):
+                k = k.strip().lstrip('/')
+                if k and k not in seen:
+                    seen.add(k)
+                    keys.append(k)
+        if not keys:
+            return Response({'ok': False, 'error': 'missing_keys'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(keys) > _BATCH_MAX_KEYS:
+            return Response({'ok': False, 'error': 'too_many_keys', 'max': _BATCH_MAX_KEYS}, status=status.HTTP_400_BAD_REQUEST)
+
+        signed: Dict[str, Dict[str, Any]] = {}
+        pending: list = []
+        for k in keys:
+            hit = _cached_public_entry(k)
+            if hit is not None:
+                signed[k] = {'url': hit['url'], 'expiresIn': hit['expiresIn'], 'media': hit['media']}
+            else:
+                pending.append(k)
+
+        denied: list = []
+        missing: list = []
+        if pending:
+            objs = {o.r2_key: o for o in MediaObject.objects.filter(r2_key__in=pending)}
+            allowed: list = []
+            memo: Dict[str, bool] = {}
+            for k in pending:
+                obj = objs.get(k)
+                if obj is None:
+                    missing.append(k)
+                    continue
+                if not obj.is_public and (not has_viewer or not _viewer_can_view_media(viewer, obj, memo=memo)):
+                    denied.append(k)
+                    continue
+                allowed.append(obj)
+
+            if allowed:
+                ok, cfg = _r2_cfg()
+                if not ok:
+                    return _r2_not_configured_response()
+                for obj in allowed:
+                    url, expires_in = _signed_get_url(cfg, obj)
+                    signed[obj.r2_key] = {'url': url, 'expiresIn': expires_in, 'media': _media_meta(obj)}
+
+        items = [dict(signed[k]['media'], url=signed[k]['url'], expiresIn=signed[k]['expiresIn']) for k in keys if k in signed]
+        return Response(
+            {
+                'ok': True,
+                'restricted': False,
+                'viewer': viewer if has_viewer else None,
+                'items': items,
+                'denied': denied,
+                'missing': missing,
             },
             status=status.HTTP_200_OK,
         )
@@ -402,32 +607,290 @@ class MediaRedirectView(APIView):
         if not key:
             return HttpResponse('bad_request', status=400)
 
+        hit = _cached_public_entry(key)
+        if hit is not None and hit.get('url'):
+            return HttpResponseRedirect(hit['url'])
+
         obj = MediaObject.objects.filter(r2_key=key).first()
-        if not obj:
-            return HttpResponse('not_found', status=404)
+        return _redirect_for(request, obj)
 
-        has_viewer, viewer, role = _viewer_ctx(request)
 
-        if not obj.is_public:
-            if not has_viewer:
-                return HttpResponse('restricted', status=401)
+class MediaRedirectAsyncView(AsyncReadView):
+    """/m/<key> on the ASGI profile: the object row and the viewer load concurrently."""
+
+    sync_view = MediaRedirectView
 
-            if obj.owner_id != viewer:
-                pid = str(getattr(obj, "post_id", "") or "").strip()
-                if not pid or not _viewer_can_view_post(viewer, pid):
-                    return HttpResponse('forbidden', status=403)
+    async def get(self, request, key: str):
+        key = str(key or '').lstrip('/')
+        if not key:
+            return HttpResponse('bad_request', status=400)
+
+        hit = await sync_to_async(_cached_public_entry)(key)
+        if hit is not None and hit.get('url'):
+            return HttpResponseRedirect(hit['url'])
+
+        # No DRF authentication on this path: dev viewer only (as MediaRedirectView).
+        obj, viewer_ctx = await asyncio.gather(
+            run_db(lambda: MediaObject.objects.filter(r2_key=key).first()),
+            run_db(_viewer_ctx, request, session_user=False),
+        )
+        return await sync_to_async(_redirect_for)(request, obj, viewer_ctx)
+
+
+def _redirect_for(request, obj: Optional[MediaObject], viewer_ctx: Optional[Tuple[bool, str, str]] = None) -> HttpResponse:
+    if not obj:
+        return HttpResponse('not_found', status=404)
+
+    has_viewer, viewer, role = viewer_ctx or _viewer_ctx(request)
+
+    if not obj.is_public:
+        if not has_viewer:
+            return HttpResponse('restricted', status=401)
+        if not _viewer_can_view_media(viewer, obj):
+            return HttpResponse('forbidden', status=403)
+
+    ok, cfg = _r2_cfg()
+    if not ok:
+        return HttpResponse('r2_not_configured', status=503)
+
+    get_url, _ = _signed_get_url(cfg, obj)
+    return HttpResponseRedirect(get_url)
+
+
+# --- Multipart uploads ---
+
+
+def _me_gate(request) -> Tuple[Optional[Response], str]:
+    has_viewer, viewer, role = _viewer_ctx(request)
+    if not has_viewer:
+        return Response(_restricted_payload(has_viewer, viewer, role), status=status.HTTP_200_OK), viewer
+    if role != 'me':
+        return Response({'ok': False, 'error': 'forbidden', 'viewer': viewer, 'role': role}, status=status.HTTP_403_FORBIDDEN), viewer
+    return None, viewer
+
+
+def _multipart_error_response(e: multipart.MultipartError) -> Response:
+    return Response({'ok': False, 'error': e.code, 'upstreamStatus': e.status or None}, status=status.HTTP_502_BAD_GATEWAY)
+
+
+def _in_flight_upload(viewer: str, body: Dict[str, Any]) -> Tuple[Optional[Response], Optional[MediaObject]]:
+    r2_key = str(body.get('r2Key') or body.get('key') or '').strip()
+    if not r2_key:
+        return Response({'ok': False, 'error': 'missing_key'}, status=status.HTTP_400_BAD_REQUEST), None
+    obj = MediaObject.objects.filter(r2_key=r2_key, owner_id=viewer, status='pending').first()
+    if not obj or not str(obj.upload_id or '').strip():
+        return Response({'ok': False, 'error': 'not_found'}, status=status.HTTP_404_NOT_FOUND), None
+    return None, obj
+
+
+def _int_or_none(v: Any) -> Optional[int]:
+    try:
+        n = int(v)
+    except Exception:
+        return None
+    return n
+
+
+class MediaMultipartInitView(APIView):
+    """Start a resumable multipart upload (same body as sign-upload; `bytes` sizes the parts)."""
+
+    def post(self, request):
+        denied, viewer = _me_gate(request)
+        if denied is not None:
+            return denied
 
         ok, cfg = _r2_cfg()
         if not ok:
-            return HttpResponse('r2_not_configured', status=503)
+            return _r2_not_configured_response()
 
-        get_url = presign_s3_url(
-            method='GET',
-            endpoint=cfg['endpoint'],
-            bucket=cfg['bucket'],
-            key=obj.r2_key,
-            access_key_id=cfg['ak'],
-            secret_access_key=cfg['sk'],
-            expires=60,
+        body: Dict[str, Any] = getattr(request, 'data', None) or {}
+        kind = str(body.get('kind') or '').strip().lower()
+        if kind not in ('image', 'video'):
+            return Response({'ok': False, 'error': 'invalid_kind'}, status=status.HTTP_400_BAD_REQUEST)
+
+        content_type = str(body.get('contentType') or body.get('content_type') or '').strip().lower()
+        if not content_type:
+            content_type = 'application/octet-stream'
+
+        ext = str(body.get('ext') or '').strip().lower()
+        if not ext:
+            ext = _ext_for_content_type(content_type)
+
+        total = int(body.get('bytes')) if str(body.get('bytes') or '').isdigit() else None
+
+        uid = uuid.uuid4().hex
+        media_id = f'm_{uid[:24]}'
+        r2_key = f'u/{viewer}/{uid}.{ext}'
+
+        try:
+            upload_id = multipart.initiate_upload(cfg, r2_key, content_type=content_type)
+        except multipart.MultipartError as e:
+            return _multipart_error_response(e)
+
+        MediaObject.objects.create(
+            id=media_id,
+            owner_id=viewer,
+            r2_key=r2_key,
+            kind=kind,
+            content_type=content_type,
+            bytes=total,
+            created_at=float(time.time()),
+            status='pending',
+            is_public=False,
+            upload_id=upload_id,
+        )
+
+        part_size = multipart.part_size_for(total)
+        return Response(
+            {
+                'ok': True,
+                'restricted': False,
+                'media': {
+                    'id': media_id,
+                    'r2Key': r2_key,
+                    'kind': kind,
+                    'contentType': content_type,
+                    'status': 'pending',
+                },
+                'upload': {
+                    'uploadId': upload_id,
+                    'partSize': part_size,
+                    'partCount': multipart.part_count_for(total, part_size),
+                    'maxPartsPerBatch': multipart.PART_URL_BATCH_MAX,
+                },
+                'serve': {'url': build_media_url(r2_key, is_public=False)},
+            },
+            status=status.HTTP_200_OK,
         )
-        return HttpResponseRedirect(get_url)
+
+
+class MediaMultipartPartsView(APIView):
+    """POST: presign a batch of part URLs. GET: list parts already stored (resume)."""
+
+    def get(self, request):
+        denied, viewer = _me_gate(request)
+        if denied is not None:
+            return denied
+
+        qp = getattr(request, 'query_params', {})
+        bad, obj = _in_flight_upload(viewer, {'key': qp.get('key') or qp.get('r2Key')})
+        if bad is not None:
+            return bad
+
+        ok, cfg = _r2_cfg()
+        if not ok:
+            return _r2_not_configured_response()
+
+        try:
+            parts = multipart.list_uploaded_parts(cfg, obj.r2_key, str(obj.upload_id))
+        except multipart.MultipartError as e:
+            return _multipart_error_response(e)
+
+        return Response({'ok': True, 'r2Key': obj.r2_key, 'parts': parts}, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        denied, viewer = _me_gate(request)
+        if denied is not None:
+            return denied
+
+        body: Dict[str, Any] = getattr(request, 'data', None) or {}
+        bad, obj = _in_flight_upload(viewer, body)
+        if bad is not None:
+            return bad
+
+        raw_nums = body.get('partNumbers') or body.get('parts') or []
+        if not isinstance(raw_nums, list) or not raw_nums:
+            return Response({'ok': False, 'error': 'missing_part_numbers'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_nums) > multipart.PART_URL_BATCH_MAX:
+            return Response({'ok': False, 'error': 'too_many_parts', 'max': multipart.PART_URL_BATCH_MAX}, status=status.HTTP_400_BAD_REQUEST)
+
+        nums = sorted({n for n in (_int_or_none(x) for x in raw_nums) if n is not None})
+        if not nums or nums[0] < 1 or nums[-1] > multipart.MAX_PARTS or len(nums) != len(raw_nums):
+            return Response({'ok': False, 'error': 'invalid_part_numbers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ok, cfg = _r2_cfg()
+        if not ok:
+            return _r2_not_configured_response()
+
+        return Response(
+            {
+                'ok': True,
+                'r2Key': obj.r2_key,
+                'parts': multipart.presign_part_urls(cfg, obj.r2_key, str(obj.upload_id), nums),
+                'expiresIn': multipart.PART_URL_EXPIRES,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class MediaMultipartCompleteView(APIView):
+    """Assemble uploaded parts. The object then follows the normal commit flow."""
+
+    def post(self, request):
+        denied, viewer = _me_gate(request)
+        if denied is not None:
+            return denied
+
+        body: Dict[str, Any] = getattr(request, 'data', None) or {}
+        bad, obj = _in_flight_upload(viewer, body)
+        if bad is not None:
+            return bad
+
+        raw_parts = body.get('parts') or []
+        if not isinstance(raw_parts, list) or not raw_parts or len(raw_parts) > multipart.MAX_PARTS:
+            return Response({'ok': False, 'error': 'invalid_parts'}, status=status.HTTP_400_BAD_REQUEST)
+
+        parts = []
+        seen = set()
+        for it in raw_parts:
+            if not isinstance(it, dict):
+                return Response({'ok': False, 'error': 'invalid_parts'}, status=status.HTTP_400_BAD_REQUEST)
+            num = _int_or_none(it.get('partNumber'))
+            etag = str(it.get('etag') or it.get('ETag') or '').strip()
+            if num is None or num < 1 or num > multipart.MAX_PARTS or num in seen or not etag:
+                return Response({'ok': False, 'error': 'invalid_parts'}, status=status.HTTP_400_BAD_REQUEST)
+            seen.add(num)
+            parts.append((num, etag))
+
+        ok, cfg = _r2_cfg()
+        if not ok:
+            return _r2_not_configured_response()
+
+        try:
+            multipart.complete_upload(cfg, obj.r2_key, str(obj.upload_id), parts)
+        except multipart.MultipartError as e:
+            return _multipart_error_response(e)
+
+        MediaObject.objects.filter(id=obj.id).update(upload_id=None)
+
+        return Response(
+            {'ok': True, 'media': {'id': obj.id, 'r2Key': obj.r2_key, 'status': 'pending', 'parts': len(parts)}},
+            status=status.HTTP_200_OK,
+        )
+
+
+class MediaMultipartAbortView(APIView):
+    """Abandon an in-flight upload: frees stored parts and drops the pending row."""
+
+    def post(self, request):
+        denied, viewer = _me_gate(request)
+        if denied is not None:
+            return denied
+
+        body: Dict[str, Any] = getattr(request, 'data', None) or {}
+        bad, obj = _in_flight_upload(viewer, body)
+        if bad is not None:
+            return bad
+
+        ok, cfg = _r2_cfg()
+        if not ok:
+            return _r2_not_configured_response()
+
+        try:
+            multipart.abort_upload(cfg, obj.r2_key, str(obj.upload_id))
+        except multipart.MultipartError as e:
+            return _multipart_error_response(e)
+
+        MediaObject.objects.filter(id=obj.id, status='pending').delete()
+        invalidate_signed_urls([obj.r2_key])
+        return Response({'ok': True, 'aborted': True, 'r2Key': obj.r2_key}, status=status.HTTP_200_OK)
@@ -2,10 +2,17 @@ from __future__ import annotations
 
 from django.urls import path
 
-from .views import NotificationsListView, NotificationsMarkAllReadView, NotificationsMarkReadView
+from siddes_backend.async_support import async_views_enabled
+
+from .views import (
+    NotificationsListAsyncView,
+    NotificationsListView,
+    NotificationsMarkAllReadView,
+    NotificationsMarkReadView,
+)
 
 urlpatterns = [
-    path("notifications", NotificationsListView.as_view()),
+    path("notifications", (NotificationsListAsyncView if async_views_enabled() else NotificationsListView).as_view()),
     path("notifications/mark-all-read", NotificationsMarkAllReadView.as_view()),
     path("notifications/mark-read", NotificationsMarkReadView.as_view()),
 ]
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 import time
 
 from typing import Any, Dict, Optional, Tuple
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.http import JsonResponse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from siddes_backend.async_support import AsyncReadView, run_db
 from siddes_inbox.visibility_stub import resolve_viewer_role
 
 from .models import Notification
@@ -36,74 +40,97 @@ def _viewer_ctx(request) -> Tuple[bool, str, str]:
     return has_viewer, viewer, role
 
 
-class NotificationsListView(APIView):
-    permission_classes: list = []
+def _list_side(request, params) -> str:
+    side = str(request.headers.get("x-sd-side") or params.get("side") or "").strip().lower()
+    if side not in ("public", "friends", "close", "work"):
+        side = "public"
+    return side
 
-    def get(self, request):
-        has_viewer, viewer, role = _viewer_ctx(request)
-        if not has_viewer:
-            return Response(
-                {"ok": True, "restricted": True, "viewer": None, "role": role, "count": 0, "items": []},
-                status=status.HTTP_200_OK,
-            )
 
-        # sd_423_mute: filter notifications from muted actors
-
-        muted_check = None
+def _recent_notifications(viewer: str, side: str) -> list:
+    # IMPORTANT: Django disallows filtering after slicing. Filter first, then apply LIMIT.
+    return list(Notification.objects.filter(viewer_id=viewer, side=side).order_by("-created_at")[:50])
 
-        try:
 
-            from siddes_safety.policy import is_muted
+def _list_items(viewer: str, rows: list) -> list[Dict[str, Any]]:
+    # sd_423_mute: filter notifications from muted actors
+    muted_check = None
+    try:
+        from siddes_safety.policy import is_muted
 
-            muted_check = is_muted
+        muted_check = is_muted
+    except Exception:
+        muted_check = None
 
+    items: list[Dict[str, Any]] = []
+    for n in rows:
+        try:
+            if muted_check and muted_check(viewer, str(getattr(n, "actor", "") or "")):
+                continue
         except Exception:
-
-            muted_check = None
-
-
-        side = str(request.headers.get("x-sd-side") or request.query_params.get("side") or "").strip().lower()
-
-
-
-        if side not in ("public", "friends", "close", "work"):
+            pass
+        items.append(
+            {
+                "id": n.id,
+                "actor": n.actor,
+                "type": n.type,
+                "ts": int(float(n.created_at or 0.0) * 1000),
+                "glimpse": n.glimpse,
+                "postId": n.post_id,
+                "postTitle": n.post_title,
+                "read": bool(n.read_at),
+            }
+        )
+    return items
 
 
+def _warm_safety_graph(viewer: str) -> None:
+    try:
+        from siddes_safety.safety_graph import safety_graph
 
-            side = "public"
+        safety_graph(viewer)  # lands in the request memo read by is_muted
+    except Exception:
+        pass
 
 
+class NotificationsListView(APIView):
+    permission_classes: list = []
 
-        
+    def get(self, request):
+        has_viewer, viewer, role = _viewer_ctx(request)
+        if not has_viewer:
+            return Response(
+                {"ok": True, "restricted": True, "viewer": None, "role": role, "count": 0, "items": []},
+                status=status.HTTP_200_OK,
+            )
 
+        side = _list_side(request, request.query_params)
+        items = _list_items(viewer, _recent_notifications(viewer, side))
 
+        return Response(
+            {"ok": True, "restricted": False, "viewer": viewer, "role": role, "count": len(items), "items": items},
+            status=status.HTTP_200_OK,
+        )
 
-        # IMPORTANT: Django disallows filtering after slicing. Filter first, then apply LIMIT.
 
+class NotificationsListAsyncView(AsyncReadView):
+    """GET /api/notifications on the ASGI profile: rows and the mute graph load concurrently."""
 
+    sync_view = NotificationsListView
 
-        qs = Notification.objects.filter(viewer_id=viewer, side=side).order_by("-created_at")[:50]
-        items: list[Dict[str, Any]] = []
-        for n in qs:
-            try:
-                if muted_check and muted_check(viewer, str(getattr(n, "actor", "") or "")):
-                    continue
-            except Exception:
-                pass
-            items.append(
-                {
-                    "id": n.id,
-                    "actor": n.actor,
-                    "type": n.type,
-                    "ts": int(float(n.created_at or 0.0) * 1000),
-                    "glimpse": n.glimpse,
-                    "postId": n.post_id,
-                    "postTitle": n.post_title,
-                    "read": bool(n.read_at),
-                }
+    async def get(self, request):
+        has_viewer, viewer, role = await sync_to_async(_viewer_ctx)(request)
+        if not has_viewer:
+            return JsonResponse(
+                {"ok": True, "restricted": True, "viewer": None, "role": role, "count": 0, "items": []},
+                status=status.HTTP_200_OK,
             )
 
-        return Response(
+        side = _list_side(request, request.GET)
+        rows, _ = await asyncio.gather(run_db(_recent_notifications, viewer, side), run_db(_warm_safety_graph, viewer))
+        items = await sync_to_async(_list_items)(viewer, rows)
+
+        return JsonResponse(
             {"ok": True, "restricted": False, "viewer": viewer, "role": role, "count": len(items), "items": items},
             status=status.HTTP_200_OK,
         )
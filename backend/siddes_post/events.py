@@ -0,0 +1,113 @@
+"""Post-created event: side effects of a new post, off the request path.
+
+PostCreateView keeps only the transactional part (validate, insert the post,
+attach media). Everything that can lag by a moment is one `post_created`
+edge job, published when the transaction commits:
+
+- mention notifications (handles resolved in bulk, block-aware; push
+  dispatch happens inside notify()),
+- cache invalidation (author profile payloads).
+
+Broadcast last_post_at is not deferred: broadcast feeds page by it, so it is
+raised inside the post transaction (PostCreateView).
+
+The edge engine delivers these jobs in batches (BATCH_HANDLERS in the
+edge_engine command): one posts query, one identity resolution and one
+safety-graph load per author for the whole batch. Re-running a batch is safe:
+notifications are upserts keyed by (viewer, type, actor, post) and only push
+when newly created, and cache bumps are idempotent.
+
+The event is queued only where an edge_engine worker is declared
+(SIDDES_EDGE_ENGINE_ENABLED=1); otherwise, or when enqueue fails, it runs
+inline after commit, as before.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List
+
+from django.db import transaction
+
+POST_CREATED = "post_created"
+
+
+def _safe_str(x: object) -> str:
+    return str(x or "").strip()
+
+
+def post_created_payload(rec: Any, *, mention_handles: Iterable[str]) -> Dict[str, Any]:
+    return {
+        "post_id": _safe_str(getattr(rec, "id", "")),
+        "author_id": _safe_str(getattr(rec, "author_id", "")),
+        "side": _safe_str(getattr(rec, "side", "")) or "public",
+        "set_id": _safe_str(getattr(rec, "set_id", "")) or None,
+        "created_at": float(getattr(rec, "created_at", 0.0) or 0.0),
+        "handles": [h for h in (mention_handles or []) if _safe_str(h)],
+    }
+
+
+def _publish(payload: Dict[str, Any]) -> None:
+    try:
+        from siddes_backend.edge_queue import enqueue, worker_declared
+
+        if worker_declared() and enqueue(POST_CREATED, payload, priority="high"):
+            return
+    except Exception:
+        pass
+    handle_post_created_batch([payload])
+
+
+def emit_post_created(rec: Any, *, mention_handles: Iterable[str]) -> None:
+    """Publish the event once the surrounding transaction commits (never raises)."""
+
+    try:
+        payload = post_created_payload(rec, mention_handles=mention_handles)
+    except Exception:
+        return
+    if not payload["post_id"]:
+        return
+    transaction.on_commit(lambda: _publish(payload))
+
+
+def _live_posts(post_ids: List[str]) -> Dict[str, Any]:
+    from .models import Post
+
+    try:
+        return {p.id: p for p in Post.objects.filter(id__in=post_ids).only("id", "text", "is_hidden")}
+    except Exception:
+        return {}
+
+
+def handle_post_created_batch(events: List[Dict[str, Any]]) -> None:
+    """Apply post_created side effects for a batch of events."""
+
+    from .views import _bump_profile_cache_best_effort, _notify_mentions_handles_best_effort
+
+    rows = [e for e in (events or []) if isinstance(e, dict) and _safe_str(e.get("post_id"))]
+    if not rows:
+        return
+
+    # Deleted in the meantime: nothing to announce.
+    posts = _live_posts([_safe_str(e.get("post_id")) for e in rows])
+
+    for author in sorted({_safe_str(e.get("author_id")) for e in rows if _safe_str(e.get("author_id"))}):
+        _bump_profile_cache_best_effort(author)
+
+    for e in rows:
+        rec = posts.get(_safe_str(e.get("post_id")))
+        handles = [h for h in (e.get("handles") or []) if _safe_str(h)]
+        if rec is None or not handles or bool(getattr(rec, "is_hidden", False)):
+            continue
+        text = _safe_str(getattr(rec, "text", ""))
+        _notify_mentions_handles_best_effort(
+            author_id=_safe_str(e.get("author_id")),
+            side=_safe_str(e.get("side")) or "public",
+            handles=handles,
+            post_id=rec.id,
+            post_title=(text[:60] if text else None),
+            glimpse=text,
+        )
+
+
+def handle_post_created(payload: Dict[str, Any]) -> None:
+    handle_post_created_batch([payload])
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_post", "0010_rename_siddes_post_echoof_created_idx_siddes_post_echo_of_fe63fc_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["set_id", "-created_at", "-id"], name="siddes_post_set_id_4651e4_idx"),
+        ),
+    ]
@@ -45,6 +45,8 @@ class Post(models.Model):
             models.Index(fields=["side", "-created_at"]),
             models.Index(fields=["author_id", "-created_at"]),
             models.Index(fields=["echo_of_post_id", "-created_at"]),
+            # Per-channel timelines (broadcast feed k-way merge): (created_at, id) keyset per set_id.
+            models.Index(fields=["set_id", "-created_at", "-id"]),
         ]
         constraints = [
             models.UniqueConstraint(fields=["author_id", "client_key"], name="uniq_post_author_client_key"),
@@ -80,6 +80,12 @@ class DbPostStore:
         rec.save()
         return rec
 
+    def get_by_client_key(self, *, author_id: str, client_key: str) -> Optional[Post]:
+        ck = (client_key or "").strip()
+        if not ck:
+            return None
+        return Post.objects.filter(author_id=author_id, client_key=ck).first()
+
     def delete_by_author_client_key(self, *, author_id: str, client_key: str) -> int:
         """Delete a post by (author_id, client_key). Returns number deleted."""
         ck = (client_key or "").strip()
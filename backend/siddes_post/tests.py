@@ -142,3 +142,133 @@ class MentionsSafetyTests(APITestCase):
         )
         assert r2.status_code == 201, r2.content
 
+
+    def test_mentions_are_authorized_in_constant_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from siddes_prism.models import SideMembership  # type: ignore
+        from siddes_post.views import _disallowed_mentions
+
+        User = get_user_model()
+        handles = ["@friend", "@boss"]
+        for i in range(6):
+            u = User.objects.create_user(username=f"pal{i}", password="x")
+            SideMembership.objects.create(owner=self.owner, member=u, side="close" if i % 2 else "friends")
+            handles.append(f"@pal{i}")
+
+        # Resolve the author's own identity first (memoized per request path).
+        assert _disallowed_mentions(author_id=self._viewer(), side="friends", set_id=None, handles=["@owner"]) == []
+        with CaptureQueriesContext(connection) as ctx:
+            out = _disallowed_mentions(author_id=self._viewer(), side="friends", set_id=None, handles=handles + ["@ghost"])
+        assert out == ["@boss", "@ghost"]
+        assert len(ctx.captured_queries) <= 4  # identities, safety graph, SideMembership
+        assert _disallowed_mentions(author_id=self._viewer(), side="close", set_id=None, handles=handles) == ["@friend", "@boss", "@pal0", "@pal2", "@pal4"]
+
+    def test_reply_mentions_follow_the_post_authors_side(self):
+        from siddes_prism.models import SideMembership  # type: ignore
+
+        r = self.client.post("/api/post", {"side": "friends", "text": "plans?"}, format="json", HTTP_X_SD_VIEWER=self._viewer())
+        assert r.status_code == 201, r.content
+        pid = r.json()["post"]["id"]
+
+        # boss is in the replier's friends, but not in the post author's.
+        SideMembership.objects.create(owner=self.friend, member=self.boss, side="friends")
+        friend = f"me_{self.friend.id}"
+        r = self.client.post(f"/api/post/{pid}/reply", {"text": "ask @boss"}, format="json", HTTP_X_SD_VIEWER=friend)
+        assert r.status_code == 400 and r.json()["handles"] == ["@boss"], r.content
+        r = self.client.post(f"/api/post/{pid}/reply", {"text": "@owner yes"}, format="json", HTTP_X_SD_VIEWER=friend)
+        assert r.status_code in (200, 201), r.content
+
+
+# Post-created event: side effects leave the request transaction.
+from unittest import mock
+
+
+@override_settings(DEBUG=True)
+class PostCreatedEventTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        User = get_user_model()
+        self.owner = User.objects.create_user(username="evowner", password="x")
+        self.friend = User.objects.create_user(username="evfriend", password="x")
+        self.viewer = f"me_{self.owner.id}"
+
+    def _post(self, text: str):
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post("/api/post", {"side": "public", "text": text}, format="json", HTTP_X_SD_VIEWER=self.viewer)
+        assert r.status_code == 201, r.content
+        return r.json()["post"]["id"]
+
+    def _mentions(self):
+        from siddes_notifications.models import Notification
+
+        return list(Notification.objects.filter(viewer_id=f"me_{self.friend.id}", type="mention").values_list("post_id", flat=True))
+
+    @override_settings(SIDDES_EDGE_ALLOW_MEMORY=True)
+    def test_mentions_are_queued_then_processed_in_a_batch(self):
+        from siddes_backend import edge_queue
+        from siddes_post.events import POST_CREATED, handle_post_created_batch
+
+        with mock.patch.dict("os.environ", {"SIDDES_EDGE_BACKEND": "memory"}):
+            b = edge_queue.get_backend()
+            b.clear()
+            p1 = self._post("hi @evfriend")
+            p2 = self._post("again @evfriend @nobody_here")
+            assert self._mentions() == []  # nothing inline on the request path
+
+            got = b.reserve("t", 10, 0, 30)
+        assert [r.job["type"] for r in got] == [POST_CREATED, POST_CREATED]
+        assert got[0].job["priority"] == "high"
+        handle_post_created_batch([r.job["payload"] for r in got])
+        assert sorted(self._mentions()) == sorted([p1, p2])
+
+        handle_post_created_batch([r.job["payload"] for r in got])  # redelivery is harmless
+        assert len(self._mentions()) == 2
+
+    def test_without_a_queue_the_event_runs_after_commit(self):
+        with mock.patch.dict("os.environ", {"SIDDES_EDGE_BACKEND": "redis", "REDIS_URL": "", "SIDDES_EDGE_ENGINE_ENABLED": ""}):
+            pid = self._post("hello @evfriend")
+        assert self._mentions() == [pid]
+
+    def test_redis_alone_does_not_queue_mentions_without_a_declared_worker(self):
+        with mock.patch.dict("os.environ", {"SIDDES_EDGE_BACKEND": "redis", "REDIS_URL": "redis://127.0.0.1:1/0", "SIDDES_EDGE_ENGINE_ENABLED": ""}):
+            with mock.patch("siddes_backend.edge_queue.enqueue") as enq:
+                pid = self._post("hey @evfriend")
+        assert not enq.called
+        assert self._mentions() == [pid]
+
+    def test_media_attach_is_one_update_inside_the_post_transaction(self):
+        from siddes_media.models import MediaObject
+
+        for k in ("u/a.jpg", "u/b.jpg"):
+            MediaObject.objects.create(id=f"m_{k[2]}", owner_id=self.viewer, r2_key=k, kind="image", content_type="image/jpeg", status="pending", created_at=0)
+
+        body = {"side": "public", "text": "pics", "mediaKeys": ["u/a.jpg", "u/b.jpg"], "mediaMeta": {"u/a.jpg": {"w": 640, "h": 480}}}
+        r = self.client.post("/api/post", body, format="json", HTTP_X_SD_VIEWER=self.viewer)
+        assert r.status_code == 201, r.content
+        pid = r.json()["post"]["id"]
+        rows = {m.r2_key: m for m in MediaObject.objects.filter(post_id=pid)}
+        assert set(rows) == {"u/a.jpg", "u/b.jpg"} and all(m.status == "committed" for m in rows.values())
+        assert (rows["u/a.jpg"].width, rows["u/a.jpg"].height, rows["u/b.jpg"].width) == (640, 480, None)
+
+    def test_replaying_a_media_post_with_the_same_client_key_returns_it(self):
+        from siddes_media.models import MediaObject
+
+        MediaObject.objects.create(id="m_r", owner_id=self.viewer, r2_key="u/r.jpg", kind="image", content_type="image/jpeg", status="pending", created_at=0)
+        body = {"side": "public", "text": "retry @evfriend", "mediaKeys": ["u/r.jpg"], "clientKey": "ck_replay"}
+
+        with mock.patch.dict("os.environ", {"SIDDES_EDGE_BACKEND": "redis", "REDIS_URL": "", "SIDDES_EDGE_ENGINE_ENABLED": ""}):
+            with self.captureOnCommitCallbacks(execute=True) as first:
+                r1 = self.client.post("/api/post", body, format="json", HTTP_X_SD_VIEWER=self.viewer)
+            with self.captureOnCommitCallbacks(execute=True) as second:
+                r2 = self.client.post("/api/post", body, format="json", HTTP_X_SD_VIEWER=self.viewer)
+
+        assert r1.status_code == 201 and r2.status_code == 201, r2.content
+        pid = r1.json()["post"]["id"]
+        assert r2.json()["post"]["id"] == pid
+        assert MediaObject.objects.get(id="m_r").post_id == pid
+        assert len(first) == 1 and len(second) == 0  # the event is published once
+        assert self._mentions() == [pid]
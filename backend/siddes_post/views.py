@@ -9,6 +9,7 @@ import time
 from typing import Any, Dict, Optional, Tuple, Set
 
 from django.conf import settings
+from django.db import transaction
 from django.utils.decorators import method_decorator
 
 from siddes_backend.csrf import dev_csrf_exempt
@@ -23,6 +24,7 @@ from siddes_inbox.visibility_stub import resolve_viewer_role
 from siddes_sets.store_db import DbSetsStore
 
 from .runtime_store import POST_STORE, REPLY_STORE
+from .events import emit_post_created
 from .models import Post, PostLike
 from .trust_gates import enabled as trust_gates_enabled, enforce_public_write_gates, normalize_trust_level
 
@@ -84,90 +86,109 @@ def _extract_mention_handles(text: str) -> list[str]:
     return out
 
 
-def _set_allows_mention(*, set_id: str, handle: str) -> bool:
-    # True if handle is a member of the Set. Fail-closed.
-    sid = str(set_id or "").strip()
-    h = str(handle or "").strip().lower()
-    if not sid or not h:
-        return False
-
-    try:
-        from siddes_sets.models import SiddesSetMember  # type: ignore
-        return bool(SiddesSetMember.objects.filter(set_id=sid, member_id=h).exists())
-    except Exception:
-        # Fallback: JSON members list
-        try:
-            from siddes_sets.models import SiddesSet  # type: ignore
-            ss = SiddesSet.objects.filter(id=sid).first()
-            members = getattr(ss, "members", []) or []
-            if not isinstance(members, list):
-                return False
-            mem = set()
-            for it in members:
-                t = str(it or "").strip().lower()
-                if not t:
-                    continue
-                if not t.startswith("@"):
-                    t = "@" + t
-                mem.add(t)
-            return h in mem
-        except Exception:
-            return False
+# Which SideMembership placements can see a post in each private Side (Close implies Friends).
+_SIDE_AUDIENCE = {"friends": ("friends", "close"), "close": ("close",), "work": ("work",)}
 
 
-def _disallowed_mentions(*, author_id: str, side: str, set_id: str | None, handles: list[str]) -> list[str]:
-    # Return disallowed mention handles for this context.
-    # Enforcement is STRICT for non-public.
-    # - If set_id is present (non-broadcast): allow only Set members.
-    # - Else: allow only SideMembership-placed members (Close implies Friends).
+def _disallowed_mentions(
+    *,
+    author_id: str,
+    side: str,
+    set_id: str | None,
+    handles: list[str],
+    audience_owner_id: str | None = None,
+) -> list[str]:
+    # Return disallowed mention handles for this context (batch authorizer).
+    # Enforcement is STRICT for non-public; fail-closed.
+    # - If set_id is present (non-broadcast): allow only Set members (one roster query).
+    # - Else: allow only people the audience owner (post author; defaults to the
+    #   writer) placed into this Side: handles resolve in one identity lookup,
+    #   SideMembership rows load in one query (Close implies Friends).
+    # Used for posts, edits, replies and quote-echoes.
     s = str(side or "").strip().lower() or "public"
     if s == "public":
         return []
 
-    sid = str(set_id or "").strip()
-    out: list[str] = []
-
-    try:
-        from siddes_safety.policy import is_blocked_pair  # type: ignore
-    except Exception:
-        is_blocked_pair = None
-
+    owner = str(audience_owner_id or author_id or "").strip()
+    hs: list[str] = []
     for h in (handles or []):
         hh = str(h or "").strip().lower()
-        if not hh:
+        if not hh or hh in hs:
             continue
-
-        # self-mention is always harmless
+        # self-mention (and the post author, who sees their own post) is always harmless
         try:
-            if _same_person(author_id, hh):
+            if _same_person(author_id, hh) or (owner != author_id and _same_person(owner, hh)):
                 continue
         except Exception:
             pass
+        hs.append(hh)
+    if not hs:
+        return []
 
-        # Set-scoped: must be in Set roster
-        if sid and not sid.startswith("b_"):
-            if not _set_allows_mention(set_id=sid, handle=hh):
-                out.append(hh)
-            continue
-
-        # Side-scoped: must be placed into this Side by the author.
-        if is_blocked_pair is not None:
-            try:
-                if is_blocked_pair(author_id, hh):
-                    out.append(hh)
-                    continue
-            except Exception:
-                pass
-
+    sid = str(set_id or "").strip()
+    if sid and not sid.startswith("b_"):
+        # Set-scoped: must be in the Set roster (members are stored as @handles).
         try:
-            if not _side_membership_allows(viewer_id=hh, author_id=author_id, side=s):
-                out.append(hh)
+            from siddes_sets.models import SiddesSetMember  # type: ignore
+
+            members = set(SiddesSetMember.objects.filter(set_id=sid, member_id__in=hs).values_list("member_id", flat=True))
         except Exception:
-            out.append(hh)
+            members = set()
+        return [h for h in hs if h not in members]
+
+    audience = _SIDE_AUDIENCE.get(s)
+    if not audience:
+        return list(hs)
+
+    # Side-scoped: must be placed into this Side by the audience owner.
+    try:
+        from siddes_backend.identity import resolve_many  # type: ignore
 
+        resolved = resolve_many(hs + [owner])
+    except Exception:
+        return list(hs)
+    owner_r = resolved.get(owner)
+    uids = {h: int(r.user_id) for h in hs if (r := resolved.get(h)) is not None}
+    if owner_r is None or not uids:
+        return list(hs)
+
+    try:
+        from siddes_safety.policy import blocked_among  # type: ignore
+
+        blocked = blocked_among(author_id, hs + [f"me_{u}" for u in uids.values()])
+    except Exception:
+        blocked = set()
+
+    try:
+        from siddes_prism.models import SideMembership  # type: ignore
+
+        placed = dict(
+            SideMembership.objects.filter(owner_id=owner_r.user_id, member_id__in=set(uids.values())).values_list("member_id", "side")
+        )
+    except Exception:
+        return list(hs)
+
+    out: list[str] = []
+    for h in hs:
+        uid = uids.get(h)
+        if uid is None or h in blocked or f"me_{uid}" in blocked:
+            out.append(h)
+        elif str(placed.get(uid) or "").strip().lower() not in audience:
+            out.append(h)
     return out
 
 
+def _bump_profile_cache_best_effort(author_id: str) -> None:
+    # Profile payloads embed the author's recent posts and their like/reply
+    # counts; invalidate them on post and engagement writes.
+    try:
+        from siddes_prism.profile_cache import bump_profile_for_token  # type: ignore
+
+        bump_profile_for_token(str(author_id or ""))
+    except Exception:
+        pass
+
+
 def _notify_mentions_handles_best_effort(
     *,
     author_id: str,
@@ -179,44 +200,52 @@ def _notify_mentions_handles_best_effort(
     exclude_tokens: list[str] | None = None,
 ) -> None:
     # Create mention notifications for handles (best-effort, never raises).
+    # Handles resolve in one identity lookup and blocks come from one safety-graph load.
     try:
         from siddes_notifications.service import notify  # type: ignore
     except Exception:
         return
 
-    try:
-        from siddes_safety.policy import is_blocked_pair  # type: ignore
-    except Exception:
-        is_blocked_pair = None
-
-    ex = [str(x or "").strip() for x in (exclude_tokens or []) if str(x or "").strip()]
-
+    hs: list[str] = []
     for h in (handles or []):
         hh = str(h or "").strip().lower()
-        if not hh:
+        if not hh or hh in hs:
             continue
-
         try:
             if _same_person(author_id, hh):
                 continue
         except Exception:
             pass
+        hs.append(hh)
+    if not hs:
+        return
 
-        # Resolve user for notification targeting: @handle -> Django user -> me_<id>
-        try:
-            u = _user_from_token(hh)
-        except Exception:
-            u = None
-        if not u:
-            continue
+    # Resolve users for notification targeting: @handle -> Django user -> me_<id>
+    try:
+        from siddes_backend.identity import resolve_many  # type: ignore
 
-        try:
-            uid = int(getattr(u, "id"))
-        except Exception:
-            continue
+        resolved = resolve_many(hs)
+    except Exception:
+        resolved = {}
+    targets: list[tuple[str, str]] = []
+    for hh in hs:
+        r = resolved.get(hh)
+        if r is not None and getattr(r, "user_id", None):
+            targets.append((hh, f"me_{r.user_id}"))
+    if not targets:
+        return
 
-        target_viewer = f"me_{uid}"
+    ex = [str(x or "").strip() for x in (exclude_tokens or []) if str(x or "").strip()]
 
+    # Block-aware: never ping across blocks.
+    try:
+        from siddes_safety.policy import blocked_among  # type: ignore
+
+        blocked = blocked_among(author_id, [t for pair in targets for t in pair])
+    except Exception:
+        blocked = set()
+
+    for hh, target_viewer in targets:
         # Exclusions (e.g. post author already getting reply notification)
         skip = False
         for tok in ex:
@@ -231,13 +260,8 @@ def _notify_mentions_handles_best_effort(
         if skip:
             continue
 
-        # Block-aware: never ping across blocks.
-        if is_blocked_pair is not None:
-            try:
-                if is_blocked_pair(author_id, target_viewer) or is_blocked_pair(author_id, hh):
-                    continue
-            except Exception:
-                pass
+        if target_viewer in blocked or hh in blocked:
+            continue
 
         try:
             notify(
@@ -427,16 +451,12 @@ def _set_meta(viewer_id: str, set_id: Optional[str]) -> Tuple[bool, Optional[str
     if owner and owner in aliases:
         return True, side
 
-    # sd_366: membership table (fast) with JSON fallback
+    # sd_366: membership table is the source of truth (fail-closed)
     try:
         ok = SiddesSetMember.objects.filter(set_id=sid, member_id__in=list(aliases)).exists()
         return bool(ok), side
     except Exception:
-        members = getattr(s, "members", []) or []
-        if not isinstance(members, list):
-            return False, side
-        mem = {str(m).strip() for m in members if isinstance(m, (str, int, float))}
-        return (bool(mem.intersection(aliases))), side
+        return False, side
 
 
 
@@ -460,8 +480,8 @@ def _viewer_is_staff(viewer_id: str) -> bool:
 # This makes the "Walking into a room" mental model true server-side.
 # Rule: for non-public posts WITHOUT set_id, viewer must be placed into
 # the author's Side via SideMembership (Close implies Friends).
-def _user_from_token(token: str):
-    """Best-effort resolve a Django User from an identity token.
+def _user_id_from_token(token: str) -> Optional[int]:
+    """Best-effort resolve a Django user id from an identity token.
 
     Accepts:
       - me_<id>
@@ -469,24 +489,12 @@ def _user_from_token(token: str):
 
     Fail-closed: returns None when unresolved or DB unavailable.
     """
-    t = str(token or "").strip()
-    if not t:
-        return None
     try:
-        from django.contrib.auth import get_user_model
-        from siddes_backend.identity import parse_viewer_user_id, normalize_handle  # type: ignore
-        User = get_user_model()
-        uid = parse_viewer_user_id(t)
-        if uid is not None:
-            return User.objects.filter(id=uid).first()
-        h = normalize_handle(t)
-        if h:
-            uname = str(h[1:] or "").strip()
-            if uname:
-                return User.objects.filter(username__iexact=uname).first()
+        from siddes_backend.identity import user_id_for_token  # type: ignore
+
+        return user_id_for_token(token)
     except Exception:
         return None
-    return None
 
 def _side_membership_allows(viewer_id: str, author_id: str, side: str) -> bool:
     """Side-only visibility for set-less private posts.
@@ -499,12 +507,12 @@ def _side_membership_allows(viewer_id: str, author_id: str, side: str) -> bool:
     if s not in ("friends", "close", "work"):
         return False
     try:
-        viewer_u = _user_from_token(viewer_id)
-        author_u = _user_from_token(author_id)
-        if not viewer_u or not author_u:
+        viewer_uid = _user_id_from_token(viewer_id)
+        author_uid = _user_id_from_token(author_id)
+        if not viewer_uid or not author_uid:
             return False
         from siddes_prism.models import SideMembership  # type: ignore
-        rel = SideMembership.objects.filter(owner=author_u, member=viewer_u).first()
+        rel = SideMembership.objects.filter(owner_id=author_uid, member_id=viewer_uid).first()
         if not rel:
             return False
         r = str(getattr(rel, "side", "") or "").strip().lower()
@@ -749,6 +757,52 @@ def _feed_post_from_record(rec, viewer_id: Optional[str] = None) -> Dict[str, An
     return out
 
 
+class _MediaAttachConflict(Exception):
+    pass
+
+
+def _media_meta_int(meta: Any, names: Tuple[str, ...]) -> Optional[int]:
+    if not isinstance(meta, dict):
+        return None
+    for k in names:
+        v = meta.get(k)
+        if v:
+            try:
+                n = int(float(v))
+                return n if n > 0 else None
+            except Exception:
+                return None
+    return None
+
+
+def _attach_media(*, post_id: str, owner_id: str, keys: list[str], meta: Dict[str, Any], is_public: bool) -> int:
+    """Commit + attach media keys to a post in one UPDATE; returns rows attached.
+
+    sd_555_media_meta: client width/height/durationMs ride along as CASE
+    expressions instead of one UPDATE per key.
+    """
+
+    from django.db.models import Case, F, IntegerField, Value, When
+
+    from siddes_media.models import MediaObject  # type: ignore
+
+    upd: Dict[str, Any] = {"status": "committed", "post_id": post_id, "is_public": bool(is_public)}
+    for field, names in (
+        ("width", ("w", "width")),
+        ("height", ("h", "height")),
+        ("duration_ms", ("durationMs", "duration_ms", "duration")),
+    ):
+        whens = []
+        for k in keys:
+            n = _media_meta_int(meta.get(k), names)
+            if n is not None:
+                whens.append(When(r2_key=k, then=Value(n)))
+        if whens:
+            upd[field] = Case(*whens, default=F(field), output_field=IntegerField())
+
+    return MediaObject.objects.filter(r2_key__in=keys, owner_id=owner_id, post_id__isnull=True).exclude(status="reaping").update(**upd)
+
+
 @method_decorator(dev_csrf_exempt, name="dispatch")
 class PostCreateView(APIView):
     throttle_scope = "post_create"
@@ -814,6 +868,13 @@ class PostCreateView(APIView):
         client_key = str(body.get("client_key") or body.get("clientKey") or "").strip() or None
         parent_id = str(body.get("parentId") or body.get("parent_id") or "").strip() or None
 
+        # Replays (offline queue, client timeouts) get the post this clientKey
+        # already created: its media is attached and its event was published.
+        if client_key:
+            replay = POST_STORE.get_by_client_key(author_id=viewer, client_key=client_key)
+            if replay is not None:
+                return Response({"ok": True, "status": 201, "post": _feed_post_from_record(replay, viewer_id=viewer), "side": str(getattr(replay, "side", "") or side)}, status=status.HTTP_201_CREATED)
+
         # sd_384_media: optional media attachments (R2 keys)
         media_keys = _parse_media_keys(body)
 
@@ -841,7 +902,7 @@ class PostCreateView(APIView):
             try:
                 from siddes_media.models import MediaObject  # type: ignore
 
-                qs = MediaObject.objects.filter(r2_key__in=media_keys, owner_id=viewer)
+                qs = MediaObject.objects.filter(r2_key__in=media_keys, owner_id=viewer).exclude(status="reaping")
                 found = {str(getattr(o, "r2_key", "") or "").strip(): o for o in qs}
                 missing = [k for k in media_keys if k not in found]
                 if missing:
@@ -850,6 +911,11 @@ class PostCreateView(APIView):
                 used = [k for k, o in found.items() if str(getattr(o, "post_id", "") or "").strip()]
                 if used:
                     return Response({"ok": False, "error": "media_already_used"}, status=status.HTTP_400_BAD_REQUEST)
+
+                # Multipart uploads must be completed before they can be attached.
+                uploading = [k for k, o in found.items() if str(getattr(o, "upload_id", "") or "").strip()]
+                if uploading:
+                    return Response({"ok": False, "error": "media_upload_incomplete"}, status=status.HTTP_400_BAD_REQUEST)
             except Exception:
                 return Response({"ok": False, "error": "media_unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
@@ -880,70 +946,32 @@ class PostCreateView(APIView):
         if disallowed:
             return Response({"ok": False, "error": "mention_forbidden", "handles": disallowed}, status=status.HTTP_400_BAD_REQUEST)
 
-        rec = POST_STORE.create(author_id=viewer, side=side, text=text, set_id=set_id, urgent=urgent, public_channel=public_channel, client_key=client_key)
-
-        # sd_384_media: commit + attach media to post (server-side visibility is enforced here)
-        if media_keys:
-            try:
-                from siddes_media.models import MediaObject  # type: ignore
+        # Transactional part: insert + media attach commit together. Mentions,
+        # notifications and cache work follow as a post_created event (events.py).
+        try:
+            with transaction.atomic():
+                rec = POST_STORE.create(author_id=viewer, side=side, text=text, set_id=set_id, urgent=urgent, public_channel=public_channel, client_key=client_key)
 
-                pid = str(getattr(rec, "id", "") or "")
-                MediaObject.objects.filter(r2_key__in=media_keys, owner_id=viewer, post_id__isnull=True).update(
-                    status="committed",
-                    post_id=pid,
-                    is_public=(side == "public"),
-                )
-
-                # sd_555_media_meta: persist width/height/durationMs when provided (max 4; safe to loop)
-                if media_meta:
-                    def _int(v: Any) -> Optional[int]:
-                        try:
-                            n = int(float(v))
-                            return n if n > 0 else None
-                        except Exception:
-                            return None
-
-                    for k in media_keys:
-                        meta = media_meta.get(k)
-                        if not isinstance(meta, dict):
-                            continue
-                        w = _int(meta.get("w") or meta.get("width"))
-                        h = _int(meta.get("h") or meta.get("height"))
-                        d = _int(meta.get("durationMs") or meta.get("duration_ms") or meta.get("duration"))
-                        upd: Dict[str, Any] = {}
-                        if w is not None:
-                            upd["width"] = w
-                        if h is not None:
-                            upd["height"] = h
-                        if d is not None:
-                            upd["duration_ms"] = d
-                        if upd:
-                            MediaObject.objects.filter(r2_key=k, owner_id=viewer).update(**upd)
-            except Exception:
-                pass
+                # sd_384_media: commit + attach media to post (server-side visibility is enforced here)
+                if media_keys:
+                    pid = str(getattr(rec, "id", "") or "")
+                    n = _attach_media(post_id=pid, owner_id=viewer, keys=media_keys, meta=media_meta, is_public=(side == "public"))
+                    if n != len(media_keys):
+                        raise _MediaAttachConflict()
 
+                # Broadcast feeds page by last_post_at: it commits with the post.
+                if set_id and str(set_id).startswith("b_"):
+                    from siddes_broadcasts.store_db import STORE as _BC_STORE
 
-        # Touch broadcast last_post_at when posting into a broadcast
-        if _broadcasts_enabled() and set_id and str(set_id).startswith("b_"):
-            try:
-                from siddes_broadcasts.store_db import STORE as _BC_STORE
+                    _BC_STORE.touch_last_post(broadcast_id=str(set_id), created_at=float(getattr(rec, "created_at", 0.0) or 0.0))
 
-                _BC_STORE.touch_last_post(broadcast_id=str(set_id), created_at=float(getattr(rec, "created_at", 0.0) or 0.0))
-            except Exception:
-                pass
-
-        # sd_717d_mentions_backend: mention notifications (best-effort)
-        try:
-            _notify_mentions_handles_best_effort(
-                author_id=viewer,
-                side=side,
-                handles=mention_handles,
-                post_id=str(getattr(rec, "id", "") or ""),
-                post_title=(text[:60] if text else None),
-                glimpse=text,
-            )
+                emit_post_created(rec, mention_handles=mention_handles)
+        except _MediaAttachConflict:
+            return Response({"ok": False, "error": "media_already_used"}, status=status.HTTP_400_BAD_REQUEST)
         except Exception:
-            pass
+            if not media_keys:
+                raise
+            return Response({"ok": False, "error": "media_unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
         return Response({"ok": True, "status": 201, "post": _feed_post_from_record(rec, viewer_id=viewer), "side": side}, status=status.HTTP_201_CREATED)
 
@@ -1093,6 +1121,8 @@ class PostDetailView(APIView):
         except Exception:
             return Response({"ok": False, "error": "update_failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        _bump_profile_cache_best_effort(str(getattr(rec, "author_id", "") or viewer))
+
         # sd_717d_mentions_backend: notify newly added mentions (best-effort)
         try:
             if added_handles:
@@ -1131,8 +1161,12 @@ class PostDetailView(APIView):
         # sd_384_media: detach media objects (fail-safe)
         try:
             from siddes_media.models import MediaObject  # type: ignore
+            from siddes_media.views import invalidate_signed_urls  # type: ignore
 
-            MediaObject.objects.filter(post_id=str(post_id)).update(post_id=None, is_public=False)
+            mq = MediaObject.objects.filter(post_id=str(post_id))
+            keys = list(mq.values_list("r2_key", flat=True))
+            mq.update(post_id=None, is_public=False)
+            invalidate_signed_urls(keys)
         except Exception:
             pass
 
@@ -1146,6 +1180,8 @@ class PostDetailView(APIView):
         except Exception:
             return Response({"ok": False, "error": "delete_failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        _bump_profile_cache_best_effort(str(getattr(rec, "author_id", "") or viewer))
+
         return Response({"ok": True, "deleted": True, "id": str(post_id)}, status=status.HTTP_200_OK)
 
 
@@ -1189,6 +1225,12 @@ class PostRepliesView(APIView):
             return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
         replies = REPLY_STORE.list_for_post(post_id)
+        try:
+            from siddes_backend.identity import resolve_many  # type: ignore
+
+            resolve_many([viewer] + [r.author_id for r in replies])
+        except Exception:
+            pass
         out = [
             {
                 "id": r.id,
@@ -1304,12 +1346,16 @@ class PostReplyCreateView(APIView):
 
         # sd_717d_mentions_backend: enforce context-safe @mentions for replies (server-side)
         mention_handles = _extract_mention_handles(text)
-        disallowed = _disallowed_mentions(author_id=viewer, side=side, set_id=set_id_of_post, handles=mention_handles)
+        disallowed = _disallowed_mentions(
+            author_id=viewer, side=side, set_id=set_id_of_post, handles=mention_handles, audience_owner_id=author_id
+        )
         if disallowed:
             return Response({"ok": False, "error": "mention_forbidden", "handles": disallowed}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
             r = REPLY_STORE.create(post_id=post_id, author_id=viewer, text=text, client_key=client_key, parent_id=parent_id)
+            # Profile payloads embed reply counts of the author's posts.
+            _bump_profile_cache_best_effort(author_id)
 
             # sd_310_notify_reply: notify post author
             try:
@@ -1469,15 +1515,18 @@ class PostLikeView(APIView):
         if not _can_view_post_record(viewer_id=viewer, side=side, author_id=author_id, set_id=set_id, is_hidden=bool(getattr(rec, "is_hidden", False))):
             return False, Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        return True, (viewer,)
+        return True, (viewer, author_id)
 
     def post(self, request, post_id: str):
         ok, payload = self._ensure_viewable(request, post_id)
         if not ok:
             return payload
 
-        (viewer,) = payload
-        PostLike.objects.get_or_create(post_id=post_id, viewer_id=viewer, defaults={"created_at": time.time()})
+        viewer, author_id = payload
+        _, created = PostLike.objects.get_or_create(post_id=post_id, viewer_id=viewer, defaults={"created_at": time.time()})
+        if created:
+            # Profile payloads embed like counts of the author's posts.
+            _bump_profile_cache_best_effort(author_id)
 
         # sd_310_notify_like: notify post author
         try:
@@ -1506,8 +1555,10 @@ class PostLikeView(APIView):
         if not ok:
             return payload
 
-        (viewer,) = payload
-        PostLike.objects.filter(post_id=post_id, viewer_id=viewer).delete()
+        viewer, author_id = payload
+        deleted, _ = PostLike.objects.filter(post_id=post_id, viewer_id=viewer).delete()
+        if deleted:
+            _bump_profile_cache_best_effort(author_id)
         return Response({"ok": True, "liked": False, "postId": post_id, "likeCount": _like_count(post_id)}, status=status.HTTP_200_OK)
 
 
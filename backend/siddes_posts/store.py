@@ -58,6 +58,10 @@ class PostStore:
             self._by_author_key[(author_id, client_key)] = post_id
         return rec
 
+    def get_by_client_key(self, *, author_id: str, client_key: str) -> Optional[PostRecord]:
+        pid = self._by_author_key.get((author_id, str(client_key or '').strip()))
+        return self._posts.get(pid) if pid else None
+
     def delete_by_author_client_key(self, *, author_id: str, client_key: str) -> int:
         """Delete a post by (author_id, client_key). Returns number deleted."""
         ck = str(client_key or '').strip()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from siddes_prism.models import ProfileStats
+from siddes_prism.stats import live_counts, recompute_profile_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild precomputed profile counts (followers/following/siders) from the graph tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Users per batch (default: 500).")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many rows drifted without writing.",
+        )
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        batch = max(1, min(int(opts.get("batch_size") or 500), 5000))
+        dry = bool(opts.get("dry_run"))
+
+        scanned = 0
+        drifted = 0
+        last_id = 0
+        while True:
+            ids = list(User.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch])
+            if not ids:
+                break
+            last_id = ids[-1]
+            scanned += len(ids)
+
+            live = live_counts(ids)
+            stored = {
+                int(r["user_id"]): r
+                for r in ProfileStats.objects.filter(user_id__in=ids).values(
+                    "user_id", "followers_count", "following_count", "siders_count"
+                )
+            }
+            stale = []
+            for uid, c in live.items():
+                row = stored.get(uid)
+                if row is None and not any(c.values()):
+                    continue
+                if row is None or any(int(row[k]) != int(v) for k, v in c.items()):
+                    stale.append(uid)
+
+            drifted += len(stale)
+            if stale and not dry:
+                recompute_profile_stats(stale)
+
+        if dry:
+            self.stdout.write(self.style.WARNING(f"Would rebuild {drifted} of {scanned} profile stats row(s)."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {drifted} of {scanned} profile stats row(s)."))
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def backfill_profile_stats(apps, schema_editor):
+    UserFollow = apps.get_model("siddes_prism", "UserFollow")
+    SideMembership = apps.get_model("siddes_prism", "SideMembership")
+    ProfileStats = apps.get_model("siddes_prism", "ProfileStats")
+
+    def grouped(qs, field):
+        return {int(k): int(n) for k, n in qs.values(field).annotate(n=Count("id")).values_list(field, "n")}
+
+    followers = grouped(UserFollow.objects.all(), "target_id")
+    following = grouped(UserFollow.objects.all(), "follower_id")
+    siders = grouped(SideMembership.objects.all(), "member_id")
+
+    ids = set(followers) | set(following) | set(siders)
+    rows = [
+        ProfileStats(
+            user_id=uid,
+            followers_count=followers.get(uid, 0),
+            following_count=following.get(uid, 0),
+            siders_count=siders.get(uid, 0),
+        )
+        for uid in sorted(ids)
+    ]
+    ProfileStats.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_prism", "0009_public_rosters_hidden"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfileStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="profile_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("followers_count", models.IntegerField(default=0)),
+                ("following_count", models.IntegerField(default=0)),
+                ("siders_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_profile_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_prism", "0010_profile_stats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userfollow",
+            index=models.Index(fields=["target", "-id", "follower"], name="userfollow_target_id_cov"),
+        ),
+        migrations.AddIndex(
+            model_name="userfollow",
+            index=models.Index(fields=["follower", "-id", "target"], name="userfollow_follower_id_cov"),
+        ),
+    ]
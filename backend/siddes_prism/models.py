@@ -145,4 +145,32 @@ class UserFollow(models.Model):
         indexes = [
             models.Index(fields=["target", "created_at"], name="userfollow_target_created"),
             models.Index(fields=["follower", "created_at"], name="userfollow_follower_created"),
+            # Roster keyset pages (ORDER BY -id); trailing column makes the scan index-only.
+            models.Index(fields=["target", "-id", "follower"], name="userfollow_target_id_cov"),
+            models.Index(fields=["follower", "-id", "target"], name="userfollow_follower_id_cov"),
         ]
+
+class ProfileStats(models.Model):
+    """Precomputed profile aggregates (one row per user).
+
+    ProfileView reads this row instead of running three COUNT(*) queries per
+    request. Rows are maintained in the same transaction as the graph write
+    (UserFollow / SideMembership) via `siddes_prism.stats`; a missing row is
+    rebuilt from live counts on first read.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="profile_stats",
+    )
+
+    # Public follow graph (UserFollow)
+    followers_count = models.IntegerField(default=0)
+    following_count = models.IntegerField(default=0)
+
+    # Owners that have placed this user into a Side (SideMembership.member=user)
+    siders_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
@@ -0,0 +1,85 @@
+"""Profile cache versions (event-driven invalidation for ProfileView).
+
+ProfileView cache keys embed two versions (siddes_backend.cache_versions):
+- target version: bumped when anything on the target's own profile changes
+  (facet edits, follower/siders counts, the target's posts and their
+  like/reply counts)
+- pair version: bumped when the relationship between two users changes
+  (follow, side placement, block). Unordered, so one bump covers both
+  "A views B" and "B views A".
+
+Bumping a version orphans every cached payload built under the old one, so the
+TTL only bounds memory, not freshness. All helpers are best-effort and never raise.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from siddes_backend.cache_versions import bump_versions, get_version
+
+
+def _uid(x: object) -> Optional[int]:
+    try:
+        n = int(x)  # type: ignore[arg-type]
+    except Exception:
+        return None
+    return n if n > 0 else None
+
+
+def _target_ver_key(target_id: int) -> str:
+    return f"profile:v1:ver:t:{target_id}"
+
+
+def _pair_ver_key(a: int, b: int) -> str:
+    lo, hi = (a, b) if a <= b else (b, a)
+    return f"profile:v1:ver:p:{lo}:{hi}"
+
+
+def profile_versions(*, target_id: object, viewer_id: object = None) -> str:
+    """Return a short version tag for cache keys: "<target_ver>.<pair_ver>"."""
+
+    t = _uid(target_id)
+    if t is None:
+        return "0.0"
+    tv = get_version(_target_ver_key(t))
+    v = _uid(viewer_id)
+    pv = get_version(_pair_ver_key(t, v)) if v is not None and v != t else "0"
+    return f"{tv}.{pv}"
+
+
+def bump_profile_target(*user_ids: object) -> None:
+    """Invalidate every cached view of these users' profiles."""
+
+    bump_versions(_target_ver_key(u) for u in (_uid(x) for x in user_ids) if u is not None)
+
+
+def bump_profile_pair(a: object, b: object) -> None:
+    """Invalidate cached profiles that A and B see of each other."""
+
+    ua, ub = _uid(a), _uid(b)
+    if ua is None or ub is None or ua == ub:
+        return
+    bump_versions([_pair_ver_key(ua, ub)])
+
+
+def bump_profile_for_token(token: str) -> None:
+    """Bump the target version for an identity token (me_<id> or @username)."""
+
+    tok = str(token or "").strip()
+    if not tok:
+        return
+    try:
+        from siddes_backend.identity import normalize_handle, parse_viewer_user_id
+
+        uid = parse_viewer_user_id(tok)
+        if uid is None:
+            h = normalize_handle(tok)
+            if not h:
+                return
+            from django.contrib.auth import get_user_model
+
+            uid = get_user_model().objects.filter(username__iexact=h[1:]).values_list("id", flat=True).first()
+        bump_profile_target(uid)
+    except Exception:
+        pass
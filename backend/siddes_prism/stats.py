@@ -0,0 +1,146 @@
+"""Profile aggregates: followers / following / siders counts.
+
+Counts live in `ProfileStats` and are maintained incrementally by the graph
+writers (FollowActionView, SideActionView, access-request accept, block
+cleanup). Callers should apply deltas inside the same `transaction.atomic()`
+block as the edge insert/delete so counts never drift from the edges.
+
+Contract:
+- `get_profile_stats(user_id)` never raises; it falls back to live COUNT(*).
+- A missing row is rebuilt from live counts (covers users that predate the table).
+- Deltas are only applied when an edge was actually created/deleted.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+
+from .models import ProfileStats, SideMembership, UserFollow
+
+_FIELDS = ("followers_count", "following_count", "siders_count")
+
+
+def _ids(user_ids: Iterable[object]) -> List[int]:
+    out: List[int] = []
+    for x in user_ids:
+        try:
+            uid = int(x)  # type: ignore[arg-type]
+        except Exception:
+            continue
+        if uid > 0 and uid not in out:
+            out.append(uid)
+    return out
+
+
+def _grouped(qs, field: str, ids: List[int]) -> Dict[int, int]:
+    rows = qs.filter(**{f"{field}__in": ids}).values(field).annotate(n=Count("id")).values_list(field, "n")
+    return {int(k): int(n) for k, n in rows}
+
+
+def live_counts(user_ids: Iterable[object]) -> Dict[int, Dict[str, int]]:
+    """Compute counts from the edge tables (one grouped query per counter)."""
+
+    ids = _ids(user_ids)
+    if not ids:
+        return {}
+
+    followers = _grouped(UserFollow.objects.all(), "target_id", ids)
+    following = _grouped(UserFollow.objects.all(), "follower_id", ids)
+    siders = _grouped(SideMembership.objects.all(), "member_id", ids)
+
+    return {
+        uid: {
+            "followers_count": followers.get(uid, 0),
+            "following_count": following.get(uid, 0),
+            "siders_count": siders.get(uid, 0),
+        }
+        for uid in ids
+    }
+
+
+def _write_row(uid: int, counts: Dict[str, int]) -> None:
+    if ProfileStats.objects.filter(user_id=uid).update(**counts):
+        return
+    try:
+        with transaction.atomic():
+            ProfileStats.objects.create(user_id=uid, **counts)
+    except IntegrityError:
+        # Concurrent first write created the row; overwrite with our snapshot.
+        ProfileStats.objects.filter(user_id=uid).update(**counts)
+
+
+def recompute_profile_stats(user_ids: Iterable[object]) -> int:
+    """Rebuild ProfileStats rows from live counts. Returns rows written."""
+
+    counts = live_counts(user_ids)
+    for uid, c in counts.items():
+        _write_row(uid, c)
+    return len(counts)
+
+
+def _bump(user_id: object, field: str, delta: int) -> None:
+    ids = _ids([user_id])
+    if not ids or not delta:
+        return
+    uid = ids[0]
+    updated = ProfileStats.objects.filter(user_id=uid).update(
+        **{field: Greatest(F(field) + Value(int(delta)), Value(0))}
+    )
+    if not updated:
+        # No row yet: the edge write already happened in this transaction,
+        # so live counts include it.
+        recompute_profile_stats([uid])
+
+
+def apply_follow_delta(*, follower_id: object, target_id: object, delta: int) -> None:
+    """Record a created (+1) / deleted (-1) UserFollow edge."""
+
+    _bump(target_id, "followers_count", delta)
+    _bump(follower_id, "following_count", delta)
+
+
+def apply_siders_delta(*, member_id: object, delta: int) -> None:
+    """Record a created (+1) / deleted (-1) SideMembership edge for member."""
+
+    _bump(member_id, "siders_count", delta)
+
+
+def get_profile_stats(user_id: object) -> Dict[str, Optional[int]]:
+    """Return {"followers", "following", "siders"} for a user (never raises)."""
+
+    ids = _ids([user_id])
+    empty: Dict[str, Optional[int]] = {"followers": None, "following": None, "siders": None}
+    if not ids:
+        return empty
+    uid = ids[0]
+
+    row: Optional[Dict[str, int]] = None
+    try:
+        row = ProfileStats.objects.filter(user_id=uid).values(*_FIELDS).first()
+    except Exception:
+        row = None
+
+    if row is None:
+        try:
+            row = live_counts([uid]).get(uid)
+        except Exception:
+            return empty
+        if row is not None:
+            try:
+                _write_row(uid, row)
+            except Exception:
+                pass
+
+    return _row_to_out(row) if row else empty
+
+
+def _row_to_out(row: Dict[str, int]) -> Dict[str, Optional[int]]:
+    return {
+        "followers": int(row.get("followers_count") or 0),
+        "following": int(row.get("following_count") or 0),
+        "siders": int(row.get("siders_count") or 0),
+    }
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import override_settings
 from rest_framework.test import APITestCase
 
-from .models import SideMembership
+from .models import PrismFacet, ProfileStats, SideMembership, UserFollow
+from .stats import get_profile_stats
 
 
 @override_settings(DEBUG=True)
@@ -92,3 +95,215 @@ class PrismGraphSecurityTests(APITestCase):
         )
         assert r.status_code == 200, r.content
         assert r.json().get("ok") is True
+
+
+@override_settings(DEBUG=True)
+@mock.patch.dict("os.environ", {"SIDDES_PROFILE_CACHE_ENABLED": "0"})
+class ProfileStatsTests(APITestCase):
+    """Precomputed profile counts stay in step with the graph writes."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.bob = User.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        self.h_alice = {"HTTP_X_SD_VIEWER": f"me_{self.alice.id}"}
+        self.h_bob = {"HTTP_X_SD_VIEWER": f"me_{self.bob.id}"}
+
+    def test_follow_and_unfollow_maintain_counts(self):
+        r = self.client.post("/api/follow", {"username": "@bob", "follow": True}, format="json", **self.h_alice)
+        assert r.status_code == 200, r.content
+        assert r.json().get("publicFollowers") == 1
+
+        # Repeat follow is idempotent (no double count).
+        self.client.post("/api/follow", {"username": "@bob", "follow": True}, format="json", **self.h_alice)
+        assert get_profile_stats(self.bob.id)["followers"] == 1
+        assert get_profile_stats(self.alice.id)["following"] == 1
+
+        r = self.client.get("/api/profile/bob", **self.h_alice)
+        assert r.status_code == 200, r.content
+        j = r.json()
+        assert j.get("publicFollowers") == 1
+        assert j.get("publicFollowing") == 0
+        assert j.get("viewerFollowsPublic") is True
+
+        r = self.client.post("/api/follow", {"username": "@bob", "follow": False}, format="json", **self.h_alice)
+        assert r.json().get("publicFollowers") == 0
+        self.client.post("/api/follow", {"username": "@bob", "follow": False}, format="json", **self.h_alice)
+        assert get_profile_stats(self.bob.id)["followers"] == 0
+        assert get_profile_stats(self.alice.id)["following"] == 0
+
+    def test_siders_count_tracks_side_changes(self):
+        self.client.post("/api/side", {"username": "@bob", "side": "friends"}, format="json", **self.h_alice)
+        self.client.post("/api/side", {"username": "@bob", "side": "close", "confirm": True}, format="json", **self.h_alice)
+        assert get_profile_stats(self.bob.id)["siders"] == 1
+
+        r = self.client.get("/api/profile/bob", **self.h_alice)
+        assert r.json().get("siders") == 1
+
+        self.client.post("/api/side", {"username": "@bob", "side": "public"}, format="json", **self.h_alice)
+        assert get_profile_stats(self.bob.id)["siders"] == 0
+
+    def test_missing_row_rebuilt_from_live_counts(self):
+        UserFollow.objects.create(follower=self.alice, target=self.bob)
+        SideMembership.objects.create(owner=self.alice, member=self.bob, side="friends")
+        ProfileStats.objects.filter(user=self.bob).delete()
+
+        r = self.client.get("/api/profile/bob", **self.h_alice)
+        j = r.json()
+        assert j.get("publicFollowers") == 1
+        assert j.get("siders") == 1
+        assert ProfileStats.objects.filter(user=self.bob, followers_count=1, siders_count=1).exists()
+
+    def test_shared_sets_from_membership_index(self):
+        from siddes_sets.models import SiddesSet, SiddesSetMember
+
+        s = SiddesSet.objects.create(id="set_a", owner_id=f"me_{self.alice.id}", side="friends", label="Climbing", members=["@bob"])
+        SiddesSetMember.objects.create(set=s, member_id="@bob")
+        SiddesSet.objects.create(id="set_b", owner_id=f"me_{self.bob.id}", side="friends", label="Other", members=["@alice"])
+
+        r = self.client.get("/api/profile/bob", **self.h_alice)
+        assert r.json().get("sharedSets") == ["Climbing"]
+
+
+@override_settings(DEBUG=True)
+class ProfileCacheInvalidationTests(APITestCase):
+    """Cached profiles are invalidated by the writes that change them."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        User = get_user_model()
+        self.alice = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+        self.bob = User.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        self.carol = User.objects.create_user(username="carol", email="carol@example.com", password="pw")
+        self.h_alice = {"HTTP_X_SD_VIEWER": f"me_{self.alice.id}"}
+        self.h_bob = {"HTTP_X_SD_VIEWER": f"me_{self.bob.id}"}
+        self.h_carol = {"HTTP_X_SD_VIEWER": f"me_{self.carol.id}"}
+
+    def _profile(self, username, headers, side=""):
+        q = f"?side={side}" if side else ""
+        r = self.client.get(f"/api/profile/{username}{q}", **headers)
+        assert r.status_code == 200, r.content
+        return r
+
+    def test_repeat_read_is_cache_hit(self):
+        self._profile("bob", self.h_alice)
+        r = self._profile("bob", self.h_alice)
+        assert r["X-Siddes-Cache"] == "hit"
+
+    def test_follow_by_third_party_invalidates_counts(self):
+        self._profile("bob", self.h_alice)
+        self.client.post("/api/follow", {"username": "@bob", "follow": True}, format="json", **self.h_carol)
+        r = self._profile("bob", self.h_alice)
+        assert r["X-Siddes-Cache"] == "miss"
+        assert r.json().get("publicFollowers") == 1
+
+    def test_facet_edit_invalidates(self):
+        self._profile("bob", self.h_alice)
+        r = self.client.patch("/api/prism", {"side": "public", "displayName": "Bobby"}, format="json", **self.h_bob)
+        assert r.status_code == 200, r.content
+        r = self._profile("bob", self.h_alice)
+        assert r["X-Siddes-Cache"] == "miss"
+        assert r.json()["facet"]["displayName"] == "Bobby"
+
+    def test_side_change_invalidates_viewer_relationship(self):
+        r = self._profile("bob", self.h_alice)
+        assert r.json().get("viewSide") == "public"
+        self.client.post("/api/side", {"username": "@alice", "side": "friends"}, format="json", **self.h_bob)
+        r = self._profile("bob", self.h_alice)
+        assert r["X-Siddes-Cache"] == "miss"
+        assert r.json().get("viewSide") == "friends"
+
+        # Bob's own view of Alice changes too (viewerSidedAs).
+        self._profile("alice", self.h_bob)
+        self.client.post("/api/side", {"username": "@alice", "side": "public"}, format="json", **self.h_bob)
+        r = self._profile("alice", self.h_bob)
+        assert r["X-Siddes-Cache"] == "miss"
+        assert r.json().get("viewerSidedAs") is None
+
+    def test_likes_and_replies_invalidate_the_authors_profile(self):
+        r = self.client.post("/api/post", {"side": "public", "text": "hello"}, format="json", **self.h_bob)
+        assert r.status_code == 201, r.content
+        pid = r.json()["post"]["id"]
+
+        def counts():
+            r = self._profile("bob", self.h_alice)
+            it = next(x for x in r.json()["posts"]["items"] if x["id"] == pid)
+            return r["X-Siddes-Cache"], it.get("likes"), it.get("replyCount")
+
+        assert counts()[0] == "miss"
+        assert counts() == ("hit", 0, 0)
+
+        self.client.post(f"/api/post/{pid}/like", {}, format="json", **self.h_carol)
+        assert counts() == ("miss", 1, 0)
+
+        self.client.post(f"/api/post/{pid}/reply", {"text": "hi"}, format="json", **self.h_carol)
+        assert counts() == ("miss", 1, 1)
+
+        self.client.delete(f"/api/post/{pid}/like", **self.h_carol)
+        assert counts() == ("miss", 0, 1)
+
+    def test_unrelated_write_keeps_cache(self):
+        self._profile("bob", self.h_alice)
+        self.client.post("/api/follow", {"username": "@carol", "follow": True}, format="json", **self.h_alice)
+        self._profile("bob", self.h_alice)
+        r = self._profile("bob", self.h_alice)
+        assert r["X-Siddes-Cache"] == "hit"
+
+
+@override_settings(DEBUG=True)
+class PublicRosterTests(APITestCase):
+    """Follower/following rosters: keyset pages, joined facets, known-followers."""
+
+    def setUp(self):
+        User = get_user_model()
+        self.star = User.objects.create_user(username="star", email="star@example.com", password="pw")
+        self.viewer = User.objects.create_user(username="viewer", email="viewer@example.com", password="pw")
+        self.fans = [
+            User.objects.create_user(username=f"fan{i}", email=f"fan{i}@example.com", password="pw") for i in range(5)
+        ]
+        for fan in self.fans:
+            self.client.post("/api/follow", {"username": "@star", "follow": True}, format="json", HTTP_X_SD_VIEWER=f"me_{fan.id}")
+        PrismFacet.objects.create(user=self.fans[0], side="public", display_name="Fan Zero", avatar_image_url="https://x/a.png")
+        self.h_viewer = {"HTTP_X_SD_VIEWER": f"me_{self.viewer.id}"}
+
+    def test_keyset_pages_cover_roster_once(self):
+        seen = []
+        cursor = ""
+        for _ in range(5):
+            r = self.client.get(f"/api/public-followers/star?limit=2&cursor={cursor}")
+            assert r.status_code == 200, r.content
+            j = r.json()
+            assert j.get("total") == 5
+            seen.extend(it["handle"] for it in j["items"])
+            cursor = j.get("nextCursor") or ""
+            if not cursor:
+                break
+        assert sorted(seen) == sorted(f"@fan{i}" for i in range(5))
+
+        r = self.client.get("/api/public-following/fan0")
+        j = r.json()
+        assert [it["handle"] for it in j["items"]] == ["@star"]
+        assert j.get("total") == 1
+
+    def test_public_facet_joined_in_roster(self):
+        r = self.client.get("/api/public-followers/star?limit=80")
+        by_handle = {it["handle"]: it for it in r.json()["items"]}
+        assert by_handle["@fan0"]["displayName"] == "Fan Zero"
+        assert by_handle["@fan0"]["avatarImage"] == "https://x/a.png"
+        assert by_handle["@fan1"]["avatarImage"] is None
+
+    def test_known_followers_intersects_viewer_follows(self):
+        r = self.client.get("/api/public-followers/star?known=1")
+        assert r.status_code == 401, r.content
+
+        for fan in self.fans[:2]:
+            self.client.post("/api/follow", {"username": f"@{fan.username}", "follow": True}, format="json", **self.h_viewer)
+
+        r = self.client.get("/api/public-followers/star?known=1", **self.h_viewer)
+        assert r.status_code == 200, r.content
+        j = r.json()
+        assert sorted(it["handle"] for it in j["items"]) == ["@fan0", "@fan1"]
+        assert j.get("knownTotal") == 2
+        assert j.get("total") == 5
@@ -8,15 +8,20 @@ from typing import Any, Dict, List, Optional, Tuple
 from django.conf import settings
 from django.core.cache import cache
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import FilteredRelation, Q
 from django.utils.decorators import method_decorator
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from siddes_backend.cache_versions import fill_ttl
 from siddes_backend.csrf import dev_csrf_exempt
 from siddes_safety.policy import is_blocked_pair
 
 from .models import PrismFacet, PrismSideId, SideMembership, SideAccessRequest, UserFollow
+from .profile_cache import bump_profile_pair, bump_profile_target, profile_versions
+from .stats import apply_follow_delta, apply_siders_delta, get_profile_stats
 
 VIEW_SIDES = ("public", "friends", "close", "work")
 MEMBER_SIDES = ("friends", "close", "work")
@@ -27,21 +32,24 @@ def _truthy(v: str | None) -> bool:
 # --- Profile server-side cache (sd_582) ---
 # Cache is server-side only (never edge-cache personalized/private payloads).
 # Key includes viewer + target + requestedSide + viewSide + cursor + limit to avoid leaks.
+# Keys also embed target/pair versions (profile_cache.py) bumped by facet edits,
+# follows, side changes, blocks, posts and likes/replies on the target's posts,
+# so the TTL no longer bounds freshness.
 
 def _profile_cache_enabled() -> bool:
     return _truthy(os.environ.get("SIDDES_PROFILE_CACHE_ENABLED", "1"))
 
 def _profile_cache_ttl() -> int:
-    raw = os.environ.get("SIDDES_PROFILE_CACHE_TTL_SECS", "20")
+    raw = os.environ.get("SIDDES_PROFILE_CACHE_TTL_SECS", "180")
     try:
         ttl = int(str(raw).strip())
     except Exception:
-        ttl = 20
+        ttl = 180
     if ttl < 0:
         ttl = 0
-    # Hard cap (avoid accidentally caching private payloads for too long)
-    if ttl > 300:
-        ttl = 300
+    # Hard cap (versioned keys keep payloads fresh; TTL only bounds memory)
+    if ttl > 900:
+        ttl = 900
     return ttl
 
 def _profile_cache_key(
@@ -53,10 +61,11 @@ def _profile_cache_key(
     is_owner: bool,
     limit: int,
     cursor: str | None,
+    ver: str = "",
 ) -> str:
-    raw = f"v1|viewer={viewer_tok}|target={target_id}|requested={requested}|viewSide={view_side}|owner={1 if is_owner else 0}|limit={limit}|cursor={cursor or ''}"
+    raw = f"v2|ver={ver}|viewer={viewer_tok}|target={target_id}|requested={requested}|viewSide={view_side}|owner={1 if is_owner else 0}|limit={limit}|cursor={cursor or ''}"
     h = hashlib.sha256(raw.encode("utf-8")).hexdigest()
-    return f"profile:v1:{h}"
+    return f"profile:v2:{h}"
 
 def viewer_id_for_user(user) -> str:
     return f"me_{getattr(user, 'id', '')}"
@@ -77,9 +86,12 @@ def _prune_member_from_owner_sets(*, owner_tok: str, member_handle: str, allowed
     Privacy hardening: SideMembership is the canonical 'who can see me' edge.
     If a person is no longer in your Friends/Close/Work, they must not silently
     retain access via old Set membership.
+
+    One DELETE on SiddesSetMember (plus a JSON mirror refresh and audit events
+    for the touched Sets); see siddes_sets.membership.
     """
     try:
-        from siddes_sets.models import SiddesSet, SiddesSetMember, SiddesSetEvent, SetEventKind  # type: ignore
+        from siddes_sets.membership import remove_members  # type: ignore
     except Exception:
         return 0
 
@@ -88,75 +100,18 @@ def _prune_member_from_owner_sets(*, owner_tok: str, member_handle: str, allowed
     if not owner or not mh:
         return 0
 
-    # Fast path: membership table -> sets owned by this owner.
-    set_ids: list[str] = []
-    try:
-        qs = SiddesSetMember.objects.select_related('set').filter(member_id=mh, set__owner_id=owner)
-        if allowed_sides:
-            qs = qs.exclude(set__side__in=list(allowed_sides))
-        set_ids = list(qs.values_list('set_id', flat=True))
-    except Exception:
-        set_ids = []
-
     try:
-        if set_ids:
-            sets = list(SiddesSet.objects.filter(id__in=set_ids, owner_id=owner))
-        else:
-            # Fallback: scan a bounded number of owner sets.
-            sets = list(SiddesSet.objects.filter(owner_id=owner)[:800])
+        touched = remove_members(
+            owner_ids=[owner],
+            member_ids=[mh],
+            exclude_sides=sorted(allowed_sides),
+            by=owner,
+            via='side_prune',
+            event_data={'member': mh, 'allowed': sorted(list(allowed_sides))},
+        )
     except Exception:
         return 0
-
-    import time as _time
-    import uuid as _uuid
-
-    touched = 0
-    for s in sets:
-        try:
-            side = str(getattr(s, 'side', '') or '').strip().lower()
-            if allowed_sides and side in allowed_sides:
-                continue
-
-            members = getattr(s, 'members', []) or []
-            if not isinstance(members, list):
-                members = []
-            prev = [str(m) for m in members if isinstance(m, (str, int, float))]
-            prev_norm = [str(m).strip().lower() for m in prev]
-            if mh not in prev_norm:
-                # still delete any stale membership row (best-effort)
-                try:
-                    SiddesSetMember.objects.filter(set=s, member_id=mh).delete()
-                except Exception:
-                    pass
-                continue
-
-            nxt = [prev[i] for i, mn in enumerate(prev_norm) if mn != mh]
-            s.members = nxt
-            s.save(update_fields=['members', 'updated_at'])
-
-            try:
-                SiddesSetMember.objects.filter(set=s, member_id=mh).delete()
-            except Exception:
-                pass
-
-            # Best-effort audit event
-            try:
-                SiddesSetEvent.objects.create(
-                    id='se_' + _uuid.uuid4().hex[:10],
-                    set=s,
-                    ts_ms=int(_time.time() * 1000),
-                    kind=SetEventKind.MEMBERS_UPDATED,
-                    by=owner,
-                    data={'from': prev, 'to': nxt, 'via': 'side_prune', 'member': mh, 'allowed': sorted(list(allowed_sides))},
-                )
-            except Exception:
-                pass
-
-            touched += 1
-        except Exception:
-            continue
-
-    return touched
+    return len(touched)
 
 def _parse_me_id(raw: str) -> Optional[int]:
     s = str(raw or "").strip()
@@ -388,6 +343,7 @@ class PrismView(APIView):
             f.pulse_text = pt
 
         f.save()
+        bump_profile_target(user.id)
 
         return Response({"ok": True, "item": _facet_dict(f)}, status=status.HTTP_200_OK)
 
@@ -458,6 +414,13 @@ class ProfileView(APIView):
             return Response({"ok": False, "error": "invalid_side"}, status=status.HTTP_400_BAD_REQUEST)
 
         if requested not in allowed_sides:
+            locked_stats = get_profile_stats(target.id)
+            locked_follows = False
+            if viewer and viewer.id != target.id:
+                try:
+                    locked_follows = bool(UserFollow.objects.filter(follower=viewer, target=target).exists())
+                except Exception:
+                    locked_follows = False
             return Response(
                 {
                     "ok": False,
@@ -466,12 +429,11 @@ class ProfileView(APIView):
                     "viewSide": view_side,
                     "requestedSide": requested,
                     "allowedSides": allowed_sides,
-            "isOwner": is_owner,
                     "isOwner": is_owner,
-                "viewerAuthed": viewer_authed,
-            "viewerFollowsPublic": viewer_follows_public,
-            "publicFollowers": public_followers,
-            "publicFollowing": public_following,
+                    "viewerAuthed": viewer_authed,
+                    "viewerFollowsPublic": locked_follows,
+                    "publicFollowers": locked_stats.get("followers"),
+                    "publicFollowing": locked_stats.get("following"),
                 },
                 status=status.HTTP_403_FORBIDDEN,
             )
@@ -501,6 +463,10 @@ class ProfileView(APIView):
                 is_owner=bool(is_owner),
                 limit=int(lim),
                 cursor=cursor_raw,
+                ver=profile_versions(
+                    target_id=getattr(target, "id", None),
+                    viewer_id=getattr(viewer, "id", None) if viewer else None,
+                ),
             )
             try:
                 cached = cache.get(cache_key)
@@ -531,20 +497,12 @@ class ProfileView(APIView):
             viewer_sided_as = rel_out.side if rel_out else None
 
         # sd_790_public_follow: Public follow graph (Public identity only; does NOT grant private access)
-        viewer_follows_public = False
-        public_followers: Optional[int] = None
-        public_following: Optional[int] = None
-
-        try:
-            public_followers = int(UserFollow.objects.filter(target=target).count())
-        except Exception:
-            public_followers = None
-
-        try:
-            public_following = int(UserFollow.objects.filter(follower=target).count())
-        except Exception:
-            public_following = None
+        # Counts come from the precomputed ProfileStats row (one PK lookup, no COUNT(*)).
+        stats = get_profile_stats(getattr(target, "id", None))
+        public_followers: Optional[int] = stats.get("followers")
+        public_following: Optional[int] = stats.get("following")
 
+        viewer_follows_public = False
         if viewer and viewer.id != target.id:
             try:
                 viewer_follows_public = bool(UserFollow.objects.filter(follower=viewer, target=target).exists())
@@ -554,39 +512,29 @@ class ProfileView(APIView):
         # Siders count: how many owners have placed target into a side
         siders_count: Optional[int] = None
         if view_side != "close":
-            try:
-                siders_count = int(SideMembership.objects.filter(member=target).count())
-            except Exception:
-                siders_count = None
+            siders_count = stats.get("siders")
 
-        # Shared sets: sets owned by viewer that include target (best-effort; contract-safe)
+        # Shared sets: sets owned by viewer that include target.
+        # One indexed join over SiddesSetMember(member_id) -> SiddesSet(owner_id).
         shared_sets: List[str] = []
         if viewer and viewer.id != target.id:
             try:
-                from siddes_sets.models import SiddesSet
+                from siddes_sets.models import SiddesSetMember
 
                 v_vid = viewer_id_for_user(viewer)
-                t_vid = viewer_id_for_user(target)
-
-                cand = list(SiddesSet.objects.filter(owner_id=v_vid).order_by("-updated_at")[:200])
-                for s in cand:
-                    try:
-                        members = list(getattr(s, "members", []) or [])
-                        if t_vid in members:
-                            label = str(getattr(s, "label", "") or "").strip()
-                            if label:
-                                shared_sets.append(label)
-                    except Exception:
-                        continue
+                t_tokens = [viewer_id_for_user(target), "@" + str(getattr(target, "username", "") or "").lower()]
 
-                seen = set()
-                out = []
-                for x in shared_sets:
-                    if x in seen:
-                        continue
-                    seen.add(x)
-                    out.append(x)
-                shared_sets = out[:6]
+                labels = (
+                    SiddesSetMember.objects.filter(member_id__in=t_tokens, set__owner_id=v_vid)
+                    .order_by("-set__updated_at")
+                    .values_list("set__label", flat=True)[:24]
+                )
+                for label in labels:
+                    x = str(label or "").strip()
+                    if x and x not in shared_sets:
+                        shared_sets.append(x)
+                    if len(shared_sets) >= 6:
+                        break
             except Exception:
                 shared_sets = []
 
@@ -795,13 +743,17 @@ class ProfileView(APIView):
             "siders": ("Close Vault" if view_side == "close" else siders_count),
             "viewerSidedAs": viewer_sided_as,
             "viewerAuthed": viewer_authed,
+            "viewerFollowsPublic": viewer_follows_public,
+            "publicFollowers": public_followers,
+            "publicFollowing": public_following,
             "sharedSets": shared_sets,
             "posts": posts_payload,
         }
 
-        if cache_key is not None and cache_status == "miss":
+        fill = fill_ttl(cache_ttl) if cache_key is not None and cache_status == "miss" else 0
+        if fill > 0:
             try:
-                cache.set(cache_key, out, timeout=cache_ttl)
+                cache.set(cache_key, out, timeout=fill)
             except Exception:
                 cache_status = "bypass"
 
@@ -853,24 +805,27 @@ class FollowActionView(APIView):
                 pass
 
             try:
-                UserFollow.objects.get_or_create(follower=viewer, target=target)
+                with transaction.atomic():
+                    _, created = UserFollow.objects.get_or_create(follower=viewer, target=target)
+                    if created:
+                        apply_follow_delta(follower_id=viewer.id, target_id=target.id, delta=1)
             except Exception:
                 pass
         else:
             try:
-                UserFollow.objects.filter(follower=viewer, target=target).delete()
+                with transaction.atomic():
+                    deleted, _ = UserFollow.objects.filter(follower=viewer, target=target).delete()
+                    if deleted:
+                        apply_follow_delta(follower_id=viewer.id, target_id=target.id, delta=-1)
             except Exception:
                 pass
 
-        try:
-            followers_cnt = int(UserFollow.objects.filter(target=target).count())
-        except Exception:
-            followers_cnt = None
+        bump_profile_target(viewer.id, target.id)
+        bump_profile_pair(viewer.id, target.id)
 
-        try:
-            following_cnt = int(UserFollow.objects.filter(follower=target).count())
-        except Exception:
-            following_cnt = None
+        stats = get_profile_stats(target.id)
+        followers_cnt = stats.get("followers")
+        following_cnt = stats.get("following")
 
         return Response(
             {"ok": True, "following": bool(follow), "publicFollowers": followers_cnt, "publicFollowing": following_cnt},
@@ -879,288 +834,182 @@ class FollowActionView(APIView):
 
 
 
-@method_decorator(dev_csrf_exempt, name="dispatch")
-class PublicFollowersView(APIView):
-    """Public follow roster: who follows @username (Public identity only).
+# --- Public follow rosters (sd_790 / sd_940) ---
+# Keyset pages over UserFollow ordered by -id, served by the covering indexes
+# (target, -id, follower) / (follower, -id, target). The listed user's public
+# facet is joined in the same query (FilteredRelation), totals come from
+# ProfileStats, and ?known=1 narrows the roster to people the viewer follows.
 
-    GET /api/public-followers/<username>?limit=&cursor=
-    Cursor is an opaque integer id (descending). Safe for public browsing.
-    """
+_ROSTER_DIRECTIONS = {
+    # direction: (filter field on UserFollow, listed user field, ProfileStats key)
+    "followers": ("target", "follower", "followers"),
+    "following": ("follower", "target", "following"),
+}
 
-    def get(self, request, username: str):
-        User = get_user_model()
-        uname = _normalize_username(username).lower()
-        if not uname:
-            return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
-
-        target = User.objects.filter(username__iexact=uname).first()
-        if not target:
-            return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        viewer = _user_from_request(request)
-        if viewer and getattr(viewer, "id", None) != getattr(target, "id", None):
-            try:
-                viewer_tok = viewer_id_for_user(viewer)
-                target_tok = "@" + str(getattr(target, "username", "") or "").lower()
-                if target_tok and is_blocked_pair(viewer_tok, target_tok):
-                    return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
-            except Exception:
-                pass
+def _public_roster_response(request, username: str, *, direction: str) -> Response:
+    anchor_field, listed_field, stats_key = _ROSTER_DIRECTIONS[direction]
 
-        # sd_940_public_rosters_hidden_rosters: if target hides rosters, return counts only (owner can still see)
-        hidden = False
-        try:
-            pf = PrismFacet.objects.filter(user=target, side="public").first()
-            hidden = bool(getattr(pf, "public_rosters_hidden", False)) if pf else False
-        except Exception:
-            hidden = False
+    User = get_user_model()
+    uname = _normalize_username(username).lower()
+    if not uname:
+        return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        if hidden and (not viewer or getattr(viewer, "id", None) != getattr(target, "id", None)):
-            total = None
-            try:
-                total = int(UserFollow.objects.filter(target=target).count())
-            except Exception:
-                total = None
-            resp = Response({"ok": True, "hidden": True, "items": [], "nextCursor": None, "total": total}, status=status.HTTP_200_OK)
-            resp["Cache-Control"] = "private, no-store"
-            resp["Vary"] = "Cookie, Authorization"
-            return resp
+    target = User.objects.filter(username__iexact=uname).first()
+    if not target:
+        return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        lim_raw = str(getattr(request, "query_params", {}).get("limit") or "").strip()
+    viewer = _user_from_request(request)
+    if viewer and getattr(viewer, "id", None) != getattr(target, "id", None):
         try:
-            lim = int(lim_raw) if lim_raw else 40
+            viewer_tok = viewer_id_for_user(viewer)
+            target_tok = "@" + str(getattr(target, "username", "") or "").lower()
+            if target_tok and is_blocked_pair(viewer_tok, target_tok):
+                return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
         except Exception:
-            lim = 40
-        if lim < 1:
-            lim = 1
-        if lim > 80:
-            lim = 80
-
-        cur_raw = str(getattr(request, "query_params", {}).get("cursor") or "").strip() or None
-        cur_id = None
-        if cur_raw:
-            try:
-                cur_id = int(cur_raw)
-            except Exception:
-                cur_id = None
-
-        qs = UserFollow.objects.filter(target=target).select_related("follower").order_by("-id")
-        if cur_id is not None and cur_id > 0:
-            qs = qs.filter(id__lt=cur_id)
-
-        recs = list(qs[: lim + 1])
-        has_more = len(recs) > lim
-        if has_more:
-            recs = recs[:lim]
-
-        next_cursor = str(getattr(recs[-1], "id")) if (has_more and recs) else None
-
-        users = []
-        for r in recs:
-            u = getattr(r, "follower", None)
-            if u is not None:
-                users.append(u)
-
-        uids = []
-        for u in users:
-            try:
-                uids.append(int(getattr(u, "id", 0) or 0))
-            except Exception:
-                pass
-
-        facet_by_uid = {}
-        if uids:
-            try:
-                for f in PrismFacet.objects.filter(user_id__in=uids, side="public"):
-                    try:
-                        facet_by_uid[int(getattr(f, "user_id", 0) or 0)] = f
-                    except Exception:
-                        continue
-            except Exception:
-                facet_by_uid = {}
-
-        items = []
-        for u in users:
-            try:
-                uid = int(getattr(u, "id", 0) or 0)
-            except Exception:
-                continue
-            uname2 = str(getattr(u, "username", "") or "").strip()
-            handle = ("@" + uname2) if uname2 else ""
+            pass
 
-            f = facet_by_uid.get(uid)
-            display = ""
-            avatar = None
-            if f is not None:
-                display = str(getattr(f, "display_name", "") or "").strip()
-                try:
-                    avatar = _avatar_url_for_facet(f)
-                except Exception:
-                    avatar = None
-            if not display:
-                display = _pretty_name(uname2)
+    known = _truthy(getattr(request, "query_params", {}).get("known"))
+    if known and not viewer:
+        return Response({"ok": False, "error": "restricted"}, status=status.HTTP_401_UNAUTHORIZED)
 
-            items.append(
-                {
-                    "id": uid,
-                    "handle": handle,
-                    "displayName": display,
-                    "avatarImage": avatar,
-                }
-            )
+    total = get_profile_stats(target.id).get(stats_key)
 
-        total = None
-        try:
-            total = int(UserFollow.objects.filter(target=target).count())
-        except Exception:
-            total = None
+    # sd_940_public_rosters_hidden_rosters: if target hides rosters, return counts only (owner can still see)
+    hidden = False
+    try:
+        hidden = PrismFacet.objects.filter(user=target, side="public", public_rosters_hidden=True).exists()
+    except Exception:
+        hidden = False
 
-        resp = Response({"ok": True, "items": items, "nextCursor": next_cursor, "total": total}, status=status.HTTP_200_OK)
+    if hidden and (not viewer or getattr(viewer, "id", None) != getattr(target, "id", None)):
+        resp = Response({"ok": True, "hidden": True, "items": [], "nextCursor": None, "total": total}, status=status.HTTP_200_OK)
         resp["Cache-Control"] = "private, no-store"
         resp["Vary"] = "Cookie, Authorization"
         return resp
 
-
-@method_decorator(dev_csrf_exempt, name="dispatch")
-class PublicFollowingView(APIView):
-    """Public follow roster: who @username follows (Public identity only).
-
-    GET /api/public-following/<username>?limit=&cursor=
-    Cursor is an opaque integer id (descending). Safe for public browsing.
-    """
-
-    def get(self, request, username: str):
-        User = get_user_model()
-        uname = _normalize_username(username).lower()
-        if not uname:
-            return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
-
-        target = User.objects.filter(username__iexact=uname).first()
-        if not target:
-            return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
-
-        viewer = _user_from_request(request)
-        if viewer and getattr(viewer, "id", None) != getattr(target, "id", None):
-            try:
-                viewer_tok = viewer_id_for_user(viewer)
-                target_tok = "@" + str(getattr(target, "username", "") or "").lower()
-                if target_tok and is_blocked_pair(viewer_tok, target_tok):
-                    return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
-            except Exception:
-                pass
-
-        # sd_940_public_rosters_hidden_rosters: if target hides rosters, return counts only (owner can still see)
-        hidden = False
+    lim_raw = str(getattr(request, "query_params", {}).get("limit") or "").strip()
+    try:
+        lim = int(lim_raw) if lim_raw else 40
+    except Exception:
+        lim = 40
+    if lim < 1:
+        lim = 1
+    if lim > 80:
+        lim = 80
+
+    cur_raw = str(getattr(request, "query_params", {}).get("cursor") or "").strip() or None
+    cur_id = None
+    if cur_raw:
         try:
-            pf = PrismFacet.objects.filter(user=target, side="public").first()
-            hidden = bool(getattr(pf, "public_rosters_hidden", False)) if pf else False
+            cur_id = int(cur_raw)
         except Exception:
-            hidden = False
-
-        if hidden and (not viewer or getattr(viewer, "id", None) != getattr(target, "id", None)):
-            total = None
-            try:
-                total = int(UserFollow.objects.filter(follower=target).count())
-            except Exception:
-                total = None
-            resp = Response({"ok": True, "hidden": True, "items": [], "nextCursor": None, "total": total}, status=status.HTTP_200_OK)
-            resp["Cache-Control"] = "private, no-store"
-            resp["Vary"] = "Cookie, Authorization"
-            return resp
-
-        lim_raw = str(getattr(request, "query_params", {}).get("limit") or "").strip()
+            cur_id = None
+
+    facets = f"{listed_field}__prism_facets"
+    qs = (
+        UserFollow.objects.filter(**{anchor_field: target})
+        .annotate(pf=FilteredRelation(facets, condition=Q(**{f"{facets}__side": "public"})))
+        .order_by("-id")
+    )
+
+    viewer_following = None
+    if known:
+        # "Followers you know": semi-join against the viewer's own follow set.
+        viewer_following = UserFollow.objects.filter(follower=viewer).values("target_id")
+        qs = qs.filter(**{f"{listed_field}_id__in": viewer_following})
+
+    if cur_id is not None and cur_id > 0:
+        qs = qs.filter(id__lt=cur_id)
+
+    rows = list(
+        qs.values(
+            "id",
+            f"{listed_field}_id",
+            f"{listed_field}__username",
+            "pf__display_name",
+            "pf__avatar_media_key",
+            "pf__avatar_image_url",
+        )[: lim + 1]
+    )
+    has_more = len(rows) > lim
+    if has_more:
+        rows = rows[:lim]
+
+    next_cursor = str(rows[-1]["id"]) if (has_more and rows) else None
+
+    items = []
+    for row in rows:
         try:
-            lim = int(lim_raw) if lim_raw else 40
+            uid = int(row.get(f"{listed_field}_id") or 0)
         except Exception:
-            lim = 40
-        if lim < 1:
-            lim = 1
-        if lim > 80:
-            lim = 80
+            continue
+        uname2 = str(row.get(f"{listed_field}__username") or "").strip()
+        handle = ("@" + uname2) if uname2 else ""
 
-        cur_raw = str(getattr(request, "query_params", {}).get("cursor") or "").strip() or None
-        cur_id = None
-        if cur_raw:
-            try:
-                cur_id = int(cur_raw)
-            except Exception:
-                cur_id = None
+        display = str(row.get("pf__display_name") or "").strip()
+        avatar = None
+        try:
+            avatar = _avatar_url_for_facet(
+                PrismFacet(
+                    side="public",
+                    avatar_media_key=str(row.get("pf__avatar_media_key") or ""),
+                    avatar_image_url=str(row.get("pf__avatar_image_url") or ""),
+                )
+            )
+        except Exception:
+            avatar = None
+        if not display:
+            display = _pretty_name(uname2)
 
-        qs = UserFollow.objects.filter(follower=target).select_related("target").order_by("-id")
-        if cur_id is not None and cur_id > 0:
-            qs = qs.filter(id__lt=cur_id)
+        items.append(
+            {
+                "id": uid,
+                "handle": handle,
+                "displayName": display,
+                "avatarImage": avatar,
+            }
+        )
 
-        recs = list(qs[: lim + 1])
-        has_more = len(recs) > lim
-        if has_more:
-            recs = recs[:lim]
+    out: Dict[str, Any] = {"ok": True, "items": items, "nextCursor": next_cursor, "total": total}
+    if known:
+        try:
+            out["knownTotal"] = int(
+                UserFollow.objects.filter(**{anchor_field: target, f"{listed_field}_id__in": viewer_following}).count()
+            )
+        except Exception:
+            out["knownTotal"] = None
 
-        next_cursor = str(getattr(recs[-1], "id")) if (has_more and recs) else None
+    resp = Response(out, status=status.HTTP_200_OK)
+    resp["Cache-Control"] = "private, no-store"
+    resp["Vary"] = "Cookie, Authorization"
+    return resp
 
-        users = []
-        for r in recs:
-            u = getattr(r, "target", None)
-            if u is not None:
-                users.append(u)
 
-        uids = []
-        for u in users:
-            try:
-                uids.append(int(getattr(u, "id", 0) or 0))
-            except Exception:
-                pass
+@method_decorator(dev_csrf_exempt, name="dispatch")
+class PublicFollowersView(APIView):
+    """Public follow roster: who follows @username (Public identity only).
 
-        facet_by_uid = {}
-        if uids:
-            try:
-                for f in PrismFacet.objects.filter(user_id__in=uids, side="public"):
-                    try:
-                        facet_by_uid[int(getattr(f, "user_id", 0) or 0)] = f
-                    except Exception:
-                        continue
-            except Exception:
-                facet_by_uid = {}
+    GET /api/public-followers/<username>?limit=&cursor=&known=1
+    Cursor is an opaque integer id (descending). Safe for public browsing.
+    known=1 (signed-in viewers): only followers the viewer also follows.
+    """
 
-        items = []
-        for u in users:
-            try:
-                uid = int(getattr(u, "id", 0) or 0)
-            except Exception:
-                continue
-            uname2 = str(getattr(u, "username", "") or "").strip()
-            handle = ("@" + uname2) if uname2 else ""
+    def get(self, request, username: str):
+        return _public_roster_response(request, username, direction="followers")
 
-            f = facet_by_uid.get(uid)
-            display = ""
-            avatar = None
-            if f is not None:
-                display = str(getattr(f, "display_name", "") or "").strip()
-                try:
-                    avatar = _avatar_url_for_facet(f)
-                except Exception:
-                    avatar = None
-            if not display:
-                display = _pretty_name(uname2)
 
-            items.append(
-                {
-                    "id": uid,
-                    "handle": handle,
-                    "displayName": display,
-                    "avatarImage": avatar,
-                }
-            )
+@method_decorator(dev_csrf_exempt, name="dispatch")
+class PublicFollowingView(APIView):
+    """Public follow roster: who @username follows (Public identity only).
 
-        total = None
-        try:
-            total = int(UserFollow.objects.filter(follower=target).count())
-        except Exception:
-            total = None
+    GET /api/public-following/<username>?limit=&cursor=&known=1
+    Cursor is an opaque integer id (descending). Safe for public browsing.
+    known=1 (signed-in viewers): only accounts the viewer also follows.
+    """
 
-        resp = Response({"ok": True, "items": items, "nextCursor": next_cursor, "total": total}, status=status.HTTP_200_OK)
-        resp["Cache-Control"] = "private, no-store"
-        resp["Vary"] = "Cookie, Authorization"
-        return resp
+    def get(self, request, username: str):
+        return _public_roster_response(request, username, direction="following")
 
 @method_decorator(dev_csrf_exempt, name="dispatch")
 class SideActionView(APIView):
@@ -1215,7 +1064,12 @@ class SideActionView(APIView):
             except Exception:
                 pass
 
-            SideMembership.objects.filter(owner=viewer, member=target).delete()
+            with transaction.atomic():
+                deleted, _ = SideMembership.objects.filter(owner=viewer, member=target).delete()
+                if deleted:
+                    apply_siders_delta(member_id=target.id, delta=-1)
+            bump_profile_target(target.id)
+            bump_profile_pair(viewer.id, target.id)
             return Response({"ok": True, "side": None}, status=status.HTTP_200_OK)
 
         if side not in MEMBER_SIDES:
@@ -1231,11 +1085,16 @@ class SideActionView(APIView):
             if not existing or existing.side not in ("friends", "close"):
                 return Response({"ok": False, "error": "friends_required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        obj, _ = SideMembership.objects.update_or_create(
-            owner=viewer,
-            member=target,
-            defaults={"side": side},
-        )
+        with transaction.atomic():
+            obj, created = SideMembership.objects.update_or_create(
+                owner=viewer,
+                member=target,
+                defaults={"side": side},
+            )
+            if created:
+                apply_siders_delta(member_id=target.id, delta=1)
+        bump_profile_target(target.id)
+        bump_profile_pair(viewer.id, target.id)
 
         try:
             _prune_member_from_owner_sets(owner_tok=owner_tok, member_handle=member_handle, allowed_sides=_allowed_set_sides_for_side(side))
@@ -1538,11 +1397,16 @@ class AccessRequestRespondView(APIView):
                 if not existing or str(getattr(existing, "side", "")) not in ("friends", "close"):
                     grant = "friends"
 
-            SideMembership.objects.update_or_create(
-                owner=viewer,
-                member=member,
-                defaults={"side": grant},
-            )
+            with transaction.atomic():
+                _, created = SideMembership.objects.update_or_create(
+                    owner=viewer,
+                    member=member,
+                    defaults={"side": grant},
+                )
+                if created:
+                    apply_siders_delta(member_id=member.id, delta=1)
+            bump_profile_target(member.id)
+            bump_profile_pair(viewer.id, member.id)
             obj.status = "accepted"
             granted_side = grant
         else:
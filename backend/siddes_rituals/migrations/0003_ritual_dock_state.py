@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_rituals", "0002_ignite_and_response"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ritual",
+            name="dock_state",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -9,6 +9,10 @@ Design goals:
 Cycle 2 adds:
 - RitualIgnite: who ignited (one per viewer)
 - RitualResponse: structured response payload (one per viewer)
+
+Ritual.ignites / Ritual.replies / Ritual.data are write-maintained counters and
+summaries (updated under a row lock on ignite/respond), so dock reads never
+count or scan responses.
 """
 
 from __future__ import annotations
@@ -58,6 +62,10 @@ class Ritual(models.Model):
     # Dock hint: number of responses
     replies = models.IntegerField(default=0)
 
+    # Internal aggregates behind `data` (recent responders/answers, mood tallies).
+    # Maintained incrementally on ignite/respond; never serialized to clients.
+    dock_state = models.JSONField(default=dict, blank=True)
+
     class Meta:
         indexes = [
             models.Index(fields=["side", "status", "-created_at"], name="siddes_ritu_side_s_5c2a1f_idx"),
@@ -0,0 +1,124 @@
+"""Ritual read cache (detail + responses pages).
+
+Public Town Halls concentrate reads on one ritual, so RitualDetailView and
+RitualResponsesView serve viewer-independent payloads from the shared cache
+after the per-viewer access check:
+
+- head: (side, set_id, created_by) — immutable after create, used for the
+  access check without loading the ritual row
+- payloads: keyed by the ritual's version token; ignite/respond/archive writes
+  rotate the token, orphaning every cached page at once
+
+Versions are siddes_backend.cache_versions tokens. Each cached payload
+stores its ETag (hash of the serialized body), so 304s need no DB work.
+All helpers are best-effort and never raise.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.core.cache import cache
+
+from siddes_backend.cache_versions import VERSION_TTL_SECS, bump_versions, fill_ttl, get_version
+
+
+def _truthy(v: str | None) -> bool:
+    return str(v or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def ritual_cache_enabled() -> bool:
+    return _truthy(os.environ.get("SIDDES_RITUAL_CACHE_ENABLED", "1"))
+
+
+def ritual_cache_ttl() -> int:
+    raw = os.environ.get("SIDDES_RITUAL_CACHE_TTL_SECS", "120")
+    try:
+        ttl = int(str(raw).strip())
+    except Exception:
+        ttl = 120
+    # Versioned keys keep payloads fresh; TTL only bounds memory.
+    return max(0, min(ttl, 900))
+
+
+def _ver_key(ritual_id: str) -> str:
+    return f"rituals:v1:ver:{ritual_id}"
+
+
+def _head_key(ritual_id: str) -> str:
+    return f"rituals:v1:head:{ritual_id}"
+
+
+def ritual_version(ritual_id: str) -> str:
+    rid = str(ritual_id or "").strip()
+    return get_version(_ver_key(rid)) if rid else ""
+
+
+def bump_ritual_versions(ritual_ids: Iterable[object]) -> None:
+    bump_versions(_ver_key(rid) for rid in (str(x or "").strip() for x in (ritual_ids or [])) if rid)
+
+
+def get_head(ritual_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        v = cache.get(_head_key(str(ritual_id or "").strip()))
+        return v if isinstance(v, dict) else None
+    except Exception:
+        return None
+
+
+def set_head(ritual_id: str, head: Dict[str, Any]) -> None:
+    try:
+        cache.set(_head_key(str(ritual_id)), dict(head), timeout=VERSION_TTL_SECS)
+    except Exception:
+        pass
+
+
+def payload_key(kind: str, ritual_id: str, ver: str, *parts: object) -> str:
+    raw = "|".join([str(kind), str(ritual_id), str(ver)] + [str(p if p is not None else "") for p in parts])
+    h = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    return f"rituals:v1:{kind}:{h}"
+
+
+def compute_etag(body: Dict[str, Any]) -> str:
+    """Strong ETag over the canonical JSON body."""
+
+    seed = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return f'"{hashlib.sha256(("ritual:v1:" + seed).encode("utf-8")).hexdigest()}"'
+
+
+def get_payload(key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+    try:
+        v = cache.get(key)
+    except Exception:
+        return None
+    if isinstance(v, dict) and isinstance(v.get("body"), dict) and v.get("etag"):
+        return v["body"], str(v["etag"])
+    return None
+
+
+def set_payload(key: str, body: Dict[str, Any], etag: str, ttl: int) -> None:
+    ttl = fill_ttl(ttl)
+    if ttl <= 0:
+        return
+    try:
+        cache.set(key, {"body": body, "etag": etag}, timeout=ttl)
+    except Exception:
+        pass
+
+
+def etag_matches(inm: str, etag: str) -> bool:
+    """If-None-Match check (list, "*" and weak-prefixed validators)."""
+
+    raw = str(inm or "").strip()
+    if not raw:
+        return False
+    for part in raw.split(","):
+        p = part.strip()
+        if p.startswith("W/"):
+            p = p[2:]
+        if p == "*" or (p and p == etag):
+            return True
+    return False
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from siddes_safety.models import UserBlock
+from siddes_safety.safety_graph import bump_safety_graph
+
+from .models import Ritual, RitualResponse
+from .views import _dock_state, _note_response, _update_dock_summary
+
+
+@override_settings(DEBUG=True)
+class RitualDockCounterTests(APITestCase):
+    def _townhall(self) -> str:
+        r = self.client.post(
+            "/api/rituals",
+            {"kind": "townhall", "prompt": "What should we fix first?"},
+            format="json",
+            HTTP_X_SD_VIEWER="me",
+        )
+        assert r.status_code == 201
+        return r.json()["ritual"]["id"]
+
+    def test_respond_maintains_counters_and_summary(self):
+        rid = self._townhall()
+
+        for who, text in (("me_11", "Approvals"), ("me_12", "Search"), ("me_11", "Onboarding")):
+            r = self.client.post(f"/api/rituals/{rid}/respond", {"text": text}, format="json", HTTP_X_SD_VIEWER=who)
+            assert r.status_code == 200
+
+        rit = Ritual.objects.get(id=rid)
+        assert rit.replies == RitualResponse.objects.filter(ritual_id=rid).count() == 2
+        # Edited answer replaces the old one; newest first.
+        assert rit.data.get("topAnswers") == ["Onboarding", "Search"]
+        assert "dock_state" not in self.client.get(f"/api/rituals/{rid}", HTTP_X_SD_VIEWER="me").json()["ritual"]
+
+    def test_mood_tallies_follow_edits(self):
+        r = Ritual.objects.create(id="rt_mood", side="friends", set_id="s_x", kind="mood", status="active", created_by="me", created_at=1.0)
+        st = _dock_state(r)
+        _note_response(st, by="me_1", text="", payload={"emoji": "😌"})
+        _note_response(st, by="me_2", text="", payload={"emoji": "😩"})
+        _note_response(st, by="me_3", text="", payload={"emoji": "😌"})
+        _note_response(st, by="me_3", text="", payload={"emoji": "😩"}, prev_payload={"emoji": "😌"})
+        r.dock_state = st
+        _update_dock_summary(r)
+        assert st["moods"] == {"😌": 1, "😩": 2}
+        assert r.data.get("vibe") == "😩 / 😌"
+
+    def test_list_filters_blocked_creator_without_per_item_checks(self):
+        self._townhall()
+        r = self.client.get("/api/rituals?side=public", HTTP_X_SD_VIEWER="me_5")
+        assert len(r.json()["items"]) == 1
+
+        UserBlock.objects.create(blocker_id="me_5", blocked_token="me")
+        bump_safety_graph("me_5", "me")  # what BlocksView does after the insert
+        with CaptureQueriesContext(connection) as ctx:
+            r2 = self.client.get("/api/rituals?side=public", HTTP_X_SD_VIEWER="me_5")
+        assert r2.json()["items"] == []
+        assert sum(1 for q in ctx.captured_queries if "siddes_safety_userblock" in q["sql"]) == 1
+
+    def test_viewer_with_blocks_still_sees_their_own_rituals(self):
+        from siddes_safety.policy import blocked_among
+        from siddes_safety.safety_graph import bump_safety_graph
+
+        self._townhall()
+        UserBlock.objects.create(blocker_id="me", blocked_token="me_6")
+        UserBlock.objects.create(blocker_id="me_7", blocked_token="me")
+        bump_safety_graph("me", "me_6", "me_7")  # as the block endpoints do
+        assert blocked_among("me", ["me", "me_6", "me_7", "me_8"]) == {"me_6", "me_7"}
+
+        r = self.client.get("/api/rituals?side=public", HTTP_X_SD_VIEWER="me")
+        assert len(r.json()["items"]) == 1
+
+
+@override_settings(DEBUG=True)
+class RitualReadCacheTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        r = self.client.post(
+            "/api/rituals",
+            {"kind": "townhall", "prompt": "Daily check-in"},
+            format="json",
+            HTTP_X_SD_VIEWER="me",
+        )
+        self.rid = r.json()["ritual"]["id"]
+
+    def _respond(self, who: str, text: str):
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.post(f"/api/rituals/{self.rid}/respond", {"text": text}, format="json", HTTP_X_SD_VIEWER=who)
+        assert r.status_code == 200
+
+    def test_detail_etag_304_and_invalidation(self):
+        r1 = self.client.get(f"/api/rituals/{self.rid}", HTTP_X_SD_VIEWER="me_2")
+        assert r1.status_code == 200
+        assert r1["X-Siddes-Cache"] == "miss"
+        etag = r1["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            r2 = self.client.get(f"/api/rituals/{self.rid}", HTTP_X_SD_VIEWER="me_3", HTTP_IF_NONE_MATCH=etag)
+        assert r2.status_code == 304
+        assert r2["X-Siddes-Cache"] == "hit"
+        assert not any("siddes_rituals_ritual" in q["sql"] for q in ctx.captured_queries)
+
+        self._respond("me_4", "More light")
+        r3 = self.client.get(f"/api/rituals/{self.rid}", HTTP_X_SD_VIEWER="me_2", HTTP_IF_NONE_MATCH=etag)
+        assert r3.status_code == 200
+        assert r3["ETag"] != etag
+        assert r3.json()["ritual"]["replies"] == 1
+
+    def test_responses_keyset_pages(self):
+        for i in range(5):
+            self._respond(f"me_{20 + i}", f"answer {i}")
+
+        seen = []
+        cursor = None
+        while True:
+            url = f"/api/rituals/{self.rid}/responses?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            d = self.client.get(url, HTTP_X_SD_VIEWER="me_2").json()
+            seen += [it["text"] for it in d["items"]]
+            cursor = d["nextCursor"]
+            if not cursor:
+                break
+        assert seen == [f"answer {i}" for i in reversed(range(5))]
+
+    def test_blocked_viewer_is_not_served_from_cache(self):
+        assert self.client.get(f"/api/rituals/{self.rid}", HTTP_X_SD_VIEWER="me_2").status_code == 200
+        UserBlock.objects.create(blocker_id="me_2", blocked_token="me")
+        bump_safety_graph("me_2", "me")
+        assert self.client.get(f"/api/rituals/{self.rid}", HTTP_X_SD_VIEWER="me_2").status_code == 404
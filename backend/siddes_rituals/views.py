@@ -6,7 +6,10 @@ Endpoints:
 - GET  /api/rituals/<id>
 - POST /api/rituals/<id>/ignite
 - POST /api/rituals/<id>/respond
-- GET  /api/rituals/<id>/responses
+- GET  /api/rituals/<id>/responses?limit=&cursor=   (keyset pages)
+
+Detail + responses are served from a versioned shared cache with strong ETags
+(ritual_cache.py); ignite/respond/archive writes rotate the version.
 
 Default-safe rules:
 - Unknown viewer => restricted:true on list, 404 on detail.
@@ -41,6 +44,19 @@ from siddes_inbox.visibility_stub import resolve_viewer_role
 from siddes_sets.store_db import DbSetsStore
 
 from .models import Ritual, RitualIgnite, RitualResponse
+from .ritual_cache import (
+    bump_ritual_versions,
+    compute_etag,
+    etag_matches,
+    get_head,
+    get_payload,
+    payload_key,
+    ritual_cache_enabled,
+    ritual_cache_ttl,
+    ritual_version,
+    set_head,
+    set_payload,
+)
 
 
 _ALLOWED_SIDES = {"public", "friends", "close", "work"}
@@ -136,10 +152,26 @@ def _archive_other_active_in_set(*, set_id: str, keep_id: str) -> None:
     if not sid:
         return
     try:
-        Ritual.objects.filter(set_id=sid, status="active").exclude(id=str(keep_id)).update(status="archived", expires_at=now_s())
+        _archive_rituals(Ritual.objects.filter(set_id=sid, status="active").exclude(id=str(keep_id)), at=now_s())
     except Exception:
         return
 
+
+def _archive_rituals(qs, *, at: float) -> None:
+    """Archive matching rituals and invalidate their cached payloads on commit."""
+
+    ids = list(qs.values_list("id", flat=True))
+    if not ids:
+        return
+    Ritual.objects.filter(id__in=ids).update(status="archived", expires_at=at)
+    _bump_on_commit(ids)
+
+
+def _bump_on_commit(ritual_ids: List[str]) -> None:
+    ids = [str(x) for x in ritual_ids if x]
+    if ids:
+        transaction.on_commit(lambda: bump_ritual_versions(ids))
+
 def now_s() -> float:
     return float(time.time())
 
@@ -226,6 +258,17 @@ def _is_blocked_pair(viewer_id: str, other_id: str) -> bool:
         return False
 
 
+def _blocked_creators(viewer_id: str, creators: List[str]) -> Set[str]:
+    """Creators blocked with the viewer (either direction), in one query."""
+
+    try:
+        from siddes_safety.policy import blocked_among
+
+        return blocked_among(viewer_id, creators)
+    except Exception:
+        return set()
+
+
 def _set_item_for_viewer(viewer_id: str, set_id: str) -> Optional[Dict[str, Any]]:
     sid = str(set_id or "").strip()
     if not sid or sid.startswith("b_"):
@@ -287,29 +330,96 @@ def _clamp_expires(raw: Any, *, side: str) -> Optional[float]:
     return min(v, max_v)
 
 
-def _refresh_counts_and_status(r: Ritual) -> Ritual:
+_DOCK_RECENT = 12  # recent (responder, answer) pairs kept in dock_state
+
+
+def _promote_if_ignited(r: Ritual) -> Ritual:
+    """Warming set rituals go active once ignites reach the threshold (counter-based)."""
+
+    if str(r.side) != "public" and str(r.status) == "warming":
+        thr = int(getattr(r, "ignite_threshold", 0) or 0)
+        if thr > 0 and int(r.ignites or 0) >= thr:
+            r.status = "active"
+    return r
+
+
+def _short_answer(text: Any) -> str:
+    t = re.sub(r"\s+", " ", str(text or "").strip())
+    if len(t) > 24:
+        t = t[:24].rstrip() + "…"
+    return t
+
+
+def _mood_of(payload: Any) -> str:
+    if not isinstance(payload, dict):
+        return ""
+    return str(payload.get("emoji") or payload.get("mood") or "").strip()
+
+
+def _display_name(token: str) -> str:
+    by = str(token or "").strip()
     try:
-        ign = RitualIgnite.objects.filter(ritual=r).count()
+        from siddes_backend.identity import display_for_token
+
+        d = display_for_token(by)
+        return str((d or {}).get("name") or "").strip() or by
     except Exception:
-        ign = int(getattr(r, "ignites", 0) or 0)
+        return by
+
 
+def _dock_state(r: Ritual) -> Dict[str, Any]:
+    """Aggregates behind the dock summary.
+
+    Rituals created before dock_state existed are bootstrapped once from their
+    responses; after that every write updates the state in place.
+    """
+
+    st = r.dock_state if isinstance(getattr(r, "dock_state", None), dict) else {}
+    if st.get("v") == 1:
+        return st
+
+    recent: List[List[str]] = []
+    moods: Dict[str, int] = {}
     try:
-        rep = RitualResponse.objects.filter(ritual=r).count()
+        rows = RitualResponse.objects.filter(ritual=r).order_by("-created_at").values_list("by", "text", "payload")
+        for by, text, payload in rows.iterator():
+            by = str(by or "").strip()
+            if by and len(recent) < _DOCK_RECENT and all(x[0] != by for x in recent):
+                recent.append([by, _display_name(by), _short_answer(text)])
+            m = _mood_of(payload)
+            if m:
+                moods[m] = moods.get(m, 0) + 1
     except Exception:
-        rep = int(getattr(r, "replies", 0) or 0)
+        pass
 
-    r.ignites = int(ign)
-    r.replies = int(rep)
+    st = {"v": 1, "recent": recent, "moods": moods}
+    r.dock_state = st
+    return st
 
-    if str(r.side) != "public" and str(r.status) == "warming":
-        thr = int(getattr(r, "ignite_threshold", 0) or 0)
-        if thr > 0 and r.ignites >= thr:
-            r.status = "active"
 
-    return r
+def _note_response(st: Dict[str, Any], *, by: str, text: str, payload: Any, prev_payload: Any = None) -> None:
+    """Fold one (new or edited) response into dock_state."""
+
+    by = str(by or "").strip()
+    recent = [x for x in (st.get("recent") or []) if isinstance(x, list) and x and x[0] != by]
+    recent.insert(0, [by, _display_name(by), _short_answer(text)])
+    st["recent"] = recent[:_DOCK_RECENT]
+
+    moods: Dict[str, int] = dict(st.get("moods") or {})
+    old = _mood_of(prev_payload)
+    if old and moods.get(old, 0) > 0:
+        moods[old] -= 1
+        if moods[old] <= 0:
+            moods.pop(old, None)
+    new = _mood_of(payload)
+    if new:
+        moods[new] = moods.get(new, 0) + 1
+    st["moods"] = moods
 
 
 def _update_dock_summary(r: Ritual) -> Ritual:
+    """Rebuild `data` from counters + dock_state (no response queries)."""
+
     data: Dict[str, Any] = r.data if isinstance(r.data, dict) else {}
 
     thr = int(getattr(r, "ignite_threshold", 0) or 0)
@@ -318,87 +428,129 @@ def _update_dock_summary(r: Ritual) -> Ritual:
         data["label"] = f"{r.ignites}/{thr} ignites"
 
     kind = str(getattr(r, "kind", "") or "").strip().lower()
+    st = _dock_state(r)
+    recent = [x for x in (st.get("recent") or []) if isinstance(x, list) and len(x) >= 3]
 
     # Recent responders -> avatars
+    names: List[str] = []
+    for _by, nm, _ans in recent:
+        if nm and nm not in names:
+            names.append(nm)
+        if len(names) >= 3:
+            break
+    if names:
+        data["avatars"] = names
+
+    # Public Town Hall host (Gavel): the creator never changes, resolve once.
+    if kind == "townhall" and str(getattr(r, "side", "") or "") == "public" and not data.get("host"):
+        host = _display_name(str(getattr(r, "created_by", "") or ""))
+        if host:
+            data["host"] = host
+
+    if kind == "mood":
+        moods = st.get("moods") or {}
+        top = sorted(((str(k), int(v)) for k, v in moods.items() if int(v) > 0), key=lambda kv: (-kv[1], kv[0]))[:2]
+        if top:
+            data["vibe"] = " / ".join([k for k, _ in top])
+
+    if kind in ("question", "townhall"):
+        top_answers: List[str] = []
+        for _by, _nm, ans in recent:
+            if ans and ans not in top_answers:
+                top_answers.append(ans)
+            if len(top_answers) >= 3:
+                break
+        if top_answers:
+            data["topAnswers"] = top_answers
+
+    r.data = data
+    return r
+
+
+def _ignite_once(r: Ritual, viewer_id: str) -> bool:
+    """Record the viewer's ignite; True only when a new row was created."""
+
     try:
-        rs = list(RitualResponse.objects.filter(ritual=r).order_by("-created_at")[:6])
-        names: List[str] = []
-        for rr in rs:
-            try:
-                from siddes_backend.identity import display_for_token
+        with transaction.atomic():
+            _, created = RitualIgnite.objects.get_or_create(
+                ritual=r,
+                by=viewer_id,
+                defaults={"id": new_id("ri"), "created_at": now_s()},
+            )
+        return bool(created)
+    except Exception:
+        return False
 
-                d = display_for_token(str(getattr(rr, "by", "") or ""))
-                nm = str((d or {}).get("name") or "").strip()
-                if nm and nm not in names:
-                    names.append(nm)
-            except Exception:
-                by = str(getattr(rr, "by", "") or "").strip()
-                if by and by not in names:
-                    names.append(by)
-        if names:
-            data["avatars"] = names[:3]
+
+def _lock_ritual(r: Ritual) -> Ritual:
+    """Re-read the ritual under a row lock (call inside transaction.atomic)."""
+
+    try:
+        locked = Ritual.objects.select_for_update().filter(id=str(r.id)).first()
     except Exception:
-        pass
+        locked = None
+    return locked or r
 
 
-    # Public Town Hall host (Gavel)
-    if kind == "townhall" and str(getattr(r, "side", "") or "") == "public":
-        try:
-            from siddes_backend.identity import display_for_token
+_DOCK_FIELDS = ["status", "ignites", "replies", "data", "dock_state"]
 
-            d = display_for_token(str(getattr(r, "created_by", "") or ""))
-            host = ""
-            if isinstance(d, dict):
-                host = str(d.get("name") or d.get("handle") or d.get("id") or "").strip()
-            else:
-                host = str(getattr(r, "created_by", "") or "").strip()
-            if host:
-                data["host"] = host
-        except Exception:
-            host = str(getattr(r, "created_by", "") or "").strip()
-            if host:
-                data["host"] = host
 
-    if kind == "mood":
-        try:
-            rs = list(RitualResponse.objects.filter(ritual=r).order_by("-created_at")[:25])
-            counts: Dict[str, int] = {}
-            for rr in rs:
-                payload = getattr(rr, "payload", {})
-                if not isinstance(payload, dict):
-                    continue
-                v = str(payload.get("emoji") or payload.get("mood") or "").strip()
-                if not v:
-                    continue
-                counts[v] = counts.get(v, 0) + 1
-            top = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:2]
-            if top:
-                data["vibe"] = " / ".join([k for k, _ in top])
-        except Exception:
-            pass
+def _head_of(r: Ritual) -> Dict[str, Any]:
+    return {
+        "side": str(getattr(r, "side", "") or "public"),
+        "set_id": str(getattr(r, "set_id", "") or "") or None,
+        "created_by": str(getattr(r, "created_by", "") or ""),
+    }
 
-    if kind in ("question", "townhall"):
+
+def _head_readable(viewer_id: str, head: Dict[str, Any]) -> bool:
+    created_by = str(head.get("created_by") or "")
+    if _is_blocked_pair(viewer_id, created_by):
+        if not (_same_person(viewer_id, created_by) or _viewer_is_staff(viewer_id)):
+            return False
+
+    side = str(head.get("side") or "public").strip().lower() or "public"
+    sid = str(head.get("set_id") or "").strip() or None
+
+    if side == "public":
+        return True
+
+    if not sid:
+        return _same_person(viewer_id, created_by) or _viewer_is_staff(viewer_id)
+
+    if sid.startswith("b_"):
+        return True
+
+    set_item = _set_item_for_viewer(viewer_id, sid)
+    if not set_item:
+        return False
+
+    set_side = str((set_item or {}).get("side") or "").strip().lower()
+    if set_side in _ALLOWED_SIDES and set_side != side:
+        return False
+
+    return True
+
+
+def _readable_head(*, viewer_id: str, ritual_id: str) -> Optional[Dict[str, Any]]:
+    """Access check without loading the ritual row when its head is cached."""
+
+    rid = str(ritual_id or "").strip()
+    if not rid:
+        return None
+
+    head = get_head(rid)
+    if head is None:
         try:
-            rs = list(RitualResponse.objects.filter(ritual=r).order_by("-created_at")[:50])
-            top: List[str] = []
-            for rr in rs:
-                t = str(getattr(rr, "text", "") or "").strip()
-                if not t:
-                    continue
-                t = re.sub(r"\s+", " ", t)
-                if len(t) > 24:
-                    t = t[:24].rstrip() + "…"
-                if t not in top:
-                    top.append(t)
-                if len(top) >= 3:
-                    break
-            if top:
-                data["topAnswers"] = top
+            r = Ritual.objects.filter(id=rid).only("id", "side", "set_id", "created_by").first()
         except Exception:
-            pass
+            r = None
+        if not r:
+            return None
+        head = _head_of(r)
+        set_head(rid, head)
 
-    r.data = data
-    return r
+    return head if _head_readable(viewer_id, head) else None
 
 
 def _load_ritual_or_none(*, viewer_id: str, ritual_id: str) -> Optional[Ritual]:
@@ -413,33 +565,114 @@ def _load_ritual_or_none(*, viewer_id: str, ritual_id: str) -> Optional[Ritual]:
     if not r:
         return None
 
-    if _is_blocked_pair(viewer_id, str(getattr(r, "created_by", "") or "")):
-        if not (_same_person(viewer_id, str(getattr(r, "created_by", "") or "")) or _viewer_is_staff(viewer_id)):
-            return None
-
-    side = str(getattr(r, "side", "") or "public").strip().lower() or "public"
-    sid = str(getattr(r, "set_id", "") or "").strip() or None
+    head = _head_of(r)
+    set_head(rid, head)
+    return r if _head_readable(viewer_id, head) else None
 
-    if side == "public":
-        return r
 
-    if not sid:
-        if _same_person(viewer_id, str(getattr(r, "created_by", "") or "")) or _viewer_is_staff(viewer_id):
-            return r
+def _ritual_detail_body(ritual_id: str) -> Optional[Dict[str, Any]]:
+    r = Ritual.objects.filter(id=str(ritual_id)).first()
+    if not r:
         return None
+    return {"ok": True, "ritual": _ritual_to_item(r)}
 
-    if sid.startswith("b_"):
-        return r
 
-    set_item = _set_item_for_viewer(viewer_id, sid)
-    if not set_item:
-        return None
+_RESPONSES_DEFAULT_LIMIT = 50
+_RESPONSES_MAX_LIMIT = 100
 
-    set_side = str((set_item or {}).get("side") or "").strip().lower()
-    if set_side in _ALLOWED_SIDES and set_side != side:
+
+def _decode_response_cursor(raw: Optional[str]) -> Optional[Tuple[float, str]]:
+    try:
+        ts_s, rid = str(raw or "").split("|", 1)
+        return float(ts_s), str(rid)
+    except Exception:
         return None
 
-    return r
+
+def _ritual_responses_body(ritual_id: str, *, limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+    """One keyset page of responses, newest first ("<created_at>|<id>" cursor)."""
+
+    qs = RitualResponse.objects.filter(ritual_id=str(ritual_id))
+    cur = _decode_response_cursor(cursor) if cursor else None
+    if cur is not None:
+        ts, last_id = cur
+        qs = qs.filter(Q(created_at__lt=ts) | Q(created_at=ts, id__lt=last_id))
+
+    rows = list(qs.order_by("-created_at", "-id")[: limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = f"{float(rows[-1].created_at)!r}|{rows[-1].id}" if (has_more and rows) else None
+
+    try:
+        from siddes_backend.identity import resolve_many
+
+        resolve_many([getattr(rr, "by", "") for rr in rows])
+    except Exception:
+        pass
+
+    items: List[Dict[str, Any]] = []
+    for rr in rows:
+        by = str(getattr(rr, "by", "") or "").strip()
+        disp = None
+        try:
+            from siddes_backend.identity import display_for_token
+
+            disp = display_for_token(by)
+        except Exception:
+            disp = {"id": by, "handle": "@unknown", "name": by}
+
+        items.append(
+            {
+                "id": str(getattr(rr, "id", "") or ""),
+                "by": by,
+                "byDisplay": disp,
+                "createdAt": float(getattr(rr, "created_at", 0.0) or 0.0),
+                "kind": str(getattr(rr, "kind", "") or ""),
+                "payload": getattr(rr, "payload", {}) if isinstance(getattr(rr, "payload", {}), dict) else {},
+                "text": str(getattr(rr, "text", "") or ""),
+            }
+        )
+
+    return {"ok": True, "ritualId": str(ritual_id), "items": items, "nextCursor": next_cursor, "hasMore": has_more}
+
+
+def _cached_conditional(request, *, kind: str, ritual_id: str, parts: Tuple[Any, ...], build) -> Response:
+    """Serve a viewer-independent ritual payload: versioned cache + strong ETag/304.
+
+    Callers must run the per-viewer access check first.
+    """
+
+    cache_status = "bypass"
+    ttl = ritual_cache_ttl()
+    key = None
+    hit = None
+    if ritual_cache_enabled() and ttl > 0:
+        ver = ritual_version(ritual_id)
+        if ver:
+            key = payload_key(kind, ritual_id, ver, *parts)
+            hit = get_payload(key)
+
+    if hit is not None:
+        body, etag = hit
+        cache_status = "hit"
+    else:
+        body = build()
+        if body is None:
+            return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
+        etag = compute_etag(body)
+        if key:
+            set_payload(key, body, etag, ttl)
+            cache_status = "miss"
+
+    if etag_matches(request.headers.get("If-None-Match") or "", etag):
+        resp = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        resp = Response(body, status=status.HTTP_200_OK)
+    resp["ETag"] = etag
+    resp["Cache-Control"] = "private, no-cache"
+    resp["Vary"] = "Cookie, Authorization"
+    resp["X-Siddes-Cache"] = cache_status
+    return resp
 
 
 @method_decorator(dev_csrf_exempt, name="dispatch")
@@ -510,10 +743,11 @@ class RitualsView(APIView):
         else:
             candidates = list(qs.order_by("-created_at")[:10])
 
+        candidates = [r for r in candidates if r]
+        blocked = _blocked_creators(viewer, [str(getattr(r, "created_by", "") or "") for r in candidates])
+
         for r in candidates:
-            if not r:
-                continue
-            if _is_blocked_pair(viewer, str(getattr(r, "created_by", "") or "")):
+            if str(getattr(r, "created_by", "") or "") in blocked:
                 continue
             items.append(_ritual_to_item(r))
             if side == "public":
@@ -611,14 +845,14 @@ class RitualsView(APIView):
         with transaction.atomic():
             if side == "public" and kind == "townhall":
                 try:
-                    Ritual.objects.filter(side="public", kind__iexact="townhall", status__in=["active", "warming"]).update(status="archived", expires_at=created_at)
+                    _archive_rituals(Ritual.objects.filter(side="public", kind__iexact="townhall", status__in=["active", "warming"]), at=created_at)
                 except Exception:
                     pass
 
             # sd_340: only one warming ritual per set at a time (keeps the room calm)
             if side != 'public' and set_id and not str(set_id).startswith('b_'):
                 try:
-                    Ritual.objects.filter(set_id=str(set_id), status='warming').update(status='archived', expires_at=created_at)
+                    _archive_rituals(Ritual.objects.filter(set_id=str(set_id), status='warming'), at=created_at)
                 except Exception:
                     pass
 
@@ -637,21 +871,24 @@ class RitualsView(APIView):
                 ignites=0,
                 replies=0,
                 data={},
+                dock_state={"v": 1, "recent": [], "moods": {}},
             )
 
             if side != "public" and int(thr) > 0:
                 try:
-                    RitualIgnite.objects.create(id=new_id("ri"), ritual=r, by=viewer, created_at=created_at)
+                    with transaction.atomic():
+                        RitualIgnite.objects.create(id=new_id("ri"), ritual=r, by=viewer, created_at=created_at)
+                    r.ignites = 1
                 except Exception:
                     pass
 
             prev_status = str(getattr(r, 'status', '') or '')
-            r = _refresh_counts_and_status(r)
+            r = _promote_if_ignited(r)
             became_active = prev_status != 'active' and str(getattr(r, 'status', '') or '') == 'active'
             if became_active and str(getattr(r, 'side', '') or '') != 'public' and str(getattr(r, 'set_id', '') or ''):
                 _archive_other_active_in_set(set_id=str(getattr(r, 'set_id', '') or ''), keep_id=str(getattr(r, 'id', '') or ''))
             r = _update_dock_summary(r)
-            r.save(update_fields=["status", "ignites", "replies", "data"])
+            r.save(update_fields=_DOCK_FIELDS)
 
         return Response({"ok": True, "ritual": _ritual_to_item(r)}, status=status.HTTP_201_CREATED)
 
@@ -667,11 +904,10 @@ class RitualDetailView(APIView):
         if not has_viewer or not ritual_id:
             return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        r = _load_ritual_or_none(viewer_id=viewer, ritual_id=ritual_id)
-        if not r:
+        if _readable_head(viewer_id=viewer, ritual_id=ritual_id) is None:
             return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({"ok": True, "ritual": _ritual_to_item(r)}, status=status.HTTP_200_OK)
+        return _cached_conditional(request, kind="detail", ritual_id=str(ritual_id), parts=(), build=lambda: _ritual_detail_body(ritual_id))
 
 
 @method_decorator(dev_csrf_exempt, name="dispatch")
@@ -698,18 +934,13 @@ class RitualIgniteView(APIView):
             return Response({"ok": True, "ritual": _ritual_to_item(r)}, status=status.HTTP_200_OK)
 
         with transaction.atomic():
-            try:
-                RitualIgnite.objects.get_or_create(
-                    ritual=r,
-                    by=viewer,
-                    defaults={"id": new_id("ri"), "created_at": now_s()},
-                )
-            except Exception:
-                pass
-
-            r = _refresh_counts_and_status(r)
-            r = _update_dock_summary(r)
-            r.save(update_fields=["status", "ignites", "replies", "data"])
+            r = _lock_ritual(r)
+            if _ignite_once(r, viewer):
+                r.ignites = int(r.ignites or 0) + 1
+                r = _promote_if_ignited(r)
+                r = _update_dock_summary(r)
+                r.save(update_fields=_DOCK_FIELDS)
+                _bump_on_commit([r.id])
 
         return Response({"ok": True, "ritual": _ritual_to_item(r)}, status=status.HTTP_200_OK)
 
@@ -752,15 +983,11 @@ class RitualRespondView(APIView):
             return Response({"ok": False, "error": "empty_response"}, status=status.HTTP_400_BAD_REQUEST)
 
         with transaction.atomic():
-            if str(getattr(r, "side", "")) != "public":
-                try:
-                    RitualIgnite.objects.get_or_create(
-                        ritual=r,
-                        by=viewer,
-                        defaults={"id": new_id("ri"), "created_at": now_s()},
-                    )
-                except Exception:
-                    pass
+            r = _lock_ritual(r)
+            st = _dock_state(r)  # bootstrap (if needed) before this write lands
+
+            if str(getattr(r, "side", "")) != "public" and _ignite_once(r, viewer):
+                r.ignites = int(r.ignites or 0) + 1
 
             existing = None
             try:
@@ -768,37 +995,49 @@ class RitualRespondView(APIView):
             except Exception:
                 existing = None
 
+            wrote = False
+            prev_payload = None
             if existing is None:
                 try:
-                    existing = RitualResponse.objects.create(
-                        id=new_id("rr"),
-                        ritual=r,
-                        by=viewer,
-                        created_at=now_s(),
-                        kind=str(getattr(r, "kind", "") or ""),
-                        payload=payload,
-                        text=text,
-                    )
+                    with transaction.atomic():
+                        existing = RitualResponse.objects.create(
+                            id=new_id("rr"),
+                            ritual=r,
+                            by=viewer,
+                            created_at=now_s(),
+                            kind=str(getattr(r, "kind", "") or ""),
+                            payload=payload,
+                            text=text,
+                        )
+                    r.replies = int(r.replies or 0) + 1
+                    wrote = True
                 except Exception:
                     existing = None
             else:
+                prev_payload = existing.payload
                 existing.payload = payload
                 existing.text = text
                 existing.created_at = now_s()
                 try:
                     existing.save(update_fields=["payload", "text", "created_at"])
+                    wrote = True
                 except Exception:
                     pass
 
-            r = _refresh_counts_and_status(r)
+            if wrote:
+                _note_response(st, by=viewer, text=text, payload=payload, prev_payload=prev_payload)
+                r.dock_state = st
+
+            r = _promote_if_ignited(r)
             r = _update_dock_summary(r)
-            r.save(update_fields=["status", "ignites", "replies", "data"])
+            r.save(update_fields=_DOCK_FIELDS)
+            _bump_on_commit([r.id])
 
         return Response({"ok": True, "ritual": _ritual_to_item(r)}, status=status.HTTP_200_OK)
 
 
 class RitualResponsesView(APIView):
-    """GET /api/rituals/<id>/responses"""
+    """GET /api/rituals/<id>/responses?limit=<n>&cursor=<opaque>"""
 
     throttle_scope = "ritual_responses"
     permission_classes: list = []
@@ -808,36 +1047,21 @@ class RitualResponsesView(APIView):
         if not has_viewer or not ritual_id:
             return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        r = _load_ritual_or_none(viewer_id=viewer, ritual_id=ritual_id)
-        if not r:
+        if _readable_head(viewer_id=viewer, ritual_id=ritual_id) is None:
             return Response({"ok": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
-        items: List[Dict[str, Any]] = []
+        qp = getattr(request, "query_params", {})
         try:
-            qs = RitualResponse.objects.filter(ritual=r).order_by("-created_at")[:50]
+            limit = int(str(qp.get("limit") or _RESPONSES_DEFAULT_LIMIT).strip())
         except Exception:
-            qs = []
-
-        for rr in qs:
-            by = str(getattr(rr, "by", "") or "").strip()
-            disp = None
-            try:
-                from siddes_backend.identity import display_for_token
-
-                disp = display_for_token(by)
-            except Exception:
-                disp = {"id": by, "handle": "@unknown", "name": by}
-
-            items.append(
-                {
-                    "id": str(getattr(rr, "id", "") or ""),
-                    "by": by,
-                    "byDisplay": disp,
-                    "createdAt": float(getattr(rr, "created_at", 0.0) or 0.0),
-                    "kind": str(getattr(rr, "kind", "") or ""),
-                    "payload": getattr(rr, "payload", {}) if isinstance(getattr(rr, "payload", {}), dict) else {},
-                    "text": str(getattr(rr, "text", "") or ""),
-                }
-            )
-
-        return Response({"ok": True, "ritualId": str(r.id), "items": items}, status=status.HTTP_200_OK)
+            limit = _RESPONSES_DEFAULT_LIMIT
+        limit = max(1, min(limit, _RESPONSES_MAX_LIMIT))
+        cursor = str(qp.get("cursor") or "").strip() or None
+
+        return _cached_conditional(
+            request,
+            kind="responses",
+            ritual_id=str(ritual_id),
+            parts=(limit, cursor),
+            build=lambda: _ritual_responses_body(ritual_id, limit=limit, cursor=cursor),
+        )
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from siddes_safety.stats_rollup import rollup_moderation_stats
+
+
+class Command(BaseCommand):
+    help = "Roll up daily moderation stats snapshots (run every few minutes; re-rolls yesterday to close it)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="UTC days to (re)build, today included (default: 2).")
+
+    def handle(self, *args, **opts):
+        days = max(1, min(int(opts.get("days") or 2), 400))
+        written = rollup_moderation_stats(days=days)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} moderation stats snapshot row(s) over {days} day(s)."))
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("siddes_safety", "0006_user_hidden_posts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ModerationStatsDaily",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("metric", models.CharField(max_length=96)),
+                ("created", models.BigIntegerField(default=0)),
+                ("total", models.BigIntegerField(blank=True, null=True)),
+                ("as_of", models.DateTimeField()),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("day", "metric"), name="modstats_day_metric_uniq")],
+            },
+        ),
+    ]
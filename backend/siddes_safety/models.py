@@ -91,3 +91,24 @@ class ModerationAuditEvent(models.Model):
     request_id = models.CharField(max_length=64, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+
+
+class ModerationStatsDaily(models.Model):
+    """Daily per-metric counters for the staff stats dashboard (rollup job output).
+
+    - metric: a table name ("posts"), or a grouped bucket ("audit:post_hide",
+      "account_state:active", "report_status:open")
+    - created: rows created during `day` (UTC), up to `as_of`
+    - total: table/bucket size at `as_of` (null for window-only metrics)
+    """
+
+    day = models.DateField()
+    metric = models.CharField(max_length=96)
+    created = models.BigIntegerField(default=0)
+    total = models.BigIntegerField(null=True, blank=True)
+    as_of = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "metric"], name="modstats_day_metric_uniq"),
+        ]
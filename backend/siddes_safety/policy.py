@@ -1,25 +1,12 @@
 from __future__ import annotations
 
-from typing import Optional, Set
+from typing import Iterable, Optional, Set
 
 
 def _safe_str(x: object) -> str:
     return str(x or "").strip()
 
 
-def _aliases(token: str) -> Set[str]:
-    t = _safe_str(token)
-    if not t:
-        return set()
-    try:
-        from siddes_backend.identity import viewer_aliases  # type: ignore
-
-        out = viewer_aliases(t)
-        return {str(a).strip() for a in out if str(a).strip()}
-    except Exception:
-        return {t}
-
-
 def normalize_target_token(raw: str | None) -> Optional[str]:
     """Normalize a user token for blocking.
 
@@ -61,7 +48,11 @@ def normalize_target_token(raw: str | None) -> Optional[str]:
 
 
 def is_blocked_pair(viewer_id: str, other_token: str) -> bool:
-    """Return True if either side has blocked the other."""
+    """Return True if either side has blocked the other.
+
+    Backed by the viewer's cached safety graph (safety_graph.py): a set lookup
+    per call once the graph is loaded.
+    """
 
     v = _safe_str(viewer_id)
     o = _safe_str(other_token)
@@ -69,25 +60,33 @@ def is_blocked_pair(viewer_id: str, other_token: str) -> bool:
         return False
 
     try:
-        from .models import UserBlock
+        from .safety_graph import safety_graph
+
+        return safety_graph(v).blocks(o)
+    except Exception:
+        # Fail-open: safety features should not crash the feed.
+        return False
 
-        v_alias = list(_aliases(v))
-        o_alias = list(_aliases(o))
-        if not v_alias or not o_alias:
-            return False
+def blocked_among(viewer_id: str, tokens: Iterable[str]) -> Set[str]:
+    """Return the subset of `tokens` blocked with the viewer in either direction.
 
-        # viewer blocked other
-        if UserBlock.objects.filter(blocker_id__in=v_alias, blocked_token__in=o_alias).exists():
-            return True
+    Bulk form of is_blocked_pair for list endpoints: one safety-graph load
+    regardless of how many tokens are checked. Fail-open.
+    """
+
+    v = _safe_str(viewer_id)
+    toks = {_safe_str(t) for t in tokens if _safe_str(t)}
+    if not v or not toks:
+        return set()
 
-        # other blocked viewer
-        if UserBlock.objects.filter(blocker_id__in=o_alias, blocked_token__in=v_alias).exists():
-            return True
+    try:
+        from .safety_graph import safety_graph
 
-        return False
+        g = safety_graph(v)
+        return {t for t in toks if g.blocks(t)}
     except Exception:
-        # Fail-open: safety features should not crash the feed.
-        return False
+        return set()
+
 
 def is_muted(viewer_id: str, other_token: str) -> bool:
     """Return True if viewer has muted other_token (one-way).
@@ -103,14 +102,8 @@ def is_muted(viewer_id: str, other_token: str) -> bool:
         return False
 
     try:
-        from .models import UserMute
-
-        v_alias = list(_aliases(v))
-        o_alias = list(_aliases(o))
-        if not v_alias or not o_alias:
-            return False
+        from .safety_graph import safety_graph
 
-        return bool(UserMute.objects.filter(muter_id__in=v_alias, muted_token__in=o_alias).exists())
+        return safety_graph(v).mutes(o)
     except Exception:
         return False
-
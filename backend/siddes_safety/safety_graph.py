@@ -0,0 +1,233 @@
+"""Per-viewer safety graph (blocks + mutes) behind the policy checks.
+
+Feeds, search, rituals and inbox lists used to run two UserBlock exists()
+queries plus a UserMute query per record. Instead, a viewer's graph is loaded
+once (two queries + one bulk identity lookup) and every check is a set lookup:
+
+- blocked:    tokens the viewer blocked
+- blocked_by: tokens that blocked the viewer
+- muted:      tokens the viewer muted (one-way)
+
+Each set holds the stored tokens plus their aliases (me_<id> and lowercase
+@handle), so records authored under either form match without resolving the
+author. Graphs are cached per person under a version token that block/mute
+writes bump for both parties, and memoized for the rest of the request.
+All helpers are best-effort and never raise (fail-open, like policy.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+from django.core.cache import cache
+
+from siddes_backend.cache_versions import bump_versions, fill_ttl, get_version
+
+
+class SafetyGraph(NamedTuple):
+    blocked: FrozenSet[str] = frozenset()
+    blocked_by: FrozenSet[str] = frozenset()
+    muted: FrozenSet[str] = frozenset()
+
+    def blocks(self, token: object) -> bool:
+        """True if the viewer and token blocked each other in either direction."""
+
+        forms = _forms(token)
+        return bool(forms & self.blocked or forms & self.blocked_by)
+
+    def mutes(self, token: object) -> bool:
+        return bool(_forms(token) & self.muted)
+
+
+_EMPTY = SafetyGraph()
+
+
+def _safe_str(x: object) -> str:
+    return str(x or "").strip()
+
+
+def _forms(token: object) -> Set[str]:
+    t = _safe_str(token)
+    if not t:
+        return set()
+    out = {t}
+    if t.startswith("@"):
+        out.add(t.lower())
+    else:
+        try:
+            from siddes_backend.identity import normalize_handle  # type: ignore
+
+            h = normalize_handle(t)
+            if h:
+                out.add(h)
+        except Exception:
+            pass
+    return out
+
+
+def _truthy(v: str | None) -> bool:
+    return str(v or "").strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+def safety_graph_cache_ttl() -> int:
+    if not _truthy(os.environ.get("SIDDES_SAFETY_GRAPH_CACHE_ENABLED", "1")):
+        return 0
+    raw = os.environ.get("SIDDES_SAFETY_GRAPH_TTL_SECS", "300")
+    try:
+        ttl = int(str(raw).strip())
+    except Exception:
+        ttl = 300
+    # Versioned keys keep graphs fresh; TTL only bounds memory.
+    return max(0, min(ttl, 3600))
+
+
+def _subject(token: str) -> str:
+    """Stable per-person key: the user id when resolvable, else the token."""
+
+    try:
+        from siddes_backend.identity import user_id_for_token  # type: ignore
+
+        uid = user_id_for_token(token)
+        if uid is not None:
+            return f"u{uid}"
+    except Exception:
+        pass
+    return "t" + hashlib.sha256(token.lower().encode("utf-8")).hexdigest()[:24]
+
+
+def _ver_key(subject: str) -> str:
+    return f"safety:v1:ver:{subject}"
+
+
+def _memo() -> Optional[Dict[str, object]]:
+    try:
+        from siddes_backend.identity import request_memo  # type: ignore
+
+        return request_memo()
+    except Exception:
+        return None
+
+
+def _expand(tokens: Iterable[str]) -> FrozenSet[str]:
+    toks = {_safe_str(t) for t in tokens if _safe_str(t)}
+    out: Set[str] = set()
+    for t in toks:
+        out |= _forms(t)
+    try:
+        from siddes_backend.identity import resolve_many  # type: ignore
+
+        for r in resolve_many(toks).values():
+            if r is not None:
+                out.add(f"me_{r.user_id}")
+                if r.handle:
+                    out.add(r.handle)
+    except Exception:
+        pass
+    return frozenset(out)
+
+
+def _load(viewer: str) -> SafetyGraph:
+    from django.db.models import Q
+
+    from siddes_backend.identity import viewer_aliases  # type: ignore
+
+    from .models import UserBlock, UserMute
+
+    v_alias = {str(a).strip() for a in (viewer_aliases(viewer) or {viewer}) if str(a).strip()}
+    if not v_alias:
+        return _EMPTY
+
+    blocked: List[str] = []
+    blocked_by: List[str] = []
+    rows = UserBlock.objects.filter(Q(blocker_id__in=v_alias) | Q(blocked_token__in=v_alias)).values_list(
+        "blocker_id", "blocked_token"
+    )
+    for blocker, target in rows:
+        if str(blocker) in v_alias:
+            blocked.append(str(target))
+        if str(target) in v_alias:
+            blocked_by.append(str(blocker))
+    muted = [str(t) for t in UserMute.objects.filter(muter_id__in=v_alias).values_list("muted_token", flat=True)]
+
+    return SafetyGraph(_expand(blocked), _expand(blocked_by), _expand(muted))
+
+
+def safety_graph(viewer_id: object) -> SafetyGraph:
+    """The viewer's safety graph (request memo -> shared cache -> DB)."""
+
+    v = _safe_str(viewer_id)
+    if not v:
+        return _EMPTY
+
+    memo = _memo()
+    mk = "safety:" + v
+    if memo is not None:
+        hit = memo.get(mk)
+        if isinstance(hit, SafetyGraph):
+            return hit
+
+    ttl = safety_graph_cache_ttl()
+    key = ""
+    g: Optional[SafetyGraph] = None
+    if ttl > 0:
+        try:
+            subj = _subject(v)
+            key = f"safety:v1:graph:{subj}:{get_version(_ver_key(subj))}:" + hashlib.sha256(v.encode("utf-8")).hexdigest()[:16]
+            raw = cache.get(key)
+            if isinstance(raw, (list, tuple)) and len(raw) == 3:
+                g = SafetyGraph(*(frozenset(str(x) for x in part) for part in raw))
+        except Exception:
+            g = None
+
+    if g is None:
+        try:
+            g = _load(v)
+        except Exception:
+            return _EMPTY  # fail-open, and do not memoize the failure
+        fill = fill_ttl(ttl) if key else 0
+        if fill > 0:
+            try:
+                cache.set(key, [sorted(g.blocked), sorted(g.blocked_by), sorted(g.muted)], timeout=fill)
+            except Exception:
+                pass
+
+    if memo is not None:
+        memo[mk] = g
+    return g
+
+
+def bump_safety_graph(*tokens: object) -> None:
+    """Invalidate the graphs of everyone named (call for both sides of a block)."""
+
+    memo = _memo()
+    for x in tokens:
+        t = _safe_str(x)
+        if not t:
+            continue
+        bump_versions([_ver_key(_subject(t))])
+        if memo is not None:
+            # The memo is keyed by raw token; drop every entry (cheap, rare).
+            for k in [k for k in memo if k.startswith("safety:")]:
+                memo.pop(k, None)
+
+
+def filter_authors(viewer_id: object, authors: Iterable[object], *, blocks: bool = True, mutes: bool = True) -> List[str]:
+    """Authors the viewer may see, in input order (blocked/muted ones dropped).
+
+    One graph load per viewer per request, then a set lookup per author.
+    """
+
+    g = safety_graph(viewer_id)
+    out: List[str] = []
+    for a in authors or []:
+        t = _safe_str(a)
+        if not t:
+            continue
+        if blocks and g.blocks(t):
+            continue
+        if mutes and g.mutes(t):
+            continue
+        out.append(t)
+    return out
@@ -0,0 +1,301 @@
+"""Moderation stats rollup (daily snapshots behind ModerationStatsView).
+
+The staff dashboard used to run ~30 full-table COUNT(*)/GROUP BY queries per
+load. Instead, a rollup job (`manage.py rollup_moderation_stats`, or the
+`moderation_stats_rollup` edge job) writes one ModerationStatsDaily row per
+(UTC day, metric):
+
+- created: rows created that day (up to as_of)
+- total:   rows present at as_of (today: COUNT(*); closed days: rows older
+           than the day end)
+
+Reads combine the snapshots with a small live delta:
+- totals = latest snapshot total + rows created since its as_of
+- window counts = full days from snapshots + live counts for the partial
+  first day and anything after the latest as_of
+- current-state distributions (account states, report statuses) are served as
+  of the last rollup
+
+Days or metrics without snapshots fall back to live counts, so the dashboard
+keeps working before the first rollup. Grouped sources also write a bare
+"<name>" marker row (created = sum of buckets) that records day coverage.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time as dtime, timedelta, timezone as dt_timezone
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import ModerationStatsDaily
+
+
+class _Source(NamedTuple):
+    name: str
+    model: Callable[[], Any]
+    time_field: Optional[str] = None
+    epoch: bool = False  # time_field holds float seconds
+    group: Optional[str] = None  # bucket field -> metrics "<name>:<value>"
+    total: bool = True
+    window_name: Optional[str] = None  # key in lastWindow (None = not windowed)
+
+
+def _model(label: str) -> Callable[[], Any]:
+    def load():
+        from django.apps import apps
+
+        return apps.get_model(label)
+
+    return load
+
+
+def _user_model():
+    from django.contrib.auth import get_user_model
+
+    return get_user_model()
+
+
+_SOURCES: Tuple[_Source, ...] = (
+    _Source("users", _user_model, "date_joined", window_name="signups"),
+    _Source("posts", _model("siddes_post.Post"), "created_at", epoch=True, window_name="posts"),
+    _Source("replies", _model("siddes_post.Reply"), "created_at", epoch=True, window_name="replies"),
+    _Source("sets", _model("siddes_sets.SiddesSet"), "created_at", window_name="sets"),
+    _Source("invites", _model("siddes_invites.SiddesInvite"), "created_at", window_name="invites"),
+    _Source("notifications", _model("siddes_notifications.Notification"), "created_at", epoch=True, window_name="notifications"),
+    _Source("broadcasts", _model("siddes_broadcasts.Broadcast"), "created_at", window_name="broadcasts"),
+    _Source("broadcast_members", _model("siddes_broadcasts.BroadcastMember"), "created_at"),
+    _Source("inbox_threads", _model("siddes_inbox.InboxThread"), "created_at", window_name="inbox_threads"),
+    _Source("inbox_messages", _model("siddes_inbox.InboxMessage"), "ts", window_name="inbox_messages"),
+    _Source("blocks", _model("siddes_safety.UserBlock"), "created_at", window_name="blocks"),
+    _Source("reports", _model("siddes_safety.UserReport"), "created_at", window_name="reports"),
+    _Source("account_state", _model("siddes_auth.SiddesProfile"), group="account_state"),
+    _Source("report_status", _model("siddes_safety.UserReport"), group="status"),
+    _Source("audit", _model("siddes_safety.ModerationAuditEvent"), "created_at", group="action", total=False, window_name="audit"),
+)
+
+
+def _day_start(d: date) -> datetime:
+    return datetime.combine(d, dtime.min, tzinfo=dt_timezone.utc)
+
+
+def _utc_day(dt: datetime) -> date:
+    return dt.astimezone(dt_timezone.utc).date()
+
+
+def _bound(src: _Source, dt: datetime) -> Any:
+    return float(dt.timestamp()) if src.epoch else dt
+
+
+def _counts(src: _Source, model: Any, lo: Optional[datetime] = None, hi: Optional[datetime] = None) -> Dict[str, int]:
+    """Live counts for one source in [lo, hi) (per bucket for grouped sources)."""
+
+    qs = model.objects.all()
+    if src.time_field and lo is not None:
+        qs = qs.filter(**{f"{src.time_field}__gte": _bound(src, lo)})
+    if src.time_field and hi is not None:
+        qs = qs.filter(**{f"{src.time_field}__lt": _bound(src, hi)})
+
+    if not src.group:
+        return {src.name: int(qs.count())}
+
+    out: Dict[str, int] = {}
+    for row in qs.values(src.group).annotate(c=Count("pk")):
+        k = str(row.get(src.group) or "").strip() or "unknown"
+        out[f"{src.name}:{k}"] = out.get(f"{src.name}:{k}", 0) + int(row.get("c") or 0)
+    out[src.name] = sum(out.values())
+    return out
+
+
+def _add(acc: Dict[str, int], d: Dict[str, int]) -> None:
+    for k, v in d.items():
+        acc[k] = acc.get(k, 0) + int(v)
+
+
+def _belongs(src: _Source, metric: str) -> bool:
+    return metric == src.name or metric.startswith(src.name + ":")
+
+
+def _load(src: _Source) -> Any:
+    try:
+        return src.model()
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Rollup
+# ---------------------------------------------------------------------------
+
+
+def rollup_moderation_stats(*, days: int = 2, now: Optional[datetime] = None) -> int:
+    """Write snapshots for the last `days` UTC days (today included). Returns rows written.
+
+    Re-rolling yesterday closes it out (created up to midnight), so running
+    with the default every few minutes keeps every closed day exact.
+    """
+
+    now = now or timezone.now()
+    today = _utc_day(now)
+    days = max(1, min(int(days), 400))
+    written = 0
+
+    for src in _SOURCES:
+        model = _load(src)
+        if model is None:
+            continue
+
+        for i in range(days - 1, -1, -1):
+            d = today - timedelta(days=i)
+            start = _day_start(d)
+            end = min(_day_start(d + timedelta(days=1)), now)
+
+            if src.time_field:
+                created = _counts(src, model, start, end)
+            elif d == today:
+                created = {}
+            else:
+                continue  # state-only sources have no history to rebuild
+
+            totals: Dict[str, int] = {}
+            if src.total:
+                if d == today:
+                    totals = _counts(src, model)
+                elif src.time_field:
+                    totals = _counts(src, model, None, end)
+
+            metrics = set(created) | set(totals)
+            with transaction.atomic():
+                for m in sorted(metrics):
+                    defaults: Dict[str, Any] = {"created": int(created.get(m, 0)), "as_of": end}
+                    if m in totals:
+                        defaults["total"] = int(totals[m])
+                    ModerationStatsDaily.objects.update_or_create(day=d, metric=m, defaults=defaults)
+                if src.group:
+                    # Buckets that emptied since the last rollup.
+                    (
+                        ModerationStatsDaily.objects.filter(day=d, metric__startswith=src.name + ":")
+                        .exclude(metric__in=list(metrics))
+                        .update(created=0, total=0 if src.total else None, as_of=end)
+                    )
+            written += len(metrics)
+
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+
+def _window(src: _Source, model: Any, snaps: Dict[Tuple[date, str], ModerationStatsDaily], since: datetime, now: datetime) -> Dict[str, int]:
+    acc: Dict[str, int] = {}
+    d = _utc_day(since)
+    today = _utc_day(now)
+    while d <= today:
+        ds = _day_start(d)
+        lo = max(since, ds)
+        hi = min(now, _day_start(d + timedelta(days=1)))
+        marker = snaps.get((d, src.name))
+        if lo < hi:
+            if marker is not None and lo == ds:
+                _add(acc, {m: r.created for (dd, m), r in snaps.items() if dd == d and _belongs(src, m)})
+                if marker.as_of < hi:
+                    _add(acc, _counts(src, model, max(marker.as_of, lo), hi))
+            else:
+                _add(acc, _counts(src, model, lo, hi))
+        d += timedelta(days=1)
+    return acc
+
+
+def _totals(src: _Source, model: Any, snaps: Dict[Tuple[date, str], ModerationStatsDaily], now: datetime) -> Tuple[Dict[str, int], Optional[datetime]]:
+    days = sorted({dd for (dd, m), r in snaps.items() if m == src.name and r.total is not None}, reverse=True)
+    if not days:
+        return _counts(src, model), None
+
+    d = days[0]
+    marker = snaps[(d, src.name)]
+    out = {m: int(r.total or 0) for (dd, m), r in snaps.items() if dd == d and _belongs(src, m) and r.total is not None}
+    if src.time_field and marker.as_of < now:
+        _add(out, _counts(src, model, marker.as_of, None))
+    return out, marker.as_of
+
+
+def _strip(src: _Source, d: Dict[str, int]) -> Dict[str, int]:
+    pre = src.name + ":"
+    return {k[len(pre):]: int(v) for k, v in sorted(d.items()) if k.startswith(pre)}
+
+
+def read_moderation_stats(*, hours: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Build the ModerationStatsView payload from snapshots + live deltas."""
+
+    now = now or timezone.now()
+    since = now - timedelta(hours=int(hours))
+    first = min(_utc_day(since), _utc_day(now) - timedelta(days=1))
+
+    snaps: Dict[Tuple[date, str], ModerationStatsDaily] = {}
+    for r in ModerationStatsDaily.objects.filter(day__gte=first, day__lte=_utc_day(now)):
+        snaps[(r.day, r.metric)] = r
+
+    totals: Dict[str, int] = {}
+    lastw: Dict[str, int] = {}
+    grouped: Dict[str, Dict[str, int]] = {}
+    as_of: List[datetime] = []
+
+    for src in _SOURCES:
+        model = _load(src)
+        if model is None:
+            if not src.group:
+                totals[src.name] = 0
+                if src.window_name:
+                    lastw[src.window_name] = 0
+            continue
+
+        try:
+            if src.total:
+                t, t_as_of = _totals(src, model, snaps, now)
+                if t_as_of is not None:
+                    as_of.append(t_as_of)
+                if src.group:
+                    grouped[src.name] = _strip(src, t)
+                else:
+                    totals[src.name] = int(t.get(src.name, 0))
+            if src.window_name and src.time_field:
+                w = _window(src, model, snaps, since, now)
+                if src.group:
+                    grouped[src.name] = _strip(src, w)
+                else:
+                    lastw[src.window_name] = int(w.get(src.name, 0))
+        except Exception:
+            if not src.group:
+                totals.setdefault(src.name, 0)
+                if src.window_name:
+                    lastw.setdefault(src.window_name, 0)
+
+    return {
+        "ok": True,
+        "serverTime": now.isoformat(),
+        "windowHours": int(hours),
+        "totals": totals,
+        "lastWindow": lastw,
+        "accountStates": grouped.get("account_state", {}),
+        "reportsByStatus": grouped.get("report_status", {}),
+        "auditActions": grouped.get("audit", {}),
+        "snapshotAsOf": min(as_of).isoformat() if as_of else None,
+    }
+
+
+def iter_snapshot_rows(*, days: int, now: Optional[datetime] = None) -> Iterator[List[Any]]:
+    """Snapshot rows for the last `days` UTC days: [day, metric, created, total, asOf]."""
+
+    now = now or timezone.now()
+    first = _utc_day(now) - timedelta(days=max(1, int(days)) - 1)
+    qs = (
+        ModerationStatsDaily.objects.filter(day__gte=first)
+        .order_by("day", "metric")
+        .values_list("day", "metric", "created", "total", "as_of")
+    )
+    for d, metric, created, total, row_as_of in qs.iterator(chunk_size=500):
+        yield [d.isoformat(), metric, int(created or 0), "" if total is None else int(total), row_as_of.isoformat()]
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 
 from siddes_prism.models import SideMembership
-from siddes_sets.models import SiddesSet
+from siddes_sets.models import SiddesSet, SiddesSetMember
 
 
 @override_settings(DEBUG=True)
@@ -40,6 +42,9 @@ class BlockRevokesAccessTests(APITestCase):
             members=["@alice_block"],
             count=0,
         )
+        # Membership rows are the source of truth (JSON members is a mirror).
+        SiddesSetMember.objects.create(set_id="set_block_a", member_id="@bob_block")
+        SiddesSetMember.objects.create(set_id="set_block_b", member_id="@alice_block")
 
         r = self.client.post("/api/blocks", {"target": "@bob_block"}, format="json", **self.h_alice)
         assert r.status_code == 200, r.content
@@ -55,3 +60,97 @@ class BlockRevokesAccessTests(APITestCase):
 
         s2 = SiddesSet.objects.get(id="set_block_b")
         assert "@alice_block" not in (s2.members or [])
+        assert not SiddesSetMember.objects.filter(set_id__in=["set_block_a", "set_block_b"]).exists()
+
+
+class ModerationStatsSnapshotTests(APITestCase):
+    def setUp(self):
+        from .models import UserBlock, UserReport
+
+        User = get_user_model()
+        self.staff = User.objects.create_user(username="staff_stats", email="staff_stats@example.com", password="pw", is_staff=True)
+        self.client.force_authenticate(self.staff)
+        UserBlock.objects.create(blocker_id="me_1", blocked_token="@x")
+        UserBlock.objects.create(blocker_id="me_2", blocked_token="@x")
+        UserReport.objects.create(reporter_id="me_1", target_type="user", target_id="@x", reason="spam")
+
+    def _stats(self) -> dict:
+        r = self.client.get("/api/moderation/stats?hours=24")
+        assert r.status_code == 200
+        return r.json()
+
+    def test_snapshot_reads_match_live_and_include_delta(self):
+        from .models import UserBlock
+        from .stats_rollup import rollup_moderation_stats
+
+        live = self._stats()
+        assert live["snapshotAsOf"] is None
+
+        assert rollup_moderation_stats(days=2) > 0
+        snap = self._stats()
+        assert snap["snapshotAsOf"]
+        for k in ("totals", "lastWindow", "reportsByStatus"):
+            assert snap[k] == live[k], k
+
+        UserBlock.objects.create(blocker_id="me_3", blocked_token="@x")
+        after = self._stats()
+        assert after["totals"]["blocks"] == 3
+        assert after["lastWindow"]["blocks"] == 3
+
+    def test_csv_export_streams_snapshot_rows(self):
+        from .stats_rollup import rollup_moderation_stats
+
+        rollup_moderation_stats(days=1)
+        r = self.client.get("/api/moderation/stats/export?format=csv&days=1")
+        assert r.status_code == 200
+        body = b"".join(r.streaming_content).decode("utf-8").splitlines()
+        assert body[0] == "day,metric,created,total,asOf"
+        assert any(",blocks,2,2," in line for line in body[1:])
+
+
+@override_settings(DEBUG=True)
+class SafetyGraphTests(APITestCase):
+    def setUp(self):
+        import time
+
+        from django.core.cache import cache
+
+        from siddes_post.models import Post
+
+        cache.clear()
+        User = get_user_model()
+        self.alice = User.objects.create_user(username="alice_graph", email="alice_graph@example.com", password="pw")
+        self.bob = User.objects.create_user(username="bob_graph", email="bob_graph@example.com", password="pw")
+        self.h_alice = {"HTTP_X_SD_VIEWER": f"me_{self.alice.id}"}
+        now = time.time()
+        for i in range(6):
+            Post.objects.create(id=f"p_graph_{i}", author_id=f"me_{self.bob.id}", side="public", text=f"hello {i}", created_at=now - i)
+
+    def _feed_ids(self) -> list:
+        r = self.client.get("/api/feed?side=public&limit=20", **self.h_alice)
+        assert r.status_code == 200
+        return [it["id"] for it in r.json()["items"]]
+
+    def test_feed_pays_for_safety_once_per_request(self):
+        with CaptureQueriesContext(connection) as ctx:
+            assert len(self._feed_ids()) == 6
+        sql = [q["sql"] for q in ctx.captured_queries]
+        assert sum(1 for q in sql if "siddes_safety_userblock" in q) <= 1
+        assert sum(1 for q in sql if "siddes_safety_usermute" in q) <= 1
+
+    def test_block_and_mute_writes_refresh_the_cached_graph(self):
+        from .policy import is_blocked_pair, is_muted
+
+        assert not is_blocked_pair(f"me_{self.bob.id}", f"me_{self.alice.id}")
+
+        r = self.client.post("/api/blocks", {"target": "@Bob_Graph"}, format="json", **self.h_alice)
+        assert r.status_code == 200
+        assert is_blocked_pair(f"me_{self.bob.id}", "@alice_graph")  # blocked-by side, other alias
+        assert self._feed_ids() == []
+
+        self.client.delete("/api/blocks/@bob_graph", **self.h_alice)
+        assert not is_blocked_pair(f"me_{self.bob.id}", f"me_{self.alice.id}")
+
+        self.client.post("/api/mutes", {"target": f"me_{self.bob.id}"}, format="json", **self.h_alice)
+        assert is_muted(f"me_{self.alice.id}", "@bob_graph")
+        assert not is_muted(f"me_{self.bob.id}", f"me_{self.alice.id}")
@@ -13,6 +13,7 @@ from siddes_backend.csrf import dev_csrf_exempt
 from siddes_inbox.visibility_stub import resolve_viewer_role
 
 from .models import ModerationAuditEvent, UserAppeal, UserBlock, UserReport, UserMute, UserHiddenPost
+from .safety_graph import bump_safety_graph
 from .policy import normalize_target_token
 
 
@@ -105,9 +106,12 @@ def _revoke_private_access_on_block(*, viewer_token: str, target_token: str) ->
 
     try:
         from django.contrib.auth import get_user_model
+        from django.db import transaction
         from siddes_backend.identity import parse_viewer_user_id, normalize_handle, viewer_aliases
         from siddes_prism.models import SideMembership
-        from siddes_sets.models import SiddesSet, SiddesSetMember
+        from siddes_prism.profile_cache import bump_profile_pair, bump_profile_target
+        from siddes_prism.stats import apply_siders_delta
+        from siddes_sets.membership import remove_members
     except Exception:
         return
 
@@ -121,25 +125,12 @@ def _revoke_private_access_on_block(*, viewer_token: str, target_token: str) ->
         if not owner_ids or not member_aliases:
             return
 
-        # Normalized table (best-effort)
+        # One DELETE on the membership table + JSON mirror refresh of touched Sets.
         try:
-            SiddesSetMember.objects.filter(set__owner_id__in=owner_ids, member_id__in=member_aliases).delete()
+            remove_members(owner_ids=owner_ids, member_ids=member_aliases)
         except Exception:
             pass
 
-        # JSON members list (payload parity)
-        try:
-            qs = SiddesSet.objects.filter(owner_id__in=owner_ids)
-            for st in qs.iterator():
-                members = st.members if isinstance(st.members, list) else []
-                members_s = [str(m).strip() for m in members if str(m).strip()]
-                new = [m for m in members_s if m not in member_aliases]
-                if new != members_s:
-                    st.members = new
-                    st.save(update_fields=["members", "updated_at"])
-        except Exception:
-            return
-
     try:
         vtok = str(viewer_token or "").strip()
         ttok = str(target_token or "").strip()
@@ -192,8 +183,15 @@ def _revoke_private_access_on_block(*, viewer_token: str, target_token: str) ->
             t_user_handle = None
 
         if t_user is not None:
-            SideMembership.objects.filter(owner=viewer_user, member=t_user).delete()
-            SideMembership.objects.filter(owner=t_user, member=viewer_user).delete()
+            with transaction.atomic():
+                n_out, _ = SideMembership.objects.filter(owner=viewer_user, member=t_user).delete()
+                n_in, _ = SideMembership.objects.filter(owner=t_user, member=viewer_user).delete()
+                if n_out:
+                    apply_siders_delta(member_id=t_user.id, delta=-1)
+                if n_in:
+                    apply_siders_delta(member_id=viewer_user.id, delta=-1)
+            bump_profile_target(viewer_user.id, t_user.id)
+            bump_profile_pair(viewer_user.id, t_user.id)
 
         # Token-based Set cleanup (both directions)
         v_alias = list(viewer_aliases(vtok) or {vtok})
@@ -250,6 +248,7 @@ class BlocksView(APIView):
             return Response({"ok": False, "error": "cannot_block_self"}, status=status.HTTP_400_BAD_REQUEST)
 
         UserBlock.objects.get_or_create(blocker_id=viewer, blocked_token=target)
+        bump_safety_graph(viewer, target)
 
         _revoke_private_access_on_block(viewer_token=viewer, target_token=target)
         return Response({"ok": True, "blocked": True, "target": target}, status=status.HTTP_200_OK)
@@ -272,6 +271,7 @@ class BlockDeleteView(APIView):
             return Response({"ok": False, "error": "invalid_target"}, status=status.HTTP_400_BAD_REQUEST)
 
         UserBlock.objects.filter(blocker_id=viewer, blocked_token=target).delete()
+        bump_safety_graph(viewer, target)
         return Response({"ok": True, "blocked": False, "target": target}, status=status.HTTP_200_OK)
 
 
@@ -308,6 +308,7 @@ class MutesView(APIView):
             return Response({"ok": False, "error": "cannot_mute_self"}, status=status.HTTP_400_BAD_REQUEST)
 
         UserMute.objects.get_or_create(muter_id=viewer, muted_token=target)
+        bump_safety_graph(viewer)
         return Response({"ok": True, "muted": True, "target": target}, status=status.HTTP_200_OK)
 
 
@@ -328,6 +329,7 @@ class MuteDeleteView(APIView):
             return Response({"ok": False, "error": "invalid_target"}, status=status.HTTP_400_BAD_REQUEST)
 
         UserMute.objects.filter(muter_id=viewer, muted_token=target).delete()
+        bump_safety_graph(viewer)
         return Response({"ok": True, "muted": False, "target": target}, status=status.HTTP_200_OK)
 
 
@@ -1016,6 +1018,12 @@ class ModerationUserStateView(APIView):
             "account_state_set_at",
             "updated_at",
         ])
+        try:
+            from siddes_auth.account_context import invalidate_account_context  # type: ignore
+
+            invalidate_account_context(user.id)
+        except Exception:
+            pass
 
         _audit(
             request=request,
@@ -1046,6 +1054,7 @@ class ModerationStatsView(APIView):
     GET /api/moderation/stats?hours=24
 
     Note: This is intentionally DB-backed only (no log scraping).
+    Served from ModerationStatsDaily snapshots + a small live delta (stats_rollup.py).
     """
 
     throttle_scope = "moderation_audit"
@@ -1056,11 +1065,6 @@ class ModerationStatsView(APIView):
         if r is not None:
             return r
 
-        from datetime import timedelta
-        from django.utils import timezone
-        from django.contrib.auth import get_user_model
-        from django.db.models import Count
-
         qp = getattr(request, "query_params", {})
         try:
             hours = int(str(qp.get("hours") or "24").strip())
@@ -1068,164 +1072,27 @@ class ModerationStatsView(APIView):
             hours = 24
         hours = max(1, min(hours, 168))
 
-        now = timezone.now()
-        since_dt = now - timedelta(hours=hours)
-        since_ts = float(since_dt.timestamp())
+        from .stats_rollup import read_moderation_stats
 
-        def safe_int(x):
-            try:
-                return int(x)
-            except Exception:
-                return 0
-
-        totals = {}
-        lastw = {}
-
-        # Users
-        try:
-            User = get_user_model()
-            totals["users"] = User.objects.count()
-            lastw["signups"] = User.objects.filter(date_joined__gte=since_dt).count()
-        except Exception:
-            totals["users"] = 0
-            lastw["signups"] = 0
-
-        # Account states (SiddesProfile)
-        account_states = {}
-        try:
-            from siddes_auth.models import SiddesProfile  # type: ignore
-
-            rows = SiddesProfile.objects.values("account_state").annotate(c=Count("id"))
-            for r2 in rows:
-                k = str(r2.get("account_state") or "").strip() or "unknown"
-                account_states[k] = safe_int(r2.get("c"))
-        except Exception:
-            account_states = {}
-
-        # Posts / replies
-        try:
-            from siddes_post.models import Post, Reply  # type: ignore
-
-            totals["posts"] = Post.objects.count()
-            totals["replies"] = Reply.objects.count()
-            lastw["posts"] = Post.objects.filter(created_at__gte=since_ts).count()
-            lastw["replies"] = Reply.objects.filter(created_at__gte=since_ts).count()
-        except Exception:
-            totals.setdefault("posts", 0)
-            totals.setdefault("replies", 0)
-            lastw.setdefault("posts", 0)
-            lastw.setdefault("replies", 0)
-
-        # Sets
-        try:
-            from siddes_sets.models import SiddesSet  # type: ignore
-
-            totals["sets"] = SiddesSet.objects.count()
-            lastw["sets"] = SiddesSet.objects.filter(created_at__gte=since_dt).count()
-        except Exception:
-            totals.setdefault("sets", 0)
-            lastw.setdefault("sets", 0)
-
-        # Invites
-        try:
-            from siddes_invites.models import SiddesInvite  # type: ignore
-
-            totals["invites"] = SiddesInvite.objects.count()
-            lastw["invites"] = SiddesInvite.objects.filter(created_at__gte=since_dt).count()
-        except Exception:
-            totals.setdefault("invites", 0)
-            lastw.setdefault("invites", 0)
-
-        # Notifications
-        try:
-            from siddes_notifications.models import Notification  # type: ignore
-
-            totals["notifications"] = Notification.objects.count()
-            lastw["notifications"] = Notification.objects.filter(created_at__gte=since_ts).count()
-        except Exception:
-            totals.setdefault("notifications", 0)
-            lastw.setdefault("notifications", 0)
-
-        # Broadcasts
-        try:
-            from siddes_broadcasts.models import Broadcast, BroadcastMember  # type: ignore
-
-            totals["broadcasts"] = Broadcast.objects.count()
-            totals["broadcast_members"] = BroadcastMember.objects.count()
-            lastw["broadcasts"] = Broadcast.objects.filter(created_at__gte=since_dt).count()
-        except Exception:
-            totals.setdefault("broadcasts", 0)
-            totals.setdefault("broadcast_members", 0)
-            lastw.setdefault("broadcasts", 0)
-
-        # Inbox
-        try:
-            from siddes_inbox.models import InboxThread, InboxMessage  # type: ignore
-
-            totals["inbox_threads"] = InboxThread.objects.count()
-            totals["inbox_messages"] = InboxMessage.objects.count()
-            lastw["inbox_threads"] = InboxThread.objects.filter(created_at__gte=since_dt).count()
-            lastw["inbox_messages"] = InboxMessage.objects.filter(ts__gte=since_dt).count()
-        except Exception:
-            totals.setdefault("inbox_threads", 0)
-            totals.setdefault("inbox_messages", 0)
-            lastw.setdefault("inbox_threads", 0)
-            lastw.setdefault("inbox_messages", 0)
-
-        # Safety: blocks + reports
-        try:
-            totals["blocks"] = UserBlock.objects.count()
-            lastw["blocks"] = UserBlock.objects.filter(created_at__gte=since_dt).count()
-        except Exception:
-            totals.setdefault("blocks", 0)
-            lastw.setdefault("blocks", 0)
-
-        reports_by_status = {}
-        try:
-            totals["reports"] = UserReport.objects.count()
-            lastw["reports"] = UserReport.objects.filter(created_at__gte=since_dt).count()
-            rrows = UserReport.objects.values("status").annotate(c=Count("id"))
-            for rr in rrows:
-                k = str(rr.get("status") or "").strip() or "unknown"
-                reports_by_status[k] = safe_int(rr.get("c"))
-        except Exception:
-            totals.setdefault("reports", 0)
-            lastw.setdefault("reports", 0)
-            reports_by_status = {}
-
-        # Moderation audit actions in window
-        audit_actions = {}
-        try:
-            arows = ModerationAuditEvent.objects.filter(created_at__gte=since_dt).values("action").annotate(c=Count("id"))
-            for ar in arows:
-                k = str(ar.get("action") or "").strip() or "unknown"
-                audit_actions[k] = safe_int(ar.get("c"))
-        except Exception:
-            audit_actions = {}
-
-        out = {
-            "ok": True,
-            "serverTime": now.isoformat(),
-            "windowHours": hours,
-            "totals": totals,
-            "lastWindow": lastw,
-            "accountStates": account_states,
-            "reportsByStatus": reports_by_status,
-            "auditActions": audit_actions,
-        }
-        return Response(out, status=status.HTTP_200_OK)
+        return Response(read_moderation_stats(hours=hours), status=status.HTTP_200_OK)
 
 
 @method_decorator(dev_csrf_exempt, name="dispatch")
 class ModerationStatsExportView(APIView):
     """Staff-only: export moderation stats as CSV or JSON.
 
-    GET /api/moderation/stats/export?format=csv|json&hours=24
+    GET /api/moderation/stats/export?format=csv|json&hours=24[&days=30]
+
+    CSV streams the daily snapshot rows; JSON is the ModerationStatsView payload.
     """
 
     throttle_scope = "moderation_audit"
     permission_classes: list = []
 
+    def perform_content_negotiation(self, request, force=False):
+        # ?format=csv is ours, not a DRF renderer suffix (would 404 otherwise).
+        return super().perform_content_negotiation(request, force=True)
+
     def get(self, request):
         r = _require_staff(request)
         if r is not None:
@@ -1234,33 +1101,53 @@ class ModerationStatsExportView(APIView):
         qp = getattr(request, "query_params", {})
         fmt = str(qp.get("format") or "csv").strip().lower()
 
-        # Reuse the JSON payload
-        stats_resp = ModerationStatsView().get(request)
-        if getattr(stats_resp, "status_code", 500) != 200:
-            return stats_resp
-
-        payload = getattr(stats_resp, "data", None) or {}
         ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
 
         if fmt == "json":
+            # Reuse the JSON payload
+            stats_resp = ModerationStatsView().get(request)
+            if getattr(stats_resp, "status_code", 500) != 200:
+                return stats_resp
+            payload = getattr(stats_resp, "data", None) or {}
             resp = Response(payload, status=status.HTTP_200_OK)
             resp["Cache-Control"] = "no-store"
             resp["Content-Disposition"] = f'attachment; filename="siddes_admin_stats_{ts}.json"'
             return resp
 
-        # CSV default: group,name,value
-        rows = []
-        def add_group(group: str, d: dict):
-            for k, v in (d or {}).items():
-                rows.append([group, str(k), v])
+        # CSV default: stream the daily snapshot rows (day,metric,created,total,asOf).
+        try:
+            days = int(str(qp.get("days") or "").strip() or 0)
+        except Exception:
+            days = 0
+        if days <= 0:
+            try:
+                hours = int(str(qp.get("hours") or "24").strip())
+            except Exception:
+                hours = 24
+            days = max(1, -(-max(1, hours) // 24))
+        days = min(days, 400)
+
+        import csv
+
+        from django.http import StreamingHttpResponse
+
+        from .stats_rollup import iter_snapshot_rows
+
+        class _Echo:
+            def write(self, value):
+                return value
+
+        w = csv.writer(_Echo())
 
-        add_group("totals", payload.get("totals") or {})
-        add_group("lastWindow", payload.get("lastWindow") or {})
-        add_group("accountStates", payload.get("accountStates") or {})
-        add_group("reportsByStatus", payload.get("reportsByStatus") or {})
-        add_group("auditActions", payload.get("auditActions") or {})
+        def _stream():
+            yield w.writerow(["day", "metric", "created", "total", "asOf"])
+            for row in iter_snapshot_rows(days=days):
+                yield w.writerow(row)
 
-        return _csv_response(f"siddes_admin_stats_{ts}.csv", ["group", "name", "value"], rows)
+        resp = StreamingHttpResponse(_stream(), content_type="text/csv; charset=utf-8")
+        resp["Content-Disposition"] = f'attachment; filename="siddes_admin_stats_{ts}.csv"'
+        resp["Cache-Control"] = "no-store"
+        return resp
 
 
 
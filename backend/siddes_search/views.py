@@ -179,10 +179,11 @@ class SearchPostsView(APIView):
         except Exception:
             recs = cand[:lim]
 
-        # sd_423_mute: exclude muted authors
+        # sd_423_mute: exclude muted authors (one safety-graph load for the page)
         try:
-            from siddes_safety.policy import is_muted
-            recs = [r for r in recs if not is_muted(viewer, str(getattr(r, "author_id", "") or ""))]
+            from siddes_safety.safety_graph import filter_authors
+            shown = set(filter_authors(viewer, [str(getattr(r, "author_id", "") or "") for r in recs], blocks=False))
+            recs = [r for r in recs if str(getattr(r, "author_id", "") or "").strip() in shown or not str(getattr(r, "author_id", "") or "").strip()]
         except Exception:
             pass
 
@@ -0,0 +1,83 @@
+"""Set-scoped cache versions.
+
+Cached payloads whose visibility depends on Set membership embed these
+versions (siddes_backend.cache_versions) in their cache keys:
+- set version: bumped when a Set's membership changes (feeds filtered by ?set=)
+- member version: bumped for every person added to / removed from any Set, so
+  that person's own feed caches stop serving (or start serving) Set posts at once
+
+Members are stored as handles (@name) while sessions use me_<id>; a bump for a
+handle also bumps the owning user id so either form of the viewer sees it.
+All helpers are best-effort and never raise.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+from siddes_backend.cache_versions import bump_versions, get_version
+
+
+def _set_key(set_id: str) -> str:
+    return f"sets:v1:ver:set:{set_id}"
+
+
+def _member_key(token: str) -> Optional[str]:
+    try:
+        from siddes_backend.identity import normalize_handle, parse_viewer_user_id
+
+        uid = parse_viewer_user_id(token)
+        if uid is not None:
+            return f"sets:v1:ver:u:{uid}"
+        h = normalize_handle(token)
+        if h:
+            return f"sets:v1:ver:h:{h}"
+    except Exception:
+        pass
+    return None
+
+
+def set_version(set_id: str) -> str:
+    sid = str(set_id or "").strip()
+    return get_version(_set_key(sid)) if sid else "0"
+
+
+def member_version(viewer_id: str) -> str:
+    k = _member_key(str(viewer_id or "").strip())
+    return get_version(k) if k else "0"
+
+
+def bump_set_versions(set_ids: Iterable[object]) -> None:
+    bump_versions(_set_key(sid) for sid in (str(x or "").strip() for x in (set_ids or [])) if sid)
+
+
+def bump_member_versions(member_ids: Iterable[object]) -> None:
+    """Bump member versions for changed members (handles resolved to user ids in one query)."""
+
+    tokens = [str(x or "").strip() for x in (member_ids or []) if str(x or "").strip()]
+    if not tokens:
+        return
+
+    keys: List[str] = []
+    handles: List[str] = []
+    for t in tokens:
+        k = _member_key(t)
+        if k and k not in keys:
+            keys.append(k)
+        if k and k.startswith("sets:v1:ver:h:"):
+            handles.append(k[len("sets:v1:ver:h:@"):])
+
+    if handles:
+        try:
+            from django.contrib.auth import get_user_model
+            from django.db.models.functions import Lower
+
+            qs = get_user_model().objects.annotate(uname_l=Lower("username")).filter(uname_l__in=handles)
+            for uid in qs.values_list("id", flat=True):
+                k = f"sets:v1:ver:u:{uid}"
+                if k not in keys:
+                    keys.append(k)
+        except Exception:
+            pass
+
+    bump_versions(keys)
@@ -0,0 +1,283 @@
+"""Set membership helpers: SiddesSetMember is the source of truth.
+
+`SiddesSet.members` (JSON) is kept as a write-through mirror for payload parity
+and for readers that predate the membership table (e.g. older app servers still
+running during a rollout). Nothing in this codebase reads membership from it.
+
+Membership-wide changes (side prune, block cleanup) are set-based:
+- one DELETE against the indexed membership table
+- one UPDATE refreshing the JSON mirror of the touched sets
+- one INSERT for the audit events
+instead of loading and rewriting each set's JSON list in Python.
+
+Per-Set edits are diffs (`apply_diff`): only the added/removed rows are
+touched, in one transaction, with one bulk event insert. Every membership
+change bumps the set-scoped cache versions (cache_versions.py) on commit.
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache_versions import bump_member_versions, bump_set_versions
+from .models import SetEventKind, SiddesSet, SiddesSetEvent, SiddesSetMember
+
+
+def _clean_ids(raw: Iterable[object]) -> List[str]:
+    out: List[str] = []
+    for x in raw or []:
+        s = str(x or "").strip()
+        if s and s not in out:
+            out.append(s)
+    return out
+
+
+def members_by_set(set_ids: Iterable[object]) -> Dict[str, List[str]]:
+    """Member ids for many sets in one query (insertion order)."""
+
+    ids = _clean_ids(set_ids)
+    out: Dict[str, List[str]] = {sid: [] for sid in ids}
+    if not ids:
+        return out
+    rows = SiddesSetMember.objects.filter(set_id__in=ids).order_by("set_id", "id").values_list("set_id", "member_id")
+    for sid, mid in rows:
+        out.setdefault(str(sid), []).append(str(mid))
+    return out
+
+
+def members_of(set_id: str) -> List[str]:
+    return members_by_set([set_id]).get(str(set_id or "").strip(), [])
+
+
+def mirror_json(members: Dict[str, List[str]]) -> None:
+    """Write the JSON mirror for the given sets in one UPDATE."""
+
+    if not members:
+        return
+    now = timezone.now()
+    objs = [SiddesSet(id=sid, members=list(mids), updated_at=now) for sid, mids in members.items()]
+    SiddesSet.objects.bulk_update(objs, ["members", "updated_at"], batch_size=500)
+
+
+def remove_members(
+    *,
+    owner_ids: Iterable[object],
+    member_ids: Iterable[object],
+    exclude_sides: Optional[Iterable[str]] = None,
+    by: str = "",
+    via: str = "",
+    event_data: Optional[Dict[str, object]] = None,
+) -> List[str]:
+    """Remove member_ids from every Set owned by owner_ids (optionally outside exclude_sides).
+
+    Returns the ids of Sets that actually changed. When `via` is set, one
+    MEMBERS_UPDATED event (members_event_data) is recorded per touched Set.
+    """
+
+    owners = _clean_ids(owner_ids)
+    removed = set(_clean_ids(member_ids))
+    if not owners or not removed:
+        return []
+
+    links = SiddesSetMember.objects.filter(set__owner_id__in=owners, member_id__in=list(removed))
+    sides = [str(s).strip().lower() for s in (exclude_sides or []) if str(s).strip()]
+    if sides:
+        links = links.exclude(set__side__in=sides)
+
+    with transaction.atomic():
+        touched = sorted({str(x) for x in links.values_list("set_id", flat=True)})
+        if not touched:
+            return []
+
+        prev = members_by_set(touched)
+        SiddesSetMember.objects.filter(set_id__in=touched, member_id__in=list(removed)).delete()
+        on_membership_changed(set_ids=touched, member_ids=removed, owner_ids=owners)
+
+        nxt = {sid: [m for m in mids if m not in removed] for sid, mids in prev.items()}
+        mirror_json(nxt)
+
+        if via:
+            ts = int(time.time() * 1000)
+            extra = dict(event_data or {})
+            SiddesSetEvent.objects.bulk_create(
+                [
+                    SiddesSetEvent(
+                        id="se_" + uuid.uuid4().hex[:10],
+                        set_id=sid,
+                        ts_ms=ts,
+                        kind=SetEventKind.MEMBERS_UPDATED,
+                        by=str(by or ""),
+                        data={
+                            **members_event_data(
+                                added=[],
+                                removed=[m for m in prev[sid] if m in removed],
+                                before=len(prev[sid]),
+                                after=len(nxt[sid]),
+                                via=via,
+                            ),
+                            **extra,
+                        },
+                    )
+                    for sid in touched
+                ]
+            )
+
+    return touched
+
+
+def add_members(*, set_id: str, member_ids: Iterable[object]) -> List[str]:
+    """Insert member rows for one Set (idempotent) and refresh its JSON mirror.
+
+    Returns the Set's member list after the insert.
+    """
+
+    sid = str(set_id or "").strip()
+    mids = _clean_ids(member_ids)
+    if not sid:
+        return []
+    with transaction.atomic():
+        inserted, _ = apply_member_rows(set_id=sid, add=mids, remove=[])
+        cur = members_of(sid)
+        mirror_json({sid: cur})
+        if inserted:
+            owner = SiddesSet.objects.filter(id=sid).values_list("owner_id", flat=True).first()
+            on_membership_changed(set_ids=[sid], member_ids=inserted, owner_ids=[owner] if owner else [])
+    return cur
+
+
+def on_membership_changed(*, set_ids: Iterable[object], member_ids: Iterable[object], owner_ids: Iterable[object] = ()) -> None:
+    """Bump set-scoped cache versions once the surrounding transaction commits.
+
+    - set versions: feeds filtered to these Sets
+    - member versions: the added/removed people's own feeds
+    - owner profile versions: profiles embed the owner's Set posts
+    """
+
+    sids = _clean_ids(set_ids)
+    mids = _clean_ids(member_ids)
+    owners = _clean_ids(owner_ids)
+    if not sids and not mids:
+        return
+
+    def _bump() -> None:
+        bump_set_versions(sids)
+        bump_member_versions(mids)
+        try:
+            from siddes_prism.profile_cache import bump_profile_for_token  # type: ignore
+
+            for o in owners:
+                bump_profile_for_token(o)
+        except Exception:
+            pass
+
+    transaction.on_commit(_bump)
+
+
+def apply_member_rows(*, set_id: str, add: Iterable[object], remove: Iterable[object]) -> Tuple[List[str], List[str]]:
+    """Apply a membership diff to SiddesSetMember rows only.
+
+    Touches only the named rows: one DELETE for `remove`, one INSERT for the
+    part of `add` that is not already present. Returns (inserted, removed).
+    """
+
+    sid = str(set_id or "").strip()
+    rm = _clean_ids(remove)
+    ad = [m for m in _clean_ids(add) if m not in rm]
+    if not sid or (not rm and not ad):
+        return [], []
+
+    removed: List[str] = []
+    if rm:
+        removed_set = set(SiddesSetMember.objects.filter(set_id=sid, member_id__in=rm).values_list("member_id", flat=True))
+        removed = [m for m in rm if m in removed_set]
+        if removed:
+            SiddesSetMember.objects.filter(set_id=sid, member_id__in=removed).delete()
+
+    inserted: List[str] = []
+    if ad:
+        present = set(SiddesSetMember.objects.filter(set_id=sid, member_id__in=ad).values_list("member_id", flat=True))
+        inserted = [m for m in ad if m not in present]
+        if inserted:
+            SiddesSetMember.objects.bulk_create(
+                [SiddesSetMember(set_id=sid, member_id=m) for m in inserted],
+                ignore_conflicts=True,
+            )
+
+    return inserted, removed
+
+
+def apply_diff(
+    *,
+    set_id: str,
+    add: Iterable[object] = (),
+    remove: Iterable[object] = (),
+    by: str = "",
+    via: str = "",
+    max_members: Optional[int] = None,
+) -> Optional[Dict[str, object]]:
+    """Add/remove members of one Set in a single transaction.
+
+    The Set row is locked, only changed membership rows are written, the JSON
+    mirror is patched in place (no re-read of the membership table), and one
+    MEMBERS_UPDATED event records the diff. Returns None if the Set is missing.
+    """
+
+    sid = str(set_id or "").strip()
+    if not sid:
+        return None
+
+    with transaction.atomic():
+        s = SiddesSet.objects.select_for_update().filter(id=sid).first()
+        if s is None:
+            return None
+
+        before = SiddesSetMember.objects.filter(set_id=sid).count()
+        rm = _clean_ids(remove)
+        ad = [m for m in _clean_ids(add) if m not in rm]
+
+        # Removals first: the cap only credits rows that were actually deleted.
+        _, removed = apply_member_rows(set_id=sid, add=[], remove=rm)
+        if max_members is not None:
+            present = set(SiddesSetMember.objects.filter(set_id=sid, member_id__in=ad).values_list("member_id", flat=True))
+            fresh = [m for m in ad if m not in present]
+            room = max(0, int(max_members) - (before - len(removed)))
+            ad = fresh[:room]
+        inserted, _ = apply_member_rows(set_id=sid, add=ad, remove=[])
+        after = before - len(removed) + len(inserted)
+
+        if inserted or removed:
+            gone = set(removed)
+            mirror = s.members if isinstance(s.members, list) else []
+            mirror = [str(m) for m in mirror if str(m) not in gone]
+            mirror += [m for m in inserted if m not in mirror]
+            SiddesSet.objects.filter(id=sid).update(members=mirror, updated_at=timezone.now())
+
+            SiddesSetEvent.objects.bulk_create(
+                [
+                    SiddesSetEvent(
+                        id="se_" + uuid.uuid4().hex[:10],
+                        set_id=sid,
+                        ts_ms=int(time.time() * 1000),
+                        kind=SetEventKind.MEMBERS_UPDATED,
+                        by=str(by or s.owner_id),
+                        data=members_event_data(added=inserted, removed=removed, before=before, after=after, via=via),
+                    )
+                ]
+            )
+            on_membership_changed(set_ids=[sid], member_ids=inserted + removed, owner_ids=[s.owner_id])
+
+    return {"added": inserted, "removed": removed, "count": after}
+
+
+def members_event_data(*, added: List[str], removed: List[str], before: int, after: int, via: str = "") -> Dict[str, object]:
+    """MEMBERS_UPDATED payload: the diff plus member counts (not full before/after lists)."""
+
+    data: Dict[str, object] = {"added": list(added), "removed": list(removed), "fromCount": int(before), "toCount": int(after)}
+    if via:
+        data["via"] = via
+    return data
@@ -0,0 +1,102 @@
+# Migration.
+#
+# Online rollout: SiddesSetMember becomes the source of truth for Set membership.
+# - (member_id, set) replaces the single-column member_id index (added before the old one is dropped).
+#   On PostgreSQL both use CREATE/DROP INDEX CONCURRENTLY, so writes to the membership table are
+#   not blocked while the index builds; other backends (SQLite dev/test) use plain index DDL.
+# - Backfill copies any JSON-only members into the table in keyset batches, each in its own
+#   transaction (atomic = False), so large tables are never locked for the whole run.
+# - SiddesSet.members is left in place and kept as a write-through mirror, so JSON readers
+#   from the previous release keep working while both versions are live.
+
+from __future__ import annotations
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models, transaction
+
+
+BATCH = 500
+
+
+def _clean_member_id(m: object) -> str | None:
+    try:
+        s = str(m or '').strip()
+    except Exception:
+        return None
+    if not s:
+        return None
+    if s.startswith('@'):
+        s = '@' + s[1:].strip().lower()
+    return s
+
+
+class AddIndexOnline(AddIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.AddIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+class RemoveIndexOnline(RemoveIndexConcurrently):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        return migrations.RemoveIndex.database_forwards(self, app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        return migrations.RemoveIndex.database_backwards(self, app_label, schema_editor, from_state, to_state)
+
+
+def forwards(apps, schema_editor):
+    SiddesSet = apps.get_model('siddes_sets', 'SiddesSet')
+    SiddesSetMember = apps.get_model('siddes_sets', 'SiddesSetMember')
+
+    last_id = ''
+    while True:
+        sets = list(SiddesSet.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'members')[:BATCH])
+        if not sets:
+            break
+        last_id = sets[-1][0]
+
+        rows = []
+        for sid, raw in sets:
+            if not isinstance(raw, list):
+                continue
+            seen = set()
+            for m in raw:
+                mid = _clean_member_id(m)
+                if not mid or mid in seen:
+                    continue
+                seen.add(mid)
+                rows.append(SiddesSetMember(set_id=str(sid), member_id=mid))
+
+        if rows:
+            with transaction.atomic():
+                SiddesSetMember.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('siddes_sets', '0002_setmember_table'),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name='siddessetmember',
+            index=models.Index(fields=['member_id', 'set'], name='setmem_member_set'),
+        ),
+        RemoveIndexOnline(
+            model_name='siddessetmember',
+            name='setmem_member',
+        ),
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -80,7 +80,8 @@ class SiddesSetMember(models.Model):
         SetMember(set_id=Y, member_id=X) -> exists
 
     Contract note:
-    - We keep `SiddesSet.members` (JSON) for response parity and keep this table in sync on writes.
+    - This table is the source of truth for membership. `SiddesSet.members` (JSON) is a
+      write-through mirror kept for response parity (see membership.py).
     """
 
     id = models.BigAutoField(primary_key=True)
@@ -95,7 +96,7 @@ class SiddesSetMember(models.Model):
             models.UniqueConstraint(fields=["set", "member_id"], name="set_member_unique"),
         ]
         indexes = [
-            models.Index(fields=["member_id"], name="setmem_member"),
+            models.Index(fields=["member_id", "set"], name="setmem_member_set"),
             models.Index(fields=["set", "member_id"], name="setmem_set_member"),
         ]
 
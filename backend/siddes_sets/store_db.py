@@ -19,6 +19,15 @@ from django.db import models, transaction
 
 from siddes_backend.identity import viewer_aliases
 
+from .membership import (
+    apply_diff,
+    apply_member_rows,
+    members_by_set,
+    members_event_data,
+    members_of,
+    mirror_json,
+    on_membership_changed,
+)
 from .models import SiddesSet, SiddesSetEvent, SideId, SetColor, SetEventKind, SiddesSetMember
 
 
@@ -103,15 +112,17 @@ def clean_members(raw: Any) -> List[str]:
     return out
 
 
-def set_to_item(s: SiddesSet) -> Dict[str, Any]:
-    members = s.members if isinstance(s.members, list) else []
-    members = [str(m) for m in members if isinstance(m, (str, int, float))]
+def set_to_item(s: SiddesSet, members: Optional[List[str]] = None) -> Dict[str, Any]:
+    # Membership comes from SiddesSetMember (pass it in); the JSON mirror is only a fallback.
+    if members is None:
+        raw = s.members if isinstance(s.members, list) else []
+        members = [str(m) for m in raw if isinstance(m, (str, int, float))]
     return {
         "id": s.id,
         "side": str(s.side),
         "label": str(s.label),
         "color": str(s.color),
-        "members": members,
+        "members": list(members),
         "count": int(s.count or 0),
     }
 
@@ -131,30 +142,33 @@ def event_to_item(e: SiddesSetEvent) -> Dict[str, Any]:
 
 
 # sd_366: Normalize Set membership into a join-friendly table.
-# We keep SiddesSet.members (JSON) for payload parity, but rely on SetMember for indexed lookups.
+# SiddesSetMember is the source of truth; SiddesSet.members (JSON) is a write-through
+# mirror for payload parity (see membership.py).
 
-def sync_memberships(*, set_id: str, members: List[str]) -> None:
-    """Best-effort: ensure SiddesSetMember rows match `members`.
+def sync_memberships(*, set_id: str, members: List[str], known: Optional[List[str]] = None) -> Tuple[List[str], List[str]]:
+    """Make SiddesSetMember rows match `members` by applying only the diff.
 
-    Safe before migrations are applied: if table doesn't exist yet, we fail silently.
+    `known` is the current member list when the caller already has it (skips the
+    read). Returns (inserted, removed). Safe before migrations are applied: if the
+    table doesn't exist yet, we fail silently.
     """
 
     sid = str(set_id or '').strip()
     if not sid:
-        return
+        return [], []
 
     try:
         members_v = clean_members(members)
-        SiddesSetMember.objects.filter(set_id=sid).exclude(member_id__in=members_v).delete()
-        existing = set(SiddesSetMember.objects.filter(set_id=sid).values_list('member_id', flat=True))
-        missing = [m for m in members_v if m not in existing]
-        if missing:
-            SiddesSetMember.objects.bulk_create(
-                [SiddesSetMember(set_id=sid, member_id=m) for m in missing],
-                ignore_conflicts=True,
-            )
+        cur = list(known) if known is not None else members_of(sid)
+        want = set(members_v)
+        have = set(cur)
+        return apply_member_rows(
+            set_id=sid,
+            add=[m for m in members_v if m not in have],
+            remove=[m for m in cur if m not in want],
+        )
     except Exception:
-        return
+        return [], []
 
 
 
@@ -226,7 +240,7 @@ class DbSetsStore:
                     count=0,
                 )
 
-                sync_memberships(set_id=s.id, members=members)
+                sync_memberships(set_id=s.id, members=members, known=[])
 
                 SiddesSetEvent.objects.create(
                     id=new_id("se"),
@@ -254,53 +268,23 @@ class DbSetsStore:
         # Seed only for the canonical owner, and only when explicitly enabled.
         self.ensure_seed(viewer_id)
 
-        aliases = viewer_aliases(viewer_id)
+        aliases = viewer_aliases(viewer_id) or {viewer_id}
+        aliases_list = list(aliases)
 
-        try:
-            aliases_list = list(aliases) if isinstance(aliases, (set, list, tuple)) else [viewer_id]
-            q = models.Q(owner_id__in=aliases_list)
-
-            # sd_366: membership table (fast) with JSON fallback (pre-migration safety).
-            try:
-                member_set_ids = SiddesSetMember.objects.filter(member_id__in=aliases_list).values_list("set_id", flat=True)
-                q |= models.Q(id__in=member_set_ids)
-            except Exception:
-                for a in aliases_list:
-                    q |= models.Q(members__contains=[a])
-
-            qs = SiddesSet.objects.filter(q).distinct()
-            if side and side in VALID_SIDES:
-                qs = qs.filter(side=side)
-            qs = qs.order_by("-updated_at")
-            out: List[Dict[str, Any]] = []
-            for s in qs:
-                it = set_to_item(s)
-                it["isOwner"] = bool(s.owner_id in aliases)
-                out.append(it)
-            return out
-        except Exception:
-            # Backend compatibility fallback (dev only): do a python filter.
-            aliases_list = list(aliases) if isinstance(aliases, (set, list, tuple)) else [viewer_id]
-            own = list(SiddesSet.objects.filter(owner_id__in=aliases_list))
-            extra: List[SiddesSet] = []
-            for s in SiddesSet.objects.all():
-                if s.owner_id in aliases:
-                    continue
-                members = s.members if isinstance(s.members, list) else []
-                mem = {str(m).strip() for m in members if isinstance(m, (str, int, float))}
-                if mem.intersection(set(aliases)):
-                    extra.append(s)
-
-            all_visible = own + extra
-            if side and side in VALID_SIDES:
-                all_visible = [s for s in all_visible if str(s.side) == side]
-            all_visible.sort(key=lambda s: s.updated_at, reverse=True)
-            out: List[Dict[str, Any]] = []
-            for s in all_visible:
-                it = set_to_item(s)
-                it["isOwner"] = bool(s.owner_id in aliases)
-                out.append(it)
-            return out
+        # sd_366: owner rows + membership rows (indexed on member_id, set).
+        member_set_ids = SiddesSetMember.objects.filter(member_id__in=aliases_list).values("set_id")
+        qs = SiddesSet.objects.filter(models.Q(owner_id__in=aliases_list) | models.Q(id__in=member_set_ids))
+        if side and side in VALID_SIDES:
+            qs = qs.filter(side=side)
+        sets = list(qs.order_by("-updated_at"))
+
+        members = members_by_set([x.id for x in sets])
+        out: List[Dict[str, Any]] = []
+        for x in sets:
+            it = set_to_item(x, members.get(x.id, []))
+            it["isOwner"] = bool(x.owner_id in aliases)
+            out.append(it)
+        return out
 
     def get(self, *, owner_id: str, set_id: str) -> Optional[Dict[str, Any]]:
         viewer_id = str(owner_id or "").strip()
@@ -316,26 +300,13 @@ class DbSetsStore:
         except SiddesSet.DoesNotExist:
             return None
 
-        if s.owner_id in aliases:
-            it = set_to_item(s)
-            it["isOwner"] = True
-            return it
-
-        # sd_366: membership table check (fast) + JSON fallback
-        try:
-            if SiddesSetMember.objects.filter(set_id=set_id, member_id__in=list(aliases)).exists():
-                it = set_to_item(s)
-                it["isOwner"] = False
-                return it
-        except Exception:
-            members = s.members if isinstance(s.members, list) else []
-            mem = {str(m).strip() for m in members if isinstance(m, (str, int, float))}
-            if mem.intersection(aliases):
-                it = set_to_item(s)
-                it["isOwner"] = False
-                return it
+        is_owner = s.owner_id in aliases
+        if not is_owner and not SiddesSetMember.objects.filter(set_id=set_id, member_id__in=list(aliases)).exists():
+            return None
 
-        return None
+        it = set_to_item(s, members_of(s.id))
+        it["isOwner"] = bool(is_owner)
+        return it
 
     def create(
         self,
@@ -366,7 +337,8 @@ class DbSetsStore:
                 count=0,
             )
 
-            sync_memberships(set_id=s.id, members=members)
+            sync_memberships(set_id=s.id, members=members, known=[])
+            on_membership_changed(set_ids=[s.id], member_ids=members, owner_ids=[owner_id])
 
             SiddesSetEvent.objects.create(
                 id=new_id("se"),
@@ -403,21 +375,41 @@ class DbSetsStore:
             s = SiddesSet.objects.get(id=set_id, owner_id=owner_id)
         except SiddesSet.DoesNotExist:
             return False
-        # Cascades to events.
-        s.delete()
+        with transaction.atomic():
+            on_membership_changed(set_ids=[s.id], member_ids=members_of(s.id), owner_ids=[s.owner_id])
+            # Cascades to events + membership rows.
+            s.delete()
         return True
 
+    def update_members(
+        self,
+        *,
+        owner_id: str,
+        set_id: str,
+        add: Iterable[Any] = (),
+        remove: Iterable[Any] = (),
+    ) -> Optional[Dict[str, Any]]:
+        """Owner-only membership diff: touches only the added/removed rows."""
 
-    def delete(self, *, owner_id: str, set_id: str) -> bool:
-        if not set_id:
-            return False
-        try:
-            s = SiddesSet.objects.get(id=set_id, owner_id=owner_id)
-        except SiddesSet.DoesNotExist:
-            return False
-        # Cascades to events.
-        s.delete()
-        return True
+        if not set_id or not SiddesSet.objects.filter(id=set_id, owner_id=owner_id).exists():
+            return None
+
+        res = apply_diff(
+            set_id=set_id,
+            add=clean_members(list(add or [])),
+            remove=clean_members(list(remove or [])),
+            by=owner_id,
+            max_members=MAX_SET_MEMBERS,
+        )
+        if res is None:
+            return None
+
+        s = SiddesSet.objects.get(id=set_id)
+        it = set_to_item(s, members_of(s.id))
+        it["isOwner"] = True
+        it["added"] = list(res.get("added") or [])
+        it["removed"] = list(res.get("removed") or [])
+        return it
 
     def update(self, *, owner_id: str, set_id: str, patch: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not set_id:
@@ -447,22 +439,30 @@ class DbSetsStore:
                     )
                 )
 
-            # Members
+            # Members (full replacement): diff against current rows, touch only changes.
+            member_diff: Optional[Tuple[List[str], List[str]]] = None
             if "members" in patch and isinstance(patch.get("members"), list):
-                prev = s.members if isinstance(s.members, list) else []
+                prev = members_of(s.id)
                 nxt = clean_members(patch.get("members"))
                 if prev != nxt:
                     s.members = nxt
-                    events.append(
-                        SiddesSetEvent(
-                            id=new_id("se"),
-                            set=s,
-                            ts_ms=t,
-                            kind=SetEventKind.MEMBERS_UPDATED,
-                            by=owner_id,
-                            data={"from": prev, "to": nxt},
+                    member_diff = sync_memberships(set_id=s.id, members=nxt, known=prev)
+                    if member_diff[0] or member_diff[1]:
+                        events.append(
+                            SiddesSetEvent(
+                                id=new_id("se"),
+                                set=s,
+                                ts_ms=t,
+                                kind=SetEventKind.MEMBERS_UPDATED,
+                                by=owner_id,
+                                data=members_event_data(
+                                    added=member_diff[0],
+                                    removed=member_diff[1],
+                                    before=len(prev),
+                                    after=len(nxt),
+                                ),
+                            )
                         )
-                    )
 
             # Side
             if isinstance(patch.get("side"), str):
@@ -500,18 +500,16 @@ class DbSetsStore:
 
             s.save()
 
-            # sd_366: Keep membership table in sync with JSON members.
-            try:
-                if any(getattr(e, "kind", "") == SetEventKind.MEMBERS_UPDATED for e in events):
-                    cur = s.members if isinstance(s.members, list) else []
-                    sync_memberships(set_id=s.id, members=cur)
-            except Exception:
-                pass
+            if member_diff and (member_diff[0] or member_diff[1]):
+                on_membership_changed(set_ids=[s.id], member_ids=member_diff[0] + member_diff[1], owner_ids=[s.owner_id])
+            elif any(getattr(e, "kind", "") == SetEventKind.MOVED_SIDE for e in events):
+                # Side moves change how the Set's posts are gated too.
+                on_membership_changed(set_ids=[s.id], member_ids=[], owner_ids=[s.owner_id])
 
             if events:
                 SiddesSetEvent.objects.bulk_create(events)
 
-        it = set_to_item(s)
+        it = set_to_item(s, members_of(s.id))
         it["isOwner"] = True
         return it
 
@@ -540,41 +538,29 @@ class DbSetsStore:
         if s.owner_id in aliases:
             return None
 
-        # Must be a member (table fast path, JSON fallback).
-        is_member = False
-        try:
-            is_member = SiddesSetMember.objects.filter(set_id=sid, member_id__in=list(aliases)).exists()
-        except Exception:
-            members = s.members if isinstance(s.members, list) else []
-            mem = {str(m).strip() for m in members if isinstance(m, (str, int, float))}
-            is_member = bool(mem.intersection(aliases))
-
-        if not is_member:
-            return None
-
-        prev = s.members if isinstance(s.members, list) else []
-        prev_v = [str(m) for m in prev if isinstance(m, (str, int, float))]
+        prev_v = members_of(sid)
         nxt = [m for m in prev_v if m not in aliases]
 
-        # If nothing changed, treat as not-found to avoid leaking details.
+        # Not a member: treat as not-found to avoid leaking details.
         if prev_v == nxt:
             return None
 
+        gone = [m for m in prev_v if m not in nxt]
         t = now_ms()
         with transaction.atomic():
-            s.members = nxt
-            s.save()
-            sync_memberships(set_id=s.id, members=nxt)
+            SiddesSetMember.objects.filter(set_id=sid, member_id__in=list(aliases)).delete()
+            mirror_json({sid: nxt})
+            on_membership_changed(set_ids=[sid], member_ids=gone, owner_ids=[s.owner_id])
             SiddesSetEvent.objects.create(
                 id=new_id('se'),
                 set=s,
                 ts_ms=t,
                 kind=SetEventKind.MEMBERS_UPDATED,
                 by=viewer_id,
-                data={'from': prev_v, 'to': nxt, 'via': 'leave'},
+                data=members_event_data(added=[], removed=gone, before=len(prev_v), after=len(nxt), via='leave'),
             )
 
-        it = set_to_item(s)
+        it = set_to_item(s, nxt)
         it['isOwner'] = False
         return it
 
@@ -595,16 +581,8 @@ class DbSetsStore:
         # sd_785 sentinel (for grep-based check): s.owner_id != viewer_id
 
         if s.owner_id not in aliases:
-            ok = False
-            # sd_366: membership table check (fast) + JSON fallback
-            try:
-                ok = SiddesSetMember.objects.filter(set_id=set_id, member_id__in=list(aliases)).exists()
-            except Exception:
-                members = s.members if isinstance(s.members, list) else []
-                mem = {str(m).strip() for m in members if isinstance(m, (str, int, float))}
-                ok = bool(mem.intersection(aliases))
-
-            if not ok:
+            # sd_366: membership table check
+            if not SiddesSetMember.objects.filter(set_id=set_id, member_id__in=list(aliases)).exists():
                 return []
 
         qs = SiddesSetEvent.objects.filter(set=s).order_by("-ts_ms")
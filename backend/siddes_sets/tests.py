@@ -81,3 +81,135 @@ class SetsApiSmokeTests(APITestCase):
         assert d2.get("restricted") is False
         assert (d2.get("item") or {}).get("id") == sid
 
+
+
+@override_settings(DEBUG=True)
+class SetMembershipTableTests(APITestCase):
+    """SiddesSetMember is the source of truth; JSON members is a mirror."""
+
+    def _create(self, label, members, side="friends", viewer="me"):
+        r = self.client.post(
+            "/api/circles",
+            {"side": side, "label": label, "members": members},
+            format="json",
+            HTTP_X_SD_VIEWER=viewer,
+        )
+        assert r.status_code == 200, r.content
+        return r.json()["item"]["id"]
+
+    def test_members_read_from_table(self):
+        from .models import SiddesSet, SiddesSetMember
+
+        sid = self._create("Crew", ["@a", "@b"])
+        # A stale JSON mirror does not change what readers see.
+        SiddesSet.objects.filter(id=sid).update(members=["@zzz"])
+        r = self.client.get(f"/api/circles/{sid}", HTTP_X_SD_VIEWER="me")
+        assert r.json()["item"]["members"] == ["@a", "@b"]
+
+        SiddesSetMember.objects.filter(set_id=sid, member_id="@b").delete()
+        r = self.client.get("/api/circles", HTTP_X_SD_VIEWER="@b")
+        assert r.json().get("items") == []
+
+    def test_remove_members_is_set_based(self):
+        from .membership import remove_members
+        from .models import SetEventKind, SiddesSet, SiddesSetEvent, SiddesSetMember
+
+        keep = self._create("Close ones", ["@a", "@b"], side="close")
+        drop1 = self._create("Work A", ["@a", "@c"], side="work")
+        drop2 = self._create("Work B", ["@a"], side="work")
+        other = self._create("Not mine", ["@a"], viewer="me_999")
+
+        touched = remove_members(owner_ids=["me"], member_ids=["@a"], exclude_sides=["close"], by="me", via="side_prune")
+        assert touched == sorted([drop1, drop2])
+
+        assert SiddesSet.objects.get(id=drop1).members == ["@c"]
+        assert SiddesSet.objects.get(id=drop2).members == []
+        assert SiddesSet.objects.get(id=keep).members == ["@a", "@b"]
+        assert SiddesSetMember.objects.filter(set_id=other, member_id="@a").exists()
+
+        ev = SiddesSetEvent.objects.filter(set_id=drop1, kind=SetEventKind.MEMBERS_UPDATED, data__via="side_prune").get()
+        assert ev.data == {"added": [], "removed": ["@a"], "fromCount": 2, "toCount": 1, "via": "side_prune"}
+
+    def test_member_diff_touches_only_changed_rows(self):
+        from django.core.cache import cache
+
+        from .cache_versions import member_version, set_version
+        from .models import SetEventKind, SiddesSet, SiddesSetEvent, SiddesSetMember
+
+        cache.clear()
+        sid = self._create("Team", ["@a", "@b", "@c"], side="work")
+        keep_ids = dict(SiddesSetMember.objects.filter(set_id=sid).values_list("member_id", "id"))
+        v_set, v_d, v_a = set_version(sid), member_version("@d"), member_version("@a")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            r = self.client.patch(
+                f"/api/circles/{sid}",
+                {"addMembers": ["@d", "@b"], "removeMembers": ["@a"]},
+                format="json",
+                HTTP_X_SD_VIEWER="me",
+            )
+        assert r.status_code == 200, r.content
+        item = r.json()["item"]
+        assert item["added"] == ["@d"]
+        assert item["removed"] == ["@a"]
+        assert item["members"] == ["@b", "@c", "@d"]
+
+        # Untouched rows keep their primary keys (no delete/re-insert).
+        now_ids = dict(SiddesSetMember.objects.filter(set_id=sid).values_list("member_id", "id"))
+        assert now_ids["@b"] == keep_ids["@b"] and now_ids["@c"] == keep_ids["@c"]
+        assert SiddesSet.objects.get(id=sid).members == ["@b", "@c", "@d"]
+
+        ev = SiddesSetEvent.objects.filter(set_id=sid, kind=SetEventKind.MEMBERS_UPDATED).get()
+        assert ev.data == {"added": ["@d"], "removed": ["@a"], "fromCount": 3, "toCount": 3}
+
+        assert set_version(sid) != v_set
+        assert member_version("@d") != v_d
+        assert member_version("@a") != v_a
+
+    def test_full_member_replace_writes_diff(self):
+        from .models import SetEventKind, SiddesSetEvent, SiddesSetMember
+
+        sid = self._create("Gym", ["@a", "@b"])
+        b_id = SiddesSetMember.objects.get(set_id=sid, member_id="@b").id
+        r = self.client.patch(f"/api/circles/{sid}", {"members": ["@b", "@c"]}, format="json", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 200, r.content
+        assert SiddesSetMember.objects.get(set_id=sid, member_id="@b").id == b_id
+        ev = SiddesSetEvent.objects.filter(set_id=sid, kind=SetEventKind.MEMBERS_UPDATED).get()
+        assert ev.data["added"] == ["@c"] and ev.data["removed"] == ["@a"]
+
+    def test_removing_non_members_does_not_make_room_past_the_cap(self):
+        from .membership import apply_diff
+        from .models import SiddesSetMember
+
+        sid = self._create("Full", ["@a", "@b"])
+        res = apply_diff(set_id=sid, add=["@x"], remove=["@not_a_member"], max_members=2)
+        assert res == {"added": [], "removed": [], "count": 2}
+
+        res = apply_diff(set_id=sid, add=["@x", "@y"], remove=["@a", "@nobody"], max_members=2)
+        assert res == {"added": ["@x"], "removed": ["@a"], "count": 2}
+        assert SiddesSetMember.objects.filter(set_id=sid).count() == 2
+
+    def test_leave_writes_the_diff_event_schema(self):
+        from django.contrib.auth import get_user_model
+
+        from .models import SetEventKind, SiddesSetEvent
+
+        u = get_user_model().objects.create_user(username="leaver", password="x")
+        sid = self._create("Club", ["@a", "@leaver"])
+        r = self.client.post(f"/api/circles/{sid}/leave", {}, format="json", HTTP_X_SD_VIEWER=f"me_{u.id}")
+        assert r.status_code == 200, r.content
+        ev = SiddesSetEvent.objects.filter(set_id=sid, kind=SetEventKind.MEMBERS_UPDATED, data__via="leave").get()
+        assert ev.data == {"added": [], "removed": ["@leaver"], "fromCount": 2, "toCount": 1, "via": "leave"}
+
+    def test_patch_rolls_back_fields_when_the_member_diff_fails(self):
+        from unittest import mock
+
+        from .models import SiddesSet
+        from .store_db import DbSetsStore
+
+        sid = self._create("Atomic", ["@a"])
+        with mock.patch.object(DbSetsStore, "update_members", side_effect=RuntimeError("boom")):
+            self.client.raise_request_exception = False
+            r = self.client.patch(f"/api/circles/{sid}", {"label": "Renamed", "addMembers": ["@b"]}, format="json", HTTP_X_SD_VIEWER="me")
+        assert r.status_code == 500
+        assert SiddesSet.objects.get(id=sid).label == "Atomic"
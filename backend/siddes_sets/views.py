@@ -2,7 +2,7 @@
 
 Endpoints mirror the Next.js API stubs:
 - GET/POST   /api/circles
-- GET/PATCH  /api/circles/<id>
+- GET/PATCH  /api/circles/<id>   (PATCH accepts members, or addMembers/removeMembers diffs)
 - GET        /api/circles/<id>/events
 - POST       /api/circles/<id>/leave
 
@@ -29,6 +29,7 @@ import os
 from typing import Any, Dict, Optional, Tuple
 
 from django.conf import settings
+from django.db import transaction
 from django.utils.decorators import method_decorator
 from siddes_backend.csrf import dev_csrf_exempt
 from rest_framework import status
@@ -204,7 +205,7 @@ class SetsView(APIView):
 class SetDetailView(APIView):
     """GET/PATCH/DELETE /api/circles/<id>"""
 
-    def get(self, request, circle_id: str):
+    def get(self, request, set_id: str):
         has_viewer, viewer, role = _viewer_ctx(request)
 
         if not has_viewer:
@@ -237,7 +238,21 @@ class SetDetailView(APIView):
         if isinstance(body.get("color"), str):
             patch["color"] = body.get("color")
 
-        item = _get_store().update(owner_id=viewer, set_id=set_id, patch=patch)
+        # Membership diff (large Sets): {"addMembers": [...], "removeMembers": [...]}
+        add = body.get("addMembers") if isinstance(body.get("addMembers"), list) else []
+        remove = body.get("removeMembers") if isinstance(body.get("removeMembers"), list) else []
+
+        store = _get_store()
+        # Field patch + membership diff commit together (no half-applied PATCH).
+        with transaction.atomic():
+            item = store.update(owner_id=viewer, set_id=set_id, patch=patch)
+            if item and (add or remove) and "members" not in patch:
+                if hasattr(store, "update_members"):
+                    item = store.update_members(owner_id=viewer, set_id=set_id, add=add, remove=remove)  # type: ignore[attr-defined]
+                else:
+                    cur = list((item or {}).get("members") or [])
+                    merged = [m for m in cur if m not in remove] + [m for m in add if m not in cur]
+                    item = store.update(owner_id=viewer, set_id=set_id, patch={"members": merged})
         if not item:
             return Response({"ok": False, "restricted": False, "error": "not_found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -273,7 +288,7 @@ class SetLeaveView(APIView):
     - Owner cannot leave (must delete).
     """
 
-    def post(self, request, circle_id: str):
+    def post(self, request, set_id: str):
         has_viewer, viewer, role = _viewer_ctx(request)
 
         if not has_viewer:
@@ -304,7 +319,7 @@ class SetLeaveView(APIView):
 class SetEventsView(APIView):
     """GET /api/circles/<id>/events"""
 
-    def get(self, request, circle_id: str):
+    def get(self, request, set_id: str):
         has_viewer, viewer, role = _viewer_ctx(request)
 
         if not has_viewer:
@@ -15,5 +15,11 @@ echo "[start_prod] Running migrations..."
 echo "[start_prod] Collecting static..."
 "${PYBIN}" manage.py collectstatic --noinput
 
-echo "[start_prod] Starting gunicorn..."
-exec gunicorn siddes_backend.wsgi:application -c gunicorn.conf.py
+# SIDDES_SERVER=asgi: uvicorn workers (see gunicorn.conf.py)
+APP="siddes_backend.wsgi:application"
+if [ "${SIDDES_SERVER:-wsgi}" = "asgi" ]; then
+  APP="siddes_backend.asgi:application"
+fi
+
+echo "[start_prod] Starting gunicorn (${APP})..."
+exec gunicorn "${APP}" -c gunicorn.conf.py
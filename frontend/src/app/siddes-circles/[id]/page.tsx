@@ -76,8 +76,8 @@ function kindDetail(e: CircleEvent): string {
   const d: any = e.data || {};
   if (e.kind === "renamed") return `${d.from ?? "?"} → ${d.to ?? "?"}`;
   if (e.kind === "members_updated") {
-    const from = Array.isArray(d.from) ? d.from.length : "?";
-    const to = Array.isArray(d.to) ? d.to.length : "?";
+    const from = Array.isArray(d.from) ? d.from.length : typeof d.fromCount === "number" ? d.fromCount : "?";
+    const to = Array.isArray(d.to) ? d.to.length : typeof d.toCount === "number" ? d.toCount : "?";
     const via = typeof d.via === "string" ? ` (${d.via})` : "";
     return `${from} → ${to}${via}`;
   }
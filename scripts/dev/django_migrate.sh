@@ -36,5 +36,10 @@ echo "• Ensuring db is up..."
 echo "• Running migrations..."
 "${COMPOSE[@]}" -f ops/docker/docker-compose.dev.yml run --rm backend python manage.py migrate
 
+# Broadcast starter channels are no longer created on first request.
+echo "• Seeding dev broadcasts (only when SIDDES_BROADCASTS_ENABLED=1)..."
+"${COMPOSE[@]}" -f ops/docker/docker-compose.dev.yml run --rm backend sh -lc \
+  'if [ "${SIDDES_BROADCASTS_ENABLED:-0}" = "1" ]; then python manage.py seed_broadcasts; fi'
+
 echo ""
 echo "✅ Migrations complete"
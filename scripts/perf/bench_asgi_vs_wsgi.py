@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Throughput per core: WSGI (gunicorn sync+threads) vs ASGI (uvicorn workers).
+
+Starts the backend under each profile with the production gunicorn config
+(backend/gunicorn.conf.py, SIDDES_SERVER=wsgi|asgi), drives the read-heavy
+endpoints with N keep-alive connections for a fixed time, and prints req/s,
+req/s per core and latency percentiles side by side.
+
+Usage (from the repo root):
+  python3 scripts/perf/bench_asgi_vs_wsgi.py --seed-posts 200
+  python3 scripts/perf/bench_asgi_vs_wsgi.py --cpus 0 --workers 1 --concurrency 64 --duration 30
+  DATABASE_URL=postgres://... python3 scripts/perf/bench_asgi_vs_wsgi.py --json /tmp/bench.json
+
+Notes:
+- --cpus pins the server to those cores (taskset); per-core numbers divide by
+  that count (default: one core per worker).
+- Server-side caches (feed/inbox page caches) are off unless --cache, so the
+  numbers reflect DB-bound requests.
+- Requests use the DEBUG dev viewer header (x-sd-viewer), so the server runs
+  with DJANGO_DEBUG=1; point DATABASE_URL at a disposable database.
+- The load generator is plain asyncio (no extra dependencies); run it on other
+  cores than the server (it pins itself away from --cpus when possible).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+BACKEND = os.path.join(ROOT, "backend")
+
+DEFAULT_PATHS = [
+    "/api/feed?side=public&limit=30",
+    "/api/notifications",
+    "/api/inbox/threads",
+]
+
+APPS = {"wsgi": "siddes_backend.wsgi:application", "asgi": "siddes_backend.asgi:application"}
+
+
+def _free_port() -> int:
+    s = socket.socket()
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+    s.close()
+    return port
+
+
+def _server_env(args: argparse.Namespace, profile: str, port: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "SIDDES_SERVER": profile,
+            "PORT": str(port),
+            "WEB_CONCURRENCY": str(args.workers),
+            "GUNICORN_THREADS": str(args.threads),
+            "DJANGO_DEBUG": "1",
+            "SIDDES_API_LOG_SAMPLE": env.get("SIDDES_API_LOG_SAMPLE", "0"),
+            "SD_LOG_LEVEL": "warning",
+        }
+    )
+    if not args.cache:
+        env["SIDDES_FEED_CACHE_ENABLED"] = "0"
+        env["SIDDES_INBOX_CACHE_ENABLED"] = "0"
+    if not env.get("DATABASE_URL"):
+        env["DATABASE_URL"] = f"sqlite:///{args.sqlite}"
+    return env
+
+
+def _manage(env: Dict[str, str], *argv: str) -> None:
+    subprocess.run([sys.executable, "manage.py", *argv], cwd=BACKEND, env=env, check=True)
+
+
+_SEED = """
+import time
+from siddes_post.models import Post
+from siddes_notifications.models import Notification
+now = time.time()
+for i in range({n}):
+    Post.objects.get_or_create(
+        id=f"p_bench_{{i}}",
+        defaults=dict(author_id=f"me_{{i % 5 + 1}}", side="public", text=f"bench post {{i}} #bench @someone", created_at=now - i),
+    )
+for i in range(min({n}, 50)):
+    Notification.objects.get_or_create(
+        id=f"n_bench_{{i}}",
+        defaults=dict(viewer_id="{viewer}", side="public", type="reply", actor=f"@user{{i % 5 + 1}}", glimpse="hi", created_at=now - i),
+    )
+"""
+
+
+def _prepare_db(args: argparse.Namespace) -> None:
+    env = _server_env(args, "wsgi", 0)
+    _manage(env, "migrate", "--noinput", "-v", "0")
+    if args.seed_posts > 0:
+        _manage(env, "shell", "-c", _SEED.format(n=args.seed_posts, viewer=args.viewer))
+
+
+def _start_server(args: argparse.Namespace, profile: str, port: int, log_path: str) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "gunicorn", APPS[profile], "-c", "gunicorn.conf.py"]
+    if args.cpus and shutil.which("taskset"):
+        cmd = ["taskset", "-c", args.cpus] + cmd
+    log = open(log_path, "ab")
+    return subprocess.Popen(
+        cmd, cwd=BACKEND, env=_server_env(args, profile, port), stdout=log, stderr=log, start_new_session=True
+    )
+
+
+def _wait_ready(port: int, timeout_s: float = 30.0) -> None:
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as r:
+                if r.status == 200:
+                    return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on :{port} did not become ready")
+
+
+def _stop_server(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        proc.wait(timeout=15)
+    except Exception:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except Exception:
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Load generator (HTTP/1.1 keep-alive over asyncio streams)
+# ---------------------------------------------------------------------------
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("closed")
+    status = int(status_line.split()[1])
+    length: Optional[int] = None
+    chunked = False
+    close = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value.strip())
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+        elif name == "connection" and "close" in value.lower():
+            close = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip().split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    if close:
+        raise ConnectionResetError("server closed keep-alive")
+    return status
+
+
+async def _client(port: int, paths: List[str], headers: str, stop_at: float, record: bool, out: List[Tuple[float, int]]) -> None:
+    i = 0
+    reader = writer = None
+    while time.perf_counter() < stop_at:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            path = paths[i % len(paths)]
+            i += 1
+            t0 = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n{headers}\r\n".encode("latin-1"))
+            status = await _read_response(reader)
+            if record:
+                out.append((time.perf_counter() - t0, status))
+        except (ConnectionError, asyncio.IncompleteReadError, OSError):
+            if record:
+                out.append((0.0, 599))
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _drive(port: int, args: argparse.Namespace, seconds: float, record: bool) -> List[Tuple[float, int]]:
+    out: List[Tuple[float, int]] = []
+    headers = f"x-sd-viewer: {args.viewer}\r\nConnection: keep-alive\r\n"
+    stop_at = time.perf_counter() + seconds
+    await asyncio.gather(*[_client(port, args.paths, headers, stop_at, record, out) for _ in range(args.concurrency)])
+    return out
+
+
+def _pct(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = min(len(sorted_vals) - 1, max(0, int(round(p / 100.0 * (len(sorted_vals) - 1)))))
+    return sorted_vals[k] * 1000.0
+
+
+def run_profile(args: argparse.Namespace, profile: str, log_dir: str) -> Dict[str, float]:
+    port = _free_port()
+    proc = _start_server(args, profile, port, os.path.join(log_dir, f"{profile}.log"))
+    try:
+        _wait_ready(port)
+        asyncio.run(_drive(port, args, args.warmup, record=False))
+        t0 = time.perf_counter()
+        samples = asyncio.run(_drive(port, args, args.duration, record=True))
+        elapsed = time.perf_counter() - t0
+    finally:
+        _stop_server(proc)
+
+    ok = sorted(lat for lat, st in samples if st < 400)
+    errors = sum(1 for _, st in samples if st >= 400)
+    cores = len([c for c in args.cpus.split(",") if c.strip()]) if args.cpus else args.workers
+    rps = len(ok) / elapsed if elapsed > 0 else 0.0
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(rps, 1),
+        "rps_per_core": round(rps / max(1, cores), 1),
+        "p50_ms": round(_pct(ok, 50), 2),
+        "p95_ms": round(_pct(ok, 95), 2),
+        "p99_ms": round(_pct(ok, 99), 2),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--profiles", default="wsgi,asgi")
+    ap.add_argument("--workers", type=int, default=1)
+    ap.add_argument("--threads", type=int, default=8, help="gunicorn threads (wsgi profile)")
+    ap.add_argument("--cpus", default="", help="pin the server to these cores, e.g. 0 or 0,1")
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--duration", type=float, default=20.0)
+    ap.add_argument("--warmup", type=float, default=3.0)
+    ap.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    ap.add_argument("--viewer", default="me_1")
+    ap.add_argument("--cache", action="store_true", help="keep server-side page caches on")
+    ap.add_argument("--seed-posts", type=int, default=0, help="create this many public posts first")
+    ap.add_argument("--sqlite", default=os.path.join(tempfile.gettempdir(), "siddes_bench.sqlite3"))
+    ap.add_argument("--json", default="", help="also write results to this file")
+    args = ap.parse_args()
+
+    if args.cpus and hasattr(os, "sched_setaffinity"):
+        busy = {int(c) for c in args.cpus.split(",") if c.strip().isdigit()}
+        free = set(os.sched_getaffinity(0)) - busy
+        if free:
+            os.sched_setaffinity(0, free)
+
+    _prepare_db(args)
+    log_dir = tempfile.mkdtemp(prefix="siddes_bench_")
+    results: Dict[str, Dict[str, float]] = {}
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip() in APPS]:
+        print(f"[bench] {profile}: {args.workers} worker(s), {args.concurrency} connections, {args.duration:.0f}s ...", flush=True)
+        results[profile] = run_profile(args, profile, log_dir)
+
+    cols = ["requests", "errors", "rps", "rps_per_core", "p50_ms", "p95_ms", "p99_ms"]
+    print()
+    print("profile  " + "  ".join(f"{c:>12}" for c in cols))
+    for profile, r in results.items():
+        print(f"{profile:<8} " + "  ".join(f"{r[c]:>12}" for c in cols))
+    if "wsgi" in results and "asgi" in results and results["wsgi"]["rps_per_core"]:
+        ratio = results["asgi"]["rps_per_core"] / results["wsgi"]["rps_per_core"]
+        print(f"\nasgi/wsgi throughput per core: {ratio:.2f}x   (server logs: {log_dir})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())